@@ -13,7 +13,7 @@ Deferred Phase 1 functionality (PTT/audio/touch) is moved to app_future.py.
 import time
 import board
 
-from lib.wifi_at import ESPATWiFi
+from lib.wifi_at import ESPATWiFi, URC_WIFI_DISCONNECT
 from lib.display import RoundDisplay
 
 try:
@@ -65,7 +65,8 @@ def show_state(ui, state, detail=""):
 
 
 def create_wifi():
-    return ESPATWiFi(board.GP0, board.GP1, debug="errors")
+    # Keep-alive: the periodic HTTP ping reuses one TCP link instead of reconnecting.
+    return ESPATWiFi(board.GP0, board.GP1, debug="errors", keep_alive=True)
 
 
 def wifi_connect_or_reconnect(wifi):
@@ -76,6 +77,7 @@ def wifi_connect_or_reconnect(wifi):
         print("WiFi credentials missing in secrets.py (wifi_ssid/wifi_password)")
         return False
 
+    # Answered from the URC-cached state; no AT round trip while it is known.
     if wifi.is_connected():
         return True
 
@@ -106,6 +108,8 @@ def main():
         show_state(ui, STATE_DISPLAY_OK, "display online")
 
     wifi = create_wifi()
+    wifi_events = []
+    wifi.subscribe(lambda event, _link_id: wifi_events.append(event))
 
     last_heartbeat = 0.0
     last_watchdog = 0.0
@@ -113,6 +117,15 @@ def main():
     while True:
         now = time.monotonic()
 
+        # Pick up URCs (WIFI DISCONNECT, WIFI GOT IP, CLOSED) as they arrive.
+        wifi.poll()
+        if wifi_events:
+            print("WIFI EVENTS:", ", ".join(wifi_events))
+            if URC_WIFI_DISCONNECT in wifi_events:
+                show_state(ui, STATE_DISPLAY_OK, "wifi lost")
+                last_watchdog = 0.0     # reconnect now, not at the next tick
+            wifi_events.clear()
+
         if now - last_watchdog >= WATCHDOG_INTERVAL_S:
             last_watchdog = now
             wifi_ok = wifi_connect_or_reconnect(wifi)
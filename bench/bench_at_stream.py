@@ -0,0 +1,98 @@
+"""Bytes per second: legacy grow-and-rescan ESP-AT reads vs. lib/at_stream.py.
+
+Replays a captured-style HTTP response split into 1460-byte +IPD frames,
+delivered in UART-sized chunks. The legacy path is the old ESPATWiFi loop
+(`response += chunk`, `in` checks on the whole buffer every poll, then decode
+and +IPD extraction); the streaming path feeds each chunk to ATStream once.
+Run from the repo root:
+
+    python bench/bench_at_stream.py
+"""
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+
+from at_stream import ATStream, CLOSED, IPD  # noqa: E402
+
+FRAME = 1460
+BODY_SIZES = (4096, 32768, 131072)
+CHUNK_SIZES = (64, 512)
+
+
+def capture(body_size):
+    body = bytes(48 + i % 64 for i in range(body_size))
+    http = b"HTTP/1.1 200 OK\r\nContent-Length: " + str(body_size).encode() + b"\r\n\r\n" + body
+    out = [b"\r\nRecv 64 bytes\r\n\r\nSEND OK\r\n"]
+    for i in range(0, len(http), FRAME):
+        frame = http[i:i + FRAME]
+        out.append(b"\r\n+IPD," + str(len(frame)).encode() + b":" + frame)
+    out.append(b"\r\nCLOSED\r\n")
+    return b"".join(out), http
+
+
+def legacy_extract_payload(response_text):
+    payloads = []
+    cursor = 0
+    while True:
+        start = response_text.find("+IPD,", cursor)
+        if start < 0:
+            break
+        colon = response_text.find(":", start)
+        if colon < 0:
+            break
+        payload_len = int(response_text[start + 5:colon].split(",")[-1].strip())
+        payloads.append(response_text[colon + 1:colon + 1 + payload_len])
+        cursor = colon + 1 + payload_len
+    return "".join(payloads)
+
+
+def legacy_read(chunks):
+    response = b""
+    for chunk in chunks:
+        response += chunk
+        if b"+IPD," in response and b"CLOSED" in response:
+            break
+    return legacy_extract_payload(response.decode("utf-8", "ignore")).encode()
+
+
+def stream_read(chunks):
+    stream = ATStream()
+    payload = []
+    for chunk in chunks:
+        for kind, _link, data in stream.feed(chunk):
+            if kind == IPD:
+                payload.append(bytes(data))
+            elif kind == CLOSED:
+                return b"".join(payload)
+    return b"".join(payload)
+
+
+def measure(fn, chunks, total):
+    start = time.perf_counter()
+    repeat = 0
+    while True:
+        result = fn(chunks)
+        repeat += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > 0.3:
+            return result, total * repeat / elapsed
+
+
+def main():
+    print("{:>8} {:>6} {:>14} {:>14} {:>8}".format("body B", "chunk", "legacy B/s", "stream B/s", "speedup"))
+    for body_size in BODY_SIZES:
+        raw, http = capture(body_size)
+        for chunk_size in CHUNK_SIZES:
+            chunks = [raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size)]
+            legacy, legacy_rate = measure(legacy_read, chunks, len(raw))
+            streamed, stream_rate = measure(stream_read, chunks, len(raw))
+            assert legacy == streamed == http
+            print("{:>8} {:>6} {:>14.0f} {:>14.0f} {:>7.1f}x".format(
+                body_size, chunk_size, legacy_rate, stream_rate, stream_rate / legacy_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Framebuffer RAM and frame time: full-screen framebuffer vs. band rendering.
+
+Draws the firmware startup screen (FirmwareApp._draw_startup) once into a full
+RGB565 framebuffer and once through lib/band_render.py for several band heights.
+For each it reports the buffer RAM, the windows and estimated bus time
+(bench/buscost.py), and the host CPU time to replay the display list and pack
+every band (lib/qspi_pack.py). Run from the repo root:
+
+    python bench/bench_band_render.py
+
+CPython has no framebuf, so drawing goes through SliceFrameBuffer below: a
+minimal RGB565 stand-in whose fills cost about what framebuf's do relative to
+packing. Only the relative cost of replaying per band is meaningful.
+"""
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from band_render import BandRenderer  # noqa: E402
+from buscost import FrameCost  # noqa: E402
+from qspi_pack import NibbleStream  # noqa: E402
+
+WIDTH = 360
+HEIGHT = 360
+BAND_ROWS = (8, 24, 40, 90)
+REPEAT = 3
+
+
+class SliceFrameBuffer:
+    """RGB565 fill_rect-based subset of framebuf (text as one box per glyph)."""
+
+    def __init__(self, buf, width, height):
+        self.buf = buf
+        self.width = width
+        self.height = height
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(0, x)
+        x1 = min(self.width, x + w)
+        if x0 >= x1:
+            return
+        row = bytes((c & 0xFF, c >> 8)) * (x1 - x0)
+        for yy in range(max(0, y), min(self.height, y + h)):
+            start = 2 * (yy * self.width + x0)
+            self.buf[start:start + len(row)] = row
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=0xFFFF):
+        for i in range(len(s)):
+            self.fill_rect(x + 8 * i, y, 7, 8, c)
+
+
+class NullSM:
+    def put(self, value, shift=0):
+        pass
+
+
+def startup_screen(d):
+    d.fill(0x0000)
+    d.text("RP2350-Touch-LCD-1.85C", 58, 20, 0x07FF)
+    d.text("MicroPython clean base", 76, 40, 0xFFFF)
+    d.text("Display: ST77916", 106, 80, 0x07E0)
+    d.text("Touch: CST816", 116, 98, 0x07E0)
+    d.text("ID: 0x03", 140, 116, 0xFFFF)
+    d.rect(40, 150, 280, 140, 0x001F)
+    d.fill_rect(50, 160, 260, 120, 0x0000)
+    d.text("Touch the screen", 120, 208, 0xFFFF)
+    d.text("coords print to REPL", 86, 228, 0xF81F)
+
+
+def full_frame():
+    buf = bytearray(WIDTH * HEIGHT * 2)
+    stream = NibbleStream(NullSM())
+    cost = FrameCost()
+
+    def frame():
+        startup_screen(SliceFrameBuffer(buf, WIDTH, HEIGHT))
+        stream.write(buf)
+
+    cost.window(WIDTH, HEIGHT)
+    return len(buf), cost, frame
+
+
+def banded_frame(rows):
+    buf = bytearray(WIDTH * rows * 2)
+    band = SliceFrameBuffer(buf, WIDTH, rows)
+    stream = NibbleStream(NullSM())
+    mv = memoryview(buf)
+    cost = FrameCost()
+
+    def write_band(top, n):
+        stream.write(mv[:n * WIDTH * 2])
+
+    renderer = BandRenderer(band, WIDTH, HEIGHT, rows, write_band)
+
+    def frame():
+        startup_screen(renderer)
+        renderer.render()
+
+    for top in range(0, HEIGHT, rows):
+        cost.window(WIDTH, min(rows, HEIGHT - top))
+    return len(buf), cost, frame
+
+
+def measure(frame):
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        frame()
+    return (time.perf_counter() - t0) * 1000 / REPEAT
+
+
+def main():
+    print("{:<10} {:>10} {:>8} {:>10} {:>10}".format("mode", "RAM bytes", "windows", "pio bus ms", "host ms"))
+    size, cost, frame = full_frame()
+    print("{:<10} {:>10} {:>8} {:>10.1f} {:>10.1f}".format(
+        "full", size, cost.windows, cost.bus_us(command_mode="pio") / 1000, measure(frame)))
+    for rows in BAND_ROWS:
+        size, cost, frame = banded_frame(rows)
+        print("{:<10} {:>10} {:>8} {:>10.1f} {:>10.1f}".format(
+            "band {}".format(rows), size, cost.windows, cost.bus_us(command_mode="pio") / 1000, measure(frame)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Bytes pushed per frame: full-screen show() vs. dirty-rectangle show().
+
+Replays the draw calls of the firmware screens against lib/damage.py and prints
+the wire cost of each frame. Run from the repo root:
+
+    python bench/bench_dirty_rect.py
+"""
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from buscost import FrameCost  # noqa: E402
+from damage import DamageTracker  # noqa: E402
+
+WIDTH = 360
+HEIGHT = 360
+
+
+def heartbeat(t):
+    # FirmwareApp._update_heartbeat
+    t.add(164, 300, 32, 32)
+
+
+def touch_readout(t):
+    # FirmwareApp._poll_touch
+    t.add(80, 260, 200, 24)
+    t.add(118, 266, 8 * len("x=123 y=045"), 8)
+
+
+def startup_screen(t):
+    # FirmwareApp._draw_startup starts with fill(); everything after is inside it.
+    t.add_full()
+
+
+def status_screen(t):
+    # main.show_ready repaints the whole screen.
+    t.add_full()
+
+
+def heartbeat_and_touch(t):
+    heartbeat(t)
+    touch_readout(t)
+
+
+SCENARIOS = (
+    ("heartbeat", heartbeat),
+    ("touch readout", touch_readout),
+    ("heartbeat + touch", heartbeat_and_touch),
+    ("startup screen", startup_screen),
+    ("status screen", status_screen),
+)
+
+
+def full_frame_cost():
+    cost = FrameCost()
+    cost.window(WIDTH, HEIGHT)
+    return cost
+
+
+def dirty_frame_cost(draw):
+    tracker = DamageTracker(WIDTH, HEIGHT)
+    draw(tracker)
+    cost = FrameCost()
+    for _x, _y, w, h in tracker.take():
+        cost.window(w, h)
+    return cost
+
+
+def main():
+    full = full_frame_cost()
+    print("{:<20} {:>8} {:>10} {:>10} {:>8} {:>12} {:>10}".format(
+        "scenario", "windows", "full B", "dirty B", "saved", "bitbang us", "pio us"))
+    for name, draw in SCENARIOS:
+        dirty = dirty_frame_cost(draw)
+        saved = 100.0 * (1 - dirty.total_bytes / full.total_bytes)
+        print("{:<20} {:>8} {:>10} {:>10} {:>7.1f}% {:>12.0f} {:>10.0f}".format(
+            name, dirty.windows, full.total_bytes, dirty.total_bytes, saved,
+            dirty.bus_us(), dirty.bus_us(command_mode="pio")))
+
+
+if __name__ == "__main__":
+    main()
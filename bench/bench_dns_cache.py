@@ -0,0 +1,60 @@
+"""HTTP GET latency with and without the ESP-AT client's DNS cache.
+
+lib/wifi_at.py against host/esp_at.py (115200-baud UART model, 40 ms TCP
+connect) with a simulated slow DNS: every host name lookup, whether by
+AT+CIPDOMAIN or inside AT+CIPSTART, takes DNS_MS. The URL names the local
+server as "ha.local". Without the cache (dns_size=0) every request resolves the
+name in AT+CIPSTART; with it the name is looked up once and later links are
+opened by IP. Run from the repo root:
+
+    python bench/bench_dns_cache.py
+"""
+import pathlib
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "host"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+REQUESTS = 20
+CONNECT_MS = 40
+DNS_MS = (50, 200)
+
+
+def run(server, dns_ms, dns_size):
+    sim = ESPATSimulator(baudrate=115200, connect_ms=CONNECT_MS, dns_ms=dns_ms, hosts={"ha.local": server.host})
+    wifi = ESPATWiFi(None, None, debug="silent", dns_size=dns_size)
+    wifi.uart = sim.uart
+    url = "http://ha.local:{}/ping".format(server.port)
+    times = []
+    for _ in range(REQUESTS):
+        start = time.monotonic()
+        assert wifi.http_get(url) == (200, "pong")
+        times.append((time.monotonic() - start) * 1000)
+    sim.close()
+    times.sort()
+    return times[len(times) // 2], sim.dns_lookups, wifi.dns
+
+
+def main():
+    print("{:>7} {:<10} {:>10} {:>9} {:>6} {:>7}".format("DNS ms", "cache", "median ms", "lookups", "hits", "misses"))
+    with LocalHTTPServer() as server:
+        for dns_ms in DNS_MS:
+            medians = []
+            for label, dns_size in (("off", 0), ("on", 8)):
+                median, lookups, cache = run(server, dns_ms, dns_size)
+                medians.append(median)
+                print("{:>7} {:<10} {:>10.1f} {:>9} {:>6} {:>7}".format(
+                    dns_ms, label, median, lookups, cache.hits, cache.misses))
+            print("{:>7} {:<10} {:>10.1f}".format("", "saved", medians[0] - medians[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Bytes and bus time per frame, measured on the host emulator.
+
+Boots the firmware ST77916 driver on host/emulator.py in several configurations,
+draws the startup screen plus a heartbeat update, and reports what the decoded
+QSPI traffic cost. These are counted bytes, not bench/buscost.py estimates.
+Run from the repo root:
+
+    python bench/bench_emulated_frames.py
+"""
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "host"))
+
+from emulator import Emulator  # noqa: E402
+
+CONFIGS = (
+    ("full square", {}),
+    ("round mask 16", {"mask_band_rows": 16}),
+    ("dma + mask 16", {"use_dma": True, "mask_band_rows": 16}),
+    ("gs8 + mask 16", {"color_mode": "gs8", "mask_band_rows": 16}),
+    ("band 24 + mask 16", {"band_rows": 24, "mask_band_rows": 16}),
+)
+
+
+def startup_screen(d):
+    d.fill(0x0000)
+    d.text("RP2350-Touch-LCD-1.85C", 58, 20, 0x07FF)
+    d.text("MicroPython clean base", 76, 40, 0xFFFF)
+    d.rect(40, 150, 280, 140, 0x001F)
+    d.fill_rect(50, 160, 260, 120, 0x0000)
+    d.text("Touch the screen", 120, 208, 0xFFFF)
+
+
+def heartbeat(d):
+    d.fill_rect(164, 300, 32, 32, 0x07E0)
+
+
+def present(d):
+    if getattr(d, "_presenter", None) is not None:
+        d.present_async()
+        while d.poll():
+            pass
+    else:
+        d.show()
+
+
+def main():
+    print("{:<20} {:>10} {:>8} {:>10} {:>10} {:>8} {:>10}".format(
+        "config", "boot us", "windows", "bytes", "bus us", "hb win", "hb bytes"))
+    for name, options in CONFIGS:
+        emu = Emulator()
+        display = emu.firmware_driver(**options)
+        boot = emu.panel.take_stats()
+        startup_screen(display)
+        present(display)
+        frame = emu.panel.take_stats()
+        heartbeat(display)
+        present(display)
+        beat = emu.panel.take_stats()
+        assert not emu.panel.errors, emu.panel.errors
+        print("{:<20} {:>10.0f} {:>8} {:>10} {:>10.0f} {:>8} {:>10}".format(
+            name, boot["bus_us"], frame["windows"], frame["total_bytes"], frame["bus_us"],
+            beat["windows"], beat["total_bytes"]))
+
+
+if __name__ == "__main__":
+    main()
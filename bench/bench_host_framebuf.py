@@ -0,0 +1,74 @@
+"""Screen renders per second with the host framebuf backends.
+
+Draws the firmware startup screen plus a moving heartbeat block into a
+360x360 FrameBuffer with host/framebuf_py.py and host/framebuf_np.py, in each
+panel colour mode, and checks that every frame is byte-identical between the
+two. This is the rate a CI job can render and diff screens without the bus
+emulator. Needs NumPy for the second backend. Run from the repo root:
+
+    python bench/bench_host_framebuf.py
+"""
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "host"))
+
+import framebuf_py  # noqa: E402
+
+try:
+    import framebuf_np
+except ImportError:
+    framebuf_np = None
+
+WIDTH = HEIGHT = 360
+FORMATS = (("rgb565", framebuf_py.RGB565, 16), ("gs8", framebuf_py.GS8, 8), ("gs4", framebuf_py.GS4_HMSB, 4))
+FRAMES = 20
+
+
+def startup_screen(d, frame, white):
+    d.fill(0)
+    d.text("RP2350-Touch-LCD-1.85C", 58, 20, white)
+    d.text("MicroPython clean base", 76, 40, white)
+    d.text("Display: ST77916", 106, 80, white)
+    d.text("Touch: CST816", 116, 98, white)
+    d.rect(40, 150, 280, 140, white)
+    d.fill_rect(50, 160, 260, 120, 0)
+    d.text("Touch the screen", 120, 208, white)
+    d.text("coords print to REPL", 86, 228, white)
+    d.fill_rect(164 + frame % 8, 300, 32, 32, white)
+
+
+def run(module, fmt, bpp, white):
+    buf = bytearray(WIDTH * HEIGHT * bpp // 8)
+    fb = module.FrameBuffer(buf, WIDTH, HEIGHT, fmt)
+    frames = []
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        startup_screen(fb, frame, white)
+        frames.append(bytes(buf))
+    return FRAMES / (time.perf_counter() - start), frames
+
+
+def main():
+    backends = [("py", framebuf_py)]
+    if framebuf_np is None:
+        print("NumPy not installed: pure-Python backend only")
+    else:
+        backends.append(("np", framebuf_np))
+    print("{:<8} {:<8} {:>12}".format("mode", "backend", "frames/s"))
+    for mode, fmt, bpp in FORMATS:
+        white = (1 << bpp) - 1
+        reference = None
+        for name, module in backends:
+            rate, frames = run(module, fmt, bpp, white)
+            if reference is None:
+                reference = frames
+            elif frames != reference:
+                raise SystemExit("{} {} frames differ from the pure-Python backend".format(mode, name))
+            print("{:<8} {:<8} {:>12.0f}".format(mode, name, rate))
+
+
+if __name__ == "__main__":
+    main()
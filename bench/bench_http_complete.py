@@ -0,0 +1,62 @@
+"""Time to complete one HTTP GET through the ESP-AT client, per response type.
+
+Runs lib/wifi_at.py against host/esp_at.py (115200-baud UART model, simulated
+TCP connect time) bridged to host/local_http.py. /hold answers with a
+Content-Length body but keeps the socket open for 1 s, like a server that
+ignores "Connection: close"; a client that waits for CLOSED pays that second.
+Run from the repo root:
+
+    python bench/bench_http_complete.py
+"""
+import pathlib
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "host"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+BAUDRATE = 115200
+CONNECT_MS = 40
+CASES = (
+    ("/ping", 10),
+    ("/chunked", 10),
+    ("/bytes/8192", 5),
+    ("/hold", 3),
+)
+
+
+def run(server, path, repeat, keep_alive):
+    sim = ESPATSimulator(baudrate=BAUDRATE, connect_ms=CONNECT_MS)
+    wifi = ESPATWiFi(None, None, debug="silent", keep_alive=keep_alive)
+    wifi.uart = sim.uart
+    times = []
+    ok = 0
+    for _ in range(repeat):
+        start = time.monotonic()
+        status, _body = wifi.http_get(server.url(path))
+        times.append((time.monotonic() - start) * 1000)
+        ok += status == 200
+    wifi.close()
+    sim.close()
+    return ok, sorted(times)
+
+
+def main():
+    print("{:<12} {:<12} {:>6} {:>9} {:>9} {:>9}".format("mode", "path", "ok", "mean ms", "min ms", "max ms"))
+    with LocalHTTPServer() as server:
+        for mode, keep_alive in (("close", False), ("keep-alive", True)):
+            for path, repeat in CASES:
+                ok, times = run(server, path, repeat, keep_alive)
+                print("{:<12} {:<12} {:>6} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                    mode, path, "{}/{}".format(ok, repeat), sum(times) / len(times), times[0], times[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Time and heap per call: str-based parse_response() vs. at_stream.ATReply.
+
+Parses two captured-style replies: a short AT+CIPSTATUS? status reply and an
+AT+CIPSEND exchange carrying a 1460-byte +IPD frame. parse_response() is the
+str parser kept for callers of the dict API (replace/split, two scans,
+_extract_payload slicing); the ATReply path reuses one instance over the
+received bytes and reads only the status.
+
+The second table is the step is_connected() actually runs on the line events
+ATStream yields for AT+CIPSTATUS?: decoding and joining them for
+parse_response(), or copying them into the client's reply buffer and reading
+STATUS: with its reused ATReply. Heap is the tracemalloc peak above the
+starting level during one call. Run from the repo root:
+
+    python bench/bench_parse_response.py
+"""
+import pathlib
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+from at_stream import ATReply  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+STATUS = b"AT+CIPSTATUS?\r\nSTATUS:3\r\n+CIPSTATUS:0,\"TCP\",\"192.168.1.10\",80,51234,0\r\n\r\nOK\r\n"
+_HTTP = b"HTTP/1.1 200 OK\r\nContent-Length: 1421\r\n\r\n" + bytes(48 + i % 64 for i in range(1421))
+SEND = (b"AT+CIPSEND=64\r\n\r\nOK\r\n> \r\nRecv 64 bytes\r\n\r\nSEND OK\r\n\r\n+IPD,"
+        + str(len(_HTTP)).encode() + b":" + _HTTP + b"\r\nCLOSED\r\n")
+# What ATStream yields for STATUS once the echo is consumed.
+STATUS_EVENTS = [line for line in STATUS.split(b"\r\n")[1:] if line]
+
+
+def dict_parse(raw, command):
+    return ESPATWiFi.parse_response(raw.decode("utf-8", "ignore"), command)
+
+
+_REPLY = ATReply()
+
+
+def reply_parse(raw, command):
+    return _REPLY.parse(raw, command=command).status
+
+
+def status_from_text(events, _wifi):
+    resp = "\r\n".join(data.decode("utf-8", "ignore") for data in events)
+    for line in ESPATWiFi.parse_response(resp, command="AT+CIPSTATUS?")["intermediate"]:
+        if line.startswith("STATUS:"):
+            return int(line.split(":", 1)[1])
+    return -1
+
+
+def status_from_capture(events, wifi):
+    wifi._reply_len = 0
+    for data in events:
+        wifi._capture(data)
+    return wifi._reply.parse(wifi._reply_buf, 0, wifi._reply_len).value(b"STATUS:")
+
+
+def per_call(fn, *args):
+    fn(*args)
+    start = time.perf_counter()
+    repeat = 0
+    while time.perf_counter() - start < 0.2:
+        fn(*args)
+        repeat += 1
+    us = (time.perf_counter() - start) / repeat * 1e6
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return us, peak
+
+
+def main():
+    print("{:<14} {:<18} {:>10} {:>12}".format("reply", "parser", "us/call", "heap B/call"))
+    for name, raw, command in (("CIPSTATUS", STATUS, "AT+CIPSTATUS?"), ("CIPSEND+IPD", SEND, "AT+CIPSEND=64")):
+        for label, fn, cmd in (("parse_response", dict_parse, command),
+                               ("ATReply (reused)", reply_parse, command.encode())):
+            us, peak = per_call(fn, raw, cmd)
+            print("{:<14} {:<18} {:>10.1f} {:>12}".format(name, label, us, peak))
+
+    wifi = ESPATWiFi(None, None, debug="silent")
+    print()
+    print("{:<33} {:>10} {:>12}".format("is_connected reply handling", "us/call", "heap B/call"))
+    for label, fn in (("decode + parse_response", status_from_text),
+                      ("capture + ATReply.value", status_from_capture)):
+        assert fn(STATUS_EVENTS, wifi) == 3
+        us, peak = per_call(fn, STATUS_EVENTS, wifi)
+        print("{:<33} {:>10.1f} {:>12}".format(label, us, peak))
+
+
+if __name__ == "__main__":
+    main()
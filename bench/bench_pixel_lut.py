@@ -0,0 +1,56 @@
+"""Expansion throughput: RGB565 nibble packing vs. GS8/GS4 LUT expansion.
+
+Streams one full 360x360 frame in each colour mode through NibbleStream against
+a no-op state machine and reports framebuffer size and pixels per second. The
+wire output is RGB565 words in every mode, so panel bus time is unchanged; on
+the board the viper kernels replace the *_py functions:
+
+    python bench/bench_pixel_lut.py
+"""
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+
+from pixel_lut import MODES, PixelFormat  # noqa: E402
+from qspi_pack import NibbleStream  # noqa: E402
+
+WIDTH = 360
+HEIGHT = 360
+REPEAT = 3
+
+
+class NullSM:
+    def __init__(self):
+        self.words = 0
+
+    def put(self, value, shift=0):
+        self.words += len(value)
+
+
+def measure(mode, rng):
+    fmt = PixelFormat(mode)
+    frame = bytearray(rng.getrandbits(8) for _ in range(fmt.buffer_size(WIDTH, HEIGHT)))
+    sm = NullSM()
+    stream = NibbleStream(sm, pack=fmt.pack, bits_per_pixel=fmt.bits_per_pixel)
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        stream.write(frame)
+    elapsed = time.perf_counter() - t0
+    print("{:<8} {:>8} B framebuffer {:>8} px {:>8.1f} ms/frame {:>12.0f} px/s".format(
+        mode, len(frame), sm.words // REPEAT, elapsed * 1000 / REPEAT, sm.words / elapsed))
+    return elapsed
+
+
+def main():
+    rng = random.Random(0)
+    times = {mode: measure(mode, rng) for mode in MODES}
+    for mode in ("gs8", "gs4"):
+        print("{} vs rgb565: {:.2f}x".format(mode, times["rgb565"] / times[mode]))
+
+
+if __name__ == "__main__":
+    main()
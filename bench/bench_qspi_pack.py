@@ -0,0 +1,66 @@
+"""Words per second: legacy per-word put() loop vs. bulk nibble packing.
+
+Packs one full 360x360 RGB565 frame (129,600 words) with each strategy against a
+no-op state machine. On the board the viper kernel replaces pack_nibbles_py;
+run this on the host to compare the interpreter-bound paths:
+
+    python bench/bench_qspi_pack.py
+"""
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+
+from qspi_pack import NibbleStream  # noqa: E402
+
+FRAME_BYTES = 360 * 360 * 2
+REPEAT = 3
+
+
+class NullSM:
+    def __init__(self):
+        self.words = 0
+
+    def put(self, value, shift=0):
+        self.words += len(value) if hasattr(value, "__len__") else 1
+
+
+def legacy_write(sm, data):
+    for i in range(0, len(data), 2):
+        b1 = data[i]
+        if i + 1 < len(data):
+            b2 = data[i + 1]
+            word = ((b1 >> 4) & 0xF) | ((b1 & 0xF) << 4) | ((b2 >> 4) & 0xF) << 8 | ((b2 & 0xF) << 12)
+        else:
+            word = ((data[i] >> 4) & 0xF) | ((data[i] & 0xF) << 4)
+        sm.put(word)
+
+
+def bulk_write(sm, data):
+    NibbleStream(sm).write(data)
+
+
+def measure(name, write, frame):
+    sm = NullSM()
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        write(sm, frame)
+    elapsed = time.perf_counter() - t0
+    print("{:<24} {:>10} words {:>8.1f} ms/frame {:>12.0f} words/s".format(
+        name, sm.words // REPEAT, elapsed * 1000 / REPEAT, sm.words / elapsed))
+    return elapsed
+
+
+def main():
+    rng = random.Random(0)
+    frame = bytearray(rng.getrandbits(8) for _ in range(FRAME_BYTES))
+    legacy = measure("legacy put() per word", legacy_write, frame)
+    bulk = measure("bulk NibbleStream", bulk_write, frame)
+    print("speed-up: {:.2f}x".format(legacy / bulk))
+
+
+if __name__ == "__main__":
+    main()
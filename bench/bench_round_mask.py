@@ -0,0 +1,73 @@
+"""Bytes and estimated bus time: full-square vs. round-mask transfers.
+
+Compares the full 360x360 square against the visible-span bands of
+lib/round_mask.py for several band heights, alone and composed with the
+dirty-rectangle scenarios from bench_dirty_rect.py. Run from the repo root:
+
+    python bench/bench_round_mask.py
+"""
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from bench_dirty_rect import HEIGHT, SCENARIOS, WIDTH  # noqa: E402
+from buscost import FrameCost  # noqa: E402
+from damage import DamageTracker  # noqa: E402
+from round_mask import RoundMask  # noqa: E402
+
+BAND_ROWS = (1, 4, 8, 16, 24)
+
+
+def frame_cost(draw, mask=None):
+    tracker = DamageTracker(WIDTH, HEIGHT)
+    draw(tracker)
+    cost = FrameCost()
+    for x, y, w, h in tracker.take():
+        windows = [(x, y, w, h)] if mask is None else mask.clip(x, y, w, h)
+        for _wx, _wy, ww, wh in windows:
+            cost.window(ww, wh)
+    return cost
+
+
+def full_frame(t):
+    t.add_full()
+
+
+def main():
+    square = frame_cost(full_frame)
+    print("Full frame")
+    print("{:<12} {:>8} {:>10} {:>8} {:>12} {:>10} {:>10}".format(
+        "band rows", "windows", "bytes", "saved", "bitbang us", "pio us", "clip us"))
+    print("{:<12} {:>8} {:>10} {:>8} {:>12.0f} {:>10.0f} {:>10}".format(
+        "square", square.windows, square.total_bytes, "-", square.bus_us(),
+        square.bus_us(command_mode="pio"), "-"))
+    for rows in BAND_ROWS:
+        mask = RoundMask(WIDTH, HEIGHT, rows)
+        t0 = time.perf_counter()
+        for _ in range(100):
+            mask.clip(0, 0, WIDTH, HEIGHT)
+        clip_us = (time.perf_counter() - t0) * 1e6 / 100
+        cost = frame_cost(full_frame, mask)
+        saved = 100.0 * (1 - cost.total_bytes / square.total_bytes)
+        print("{:<12} {:>8} {:>10} {:>7.1f}% {:>12.0f} {:>10.0f} {:>10.1f}".format(
+            rows, cost.windows, cost.total_bytes, saved, cost.bus_us(),
+            cost.bus_us(command_mode="pio"), clip_us))
+
+    mask = RoundMask(WIDTH, HEIGHT, 8)
+    print("\nComposed with dirty rectangles (band rows = 8)")
+    print("{:<20} {:>10} {:>10} {:>14} {:>14}".format(
+        "scenario", "dirty B", "masked B", "dirty pio us", "masked pio us"))
+    for name, draw in SCENARIOS:
+        dirty = frame_cost(draw)
+        masked = frame_cost(draw, mask)
+        print("{:<20} {:>10} {:>10} {:>14.0f} {:>14.0f}".format(
+            name, dirty.total_bytes, masked.total_bytes,
+            dirty.bus_us(command_mode="pio"), masked.bus_us(command_mode="pio")))
+
+
+if __name__ == "__main__":
+    main()
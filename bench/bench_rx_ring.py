@@ -0,0 +1,109 @@
+"""UART receive: read() into fresh bytes vs. readinto() an at_stream.RxRing.
+
+Streams 256 KiB of +IPD frames (1460-byte payloads) through ATStream, with the
+UART holding 64, 256 or 1024 new bytes at each poll, as the ESP-AT clients see
+a download. The read() path is the clients' previous loop (uart.read(in_waiting)
+then feed); the ring path (1 KiB) is what they do now. Reported per poll: time
+and the median tracemalloc peak above the starting level. Both paths pay a fixed
+cost for the parser's generator and memoryview objects (large on CPython, tens
+of bytes on MicroPython); only the read() peak grows with the bytes per poll,
+since every chunk is a fresh heap object left for the GC.
+Run from the repo root:
+
+    python bench/bench_rx_ring.py
+"""
+import pathlib
+import sys
+import time
+import tracemalloc
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+
+from at_stream import ATStream, RxRing  # noqa: E402
+
+ARRIVALS = (64, 256, 1024)
+_FRAME = b"+IPD,1460:" + bytes(48 + i % 64 for i in range(1460)) + b"\r\n"
+STREAM = _FRAME * (256 * 1024 // len(_FRAME))
+
+
+class TrickleUART:
+    """busio.UART-like port that holds `arrival` more bytes of STREAM at each poll."""
+
+    def __init__(self, arrival):
+        self.arrival = arrival
+        self.pos = 0
+        self.limit = 0
+
+    def arrive(self):
+        self.limit = min(self.limit + self.arrival, len(STREAM))
+
+    @property
+    def in_waiting(self):
+        return self.limit - self.pos
+
+    def read(self, nbytes):
+        data = STREAM[self.pos:self.pos + nbytes]
+        self.pos += len(data)
+        return data
+
+    def readinto(self, buf):
+        n = min(len(buf), self.limit - self.pos)
+        buf[:n] = memoryview(STREAM)[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+def poll_read(uart, stream, _ring):
+    if uart.in_waiting:
+        chunk = uart.read(uart.in_waiting)
+        for _event in stream.feed(chunk):
+            pass
+        return len(chunk)
+    return 0
+
+
+def poll_ring(uart, stream, ring):
+    got = ring.fill(uart)
+    for _event in ring.feed(stream):
+        pass
+    return got
+
+
+def run(poll, arrival):
+    uart = TrickleUART(arrival)
+    stream = ATStream()
+    ring = RxRing(1024)
+    polls = 0
+    start = time.perf_counter()
+    while uart.pos < len(STREAM):
+        uart.arrive()
+        poll(uart, stream, ring)
+        polls += 1
+    us = (time.perf_counter() - start) / polls * 1e6
+
+    uart = TrickleUART(arrival)
+    stream = ATStream()
+    peaks = []
+    tracemalloc.start()
+    while uart.pos < len(STREAM):
+        uart.arrive()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        poll(uart, stream, ring)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    peaks.sort()
+    return polls, us, peaks[len(peaks) // 2]
+
+
+def main():
+    print("{:<18} {:>8} {:>8} {:>10} {:>14}".format("receive", "B/poll", "polls", "us/poll", "peak B/poll"))
+    for arrival in ARRIVALS:
+        for name, poll in (("read() + feed", poll_read), ("RxRing readinto", poll_ring)):
+            polls, us, peak = run(poll, arrival)
+            print("{:<18} {:>8} {:>8} {:>10.1f} {:>14}".format(name, arrival, polls, us, peak))
+
+
+if __name__ == "__main__":
+    main()
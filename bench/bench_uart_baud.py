@@ -0,0 +1,58 @@
+"""HTTP download time before and after ESPATWiFi.negotiate_baudrate().
+
+Runs lib/wifi_at.py against host/esp_at.py starting at 115200 baud, with and
+without a line that fails above 460800 baud, and prints the probe's AT+GMR
+round-trip time for each rate (ms; "-" where the probe failed) plus the time to
+GET a 20 kB body at the final rate.
+Run from the repo root:
+
+    python bench/bench_uart_baud.py
+"""
+import pathlib
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "host"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+BODY = 20000
+
+
+def download_ms(wifi, server):
+    start = time.monotonic()
+    status, body = wifi.http_get(server.url("/bytes/{}".format(BODY)))
+    assert (status, len(body)) == (200, BODY)
+    return (time.monotonic() - start) * 1000
+
+
+def run(server, max_baudrate, negotiate):
+    sim = ESPATSimulator(baudrate=115200, max_baudrate=max_baudrate)
+    wifi = ESPATWiFi(None, None, debug="silent")
+    wifi.uart = sim.uart
+    report = wifi.negotiate_baudrate() if negotiate else [(sim.baudrate, None)]
+    elapsed = download_ms(wifi, server)
+    wifi.close()
+    sim.close()
+    return report, sim.baudrate, elapsed
+
+
+def main():
+    print("{:<24} {:<44} {:>9} {:>9}".format("line", "AT+GMR round trip ms per rate", "baud", "GET ms"))
+    with LocalHTTPServer() as server:
+        for name, max_baudrate, negotiate in (("115200 (no negotiation)", None, False),
+                                              ("clean", None, True),
+                                              ("fails above 460800", 460800, True)):
+            report, rate, elapsed = run(server, max_baudrate, negotiate)
+            probes = " ".join("{}:{}".format(r, "-" if t is None else "{:.1f}".format(t)) for r, t in report)
+            print("{:<24} {:<44} {:>9} {:>9.1f}".format(name, probes if negotiate else "", rate, elapsed))
+
+
+if __name__ == "__main__":
+    main()
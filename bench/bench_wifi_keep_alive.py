@@ -0,0 +1,57 @@
+"""Latency of 50 sequential HTTP GETs: one link per request vs. keep-alive.
+
+Runs lib/wifi_at.py against host/esp_at.py (115200-baud UART model, simulated
+TCP connect time) bridged to a local HTTP server from host/local_http.py, so
+the numbers include AT command traffic, serial time and the client's own
+polling, but not a real WiFi round trip. Run from the repo root:
+
+    python bench/bench_wifi_keep_alive.py
+"""
+import pathlib
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "host"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+REQUESTS = 50
+BAUDRATE = 115200
+CONNECT_MS = 40
+
+
+def run(server, keep_alive):
+    sim = ESPATSimulator(baudrate=BAUDRATE, connect_ms=CONNECT_MS)
+    wifi = ESPATWiFi(None, None, debug="silent", keep_alive=keep_alive)
+    wifi.uart = sim.uart
+    latencies = []
+    ok = 0
+    for _ in range(REQUESTS):
+        start = time.monotonic()
+        status, _body = wifi.http_get(server.url("/ping"))
+        latencies.append((time.monotonic() - start) * 1000)
+        ok += status == 200
+    wifi.close()
+    sim.close()
+    return ok, sorted(latencies), sim.counts.get("AT+CIPSTART", 0)
+
+
+def main():
+    print("{:<12} {:>6} {:>9} {:>9} {:>9} {:>9} {:>10}".format(
+        "mode", "ok", "mean ms", "p50 ms", "p95 ms", "total s", "CIPSTARTs"))
+    with LocalHTTPServer() as server:
+        for name, keep_alive in (("close", False), ("keep-alive", True)):
+            ok, lat, starts = run(server, keep_alive)
+            print("{:<12} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.2f} {:>10}".format(
+                name, "{}/{}".format(ok, REQUESTS), sum(lat) / len(lat), lat[len(lat) // 2],
+                lat[int(len(lat) * 0.95) - 1], sum(lat) / 1000, starts))
+
+
+if __name__ == "__main__":
+    main()
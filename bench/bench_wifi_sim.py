@@ -0,0 +1,115 @@
+"""WiFi connect timing and HTTP success rate against the ESP-AT simulator.
+
+The Phase 0 exit report metrics (docs/phase0-exit.md sections 3 and 4), measured
+on the host: host/esp_at.py (115200-baud UART model, simulated join and TCP
+connect times, a share of failed TCP connects) bridged to a local HTTP server
+from host/local_http.py. The Stage C path (lib/at_transport.py through
+machine.UART, one attempt per request) and lib/wifi_at.py (retries failed
+connects) run the same requests. Numbers reflect the simulated WiFi, not a real
+AP. Run from the repo root:
+
+    python bench/bench_wifi_sim.py
+"""
+import pathlib
+import sys
+import time
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lib"))
+sys.path.insert(0, str(ROOT / "host"))
+sys.modules.setdefault("busio", types.SimpleNamespace(UART=lambda *args, **kwargs: None))
+
+import machine  # noqa: E402
+from at_transport import ATTransport  # noqa: E402
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+from wifi_at import ESPATWiFi  # noqa: E402
+
+CYCLES = 10
+REQUESTS = 50
+JOIN_MS = 400
+CONNECT_MS = 40
+CONNECT_FAIL_RATE = 0.05
+AP = ("orb-ap", "secret")
+
+
+def simulator():
+    return ESPATSimulator(baudrate=115200, connect_ms=CONNECT_MS, join_ms=JOIN_MS, ap=AP,
+                          connect_fail_rate=CONNECT_FAIL_RATE, seed=7)
+
+
+def transport(sim):
+    machine.reset()
+    machine.attach_uart(0, sim.uart)
+    return ATTransport(machine.UART(0, baudrate=115200),
+                       ticks_ms=lambda: int(time.monotonic() * 1000),
+                       ticks_diff=lambda a, b: a - b,
+                       sleep_ms=lambda ms: time.sleep(ms / 1000))
+
+
+def stage_c_connects(sim):
+    at = transport(sim)
+    times = []
+    for _ in range(CYCLES):
+        start = time.monotonic()
+        ok = (at.command("AT", 600).ok and at.command("AT+CWMODE=1", 1000).ok
+              and at.command('AT+CWJAP="{}","{}"'.format(*AP), 15000).ok)
+        times.append((time.monotonic() - start) * 1000 if ok else None)
+        at.command("AT+CWQAP", 1000)
+    return times
+
+
+def stage_c_gets(sim, server):
+    at = transport(sim)
+    at.command("AT+CIPMUX=0", 800)
+    ok = 0
+    request = "GET /ping HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n\r\n".format(server.host).encode()
+    for _ in range(REQUESTS):
+        if not at.command('AT+CIPSTART="TCP","{}",{}'.format(server.host, server.port), 7000).ok:
+            continue
+        if at.command("AT+CIPSEND={}".format(len(request)), 2000, prompt=True).ok:
+            _reply, response = at.send_http(request, 10000)
+            ok += response.complete and response.status == 200
+        if not at.link_closed:
+            at.command("AT+CIPCLOSE", 800)
+    return ok
+
+
+def wifi_at_connects(sim):
+    wifi = ESPATWiFi(None, None, debug="silent")
+    wifi.uart = sim.uart
+    times = []
+    for _ in range(CYCLES):
+        start = time.monotonic()
+        ok = wifi.connect(*AP)
+        times.append((time.monotonic() - start) * 1000 if ok else None)
+    return times
+
+
+def wifi_at_gets(sim, server):
+    wifi = ESPATWiFi(None, None, debug="silent")
+    wifi.uart = sim.uart
+    ok = sum(wifi.http_get(server.url("/ping"))[0] == 200 for _ in range(REQUESTS))
+    wifi.close()
+    return ok
+
+
+def main():
+    print("{:<22} {:>10} {:>10} {:>10} {:>12}".format(
+        "path", "joins", "median ms", "worst ms", "HTTP ok"))
+    with LocalHTTPServer() as server:
+        for name, connects, gets in (("Stage C (at_transport)", stage_c_connects, stage_c_gets),
+                                     ("wifi_at (retries)", wifi_at_connects, wifi_at_gets)):
+            sim = simulator()
+            times = connects(sim)
+            good = sorted(t for t in times if t is not None)
+            ok = gets(sim, server)
+            sim.close()
+            print("{:<22} {:>10} {:>10.1f} {:>10.1f} {:>12}".format(
+                name, "{}/{}".format(len(good), CYCLES), good[len(good) // 2] if good else 0,
+                good[-1] if good else 0, "{}/{} ({:.0%})".format(ok, REQUESTS, ok / REQUESTS)))
+
+
+if __name__ == "__main__":
+    main()
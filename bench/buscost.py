@@ -0,0 +1,52 @@
+"""Byte/time cost model for the ST77916 QSPI link, shared by the host benchmarks.
+
+Counts what the drivers actually put on the wire: 1-bit command/parameter bytes
+(0x02, 0x00, cmd, 0x00 header + params) and 4-bit pixel bytes.
+"""
+
+# firmware/board/config.py DISPLAY_QSPI_FREQ_HZ; the PIO program spends 4 SM cycles per nibble.
+QSPI_FREQ_HZ = 80_000_000
+PIO_CYCLES_PER_NIBBLE = 4
+
+# Rough cost of one bit-banged command byte (8 x sclk/d0/sclk Pin writes) on RP2350 MicroPython.
+BITBANG_US_PER_BYTE = 50.0
+
+# PIO command phase (command_mode="pio"): 4 SM cycles per bit, plus the interpreter
+# overhead of one _write_cmd call (two put()s and the FIFO drain wait). That overhead
+# is an estimate, not a measurement: replace it with a third of the pio set_window
+# time reported by bench/display_cmd_timing.py on the board (three commands per call).
+PIO_CYCLES_PER_BIT = 4
+PIO_US_PER_COMMAND_ESTIMATE = 15.0
+
+CMD_HEADER_BYTES = 4
+WINDOW_CMD_BYTES = 2 * (CMD_HEADER_BYTES + 4) + CMD_HEADER_BYTES  # CASET + RASET + RAMWR
+
+
+class FrameCost:
+    """Accumulates wire bytes for one frame."""
+
+    def __init__(self):
+        self.windows = 0
+        self.commands = 0
+        self.cmd_bytes = 0
+        self.pixel_bytes = 0
+
+    def window(self, w, h, bytes_per_pixel=2):
+        self.windows += 1
+        self.commands += 3
+        self.cmd_bytes += WINDOW_CMD_BYTES
+        self.pixel_bytes += w * h * bytes_per_pixel
+
+    @property
+    def total_bytes(self):
+        return self.cmd_bytes + self.pixel_bytes
+
+    def bus_us(self, freq_hz=QSPI_FREQ_HZ, command_mode="bitbang"):
+        """Estimated wire time: PIO pixel stream plus the command phase (per-byte/per-command estimates above)."""
+        pixel_us = self.pixel_bytes * 2 * PIO_CYCLES_PER_NIBBLE * 1_000_000 / freq_hz
+        if command_mode == "pio":
+            cmd_us = self.cmd_bytes * 8 * PIO_CYCLES_PER_BIT * 1_000_000 / freq_hz
+            cmd_us += self.commands * PIO_US_PER_COMMAND_ESTIMATE
+        else:
+            cmd_us = self.cmd_bytes * BITBANG_US_PER_BYTE
+        return pixel_us + cmd_us
@@ -0,0 +1,67 @@
+"""On-device timing: bit-banged vs. PIO command phase (MicroPython, run on the board).
+
+Copy next to the firmware files (see firmware/README.md) and run from the REPL:
+
+    import display_cmd_timing
+
+For each command_mode it reports driver construction time (reset + init table),
+the init table alone, and the mean set_window latency. The bitbang times include
+handing SCLK/D0 from PIO0 to GPIO and back around every command, which the
+driver needs for the bit-banged bytes to reach the pins at all. Divide the pio
+set_window time by three for bench/buscost.py's per-command estimate.
+"""
+import time
+
+from board import config, pins
+from drivers.display import ST77916
+
+SET_WINDOW_ROUNDS = 200
+
+
+def build(command_mode):
+    return ST77916(
+        width=config.DISPLAY_WIDTH,
+        height=config.DISPLAY_HEIGHT,
+        rotation=config.DISPLAY_ROTATION,
+        qspi_freq_hz=config.DISPLAY_QSPI_FREQ_HZ,
+        reset_low_ms=config.DISPLAY_RESET_LOW_MS,
+        reset_high_ms=config.DISPLAY_RESET_HIGH_MS,
+        post_init_ms=config.DISPLAY_POST_INIT_MS,
+        pin_sclk=pins.LCD_SCLK,
+        pin_d0=pins.LCD_D0,
+        pin_d1=pins.LCD_D1,
+        pin_d2=pins.LCD_D2,
+        pin_d3=pins.LCD_D3,
+        pin_cs=pins.LCD_CS,
+        pin_rst=pins.LCD_RST,
+        pin_te=pins.LCD_TE,
+        command_mode=command_mode,
+    )
+
+
+def measure(command_mode):
+    t0 = time.ticks_us()
+    display = build(command_mode)
+    boot_us = time.ticks_diff(time.ticks_us(), t0)
+
+    t0 = time.ticks_us()
+    display._init_panel()
+    init_us = time.ticks_diff(time.ticks_us(), t0)
+
+    t0 = time.ticks_us()
+    for _ in range(SET_WINDOW_ROUNDS):
+        display.set_window(164, 300, 195, 331)
+    window_us = time.ticks_diff(time.ticks_us(), t0) / SET_WINDOW_ROUNDS
+
+    display.deinit()
+    return boot_us, init_us, window_us
+
+
+def main():
+    print("{:<8} {:>10} {:>10} {:>14}".format("mode", "boot ms", "init ms", "set_window us"))
+    for mode in ("bitbang", "pio"):
+        boot_us, init_us, window_us = measure(mode)
+        print("{:<8} {:>10.1f} {:>10.1f} {:>14.1f}".format(mode, boot_us / 1000, init_us / 1000, window_us))
+
+
+main()
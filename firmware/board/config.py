@@ -11,6 +11,41 @@ DISPLAY_RESET_LOW_MS = 100
 DISPLAY_RESET_HIGH_MS = 100
 DISPLAY_POST_INIT_MS = 20
 
+# Command/parameter phase: "pio" (second state machine) or "bitbang" (legacy GPIO path)
+DISPLAY_COMMAND_MODE = "pio"
+
+# Round-panel transfer mask: rows per visible-span band (0 = stream the full square).
+# Each band costs a set_window; 16 rows is the sweet spot with PIO commands
+# (see bench/bench_round_mask.py). Off until the masked windows are checked on
+# hardware; keep 0 with DISPLAY_COMMAND_MODE = "bitbang".
+DISPLAY_MASK_BAND_ROWS = 0
+
+# DMA-fed present_async(). Without DISPLAY_DOUBLE_BUFFER the transfer reads the
+# framebuffer the app draws into, so drawing while display.busy tears the frame; the
+# second framebuffer costs another width * height * bytes per pixel of SRAM (259 KB in
+# RGB565, too much next to the first one, so use it with gs8/gs4).
+DISPLAY_USE_DMA = False
+DISPLAY_DOUBLE_BUFFER = False
+
+# Framebuffer colour mode: "rgb565" (259 KB), "gs8" (130 KB) or "gs4" (65 KB).
+# gs8/gs4 draw with palette indices (gray ramp by default, see display.set_palette())
+# and are expanded to RGB565 while streaming; switch per screen with set_color_mode().
+DISPLAY_COLOR_MODE = "rgb565"
+
+# Band rendering: > 0 keeps only a width x rows strip buffer (24 rows = 17 KB in RGB565)
+# and replays recorded draw calls per strip on show(). Requires DISPLAY_USE_DMA = False.
+DISPLAY_BAND_ROWS = 0
+
+# Present frames after the LCD_TE pulse (started from the app loop's poll()); requests
+# within one refresh coalesce. Off until the timing is validated on hardware: with the
+# 20 ms loop a frame can start well after the pulse.
+DISPLAY_TE_PACING = False
+
+# Boot-time budgets (ms) reported by lib/boot_profile.py after setup.
+# Reset is two fixed waits; the init stream is dominated by the 120 ms sleep-out.
+DISPLAY_BOOT_BUDGET_MS = {"reset": 210, "init stream": 160, "first frame": 40}
+DISPLAY_BOOT_TOTAL_BUDGET_MS = 420
+
 # Backlight
 BACKLIGHT_PWM_FREQ_HZ = 10_000
 BACKLIGHT_PWM_WRAP = 1000
@@ -30,3 +65,4 @@ TOUCH_SLEEP_OFF = 0xFF
 MAIN_LOOP_INTERVAL_MS = 20
 TOUCH_SAMPLE_INTERVAL_MS = 20
 UI_HEARTBEAT_INTERVAL_MS = 300
+UI_FRAME_STATS_INTERVAL_MS = 10_000
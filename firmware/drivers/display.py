@@ -4,25 +4,66 @@ This driver follows the Waveshare BSP pin mapping and command initialization pat
 while providing a MicroPython-friendly FrameBuffer API.
 """
 import framebuf
+import gc
 from machine import Pin
-from rp2 import PIO, StateMachine, asm_pio
+from rp2 import DMA, PIO, StateMachine, asm_pio
 import time
 
+from band_render import SURFACE_METHODS, BandRenderer
+from damage import DamageMixin, DamageTracker
+from frame_pacer import FramePacer
+from pixel_lut import PixelFormat
+from qspi_dma import DmaPresenter, pio_tx_fifo
+from qspi_pack import NibbleStream
+from round_mask import RoundMask
+from st77916_init import init_stream, run_init
 
+
+# Each FIFO word carries two packed payload bytes (four nibbles), see lib/qspi_pack.py.
 @asm_pio(
     sideset_init=PIO.OUT_LOW,
     out_init=(PIO.OUT_LOW, PIO.OUT_LOW, PIO.OUT_LOW, PIO.OUT_LOW),
     out_shiftdir=PIO.SHIFT_RIGHT,
     autopull=True,
-    pull_thresh=8,
+    pull_thresh=16,
 )
 def qspi_4bit():
     out(pins, 4).side(0) [1]
     nop().side(1) [1]
 
 
-class ST77916(framebuf.FrameBuffer):
-    """ST77916 frame-buffered driver using RP2350 PIO for 4-bit serial writes."""
+# Command/parameter phase: 1 bit per clock on D0, MSB first. Bytes are put shifted
+# left by 24. Runs on its own state machine sharing SCLK/D0 with qspi_4bit.
+@asm_pio(
+    sideset_init=PIO.OUT_LOW,
+    out_init=PIO.OUT_LOW,
+    out_shiftdir=PIO.SHIFT_LEFT,
+    autopull=True,
+    pull_thresh=8,
+)
+def qspi_1bit():
+    out(pins, 1).side(0) [1]
+    nop().side(1) [1]
+
+
+_FB_FORMATS = {"rgb565": framebuf.RGB565, "gs8": framebuf.GS8, "gs4": framebuf.GS4_HMSB}
+
+# One RGB565 pixel; the FrameBuffer base holds it while set_color_mode() swaps buffers.
+_PLACEHOLDER = bytearray(2)
+
+
+class ST77916(DamageMixin, framebuf.FrameBuffer):
+    """ST77916 frame-buffered driver using RP2350 PIO for 4-bit serial writes.
+
+    color_mode "gs8" / "gs4" keeps palette indices in a half / quarter size
+    framebuffer and expands them to RGB565 while streaming (lib/pixel_lut.py).
+
+    band_rows > 0 replaces the full-screen framebuffer with one band of that many
+    rows: drawing calls are recorded and replayed per band on show()
+    (lib/band_render.py). Band mode presents synchronously (use_dma=False).
+    band_redraw() is called from show() to draw the whole screen again (no show()
+    inside) if the display list ever outgrows its cap.
+    """
 
     COLOR_BLACK = 0x0000
     COLOR_WHITE = 0xFFFF
@@ -50,6 +91,16 @@ class ST77916(framebuf.FrameBuffer):
         pin_cs,
         pin_rst,
         pin_te,
+        mask_band_rows=0,
+        use_dma=False,
+        double_buffer=False,
+        te_pacing=False,
+        command_mode="pio",
+        profiler=None,
+        color_mode="rgb565",
+        palette=None,
+        band_rows=0,
+        band_redraw=None,
     ):
         self.width = width
         self.height = height
@@ -57,6 +108,7 @@ class ST77916(framebuf.FrameBuffer):
         self._reset_low_ms = reset_low_ms
         self._reset_high_ms = reset_high_ms
         self._post_init_ms = post_init_ms
+        self._init_stream = init_stream(rotation, post_init_ms)
 
         self.cs = Pin(pin_cs, Pin.OUT, value=1)
         self.rst = Pin(pin_rst, Pin.OUT, value=1)
@@ -68,20 +120,93 @@ class ST77916(framebuf.FrameBuffer):
         self.d2 = Pin(pin_d2, Pin.OUT)
         self.d3 = Pin(pin_d3, Pin.OUT)
 
+        self._sm_id = 0
         self._sm = StateMachine(
-            0,
+            self._sm_id,
             qspi_4bit,
             freq=qspi_freq_hz,
             sideset_base=Pin(pin_sclk),
             out_base=Pin(pin_d0),
         )
         self._sm.active(1)
+        self._pixels = NibbleStream(self._sm)
+
+        # command_mode="bitbang" keeps the original GPIO command path for comparison.
+        self._cmd_sm = None
+        if command_mode == "pio":
+            self._cmd_sm = StateMachine(
+                self._sm_id + 1,
+                qspi_1bit,
+                freq=qspi_freq_hz,
+                sideset_base=Pin(pin_sclk),
+                out_base=Pin(pin_d0),
+            )
+            self._cmd_sm.active(1)
+        elif command_mode != "bitbang":
+            raise ValueError("command_mode must be 'pio' or 'bitbang'")
+        self._cmd_header = bytearray((0x02, 0x00, 0x00, 0x00))
+        # Worst case for the last FIFO word to leave the OSR: one 1-bit byte, 32 SM cycles.
+        self._tail_us = 32 * 1_000_000 // qspi_freq_hz + 1
+
+        if band_rows and use_dma:
+            raise ValueError("band_rows requires use_dma=False")
+        self._format = PixelFormat(color_mode, palette)
+        buffer_rows = band_rows or self.height
+        self._buffer = bytearray(self._format.buffer_size(self.width, buffer_rows))
+        super().__init__(self._buffer, self.width, buffer_rows, _FB_FORMATS[color_mode])
+        self._pixels.set_format(self._format.pack, self._format.bits_per_pixel)
+
+        # Panel RAM content is undefined after reset, so the first show() is full-screen.
+        self._damage = DamageTracker(self.width, self.height)
+        self._damage.add_full()
 
-        self._buffer = bytearray(self.width * self.height * 2)
-        super().__init__(self._buffer, self.width, self.height, framebuf.RGB565)
+        # Optional round-panel mask: skip the invisible corners outside the circle.
+        self._mask = RoundMask(self.width, self.height, mask_band_rows) if mask_band_rows > 0 else None
 
-        self._reset()
-        self._init_panel()
+        # Optional band mode: drawing calls go to a display list replayed into the band buffer.
+        self._bands = None
+        if band_rows:
+            band = framebuf.FrameBuffer(self._buffer, self.width, band_rows, _FB_FORMATS[color_mode])
+            self._bands = BandRenderer(band, self.width, self.height, band_rows, self._write_band,
+                                       redraw=band_redraw)
+            for name in SURFACE_METHODS:
+                setattr(self, name, getattr(self._bands, name))
+
+        # Optional DMA presentation; with double_buffer the transfer reads a snapshot
+        # so drawing can continue while a frame is in flight (costs a second framebuffer).
+        self._front = bytearray(len(self._buffer)) if use_dma and double_buffer else None
+        self._presenter = None
+        if use_dma:
+            fifo_addr, dreq = pio_tx_fifo(self._sm_id)
+            self._presenter = DmaPresenter(
+                self._sm,
+                DMA(),
+                fifo_addr,
+                dreq,
+                stride=self._format.row_bytes(self.width),
+                prepare=self._prepare_present,
+                begin_window=self._begin_window,
+                end_window=self._end_window,
+                pack=self._format.pack,
+                bits_per_pixel=self._format.bits_per_pixel,
+            )
+
+        # Optional TE-synchronized pacing: request_frame() presents from poll() after the next TE pulse.
+        self._pacer = None
+        if te_pacing:
+            self._pacer = FramePacer(present=self._present_now, busy=lambda: self.busy)
+
+        if profiler is None:
+            self._reset()
+            self._init_panel()
+        else:
+            with profiler.phase("reset"):
+                self._reset()
+            with profiler.phase("init stream"):
+                self._init_panel()
+
+        if self._pacer is not None:
+            self.te.irq(trigger=Pin.IRQ_RISING, handler=self._pacer.on_te)
 
     def _reset(self):
         self.rst.value(0)
@@ -96,15 +221,34 @@ class ST77916(framebuf.FrameBuffer):
             self.d0.value(bit)
             self.sclk.value(1)
 
+    def _wait_idle(self, sm):
+        # An empty TX FIFO still leaves the last word shifting out of the OSR.
+        while sm.tx_fifo():
+            pass
+        time.sleep_us(self._tail_us)
+
     def _write_cmd(self, cmd: int, data=None, delay_ms=0, keep_cs=False):
         self.cs.value(0)
-        cmd_bytes = bytes((0x02, 0x00, cmd, 0x00))
-        for b in cmd_bytes:
-            self._write_byte_1bit(b)
-
-        if data:
-            for b in data:
+        header = self._cmd_header
+        header[2] = cmd
+        if self._cmd_sm is not None:
+            self._cmd_sm.put(header, 24)
+            if data:
+                self._cmd_sm.put(data, 24)
+            self._wait_idle(self._cmd_sm)
+        else:
+            # SCLK/D0 belong to the pixel state machine; take them back as GPIO
+            # outputs for the bit-banged bytes, or the writes never reach the pads.
+            self.sclk.init(Pin.OUT)
+            self.d0.init(Pin.OUT)
+            for b in header:
                 self._write_byte_1bit(b)
+            if data:
+                for b in data:
+                    self._write_byte_1bit(b)
+            # State machine 0 lives in PIO0.
+            self.sclk.init(Pin.ALT, alt=Pin.ALT_PIO0)
+            self.d0.init(Pin.ALT, alt=Pin.ALT_PIO0)
 
         if not keep_cs:
             self.cs.value(1)
@@ -112,90 +256,182 @@ class ST77916(framebuf.FrameBuffer):
         if delay_ms > 0:
             time.sleep_ms(delay_ms)
 
-    def _write_bytes_4bit(self, payload: bytearray):
-        for i in range(0, len(payload), 2):
-            b1 = payload[i]
-            if i + 1 < len(payload):
-                b2 = payload[i + 1]
-                packed = (
-                    ((b1 >> 4) & 0x0F)
-                    | ((b1 & 0x0F) << 4)
-                    | (((b2 >> 4) & 0x0F) << 8)
-                    | ((b2 & 0x0F) << 12)
-                )
-            else:
-                packed = ((b1 >> 4) & 0x0F) | ((b1 & 0x0F) << 4)
-            self._sm.put(packed)
+    def _write_bytes_4bit(self, payload):
+        # One packing pass per chunk, then a single bulk put (see lib/qspi_pack.py).
+        self._pixels.write(payload)
 
     def _init_panel(self):
-        # Exact startup sequence used by Waveshare BSP (trimmed to the active set used in their main init path).
-        init_cmds = (
-            (0xF0, (0x28,), 0), (0xF2, (0x28,), 0), (0x73, (0xF0,), 0), (0x7C, (0xD1,), 0),
-            (0x83, (0xE0,), 0), (0x84, (0x61,), 0), (0xF2, (0x82,), 0), (0xF0, (0x00,), 0),
-            (0xF0, (0x01,), 0), (0xF1, (0x01,), 0), (0xB0, (0x56,), 0), (0xB1, (0x4D,), 0),
-            (0xB2, (0x24,), 0), (0xB4, (0x87,), 0), (0xB5, (0x44,), 0), (0xB6, (0x8B,), 0),
-            (0xB7, (0x40,), 0), (0xB8, (0x86,), 0), (0xBA, (0x00,), 0), (0xBB, (0x08,), 0),
-            (0xBC, (0x08,), 0), (0xBD, (0x00,), 0), (0xC0, (0x80,), 0), (0xC1, (0x10,), 0),
-            (0xC2, (0x37,), 0), (0xC3, (0x80,), 0), (0xC4, (0x10,), 0), (0xC5, (0x37,), 0),
-            (0xC6, (0xA9,), 0), (0xC7, (0x41,), 0), (0xC8, (0x01,), 0), (0xC9, (0xA9,), 0),
-            (0xCA, (0x41,), 0), (0xCB, (0x01,), 0), (0xD0, (0x91,), 0), (0xD1, (0x68,), 0),
-            (0xD2, (0x68,), 0), (0xF5, (0x00, 0xA5), 0), (0xDD, (0x4F,), 0), (0xDE, (0x4F,), 0),
-            (0xF1, (0x10,), 0), (0xF0, (0x00,), 0), (0xF0, (0x02,), 0),
-            (0xE0, (0xF0, 0x0A, 0x10, 0x09, 0x09, 0x36, 0x35, 0x33, 0x4A, 0x29, 0x15, 0x15, 0x2E, 0x34), 0),
-            (0xE1, (0xF0, 0x0A, 0x0F, 0x08, 0x08, 0x05, 0x34, 0x33, 0x4A, 0x39, 0x15, 0x15, 0x2D, 0x33), 0),
-            (0xF0, (0x10,), 0), (0xF3, (0x10,), 0), (0xE0, (0x07,), 0), (0xE1, (0x00,), 0),
-            (0xE2, (0x00,), 0), (0xE3, (0x00,), 0), (0xE4, (0xE0,), 0), (0xE5, (0x06,), 0),
-            (0xE6, (0x21,), 0), (0xE7, (0x01,), 0), (0xE8, (0x05,), 0), (0xE9, (0x02,), 0),
-            (0xEA, (0xDA,), 0), (0xEB, (0x00,), 0), (0xEC, (0x00,), 0), (0xED, (0x0F,), 0),
-            (0xEE, (0x00,), 0), (0xEF, (0x00,), 0), (0xF8, (0x00,), 0), (0xF9, (0x00,), 0),
-            (0xFA, (0x00,), 0), (0xFB, (0x00,), 0), (0xFC, (0x00,), 0), (0xFD, (0x00,), 0),
-            (0xFE, (0x00,), 0), (0xFF, (0x00,), 0),
-            (0x60, (0x40,), 0), (0x61, (0x04,), 0), (0x62, (0x00,), 0), (0x63, (0x42,), 0),
-            (0x64, (0xD9,), 0), (0x65, (0x00,), 0), (0x66, (0x00,), 0), (0x67, (0x00,), 0),
-            (0x68, (0x00,), 0), (0x69, (0x00,), 0), (0x6A, (0x00,), 0), (0x6B, (0x00,), 0),
-            (0x70, (0x40,), 0), (0x71, (0x03,), 0), (0x72, (0x00,), 0), (0x73, (0x42,), 0),
-            (0x74, (0xD8,), 0), (0x75, (0x00,), 0), (0x76, (0x00,), 0), (0x77, (0x00,), 0),
-            (0x78, (0x00,), 0), (0x79, (0x00,), 0), (0x7A, (0x00,), 0), (0x7B, (0x00,), 0),
-            (0x80, (0x48,), 0), (0x81, (0x00,), 0), (0x82, (0x06,), 0), (0x83, (0x02,), 0),
-            (0x84, (0xD6,), 0), (0x85, (0x04,), 0), (0x86, (0x00,), 0), (0x87, (0x00,), 0),
-            (0x88, (0x48,), 0), (0x89, (0x00,), 0), (0x8A, (0x08,), 0), (0x8B, (0x02,), 0),
-            (0x8C, (0xD8,), 0), (0x8D, (0x04,), 0), (0x8E, (0x00,), 0), (0x8F, (0x00,), 0),
-            (0x90, (0x48,), 0), (0x91, (0x00,), 0), (0x92, (0x0A,), 0), (0x93, (0x02,), 0),
-            (0x94, (0xDA,), 0), (0x95, (0x04,), 0), (0x96, (0x00,), 0), (0x97, (0x00,), 0),
-            (0x98, (0x48,), 0), (0x99, (0x00,), 0), (0x9A, (0x0C,), 0), (0x9B, (0x02,), 0),
-            (0x9C, (0xDC,), 0), (0x9D, (0x04,), 0), (0x9E, (0x00,), 0), (0x9F, (0x00,), 0),
-            (0xA0, (0x48,), 0), (0xA1, (0x00,), 0), (0xA2, (0x0E,), 0), (0xA3, (0x02,), 0),
-            (0xA4, (0xDE,), 0), (0xA5, (0x04,), 0), (0xA6, (0x00,), 0), (0xA7, (0x00,), 0),
-            (0xA8, (0x48,), 0), (0xA9, (0x00,), 0), (0xAA, (0x10,), 0), (0xAB, (0x02,), 0),
-            (0xAC, (0xE0,), 0), (0xAD, (0x04,), 0), (0xAE, (0x00,), 0), (0xAF, (0x00,), 0),
-            (0xB0, (0x48,), 0), (0xB1, (0x00,), 0), (0xB2, (0x12,), 0), (0xB3, (0x02,), 0),
-            (0xB4, (0xE2,), 0), (0xB5, (0x04,), 0), (0xB6, (0x00,), 0), (0xB7, (0x00,), 0),
-            (0xB8, (0x48,), 0), (0xB9, (0x00,), 0), (0xBA, (0x14,), 0), (0xBB, (0x02,), 0),
-            (0xBC, (0xE4,), 0), (0xBD, (0x04,), 0), (0xBE, (0x00,), 0), (0xBF, (0x00,), 0),
-            (0xC0, (0x48,), 0), (0xC1, (0x00,), 0), (0xC2, (0x16,), 0), (0xC3, (0x02,), 0),
-            (0xC4, (0xE6,), 0), (0xC5, (0x04,), 0), (0xC6, (0x00,), 0), (0xC7, (0x00,), 0),
-            (0xC8, (0x48,), 0), (0xC9, (0x00,), 0), (0xCA, (0x18,), 0), (0xCB, (0x02,), 0),
-            (0xCC, (0xE8,), 0), (0xCD, (0x04,), 0), (0xCE, (0x00,), 0), (0xCF, (0x00,), 0),
-            (0xD0, (0x48,), 0), (0xD1, (0x00,), 0), (0xD2, (0x1A,), 0), (0xD3, (0x02,), 0),
-            (0xD4, (0xEA,), 0), (0xD5, (0x04,), 0), (0xD6, (0x00,), 0), (0xD7, (0x00,), 0),
-            (0xD8, (0x48,), 0), (0xD9, (0x00,), 0), (0xDA, (0x1C,), 0), (0xDB, (0x02,), 0),
-            (0xDC, (0xEC,), 0), (0xDD, (0x04,), 0), (0xDE, (0x00,), 0), (0xDF, (0x00,), 0),
-            (0x36, (self._rotation & 0x03,), 0),
-            (0x3A, (0x55,), 0),
-            (0x21, (), 0),
-            (0x11, (), 120),
-            (0x29, (), self._post_init_ms),
-        )
-
-        for cmd, data, delay in init_cmds:
-            self._write_cmd(cmd, bytes(data) if data else None, delay)
+        # Waveshare BSP init sequence, precompiled into one command stream (lib/st77916_init.py).
+        run_init(self._init_stream, self._write_cmd, time.sleep_ms)
 
     def set_window(self, x1, y1, x2, y2):
         self._write_cmd(0x2A, bytes(((x1 >> 8) & 0xFF, x1 & 0xFF, (x2 >> 8) & 0xFF, x2 & 0xFF)))
         self._write_cmd(0x2B, bytes(((y1 >> 8) & 0xFF, y1 & 0xFF, (y2 >> 8) & 0xFF, y2 & 0xFF)))
 
-    def show(self):
-        self.set_window(0, 0, self.width - 1, self.height - 1)
+    @property
+    def color_mode(self):
+        return self._format.mode
+
+    def set_color_mode(self, mode, palette=None):
+        """Switch framebuffer mode ("rgb565", "gs8", "gs4") for the next screen.
+
+        Waits for any in-flight frame, then replaces the framebuffer (contents are
+        lost) and schedules a full-screen refresh. In gs8/gs4 drawing colours are
+        palette indices; the default palette is a gray ramp.
+        """
+        if self._bands is not None:
+            raise RuntimeError("set_color_mode is not supported with band_rows")
+        fmt = PixelFormat(mode, palette)
+        while self.poll():
+            pass
+        self._format = fmt
+        # Re-point the FrameBuffer base at a 1x1 placeholder first: it still
+        # references the old buffer, which gc.collect() could not free otherwise.
+        super().__init__(_PLACEHOLDER, 1, 1, framebuf.RGB565)
+        self._buffer = None
+        front = self._front is not None
+        self._front = None
+        gc.collect()
+        self._buffer = bytearray(fmt.buffer_size(self.width, self.height))
+        if front:
+            self._front = bytearray(len(self._buffer))
+        super().__init__(self._buffer, self.width, self.height, _FB_FORMATS[mode])
+        self._pixels.set_format(fmt.pack, fmt.bits_per_pixel)
+        if self._presenter is not None:
+            self._presenter.set_format(fmt.row_bytes(self.width), fmt.pack, fmt.bits_per_pixel)
+        self._damage.add_full()
+
+    def set_palette(self, colors, start=0):
+        """Load RGB565 colours for palette indices start.. (gs8/gs4 only); redraws on next show()."""
+        self._format.set_palette(colors, start)
+        self._damage.add_full()
+
+    def _begin_window(self, x, y, w, h):
+        self.set_window(x, y, x + w - 1, y + h - 1)
         self._write_cmd(0x2C, keep_cs=True)
-        self._write_bytes_4bit(self._buffer)
+
+    def _end_window(self):
+        self._wait_idle(self._sm)
         self.cs.value(1)
+
+    def _write_region(self, x, y, w, h, top=0):
+        # top: panel row held in the first buffer row (band mode).
+        self._begin_window(x, y, w, h)
+        bpp = self._format.bits_per_pixel
+        stride = self._format.row_bytes(self.width)
+        buf = memoryview(self._buffer)
+        row = y - top
+        if w == self.width:
+            self._write_bytes_4bit(buf[row * stride:(row + h) * stride])
+        else:
+            start = row * stride + x * bpp // 8
+            row_bytes = w * bpp // 8
+            for _ in range(h):
+                self._write_bytes_4bit(buf[start:start + row_bytes])
+                start += stride
+        self._end_window()
+
+    def _write_band(self, top, rows):
+        windows = [(0, top, self.width, rows)] if self._mask is None else self._mask.clip(0, top, self.width, rows)
+        for x, y, w, h in windows:
+            x, y, w, h = self._format.align(x, y, w, h, self.width)
+            self._write_region(x, y, w, h, top)
+
+    def _take_windows(self):
+        """Damaged rectangles since the last frame, clipped to the round mask if enabled.
+
+        In gs4 mode windows are widened to even columns so rows start on whole bytes.
+        """
+        rects = self._damage.take()
+        if self._mask is not None:
+            windows = []
+            for x, y, w, h in rects:
+                windows.extend(self._mask.clip(x, y, w, h))
+            rects = windows
+        if self._format.bits_per_pixel == 4:
+            rects = [self._format.align(x, y, w, h, self.width) for x, y, w, h in rects]
+        return rects
+
+    def _prepare_present(self):
+        windows = self._take_windows()
+        if self._front is None:
+            return self._buffer, windows
+        bpp = self._format.bits_per_pixel
+        stride = self._format.row_bytes(self.width)
+        for x, y, w, h in windows:
+            start = y * stride + x * bpp // 8
+            end = start + w * bpp // 8
+            for _ in range(h):
+                self._front[start:end] = self._buffer[start:end]
+                start += stride
+                end += stride
+        return self._front, windows
+
+    def present_async(self, callback=None):
+        """Start presenting damaged regions without blocking; returns a PresentHandle.
+
+        Requires use_dma=True. Call poll() from the app loop: the DMA IRQ only streams
+        the frame in flight, poll() completes it and starts the next. Requests made while
+        a frame is in flight coalesce into one next frame. Without double_buffer the
+        transfer reads the live framebuffer, so do not draw while busy.
+        """
+        if self._presenter is None:
+            raise RuntimeError("present_async requires use_dma=True")
+        return self._presenter.request(callback)
+
+    def request_frame(self):
+        """Present damaged regions after the next TE pulse (te_pacing=True).
+
+        The TE IRQ only records the pulse; the frame starts in the next poll()
+        from the app loop. Multiple requests within one refresh period become a
+        single transfer. Without pacing this presents immediately.
+        """
+        if self._pacer is None:
+            self._present_now()
+        else:
+            self._pacer.request()
+
+    def _present_now(self):
+        if self._presenter is not None:
+            self._presenter.request()
+        else:
+            self.show()
+
+    def frame_stats(self):
+        """Pacing statistics (frames, coalesced requests, missed vsyncs, frame times)."""
+        return self._pacer.stats() if self._pacer is not None else None
+
+    def poll(self):
+        """Advance an in-flight present; returns True while one is pending."""
+        if self._pacer is not None:
+            self._pacer.poll()
+        if self._presenter is None:
+            return False
+        return self._presenter.poll()
+
+    def deinit(self):
+        """Stop IRQs and release the state machines (lets a new instance take over)."""
+        if self._pacer is not None:
+            self.te.irq(handler=None)
+        while self.poll():
+            pass
+        if self._presenter is not None:
+            self._presenter.close()
+        self._sm.active(0)
+        if self._cmd_sm is not None:
+            self._cmd_sm.active(0)
+
+    @property
+    def busy(self):
+        return self._presenter is not None and self._presenter.busy
+
+    def show(self):
+        """Push only the regions damaged since the previous show(); blocks until done."""
+        if self._presenter is not None:
+            self._presenter.wait(self._presenter.request())
+            return
+        if self._bands is not None:
+            self._bands.render()
+            return
+        for x, y, w, h in self._take_windows():
+            self._write_region(x, y, w, h)
@@ -2,13 +2,14 @@
 
 This main file contains framework logic only:
 - initialize board drivers
-- run a non-blocking loop
+- run a non-blocking loop (with DISPLAY_USE_DMA, frames stream by DMA while touch is polled)
 - update a tiny diagnostics UI
 - report touch coordinates over USB REPL
 """
 from machine import Pin
 import time
 
+from boot_profile import BootProfiler
 from board import config, pins
 from drivers.backlight import Backlight
 from drivers.display import ST77916
@@ -26,6 +27,9 @@ class FirmwareApp:
         self._last_touch_ms = 0
         self._last_heartbeat_ms = 0
         self._heartbeat_on = False
+        self._last_stats_ms = 0
+        self._chip_id = 0
+        self._touch_ok = False
 
     def setup(self):
         # Backlight first so display output is visible after init completes.
@@ -36,6 +40,10 @@ class FirmwareApp:
         )
         self.backlight.set_percent(config.BACKLIGHT_DEFAULT_PERCENT)
 
+        profiler = BootProfiler(
+            budgets_ms=config.DISPLAY_BOOT_BUDGET_MS,
+            total_budget_ms=config.DISPLAY_BOOT_TOTAL_BUDGET_MS,
+        )
         self.display = ST77916(
             width=config.DISPLAY_WIDTH,
             height=config.DISPLAY_HEIGHT,
@@ -52,6 +60,15 @@ class FirmwareApp:
             pin_cs=pins.LCD_CS,
             pin_rst=pins.LCD_RST,
             pin_te=pins.LCD_TE,
+            mask_band_rows=config.DISPLAY_MASK_BAND_ROWS,
+            use_dma=config.DISPLAY_USE_DMA,
+            double_buffer=config.DISPLAY_DOUBLE_BUFFER,
+            te_pacing=config.DISPLAY_TE_PACING,
+            command_mode=config.DISPLAY_COMMAND_MODE,
+            color_mode=config.DISPLAY_COLOR_MODE,
+            band_rows=config.DISPLAY_BAND_ROWS,
+            band_redraw=self._paint_screen,
+            profiler=profiler,
         )
 
         self.touch = CST816(
@@ -75,12 +92,24 @@ class FirmwareApp:
         )
         chip_id = self.touch.init()
 
-        self._draw_startup(chip_id, self.touch.validate())
+        touch_ok = self.touch.validate()
+        with profiler.phase("first frame"):
+            self._draw_startup(chip_id, touch_ok)
         print("[init] display OK")
+        print(profiler.report())
         print("[init] touch chip id: 0x{:02X}".format(chip_id))
 
     def _draw_startup(self, chip_id: int, touch_ok: bool):
+        self._chip_id = chip_id
+        self._touch_ok = touch_ok
+        self._paint_screen()
+        self.display.show()
+
+    def _paint_screen(self):
+        # Whole diagnostics screen; also the band-mode redraw hook, so no show() here.
         d = self.display
+        chip_id = self._chip_id
+        touch_ok = self._touch_ok
         d.fill(ST77916.COLOR_BLACK)
         d.text("RP2350-Touch-LCD-1.85C", 58, 20, ST77916.COLOR_CYAN)
         d.text("MicroPython clean base", 76, 40, ST77916.COLOR_WHITE)
@@ -94,7 +123,12 @@ class FirmwareApp:
         d.fill_rect(50, 160, 260, 120, ST77916.COLOR_BLACK)
         d.text("Touch the screen", 120, 208, ST77916.COLOR_WHITE)
         d.text("coords print to REPL", 86, 228, ST77916.COLOR_MAGENTA)
-        d.show()
+        if self._last_heartbeat_ms:
+            self._paint_heartbeat()
+
+    def _paint_heartbeat(self):
+        color = ST77916.COLOR_GREEN if self._heartbeat_on else ST77916.COLOR_BLUE
+        self.display.fill_rect(164, 300, 32, 32, color)
 
     def _update_heartbeat(self):
         now = time.ticks_ms()
@@ -104,9 +138,8 @@ class FirmwareApp:
         self._last_heartbeat_ms = now
         self._heartbeat_on = not self._heartbeat_on
 
-        color = ST77916.COLOR_GREEN if self._heartbeat_on else ST77916.COLOR_BLUE
-        self.display.fill_rect(164, 300, 32, 32, color)
-        self.display.show()
+        self._paint_heartbeat()
+        self._present()
 
     def _poll_touch(self):
         now = time.ticks_ms()
@@ -123,13 +156,44 @@ class FirmwareApp:
 
         self.display.fill_rect(80, 260, 200, 24, ST77916.COLOR_BLACK)
         self.display.text("x={:03d} y={:03d}".format(x, y), 118, 266, ST77916.COLOR_YELLOW)
-        self.display.show()
+        self._present()
+
+    def _present(self):
+        # Paced to TE and non-blocking when enabled; overlapping requests coalesce into one frame.
+        if config.DISPLAY_TE_PACING:
+            self.display.request_frame()
+        elif config.DISPLAY_USE_DMA:
+            self.display.present_async()
+        else:
+            self.display.show()
+
+    def _report_frame_stats(self):
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_stats_ms) < config.UI_FRAME_STATS_INTERVAL_MS:
+            return
+
+        self._last_stats_ms = now
+        stats = self.display.frame_stats()
+        if stats is None:
+            return
+        print(
+            "frames: {} (coalesced {}), missed vsync {}, frame avg {}us max {}us, te {}us".format(
+                stats["frames"],
+                stats["coalesced"],
+                stats["missed_vsyncs"],
+                stats["frame_time_avg_us"],
+                stats["frame_time_max_us"],
+                stats["te_period_us"],
+            )
+        )
 
     def run(self):
         self.setup()
         while True:
             self._poll_touch()
             self._update_heartbeat()
+            self.display.poll()
+            self._report_frame_stats()
             time.sleep_ms(config.MAIN_LOOP_INTERVAL_MS)
 
 
@@ -29,6 +29,10 @@ ESP_UART_ID = 0
 ESP_UART_BAUDRATE = 115_200
 ESP_TX = 26  # GP26 -> ESP32 RX
 ESP_RX = 27  # GP27 <- ESP32 TX
+# RTS/CTS are not wired on this board; ESPATWiFi.negotiate_baudrate() then
+# moves to a faster UART rate without hardware flow control.
+ESP_RTS = None
+ESP_CTS = None
 
 # Auxiliary peripherals present on board
 TOUCH_CONTROLLER = "CST816"
@@ -0,0 +1,405 @@
+"""Host emulator for the ST77916 QSPI display path.
+
+Runs lib/st77916.py and firmware/drivers/display.py unmodified on CPython. The
+stand-in machine/rp2/framebuf modules in this folder record pin edges and PIO
+output; ST77916Panel decodes them back into CASET/RASET/RAMWR transactions,
+rebuilds the panel image and counts the bytes and bus time of every frame:
+
+    from emulator import Emulator
+    emu = Emulator()
+    display = emu.firmware_driver(use_dma=True)
+    display.fill(display.COLOR_RED)
+    display.show()
+    emu.panel.take_stats()      # {'pixel_bytes': 259200, 'bus_us': ..., ...}
+    emu.panel.save_png("frame.png")
+"""
+import importlib.util
+import pathlib
+import struct
+import sys
+import time
+import zlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+HOST = ROOT / "host"
+LIB = ROOT / "lib"
+FIRMWARE = ROOT / "firmware"
+
+# Both PIO programs spend 4 SM cycles per bus clock (out [1] + nop [1]).
+PIO_CYCLES_PER_CLOCK = 4
+
+# Header byte 0: 0x02 = write with 1-lane payload, 0x32 = write with 4-lane payload.
+WRITE_HEADERS = (0x02, 0x32)
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+RAMWRC = 0x3C
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+config = _load_module("board_config", FIRMWARE / "board" / "config.py")
+pins = _load_module("board_pins", FIRMWARE / "board" / "pins.py")
+QSPI_FREQ_HZ = config.DISPLAY_QSPI_FREQ_HZ
+
+
+class VirtualClock:
+    """MicroPython time.ticks_* / sleep_* on a simulated microsecond counter.
+
+    Sleeps return immediately and advance the counter, and the panel adds the
+    wire time of every transfer, so BootProfiler and FramePacer see board-like
+    timings without real waiting.
+    """
+
+    def __init__(self):
+        self.now_us = 0
+
+    def advance_us(self, us):
+        self.now_us += us
+
+    def sleep_ms(self, ms):
+        self.now_us += int(ms * 1000)
+
+    def sleep_us(self, us):
+        self.now_us += int(us)
+
+    def ticks_ms(self):
+        return int(self.now_us // 1000)
+
+    def ticks_us(self):
+        return int(self.now_us)
+
+    def ticks_cpu(self):
+        return int(self.now_us)
+
+    @staticmethod
+    def ticks_diff(a, b):
+        return a - b
+
+    @staticmethod
+    def ticks_add(a, b):
+        return a + b
+
+    def install(self, module=time):
+        for name in ("sleep_ms", "sleep_us", "ticks_ms", "ticks_us", "ticks_cpu", "ticks_diff", "ticks_add"):
+            setattr(module, name, getattr(self, name))
+
+
+def install(clock=None):
+    """Put host/ and lib/ on sys.path, reset the fake hardware and patch `time`."""
+    for path in (str(LIB), str(HOST)):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    import machine
+    import rp2
+
+    machine.reset()
+    rp2.reset()
+    clock = clock or VirtualClock()
+    clock.install(time)
+    return clock
+
+
+class ST77916Panel:
+    """Bus-level model of the panel: decodes transactions and keeps its frame memory.
+
+    The image is stored in wire byte order (RGB565, high byte first), which is
+    how the controller interprets RAMWR data after COLMOD 0x55.
+    """
+
+    def __init__(self, width=360, height=360, cs=pins.LCD_CS, sclk=pins.LCD_SCLK, d0=pins.LCD_D0,
+                 te=pins.LCD_TE, clock=None):
+        import machine
+        import rp2
+
+        self.width = width
+        self.height = height
+        self.image = bytearray(width * height * 2)
+        self._machine = machine
+        self._pins = (cs, sclk, d0)
+        self._te = te
+        self._clock = clock
+
+        self.log = []
+        self.errors = []
+        self.madctl = None
+        self.te_enabled = False
+        self.display_on = False
+        self._cols = (0, width - 1)
+        self._rows = (0, height - 1)
+
+        self._selected = False
+        self._header = bytearray()
+        self._cmd = None
+        self._params = bytearray()
+        self._bit_acc = 0
+        self._bit_count = 0
+        self._x = 0
+        self._y = 0
+        self._odd = None
+        self.reset_stats()
+
+        machine.add_listener(self._on_pin)
+        rp2.add_sink(self)
+
+    # Statistics
+
+    def reset_stats(self):
+        self.commands = 0
+        self.windows = 0
+        self.cmd_bytes = 0
+        self.pixel_bytes = 0
+        self.bitbang_bytes = 0
+        self.clocks = 0
+
+    def bus_us(self, freq_hz=QSPI_FREQ_HZ):
+        """PIO wire time of the traffic since reset_stats() (bit-banged bytes excluded)."""
+        return self.clocks * PIO_CYCLES_PER_CLOCK * 1_000_000 / freq_hz
+
+    def stats(self, freq_hz=QSPI_FREQ_HZ):
+        return {
+            "commands": self.commands,
+            "windows": self.windows,
+            "cmd_bytes": self.cmd_bytes,
+            "pixel_bytes": self.pixel_bytes,
+            "bitbang_bytes": self.bitbang_bytes,
+            "total_bytes": self.cmd_bytes + self.pixel_bytes,
+            "bus_us": self.bus_us(freq_hz),
+        }
+
+    def take_stats(self, freq_hz=QSPI_FREQ_HZ):
+        """stats() for the traffic since the previous call (one frame), then reset."""
+        stats = self.stats(freq_hz)
+        self.reset_stats()
+        return stats
+
+    # Bus input
+
+    def _on_pin(self, pin_id, old, new):
+        cs, sclk, d0 = self._pins
+        if pin_id == cs:
+            if new:
+                self._end()
+            else:
+                self._begin()
+        elif pin_id == sclk and new and self._selected:
+            # Bit-banged command byte: D0 sampled on the rising edge, MSB first.
+            self._bit_acc = (self._bit_acc << 1) | self._machine._levels.get(d0, 0)
+            self._bit_count += 1
+            if self._bit_count == 8:
+                byte = self._bit_acc
+                self._bit_acc = 0
+                self._bit_count = 0
+                self.bitbang_bytes += 1
+                self._receive(1, bytes((byte,)))
+
+    def pio_out(self, sm, lanes, data):
+        clocks = len(data) * 8 // lanes
+        self.clocks += clocks
+        if self._clock is not None:
+            self._clock.advance_us(clocks * PIO_CYCLES_PER_CLOCK * 1_000_000 / sm.freq)
+        if not self._selected:
+            self.errors.append("{} bytes clocked with CS high".format(len(data)))
+            return
+        if self._machine.function(self._pins[1]) is None:
+            self.errors.append("{} bytes clocked by PIO while SCLK is a GPIO".format(len(data)))
+            return
+        self._receive(lanes, data)
+
+    def vsync(self):
+        """Pulse LCD_TE (only while TE output is on, as after command 0x35)."""
+        if self.te_enabled:
+            self._machine.drive(self._te, 0)
+            self._machine.drive(self._te, 1)
+            self._machine.drive(self._te, 0)
+
+    # Transaction decoding
+
+    def _begin(self):
+        self._selected = True
+        self._header = bytearray()
+        self._cmd = None
+        self._params = bytearray()
+        self._bit_acc = 0
+        self._bit_count = 0
+
+    def _receive(self, lanes, data):
+        if self._cmd is None:
+            need = 4 - len(self._header)
+            head = data[:need]
+            if lanes != 1:
+                self.errors.append("4-lane data during the command header")
+            self._header += head
+            self.cmd_bytes += len(head)
+            data = data[need:]
+            if len(self._header) < 4:
+                return
+            if self._header[0] not in WRITE_HEADERS:
+                self.errors.append("unsupported header 0x{:02X}".format(self._header[0]))
+            self._cmd = self._header[2]
+            self.commands += 1
+            if self._cmd in (RAMWR, RAMWRC):
+                self.windows += 1
+                if self._cmd == RAMWR:
+                    self._x, self._y = self._cols[0], self._rows[0]
+                self._odd = None
+            if not data:
+                return
+        if self._cmd in (RAMWR, RAMWRC):
+            if lanes == 1:
+                self.cmd_bytes += len(data)
+            else:
+                self.pixel_bytes += len(data)
+            self._write_pixels(data)
+        else:
+            self.cmd_bytes += len(data)
+            self._params += data
+
+    def _end(self):
+        if not self._selected:
+            return
+        self._selected = False
+        if self._bit_count:
+            self.errors.append("{} stray bit-banged bits".format(self._bit_count))
+        cmd = self._cmd
+        if cmd is None:
+            if self._header:
+                self.errors.append("CS released inside the command header")
+            return
+        params = bytes(self._params)
+        if cmd not in (RAMWR, RAMWRC):
+            self.log.append((cmd, params))
+        if cmd in (CASET, RASET):
+            if len(params) != 4:
+                self.errors.append("0x{:02X} expects 4 parameter bytes".format(cmd))
+                return
+            start = (params[0] << 8) | params[1]
+            end = (params[2] << 8) | params[3]
+            if cmd == CASET:
+                self._cols = (start, end)
+            else:
+                self._rows = (start, end)
+        elif cmd == 0x36 and params:
+            self.madctl = params[0]
+        elif cmd == 0x35:
+            self.te_enabled = True
+        elif cmd == 0x34:
+            self.te_enabled = False
+        elif cmd == 0x29:
+            self.display_on = True
+        elif cmd == 0x28:
+            self.display_on = False
+
+    def _write_pixels(self, data):
+        if self._odd is not None:
+            data = bytes((self._odd,)) + bytes(data)
+            self._odd = None
+        if len(data) & 1:
+            self._odd = data[-1]
+            data = data[:-1]
+        x0, x1 = self._cols
+        y0, y1 = self._rows
+        if x1 >= self.width or y1 >= self.height or x0 > x1 or y0 > y1:
+            self.errors.append("pixels outside the panel window {} {}".format(self._cols, self._rows))
+            return
+        mv = memoryview(data)
+        image = self.image
+        x, y = self._x, self._y
+        i = 0
+        n = len(mv)
+        while i < n:
+            run = min(2 * (x1 - x + 1), n - i)
+            start = 2 * (y * self.width + x)
+            image[start:start + run] = mv[i:i + run]
+            i += run
+            x += run // 2
+            if x > x1:
+                x = x0
+                y = y0 if y >= y1 else y + 1
+        self._x, self._y = x, y
+
+    # Image access
+
+    def pixel(self, x, y):
+        i = 2 * (y * self.width + x)
+        return (self.image[i] << 8) | self.image[i + 1]
+
+    def rgb888(self):
+        """Frame memory expanded to 8-bit RGB triplets, row by row."""
+        out = bytearray(self.width * self.height * 3)
+        img = self.image
+        j = 0
+        for i in range(0, len(img), 2):
+            v = (img[i] << 8) | img[i + 1]
+            r = (v >> 11) & 0x1F
+            g = (v >> 5) & 0x3F
+            b = v & 0x1F
+            out[j] = (r << 3) | (r >> 2)
+            out[j + 1] = (g << 2) | (g >> 4)
+            out[j + 2] = (b << 3) | (b >> 2)
+            j += 3
+        return bytes(out)
+
+    def to_ndarray(self):
+        """Frame memory as a (height, width) uint16 RGB565 array (requires NumPy)."""
+        import numpy as np
+
+        return np.frombuffer(bytes(self.image), dtype=">u2").reshape(self.height, self.width).astype(np.uint16)
+
+    def save_png(self, path):
+        rgb = self.rgb888()
+        stride = self.width * 3
+        raw = b"".join(b"\x00" + rgb[y * stride:(y + 1) * stride] for y in range(self.height))
+
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+        png = b"\x89PNG\r\n\x1a\n"
+        png += chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+        png += chunk(b"IDAT", zlib.compress(raw, 6))
+        png += chunk(b"IEND", b"")
+        with open(path, "wb") as f:
+            f.write(png)
+
+
+class Emulator:
+    """One emulated board: fake hardware, virtual clock and panel model."""
+
+    def __init__(self, width=360, height=360):
+        self.clock = install()
+        self.panel = ST77916Panel(width, height, clock=self.clock)
+
+    def lib_driver(self, **kwargs):
+        """Construct lib/st77916.py's ST77916 (canonical boot driver)."""
+        module = _load_module("st77916", LIB / "st77916.py")
+        return module.ST77916(**kwargs)
+
+    def firmware_driver(self, **kwargs):
+        """Construct firmware/drivers/display.py's ST77916 with board/config.py defaults."""
+        module = _load_module("drivers_display", FIRMWARE / "drivers" / "display.py")
+        options = dict(
+            width=config.DISPLAY_WIDTH,
+            height=config.DISPLAY_HEIGHT,
+            rotation=config.DISPLAY_ROTATION,
+            qspi_freq_hz=config.DISPLAY_QSPI_FREQ_HZ,
+            reset_low_ms=config.DISPLAY_RESET_LOW_MS,
+            reset_high_ms=config.DISPLAY_RESET_HIGH_MS,
+            post_init_ms=config.DISPLAY_POST_INIT_MS,
+            pin_sclk=pins.LCD_SCLK,
+            pin_d0=pins.LCD_D0,
+            pin_d1=pins.LCD_D1,
+            pin_d2=pins.LCD_D2,
+            pin_d3=pins.LCD_D3,
+            pin_cs=pins.LCD_CS,
+            pin_rst=pins.LCD_RST,
+            pin_te=pins.LCD_TE,
+        )
+        options.update(kwargs)
+        return module.ST77916(**options)
@@ -0,0 +1,456 @@
+"""Host ESP-AT simulator with real TCP links.
+
+ESPATSimulator answers the AT commands the ESP-AT clients send and bridges
+AT+CIPSTART to real sockets, so HTTP code runs end to end against local servers:
+
+    sim = ESPATSimulator(baudrate=115200, connect_ms=40)
+    wifi.uart = sim.uart            # any client using in_waiting/read/write
+    wifi.http_get("http://127.0.0.1:8080/ping")
+    sim.counts["AT+CIPSTART"]
+
+AT+CIPMUX=1 switches to multiplexed links 0..4 ("+IPD,<id>,<len>:",
+"<id>,CONNECT", "<id>,CLOSED"). AT+CIPRECVMODE=1 holds received data until the
+host pulls it with AT+CIPRECVDATA, announcing it with "+IPD,[<id>,]<len>";
+CLOSED is reported once the held data has been read. lose_ap()/rejoin_ap() emit
+the WIFI DISCONNECT / WIFI CONNECTED / WIFI GOT IP URCs. The UART models the
+serial line: bytes in either direction take 10 bit times, and replies queue
+behind earlier output, so measured latencies include the 115200-baud cost.
+baudrate=None makes the line instant. connect_ms adds the time a real ESP
+spends opening a TCP link (handshake over WiFi; name lookups are dns_ms),
+join_ms the time AT+CWJAP takes to associate and get an address. With ap=(ssid, password) other
+credentials fail with "+CWJAP:<code>" and ERROR. connect_fail_rate makes that
+share of AT+CIPSTARTs fail after connect_ms, as a lost handshake would (seeded
+by seed, so runs repeat).
+
+Host names (in AT+CIPDOMAIN, or instead of an IP in AT+CIPSTART) resolve through
+hosts, a {name: ip} dict that always knows localhost; the host's own resolver is
+never asked. Each resolution costs dns_ms and is counted in dns_lookups; unknown
+names give "DNS Fail" and ERROR. IP addresses connect without a lookup.
+
+sim.uart also has any(), and host/machine.py's attach_uart() plugs it in as a
+machine.UART, so MicroPython AT code (lib/at_transport.py, the stage scripts)
+runs against the simulator too.
+
+AT+UART_CUR changes the ESP's rate after its OK; while sim.uart.baudrate (the
+host side) differs, bytes in either direction arrive garbled. Above
+max_baudrate, output without RTS/CTS flow control loses a bit in every
+64-byte piece, so a probe with AT+GMR (a fixed multi-line reply) fails there.
+"""
+import random
+import select
+import socket
+import time
+
+OK = b"\r\nOK\r\n"
+ERROR = b"\r\nERROR\r\n"
+
+# Largest piece of serial output scheduled as one unit.
+_PIECE = 64
+
+# Largest AT+CIPSEND payload ESP-AT accepts.
+_SEND_MAX = 8192
+
+# Passive receive mode: bytes the ESP holds per link before it stops reading
+# the socket (the sender then stalls on the TCP window).
+_RECV_BUFFER = 8192
+
+
+# AT+GMR reply of the simulated module.
+_GMR = (b"AT version:2.2.0.0(host-sim)\r\nSDK version:v4.2 (host)\r\n"
+        b"compile time:host\r\nBin version:2.2.0(WROOM-32)\r\n")
+
+
+def _garble(data):
+    """What bytes sent at one baud rate look like when read at another."""
+    return b"\xfe" * len(data)
+
+
+class SimUART:
+    """busio.UART-like endpoint (in_waiting/read/readinto/write) of the simulated ESP.
+
+    baudrate is the host side's setting; bytes cross the line intact only
+    while it equals the ESP's rate.
+    """
+
+    def __init__(self, sim):
+        self._sim = sim
+        self.baudrate = sim.baudrate
+
+    @property
+    def in_waiting(self):
+        return self._sim._available()
+
+    def any(self):
+        return self._sim._available()
+
+    def read(self, nbytes=None):
+        return self._sim._read(nbytes)
+
+    def readinto(self, buf, nbytes=None):
+        data = self._sim._read(len(buf) if nbytes is None else min(nbytes, len(buf)))
+        if not data:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def write(self, buf):
+        self._sim._receive(bytes(buf))
+        return len(buf)
+
+    def reset_input_buffer(self):
+        self._sim._read(None)
+
+
+class ESPATSimulator:
+    def __init__(self, baudrate=115200, connect_ms=0, echo=True, clock=time.monotonic, max_baudrate=None,
+                 join_ms=0, ap=None, connect_fail_rate=0.0, seed=0, dns_ms=0, hosts=None):
+        self.baudrate = baudrate
+        self.uart = SimUART(self)
+        # Above max_baudrate the line drops bits unless RTS/CTS flow control
+        # is on (AT+UART_CUR flow field 3).
+        self.max_baudrate = max_baudrate
+        self.flow_control = False
+        self.connect_ms = connect_ms
+        self.join_ms = join_ms
+        self.ap = ap
+        self.connect_fail_rate = connect_fail_rate
+        self.dns_ms = dns_ms
+        self.hosts = {"localhost": "127.0.0.1"}
+        self.hosts.update(hosts or {})
+        self.dns_lookups = 0
+        self._random = random.Random(seed)
+        self.echo = echo
+        self.counts = {}
+        self.wifi_connected = False
+        self._clock = clock
+        self._out = []          # [ready_time, bytes, baudrate] pieces of ESP -> host output
+        self._tx_free = 0.0     # when the ESP -> host line is next idle
+        self._rx_done = 0.0     # when the last host -> ESP byte has arrived
+        self._line = bytearray()
+        self._send_remaining = 0
+        self._send_buf = bytearray()
+        self._send_link = 0
+        self.mux = False
+        self.passive = False
+        self._links = {}        # link id -> socket (id 0 in single-link mode)
+        self._had_link = False  # a link was opened since the AP was joined (STATUS:4 once all close)
+        self._held = {}         # link id -> bytes held in passive mode
+        self._eof = set()       # passive links whose peer closed
+
+    # Serial line
+
+    def _byte_time(self, n):
+        return 0.0 if not self.baudrate else n * 10.0 / self.baudrate
+
+    def _unreliable(self):
+        return bool(self.max_baudrate and self.baudrate and self.baudrate > self.max_baudrate
+                    and not self.flow_control)
+
+    def _emit(self, data, delay=0.0):
+        """Queue ESP output; it starts after the command arrived plus delay."""
+        start = max(self._clock(), self._rx_done + delay, self._tx_free)
+        unreliable = self._unreliable()
+        for i in range(0, len(data), _PIECE):
+            piece = data[i:i + _PIECE]
+            if unreliable and len(piece) >= 16:
+                # One corrupted byte per piece, as an overrun would.
+                piece = piece[:8] + bytes([piece[8] ^ 0x80]) + piece[9:]
+            start += self._byte_time(len(piece))
+            self._out.append([start, piece, self.baudrate])
+        self._tx_free = start
+
+    def _available(self):
+        self._poll_sockets()
+        now = self._clock()
+        n = 0
+        for ready, piece, _rate in self._out:
+            if ready > now:
+                break
+            n += len(piece)
+        return n
+
+    def _read(self, nbytes):
+        available = self._available()
+        if nbytes is None or nbytes > available:
+            nbytes = available
+        if not nbytes:
+            return None
+        out = bytearray()
+        while len(out) < nbytes:
+            ready, piece, rate = self._out[0]
+            take = nbytes - len(out)
+            out += piece[:take] if rate == self.uart.baudrate else _garble(piece[:take])
+            if take >= len(piece):
+                self._out.pop(0)
+            else:
+                self._out[0][1] = piece[take:]
+        return bytes(out)
+
+    def _receive(self, data):
+        if self.uart.baudrate != self.baudrate:
+            data = _garble(data)
+        self._rx_done = max(self._clock(), self._rx_done) + self._byte_time(len(data))
+        i = 0
+        while i < len(data):
+            if self._send_remaining:
+                take = min(self._send_remaining, len(data) - i)
+                self._send_buf += data[i:i + take]
+                self._send_remaining -= take
+                i += take
+                if not self._send_remaining:
+                    self._finish_send()
+                continue
+            nl = data.find(b"\n", i)
+            if nl < 0:
+                self._line += data[i:]
+                break
+            self._line += data[i:nl]
+            i = nl + 1
+            line = bytes(self._line).rstrip(b"\r")
+            self._line = bytearray()
+            if line:
+                self._command(line)
+
+    # TCP link
+
+    def _prefix(self, link_id):
+        return str(link_id).encode() + b"," if self.mux else b""
+
+    def _poll_sockets(self):
+        for link_id in list(self._eof):
+            if not self._held.get(link_id):
+                self._drop_link(link_id)
+                self._emit(self._prefix(link_id) + b"CLOSED\r\n")
+        while self._links:
+            ids = {sock: link_id for link_id, sock in self._links.items()
+                   if link_id not in self._eof and len(self._held.get(link_id, b"")) < _RECV_BUFFER}
+            if not ids:
+                return
+            readable, _, _ = select.select(list(ids), [], [], 0)
+            if not readable:
+                return
+            for sock in readable:
+                link_id = ids[sock]
+                try:
+                    data = sock.recv(2920)
+                except OSError:
+                    data = b""
+                if self.passive:
+                    self._hold(link_id, data)
+                    continue
+                if not data:
+                    self._drop_link(link_id)
+                    self._emit(self._prefix(link_id) + b"CLOSED\r\n")
+                    continue
+                for i in range(0, len(data), 1460):
+                    frame = data[i:i + 1460]
+                    self._emit(b"\r\n+IPD," + self._prefix(link_id) + str(len(frame)).encode() + b":" + frame)
+
+    def _hold(self, link_id, data):
+        if not data:
+            self._eof.add(link_id)
+            if not self._held.get(link_id):
+                self._drop_link(link_id)
+                self._emit(self._prefix(link_id) + b"CLOSED\r\n")
+            return
+        held = self._held.setdefault(link_id, bytearray())
+        held += data
+        self._emit(b"\r\n+IPD," + self._prefix(link_id) + str(len(held)).encode() + b"\r\n")
+
+    def _drop_link(self, link_id):
+        self._held.pop(link_id, None)
+        self._eof.discard(link_id)
+        sock = self._links.pop(link_id, None)
+        if sock is not None:
+            sock.close()
+
+    def close(self):
+        for link_id in list(self._links):
+            self._drop_link(link_id)
+
+    # Unsolicited events
+
+    def lose_ap(self):
+        """The AP goes away: report WIFI DISCONNECT and close every link."""
+        self.wifi_connected = False
+        self._emit(b"WIFI DISCONNECT\r\n")
+        for link_id in list(self._links):
+            self._drop_link(link_id)
+            self._emit(self._prefix(link_id) + b"CLOSED\r\n")
+
+    def rejoin_ap(self):
+        """The module's auto-reconnect finds the AP again."""
+        self.wifi_connected = True
+        self._had_link = False
+        self._emit(b"WIFI CONNECTED\r\nWIFI GOT IP\r\n")
+
+    def _link_args(self, args):
+        """Split "<id>,rest" in multiplexed mode; returns (link_id, rest) or (None, None)."""
+        if not self.mux:
+            return 0, args
+        link_id, _, rest = (args or "").partition(",")
+        try:
+            link_id = int(link_id)
+        except ValueError:
+            return None, None
+        return (link_id, rest) if 0 <= link_id < 5 else (None, None)
+
+    # AT commands
+
+    def _command(self, line):
+        if self.echo:
+            self._emit(line + b"\r\n")
+        name = line.split(b"=", 1)[0].rstrip(b"?").decode()
+        self.counts[name] = self.counts.get(name, 0) + 1
+        handler = getattr(self, "_at_" + name[3:].lower(), None) if name.startswith("AT+") else None
+        if name == "AT":
+            self._emit(OK)
+        elif name in ("ATE0", "ATE1"):
+            self.echo = name == "ATE1"
+            self._emit(OK)
+        elif handler is None:
+            self._emit(ERROR)
+        else:
+            args = line.split(b"=", 1)[1].decode() if b"=" in line else None
+            handler(args)
+
+    def _at_gmr(self, args):
+        self._emit(_GMR + OK)
+
+    def _at_uart_cur(self, args):
+        fields = (args or "").split(",")
+        if len(fields) != 5 or not all(f.isdigit() for f in fields):
+            self._emit(ERROR)
+            return
+        # The reply still goes out at the old rate.
+        self._emit(OK)
+        self.baudrate = int(fields[0])
+        self.flow_control = fields[4] == "3"
+
+    def _at_cwmode(self, args):
+        self._emit(OK)
+
+    def _at_cwjap(self, args):
+        delay = self.join_ms / 1000
+        fields = [f.strip('"') for f in (args or "").split(",")]
+        if self.ap is not None and tuple(fields[:2]) != tuple(self.ap):
+            # 2: wrong password, 3: no AP with that SSID.
+            code = b"2" if fields[0] == self.ap[0] else b"3"
+            self.wifi_connected = False
+            self._emit(b"+CWJAP:" + code + b"\r\n" + ERROR, delay)
+            return
+        self.wifi_connected = True
+        self._had_link = False
+        self._emit(b"WIFI CONNECTED\r\nWIFI GOT IP\r\n" + OK, delay)
+
+    def _at_cwqap(self, args):
+        self.wifi_connected = False
+        self._emit(OK + b"WIFI DISCONNECT\r\n")
+
+    def _at_cipmux(self, args):
+        if self._links:
+            self._emit(b"link is builded\r\n" + ERROR)
+            return
+        self.mux = args == "1"
+        self._emit(OK)
+
+    def _at_ciprecvmode(self, args):
+        self.passive = args == "1"
+        self._emit(OK)
+
+    def _at_ciprecvdata(self, args):
+        link_id, args = self._link_args(args)
+        held = self._held.get(link_id)
+        if not held or not (args or "").isdigit():
+            self._emit(ERROR)
+            return
+        data = bytes(held[:int(args)])
+        del held[:len(data)]
+        self._emit(b"+CIPRECVDATA:" + str(len(data)).encode() + b"," + data + OK)
+
+    def _resolve(self, name):
+        """(ip or None, seconds the lookup took) for a host name or an IP address."""
+        parts = name.split(".")
+        if len(parts) == 4 and all(p.isdigit() for p in parts):
+            return name, 0.0
+        self.dns_lookups += 1
+        return self.hosts.get(name), self.dns_ms / 1000
+
+    def _at_cipdomain(self, args):
+        ip, delay = self._resolve((args or "").split(",")[0].strip('"'))
+        if ip is None:
+            self._emit(b"DNS Fail\r\n" + ERROR, delay)
+            return
+        self._emit(b'+CIPDOMAIN:"' + ip.encode() + b'"\r\n' + OK, delay)
+
+    def _at_cipstatus(self, args):
+        if not self.wifi_connected:
+            status = 5
+        elif self._links:
+            status = 3
+        else:
+            status = 4 if self._had_link else 2
+        self._emit(b"STATUS:" + str(status).encode() + b"\r\n" + OK)
+
+    def _at_cipstart(self, args):
+        link_id, args = self._link_args(args)
+        if link_id is None:
+            self._emit(ERROR)
+            return
+        if link_id in self._links:
+            self._emit(b"ALREADY CONNECTED\r\n" + ERROR)
+            return
+        fields = [f.strip().strip('"') for f in (args or "").split(",")]
+        delay = self.connect_ms / 1000
+        if len(fields) > 1:
+            ip, dns_delay = self._resolve(fields[1])
+            delay += dns_delay
+            if ip is None:
+                self._emit(b"DNS Fail\r\n" + ERROR, delay)
+                return
+            fields[1] = ip
+        if self.connect_fail_rate and self._random.random() < self.connect_fail_rate:
+            self._emit(ERROR + self._prefix(link_id) + b"CLOSED\r\n", delay)
+            return
+        try:
+            self._links[link_id] = socket.create_connection((fields[1], int(fields[2])), timeout=5)
+        except (IndexError, ValueError, OSError):
+            self._emit(ERROR + self._prefix(link_id) + b"CLOSED\r\n", delay)
+            return
+        self._had_link = True
+        self._emit(self._prefix(link_id) + b"CONNECT\r\n" + OK, delay)
+
+    def _at_cipsend(self, args):
+        self._poll_sockets()
+        link_id, args = self._link_args(args)
+        if link_id not in self._links:
+            self._emit(b"link is not valid\r\n" + ERROR)
+            return
+        length = int(args)
+        if not 0 < length <= _SEND_MAX:
+            self._emit(ERROR)
+            return
+        self._send_link = link_id
+        self._send_remaining = length
+        self._send_buf = bytearray()
+        self._emit(OK + b">")
+
+    def _finish_send(self):
+        data = bytes(self._send_buf)
+        self._emit(b"\r\nRecv " + str(len(data)).encode() + b" bytes\r\n")
+        sock = self._links.get(self._send_link)
+        try:
+            sock.sendall(data)
+        except (AttributeError, OSError):
+            self._drop_link(self._send_link)
+            self._emit(b"\r\nSEND FAIL\r\n")
+            return
+        self._emit(b"\r\nSEND OK\r\n")
+
+    def _at_cipclose(self, args):
+        link_id, _ = self._link_args(args)
+        if link_id not in self._links:
+            self._emit(ERROR)
+            return
+        self._drop_link(link_id)
+        self._emit(self._prefix(link_id) + b"CLOSED\r\n" + OK)
@@ -0,0 +1,34 @@
+"""CPython stand-in for MicroPython's ``framebuf`` module.
+
+Same constructor, formats and drawing calls as ports built with modframebuf.c,
+and the same buffer layout, so drivers and screens render byte-for-byte alike on
+the host. Put ``host/`` on sys.path (see host/emulator.py) to use it.
+
+FrameBuffer is the NumPy-backed class from host/framebuf_np.py when NumPy is
+installed and the pure-Python one from host/framebuf_py.py otherwise. Set
+HOST_FRAMEBUF=py in the environment to force the pure-Python backend.
+"""
+import os
+
+from framebuf_py import (  # noqa: F401
+    FONT_8X8,
+    GS2_HMSB,
+    GS4_HMSB,
+    GS8,
+    MONO_HLSB,
+    MONO_HMSB,
+    MONO_VLSB,
+    MVLSB,
+    RGB565,
+)
+
+BACKEND = "py"
+if os.environ.get("HOST_FRAMEBUF", "np") != "py":
+    try:
+        from framebuf_np import FrameBuffer
+
+        BACKEND = "np"
+    except ImportError:
+        pass
+if BACKEND == "py":
+    from framebuf_py import FrameBuffer  # noqa: F401
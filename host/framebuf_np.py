@@ -0,0 +1,175 @@
+"""NumPy backend of the host ``framebuf`` stand-in.
+
+FrameBuffer here subclasses the pure-Python one from host/framebuf_py.py and
+replaces its bulk operations -- fill_rect (and fill/hline/vline/rect and the
+filled ellipse and poly spans built on it), text, blit and scroll -- with array
+operations on a view of the same buffer. Single-pixel calls and the line and
+outline walks stay in Python. The buffer layout is unchanged, so both backends
+produce identical bytes (tests/test_host_framebuf.py checks this).
+
+RGB565 and GS8 are edited in place through a uint16/uint8 view; the packed
+formats (GS4_HMSB, GS2_HMSB, MONO_*) are unpacked for the touched block,
+widened to whole bytes, and packed back afterwards.
+"""
+import numpy as np
+
+import framebuf_py
+from framebuf_py import FONT_8X8, GS2_HMSB, GS4_HMSB, GS8, MONO_HLSB, MONO_HMSB, MONO_VLSB, RGB565
+
+# Largest colour value per format; colours are masked to it, as framebuf does.
+_MASK = {MONO_VLSB: 1, MONO_HLSB: 1, MONO_HMSB: 1, GS2_HMSB: 3, GS4_HMSB: 15, GS8: 0xFF, RGB565: 0xFFFF}
+
+# Pixels per byte of the horizontally packed formats.
+_PER_BYTE = {GS4_HMSB: 2, GS2_HMSB: 4, MONO_HLSB: 8, MONO_HMSB: 8}
+_PAGE_SHIFTS = np.arange(8, dtype=np.uint8)[None, :, None]
+
+# FONT_8X8 as booleans indexed [char - 32, row, column].
+_GLYPHS = ((np.frombuffer(FONT_8X8, np.uint8).reshape(96, 1, 8) >> _PAGE_SHIFTS) & 1).astype(bool)
+
+
+def _rows(fb, y0, y1, x0=0, x1=None):
+    """Pixels of rows y0..y1-1, columns x0..x1-1 of any FrameBuffer.
+
+    Returns (pixels, xa): a (rows, columns) array whose first column is xa.
+    RGB565 and GS8 get a writable view of exactly the requested block; the
+    packed formats get a decoded copy widened to whole bytes (xa <= x0), which
+    _store() writes back.
+    """
+    fmt = fb._fb_format
+    stride = fb._fb_stride
+    if x1 is None:
+        x1 = stride
+    raw = np.frombuffer(fb._fb_buf, np.uint8)
+    if fmt == RGB565:
+        return raw[2 * y0 * stride:2 * y1 * stride].view("<u2").reshape(-1, stride)[:, x0:x1], x0
+    if fmt == GS8:
+        return raw[y0 * stride:y1 * stride].reshape(-1, stride)[:, x0:x1], x0
+    if fmt == MONO_VLSB:
+        p0 = y0 >> 3
+        pages = raw[p0 * stride:((y1 + 7) >> 3) * stride].reshape(-1, 1, stride)[:, :, x0:x1]
+        bits = ((pages >> _PAGE_SHIFTS) & 1).reshape(-1, x1 - x0)
+        return bits[y0 - 8 * p0:y1 - 8 * p0], x0
+    per = _PER_BYTE[fmt]
+    n = stride // per
+    b0 = x0 // per
+    packed = raw[y0 * n:y1 * n].reshape(-1, n)[:, b0:(x1 + per - 1) // per]
+    if fmt == MONO_HLSB:
+        return np.unpackbits(packed, axis=1), b0 * per
+    if fmt == MONO_HMSB:
+        return np.unpackbits(packed, axis=1, bitorder="little"), b0 * per
+    px = np.empty((packed.shape[0], packed.shape[1] * per), np.uint8)
+    if fmt == GS4_HMSB:
+        px[:, 0::2] = packed >> 4
+        px[:, 1::2] = packed & 0x0F
+    else:
+        for k in range(4):
+            px[:, k::4] = (packed >> (2 * k)) & 3
+    return px, b0 * per
+
+
+def _store(fb, px, y0, xa):
+    """Write a block decoded by _rows(fb, y0, ...) back into a packed buffer."""
+    fmt = fb._fb_format
+    if fmt == RGB565 or fmt == GS8:
+        return
+    stride = fb._fb_stride
+    raw = np.frombuffer(fb._fb_buf, np.uint8)
+    y1 = y0 + len(px)
+    if fmt == MONO_VLSB:
+        # Whole pages only: merge the rows into the surrounding ones first.
+        p0 = y0 >> 3
+        p1 = (y1 + 7) >> 3
+        full, _ = _rows(fb, 8 * p0, 8 * p1, xa, xa + px.shape[1])
+        full[y0 - 8 * p0:y1 - 8 * p0] = px
+        bits = full.reshape(-1, 8, px.shape[1]).astype(np.uint8) << _PAGE_SHIFTS
+        pages = raw[p0 * stride:p1 * stride].reshape(-1, stride)
+        pages[:, xa:xa + px.shape[1]] = np.bitwise_or.reduce(bits, axis=1)
+        return
+    per = _PER_BYTE[fmt]
+    n = stride // per
+    px = px.astype(np.uint8, copy=False)
+    if fmt == MONO_HLSB:
+        packed = np.packbits(px, axis=1)
+    elif fmt == MONO_HMSB:
+        packed = np.packbits(px, axis=1, bitorder="little")
+    elif fmt == GS4_HMSB:
+        packed = (px[:, 0::2] << 4) | px[:, 1::2]
+    else:
+        packed = px[:, 0::4] | (px[:, 1::4] << 2) | (px[:, 2::4] << 4) | (px[:, 3::4] << 6)
+    b0 = xa // per
+    raw[y0 * n:y1 * n].reshape(-1, n)[:, b0:b0 + packed.shape[1]] = packed
+
+
+class FrameBuffer(framebuf_py.FrameBuffer):
+    def _fill_rect(self, x, y, w, h, c):
+        if h < 1 or w < 1 or x + w <= 0 or y + h <= 0 or y >= self._fb_height or x >= self._fb_width:
+            return
+        xend = min(self._fb_width, x + w)
+        yend = min(self._fb_height, y + h)
+        x = max(x, 0)
+        y = max(y, 0)
+        px, xa = _rows(self, y, yend, x, xend)
+        px[:, x - xa:xend - xa] = c & _MASK[self._fb_format]
+        _store(self, px, y, xa)
+
+    def text(self, s, x0, y0, c=1):
+        if isinstance(s, str):
+            s = s.encode()
+        codes = np.frombuffer(bytes(s), np.uint8)
+        codes = np.where((codes < 32) | (codes > 127), 127, codes) - 32
+        # (8 rows, 8 columns per char) mask of the whole string.
+        mask = _GLYPHS[codes].transpose(1, 0, 2).reshape(8, -1)
+        xa = max(x0, 0)
+        xb = min(self._fb_width, x0 + mask.shape[1])
+        ya = max(y0, 0)
+        yb = min(self._fb_height, y0 + 8)
+        if xa >= xb or ya >= yb:
+            return
+        px, x = _rows(self, ya, yb, xa, xb)
+        px[:, xa - x:xb - x][mask[ya - y0:yb - y0, xa - x0:xb - x0]] = c & _MASK[self._fb_format]
+        _store(self, px, ya, x)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            fbuf = framebuf_py.FrameBuffer(*fbuf)
+        if x >= self._fb_width or y >= self._fb_height or -x >= fbuf._fb_width or -y >= fbuf._fb_height:
+            return
+        key &= 0xFFFFFFFF
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = max(0, -x)
+        y1 = max(0, -y)
+        x0end = min(self._fb_width, x + fbuf._fb_width)
+        y0end = min(self._fb_height, y + fbuf._fb_height)
+        w = x0end - x0
+        src, xa = _rows(fbuf, y1, y1 + y0end - y0, x1, x1 + w)
+        src = src[:, x1 - xa:x1 - xa + w]
+        if palette is not None:
+            src = _rows(palette, 0, 1)[0][0][src]
+        px, xa = _rows(self, y0, y0end, x0, x0end)
+        region = px[:, x0 - xa:x0end - xa]
+        colors = src & _MASK[self._fb_format]
+        if key <= np.iinfo(src.dtype).max:
+            keep = src != key
+            region[keep] = colors[keep]
+        else:
+            region[...] = colors
+        _store(self, px, y0, xa)
+
+    def scroll(self, xstep, ystep):
+        width = self._fb_width
+        height = self._fb_height
+        if xstep < 0:
+            xs, xe = 0, width + xstep
+        else:
+            xs, xe = xstep, width
+        if ystep < 0:
+            ys, ye = 0, height + ystep
+        else:
+            ys, ye = ystep, height
+        if xs >= xe or ys >= ye:
+            return
+        # Same result as framebuf's far-side-first pixel copy: every source is read before it is overwritten.
+        px, _ = _rows(self, 0, height)
+        px[ys:ye, xs:xe] = px[ys - ystep:ye - ystep, xs - xstep:xe - xstep].copy()
+        _store(self, px, 0, 0)
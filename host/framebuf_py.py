@@ -0,0 +1,403 @@
+"""Pure-Python backend of the host ``framebuf`` stand-in.
+
+Same constructor, formats and drawing calls as ports built with modframebuf.c,
+and the same buffer layout (RGB565 little-endian, GS4_HMSB with the even pixel
+in the high nibble, ...). Drivers and screens written against framebuf
+therefore run and render byte-for-byte alike on the host. Import ``framebuf``
+(host/framebuf.py) rather than this module; it picks the NumPy backend in
+host/framebuf_np.py when NumPy is installed.
+"""
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+MVLSB = MONO_VLSB
+
+# 8x8 petme128 font used by text() for chars 32..127: one byte per column, top
+# row in bit 0. Taken from the MicroPython build in firmware/firmware.uf2.
+FONT_8X8 = bytes.fromhex(
+    "00000000000000000000004f4f0000000007070000070700147f7f14147f7f14"
+    "00242e6b6b3a1200006333180c66630000327f4d4d7772500000000406030100"
+    "00001c3e63410000000041633e1c0000082a3e1c1c3e2a080008083e3e080800"
+    "000080e0600000000008080808080800000000606000000000406030180c0602"
+    "003e7f49457f3e000040447f7f40400000627351494f460000226349497f3600"
+    "00181814167f7f1000276745457d3900003e7f49497b3200000303797d070300"
+    "00367f49497f360000266f49497f3e000000002424000000000080e464000000"
+    "00081c3663414100001414141414140000414163361c080000020351590f0600"
+    "003e7f414d4f2e00007c7e0b0b7e7c00007f7f49497f3600003e7f4141632200"
+    "007f7f41633e1c00007f7f4949414100007f7f0909010100003e7f41497b3a00"
+    "007f7f08087f7f000000417f7f410000002060417f3f0100007f7f1c36634100"
+    "007f7f4040404000007f7f060c067f7f007f7f0e1c7f7f00003e7f41417f3e00"
+    "007f7f09090f0600001e3f21617f5e00007f7f19396f460000266f49497b3200"
+    "0001017f7f010100003f7f40407f3f00001f3f60603f1f00007f7f3018307f7f"
+    "0063771c1c77630000070f78780f0700006171594d47430000007f7f41410000"
+    "0002060c18306040000041417f7f000000080c06060c0800c0c0c0c0c0c0c0c0"
+    "000001030604000000207454547c7800007f7f44447c380000387c44446c2800"
+    "00387c44447f7f0000387c54545c580000087e7f090302000098bca4a4fc7c00"
+    "007f7f04047c78000000007d7d0000000040c08080fd7d00007f7f30386c4400"
+    "0000417f7f400000007c7c1830187c7c007c7c04047c780000387c44447c3800"
+    "00fcfc24243c180000183c2424fcfc00007c7c04040c080000485c5454742000"
+    "04043f7f44642000003c7c40407c3c00001c3c60603c1c00001c7c3018307c1c"
+    "00446c38386c4400009cbca0a0fc7c00004464745c4c44000008083e77414100"
+    "000000ffff000000004141773e0808000002030103020301aa55aa55aa55aa55"
+)
+
+_BITS = {MONO_VLSB: 1, MONO_HLSB: 1, MONO_HMSB: 1, GS2_HMSB: 2, GS4_HMSB: 4, GS8: 8, RGB565: 16}
+
+
+def _cdiv(a, b):
+    """C integer division (truncates towards zero)."""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in _BITS:
+            raise ValueError("invalid format")
+        if stride is None:
+            stride = width
+        if format in (MONO_HLSB, MONO_HMSB):
+            stride = (stride + 7) & ~7
+        elif format == GS2_HMSB:
+            stride = (stride + 3) & ~3
+        elif format == GS4_HMSB:
+            stride = (stride + 1) & ~1
+        # Private names only: MicroPython's FrameBuffer exposes no attributes, and
+        # driver subclasses set their own width/height/_format.
+        self._fb_buf = memoryview(buffer).cast("B")
+        self._fb_width = width
+        self._fb_height = height
+        self._fb_format = format
+        self._fb_stride = stride
+        if format == MONO_VLSB:
+            size = stride * ((height + 7) // 8)
+        else:
+            size = (stride * height * _BITS[format] + 7) // 8
+        if len(self._fb_buf) < size:
+            raise ValueError("buffer too small")
+
+    # Pixel access in the exact modframebuf.c layouts.
+
+    def _set(self, x, y, c):
+        buf = self._fb_buf
+        fmt = self._fb_format
+        if fmt == RGB565:
+            i = 2 * (x + y * self._fb_stride)
+            buf[i] = c & 0xFF
+            buf[i + 1] = (c >> 8) & 0xFF
+        elif fmt == GS8:
+            buf[x + y * self._fb_stride] = c & 0xFF
+        elif fmt == GS4_HMSB:
+            i = (x + y * self._fb_stride) >> 1
+            if x & 1:
+                buf[i] = (c & 0x0F) | (buf[i] & 0xF0)
+            else:
+                buf[i] = ((c & 0x0F) << 4) | (buf[i] & 0x0F)
+        elif fmt == GS2_HMSB:
+            i = (x + y * self._fb_stride) >> 2
+            shift = (x & 3) << 1
+            buf[i] = ((c & 3) << shift) | (buf[i] & ~(3 << shift) & 0xFF)
+        elif fmt == MONO_VLSB:
+            i = (y >> 3) * self._fb_stride + x
+            bit = y & 7
+            buf[i] = ((c & 1) << bit) | (buf[i] & ~(1 << bit) & 0xFF)
+        else:
+            i = (x + y * self._fb_stride) >> 3
+            bit = 7 - (x & 7) if fmt == MONO_HLSB else x & 7
+            buf[i] = ((c & 1) << bit) | (buf[i] & ~(1 << bit) & 0xFF)
+
+    def _get(self, x, y):
+        buf = self._fb_buf
+        fmt = self._fb_format
+        if fmt == RGB565:
+            i = 2 * (x + y * self._fb_stride)
+            return buf[i] | (buf[i + 1] << 8)
+        if fmt == GS8:
+            return buf[x + y * self._fb_stride]
+        if fmt == GS4_HMSB:
+            b = buf[(x + y * self._fb_stride) >> 1]
+            return b & 0x0F if x & 1 else b >> 4
+        if fmt == GS2_HMSB:
+            return (buf[(x + y * self._fb_stride) >> 2] >> ((x & 3) << 1)) & 3
+        if fmt == MONO_VLSB:
+            return (buf[(y >> 3) * self._fb_stride + x] >> (y & 7)) & 1
+        bit = 7 - (x & 7) if fmt == MONO_HLSB else x & 7
+        return (buf[(x + y * self._fb_stride) >> 3] >> bit) & 1
+
+    def _set_checked(self, x, y, c, mask=True):
+        if mask and 0 <= x < self._fb_width and 0 <= y < self._fb_height:
+            self._set(x, y, c)
+
+    def _fill_rect(self, x, y, w, h, c):
+        if h < 1 or w < 1 or x + w <= 0 or y + h <= 0 or y >= self._fb_height or x >= self._fb_width:
+            return
+        xend = min(self._fb_width, x + w)
+        yend = min(self._fb_height, y + h)
+        x = max(x, 0)
+        y = max(y, 0)
+        fmt = self._fb_format
+        buf = self._fb_buf
+        if fmt == RGB565:
+            row = bytes((c & 0xFF, (c >> 8) & 0xFF)) * (xend - x)
+            for yy in range(y, yend):
+                i = 2 * (x + yy * self._fb_stride)
+                buf[i:i + len(row)] = row
+        elif fmt == GS8:
+            row = bytes((c & 0xFF,)) * (xend - x)
+            for yy in range(y, yend):
+                i = x + yy * self._fb_stride
+                buf[i:i + len(row)] = row
+        elif fmt == GS4_HMSB and xend - x > 2:
+            # Partial bytes at either end, whole bytes in between.
+            x0 = (x + 1) & ~1
+            x1 = xend & ~1
+            row = bytes((((c & 0x0F) << 4) | (c & 0x0F),)) * ((x1 - x0) >> 1)
+            for yy in range(y, yend):
+                if x0 != x:
+                    self._set(x, yy, c)
+                i = (x0 + yy * self._fb_stride) >> 1
+                buf[i:i + len(row)] = row
+                if x1 != xend:
+                    self._set(x1, yy, c)
+        else:
+            for yy in range(y, yend):
+                for xx in range(x, xend):
+                    self._set(xx, yy, c)
+
+    # framebuf API
+
+    def fill(self, c):
+        self._fill_rect(0, 0, self._fb_width, self._fb_height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._fill_rect(x, y, w, h, c)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._fb_width and 0 <= y < self._fb_height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+        return None
+
+    def hline(self, x, y, w, c):
+        self._fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self._fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self._fill_rect(x, y, w, h, c)
+            return
+        self._fill_rect(x, y, w, 1, c)
+        self._fill_rect(x, y + h - 1, w, 1, c)
+        self._fill_rect(x, y, 1, h, c)
+        self._fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = x2 - x1
+        if dx > 0:
+            sx = 1
+        else:
+            dx = -dx
+            sx = -1
+        dy = y2 - y1
+        if dy > 0:
+            sy = 1
+        else:
+            dy = -dy
+            sy = -1
+        steep = dy > dx
+        if steep:
+            x1, y1 = y1, x1
+            dx, dy = dy, dx
+            sx, sy = sy, sx
+        e = 2 * dy - dx
+        for _ in range(dx):
+            if steep:
+                self._set_checked(y1, x1, c)
+            else:
+                self._set_checked(x1, y1, c)
+            while e >= 0:
+                y1 += sy
+                e -= 2 * dx
+            x1 += sx
+            e += 2 * dy
+        self._set_checked(x2, y2, c)
+
+    def _ellipse_points(self, cx, cy, x, y, c, mask):
+        if mask & 0x10:
+            if mask & 1:
+                self._fill_rect(cx, cy - y, x + 1, 1, c)
+            if mask & 2:
+                self._fill_rect(cx - x, cy - y, x + 1, 1, c)
+            if mask & 4:
+                self._fill_rect(cx - x, cy + y, x + 1, 1, c)
+            if mask & 8:
+                self._fill_rect(cx, cy + y, x + 1, 1, c)
+        else:
+            self._set_checked(cx + x, cy - y, c, mask & 1)
+            self._set_checked(cx - x, cy - y, c, mask & 2)
+            self._set_checked(cx - x, cy + y, c, mask & 4)
+            self._set_checked(cx + x, cy + y, c, mask & 8)
+
+    def ellipse(self, cx, cy, xr, yr, c, f=False, m=0x0F):
+        mask = (0x10 if f else 0) | (m & 0x0F)
+        if xr == 0 and yr == 0:
+            self._set_checked(cx, cy, c, mask & 0x0F)
+            return
+        two_asquare = 2 * xr * xr
+        two_bsquare = 2 * yr * yr
+        x = xr
+        y = 0
+        xchange = yr * yr * (1 - 2 * xr)
+        ychange = xr * xr
+        error = 0
+        stoppingx = two_bsquare * xr
+        stoppingy = 0
+        while stoppingx >= stoppingy:
+            self._ellipse_points(cx, cy, x, y, c, mask)
+            y += 1
+            stoppingy += two_asquare
+            error += ychange
+            ychange += two_asquare
+            if 2 * error + xchange > 0:
+                x -= 1
+                stoppingx -= two_bsquare
+                error += xchange
+                xchange += two_bsquare
+        x = 0
+        y = yr
+        xchange = yr * yr
+        ychange = xr * xr * (1 - 2 * yr)
+        error = 0
+        stoppingx = 0
+        stoppingy = two_asquare * yr
+        while stoppingx <= stoppingy:
+            self._ellipse_points(cx, cy, x, y, c, mask)
+            x += 1
+            stoppingx += two_bsquare
+            error += xchange
+            xchange += two_bsquare
+            if 2 * error + ychange > 0:
+                y -= 1
+                stoppingy -= two_asquare
+                error += ychange
+                ychange += two_asquare
+
+    def poly(self, x, y, coords, c, f=False):
+        n = len(coords) // 2
+        if n == 0:
+            return
+        if not f:
+            px1, py1 = coords[0], coords[1]
+            i = n * 2 - 1
+            while i >= 0:
+                py2 = coords[i]
+                px2 = coords[i - 1]
+                i -= 2
+                self.line(x + px1, y + py1, x + px2, y + py2, c)
+                px1, py1 = px2, py2
+            return
+        # Scanline fill, integer version of alienryderflex.com/polygon_fill as in modframebuf.c.
+        ys = [coords[2 * i + 1] for i in range(n)]
+        for row in range(min(ys), max(ys) + 1):
+            nodes = []
+            px1, py1 = coords[0], coords[1]
+            i = n * 2 - 1
+            while i >= 0:
+                py2 = coords[i]
+                px2 = coords[i - 1]
+                i -= 2
+                if py1 != py2 and ((py1 > row >= py2) or (py1 <= row < py2)):
+                    nodes.append(_cdiv(32 * px1 + _cdiv(32 * (px2 - px1) * (row - py1), py2 - py1) + 16, 32))
+                elif row == max(py1, py2):
+                    if py1 < py2:
+                        self._set_checked(x + px2, y + py2, c)
+                    elif py2 < py1:
+                        self._set_checked(x + px1, y + py1, c)
+                    else:
+                        self.line(x + px1, y + py1, x + px2, y + py2, c)
+                px1, py1 = px2, py2
+            nodes.sort()
+            for j in range(0, len(nodes) - 1, 2):
+                self._fill_rect(x + nodes[j], y + row, nodes[j + 1] - nodes[j] + 1, 1, c)
+
+    def text(self, s, x0, y0, c=1):
+        if isinstance(s, str):
+            s = s.encode()
+        for ch in s:
+            if ch < 32 or ch > 127:
+                ch = 127
+            glyph = FONT_8X8[(ch - 32) * 8:(ch - 31) * 8]
+            for column in glyph:
+                if 0 <= x0 < self._fb_width:
+                    yy = y0
+                    while column:
+                        if column & 1 and 0 <= yy < self._fb_height:
+                            self._set(x0, yy, c)
+                        column >>= 1
+                        yy += 1
+                x0 += 1
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            fbuf = FrameBuffer(*fbuf)
+        if x >= self._fb_width or y >= self._fb_height or -x >= fbuf._fb_width or -y >= fbuf._fb_height:
+            return
+        key &= 0xFFFFFFFF
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = max(0, -x)
+        y1 = max(0, -y)
+        x0end = min(self._fb_width, x + fbuf._fb_width)
+        y0end = min(self._fb_height, y + fbuf._fb_height)
+        while y0 < y0end:
+            cx1 = x1
+            for cx0 in range(x0, x0end):
+                col = fbuf._get(cx1, y1)
+                if palette is not None:
+                    col = palette._get(col, 0)
+                if col != key:
+                    self._set(cx0, y0, col)
+                cx1 += 1
+            y0 += 1
+            y1 += 1
+
+    def scroll(self, xstep, ystep):
+        if xstep < 0:
+            sx = 0
+            xend = self._fb_width + xstep
+            if xend <= 0:
+                return
+            dx = 1
+        else:
+            sx = self._fb_width - 1
+            xend = xstep - 1
+            if xend >= sx:
+                return
+            dx = -1
+        if ystep < 0:
+            y = 0
+            yend = self._fb_height + ystep
+            if yend <= 0:
+                return
+            dy = 1
+        else:
+            y = self._fb_height - 1
+            yend = ystep - 1
+            if yend >= y:
+                return
+            dy = -1
+        while y != yend:
+            x = sx
+            while x != xend:
+                self._set(x, y, self._get(x - xstep, y - ystep))
+                x += dx
+            y += dy
@@ -0,0 +1,132 @@
+"""Local HTTP/1.1 stand-in server for the ESP-AT client tests and benchmarks.
+
+    with LocalHTTPServer() as server:
+        url = server.url("/ping")
+
+Routes:
+    GET  /ping           200 "pong" with Content-Length, link kept open
+    GET  /chunked        200 body sent with Transfer-Encoding: chunked
+    GET  /bytes/<n>      200 with an n-byte body
+    GET  /slow           200 "slow" after a 0.2 s pause (overlapping requests)
+    GET  /hold           200 "held" with Content-Length; if the client asked to
+                         close, the link stays open for 1 s anyway
+    GET  /drop           200 "bye", then the server closes the link without
+                         announcing it (an idle keep-alive link being dropped)
+    POST /echo           200 echoing the request body
+    POST /length         200 with the body's length and its sum of bytes mod 65536
+                         (checks a large upload without echoing it)
+Request bodies may use Content-Length or Transfer-Encoding: chunked.
+Anything else is 404. server.connections counts accepted TCP connections and
+server.requests counts handled requests.
+"""
+import http.server
+import threading
+import time
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200, extra=()):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in extra:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.path == "/ping":
+            self._send(b"pong")
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (b"chunked ", b"body", b" done"):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path.startswith("/bytes/"):
+            n = int(self.path[7:])
+            self._send(bytes(48 + i % 64 for i in range(n)))
+        elif self.path == "/slow":
+            time.sleep(0.2)
+            self._send(b"slow")
+        elif self.path == "/hold":
+            self._send(b"held")
+            if self.headers.get("Connection", "").lower() == "close":
+                self.wfile.flush()
+                time.sleep(1.0)
+        elif self.path == "/drop":
+            self._send(b"bye")
+            self.close_connection = True
+        else:
+            self._send(b"not found", 404)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = bytearray()
+        while True:
+            size = int(self.rfile.readline().split(b";", 1)[0], 16)
+            if not size:
+                break
+            body += self.rfile.read(size)
+            self.rfile.readline()
+        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
+        return bytes(body)
+
+    def do_POST(self):
+        self.server.requests += 1
+        body = self._read_body()
+        if self.path == "/echo":
+            self._send(body)
+        elif self.path == "/length":
+            self._send("{} {}".format(len(body), sum(body) % 65536).encode())
+        else:
+            self._send(b"not found", 404)
+
+
+class LocalHTTPServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.connections = 0
+        self._server.requests = 0
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def connections(self):
+        return self._server.connections
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    def url(self, path="/"):
+        return "http://{}:{}{}".format(self.host, self.port, path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
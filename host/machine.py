@@ -0,0 +1,150 @@
+"""CPython stand-in for the parts of MicroPython's ``machine`` module the drivers use.
+
+Pins keep their level in a shared table so a bus model (host/emulator.py) can
+watch chip-select and bit-banged clock edges via add_listener(), and can drive
+inputs such as LCD_TE with drive(), which fires the pin's irq() handler.
+Pins also remember their function: once a PIO state machine claims a pin (see
+host/rp2.py) GPIO writes to it are dropped, as on the RP2350, until the pin is
+re-initialised with Pin.OUT.
+
+UART(id, ...) talks to whatever endpoint attach_uart(id, endpoint) registered,
+e.g. the SimUART of host/esp_at.py, so MicroPython AT code runs unchanged.
+"""
+
+_levels = {}
+_functions = {}
+_irqs = {}
+_listeners = []
+_uarts = {}
+
+
+def reset():
+    """Forget all pin state and listeners (start of every emulator session)."""
+    _levels.clear()
+    _functions.clear()
+    _irqs.clear()
+    del _listeners[:]
+    _uarts.clear()
+
+
+def add_listener(callback):
+    """callback(pin_id, old_level, new_level) on every output level change."""
+    _listeners.append(callback)
+
+
+def set_function(pin_id, alt):
+    """Route pin_id to a peripheral (an ALT_* number), or back to GPIO with None."""
+    if alt is None:
+        _functions.pop(pin_id, None)
+    else:
+        _functions[pin_id] = alt
+
+
+def function(pin_id):
+    """The ALT_* function pin_id is routed to, or None while it is a GPIO."""
+    return _functions.get(pin_id)
+
+
+def drive(pin_id, level):
+    """Set an input pin from outside (e.g. the panel's TE line) and run its IRQ."""
+    old = _levels.get(pin_id, 0)
+    _levels[pin_id] = level
+    if pin_id not in _irqs:
+        return
+    pin, handler, trigger = _irqs[pin_id]
+    if (trigger & Pin.IRQ_RISING and not old and level) or (trigger & Pin.IRQ_FALLING and old and not level):
+        handler(pin)
+
+
+def attach_uart(uart_id, endpoint):
+    """Back UART(uart_id) with endpoint (in_waiting, read(n=None), readinto(buf, n=None), write(buf))."""
+    _uarts[uart_id] = endpoint
+
+
+def freq(hz=None):
+    return 150_000_000 if hz is None else None
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+    ALT_PIO0 = 6
+    ALT_PIO1 = 7
+    ALT_PIO2 = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None, alt=-1):
+        self.id = id
+        if pull == Pin.PULL_UP:
+            _levels.setdefault(id, 1)
+        else:
+            _levels.setdefault(id, 0)
+        self.init(mode, value=value, alt=alt)
+
+    def init(self, mode=-1, pull=-1, value=None, alt=-1):
+        if mode == Pin.ALT:
+            set_function(self.id, alt)
+        elif mode != -1:
+            set_function(self.id, None)
+        if value is not None:
+            self.value(value)
+
+    def __repr__(self):
+        return "Pin({})".format(self.id)
+
+    def value(self, level=None):
+        if level is None:
+            return _levels.get(self.id, 0)
+        if self.id in _functions:
+            return None
+        level = 1 if level else 0
+        old = _levels.get(self.id, 0)
+        _levels[self.id] = level
+        if old != level:
+            for callback in _listeners:
+                callback(self.id, old, level)
+        return None
+
+    def __call__(self, level=None):
+        return self.value(level)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        if handler is None:
+            _irqs.pop(self.id, None)
+        else:
+            _irqs[self.id] = (self, handler, trigger)
+
+
+class UART:
+    def __init__(self, id, baudrate=115200, tx=None, rx=None, **kwargs):
+        if id not in _uarts:
+            raise ValueError("no endpoint attached to UART({})".format(id))
+        self.id = id
+        self._endpoint = _uarts[id]
+
+    def init(self, baudrate=115200, **kwargs):
+        """Change the host side's rate (follow an AT+UART_CUR)."""
+        self._endpoint.baudrate = baudrate
+
+    def any(self):
+        return self._endpoint.in_waiting
+
+    def read(self, nbytes=None):
+        return self._endpoint.read(nbytes)
+
+    def readinto(self, buf, nbytes=None):
+        return self._endpoint.readinto(buf, nbytes)
+
+    def write(self, buf):
+        return self._endpoint.write(buf)
@@ -0,0 +1,220 @@
+"""CPython stand-in for MicroPython's ``rp2`` module (PIO state machines and DMA).
+
+asm_pio() records the program's shift configuration instead of assembling it.
+StateMachine.put() turns FIFO words into the bytes the program would clock out
+(out_init pin count = data lanes, out_shiftdir/pull_thresh = bit order) and hands
+them to every registered sink, e.g. the panel model in host/emulator.py. The FIFO
+drains instantly, and DMA transfers into a PIO TX FIFO run synchronously.
+Initialising a state machine routes its out/side-set pins to the PIO block
+(machine.set_function), so later GPIO writes to them have no effect.
+"""
+
+import machine
+
+_machines = {}
+_sinks = []
+
+# RP2350 PIO TX FIFO addresses, as in lib/qspi_dma.py.
+_PIO_BASES = (0x5020_0000, 0x5030_0000, 0x5040_0000)
+_PIO_TXF0_OFFSET = 0x010
+
+# Byte with its nibbles swapped: a 4-lane LSB-first word carries hi(b) before lo(b).
+_SWAP = bytes(((b >> 4) | ((b & 0x0F) << 4)) for b in range(256))
+
+
+def reset():
+    _machines.clear()
+    del _sinks[:]
+
+
+def add_sink(sink):
+    """sink.pio_out(sm, lanes, data) receives every whole byte a state machine clocks out."""
+    _sinks.append(sink)
+
+
+class PIO:
+    IN_LOW = 0
+    IN_HIGH = 1
+    OUT_LOW = 2
+    OUT_HIGH = 3
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    IRQ_SM0 = 0x100
+    IRQ_SM1 = 0x200
+    IRQ_SM2 = 0x400
+    IRQ_SM3 = 0x800
+
+    def __init__(self, id):
+        self.id = id
+
+    def state_machine(self, id, program=None, *args, **kwargs):
+        return StateMachine(self.id * 4 + id, program, *args, **kwargs)
+
+
+class Program:
+    def __init__(self, name, out_init=None, out_shiftdir=PIO.SHIFT_LEFT, autopull=False, pull_thresh=32, **kwargs):
+        self.name = name
+        if out_init is None:
+            self.lanes = 0
+        elif isinstance(out_init, tuple):
+            self.lanes = len(out_init)
+        else:
+            self.lanes = 1
+        self.shift_right = out_shiftdir == PIO.SHIFT_RIGHT
+        self.autopull = autopull
+        self.pull_thresh = pull_thresh
+        self.options = kwargs
+
+
+def asm_pio(**kwargs):
+    def decorator(func):
+        return Program(func.__name__, **kwargs)
+
+    return decorator
+
+
+class StateMachine:
+    def __init__(self, id, program=None, freq=-1, **kwargs):
+        self.id = id
+        self.program = None
+        self.freq = 125_000_000
+        self._active = False
+        self._residual = []
+        _machines[id] = self
+        if program is not None:
+            self.init(program, freq, **kwargs)
+
+    def init(self, program, freq=-1, **kwargs):
+        self.program = program
+        if freq > 0:
+            self.freq = freq
+        self.options = kwargs
+        alt = machine.Pin.ALT_PIO0 + self.id // 4
+        sideset = program.options.get("sideset_init")
+        for base, count in ((kwargs.get("out_base"), program.lanes),
+                            (kwargs.get("sideset_base"), len(sideset) if isinstance(sideset, tuple) else 1)):
+            if base is not None:
+                for pin_id in range(base.id, base.id + count):
+                    machine.set_function(pin_id, alt)
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = bool(value)
+        return None
+
+    def tx_fifo(self):
+        return 0
+
+    def rx_fifo(self):
+        return 0
+
+    def put(self, value, shift=0):
+        if isinstance(value, int):
+            words = (value,)
+        else:
+            words = value
+        prog = self.program
+        lanes = prog.lanes
+        per_word = prog.pull_thresh
+        out = bytearray()
+        if lanes == 4 and prog.shift_right and per_word % 8 == 0 and not self._residual:
+            swap = _SWAP
+            for w in words:
+                w = (w << shift) & 0xFFFFFFFF
+                for k in range(0, per_word, 8):
+                    out.append(swap[(w >> k) & 0xFF])
+        elif lanes == 1 and not prog.shift_right and per_word % 8 == 0 and not self._residual:
+            for w in words:
+                w = (w << shift) & 0xFFFFFFFF
+                for k in range(per_word // 8):
+                    out.append((w >> (24 - 8 * k)) & 0xFF)
+        else:
+            out = self._put_bits(words, shift, lanes, per_word, prog.shift_right)
+        if out:
+            for sink in _sinks:
+                sink.pio_out(self, lanes, bytes(out))
+
+    def _put_bits(self, words, shift, lanes, per_word, shift_right):
+        # Generic path: every out() puts `lanes` bits on the bus, highest lane first.
+        bits = self._residual
+        mask = (1 << lanes) - 1
+        for w in words:
+            w = (w << shift) & 0xFFFFFFFF
+            for _ in range(per_word // lanes):
+                if shift_right:
+                    v = w & mask
+                    w >>= lanes
+                else:
+                    v = (w >> (32 - lanes)) & mask
+                    w = (w << lanes) & 0xFFFFFFFF
+                for b in range(lanes - 1, -1, -1):
+                    bits.append((v >> b) & 1)
+        out = bytearray()
+        whole = len(bits) - len(bits) % 8
+        for i in range(0, whole, 8):
+            byte = 0
+            for bit in bits[i:i + 8]:
+                byte = (byte << 1) | bit
+            out.append(byte)
+        self._residual = bits[whole:]
+        return out
+
+
+def _machine_for_fifo(addr):
+    for block, base in enumerate(_PIO_BASES):
+        index, rem = divmod(addr - base - _PIO_TXF0_OFFSET, 4)
+        if rem == 0 and 0 <= index < 4:
+            return _machines.get(block * 4 + index)
+    return None
+
+
+class DMA:
+    """Synchronous DMA channel: a triggered transfer to a PIO TX FIFO completes inside config()."""
+
+    def __init__(self):
+        self._handler = None
+        self._closed = False
+
+    def pack_ctrl(self, default=None, **kwargs):
+        ctrl = {"size": 2, "inc_read": True, "inc_write": True, "treq_sel": 0x3F, "irq_quiet": True}
+        if default is not None:
+            ctrl.update(default)
+        ctrl.update(kwargs)
+        return ctrl
+
+    def config(self, read=None, write=None, count=None, ctrl=None, trigger=False):
+        self._read = read
+        self._write = write
+        self._count = count
+        self._ctrl = ctrl or self.pack_ctrl()
+        if trigger:
+            self._run()
+
+    def _run(self):
+        sm = _machine_for_fifo(self._write) if isinstance(self._write, int) else None
+        if sm is None:
+            raise ValueError("host DMA only supports writes to a PIO TX FIFO")
+        size = self._ctrl["size"]
+        src = memoryview(self._read).cast("B").cast("BHI"[size])
+        words = []
+        for v in src[:self._count]:
+            # Narrow writes are replicated across the 32-bit FIFO entry, as on the bus.
+            if size == 0:
+                v *= 0x01010101
+            elif size == 1:
+                v *= 0x00010001
+            words.append(v)
+        sm.put(words)
+        if self._handler is not None and not self._ctrl.get("irq_quiet", True):
+            self._handler(self)
+
+    def active(self, value=None):
+        return False
+
+    def irq(self, handler=None, hard=False):
+        self._handler = handler
+
+    def close(self):
+        self._handler = None
+        self._closed = True
@@ -0,0 +1,497 @@
+# Incremental ESP-AT response parser
+# Shared by the ESP-AT clients; pure Python, runs on MicroPython, CircuitPython
+# and the host (tests/test_at_stream.py, bench/bench_at_stream.py).
+#
+# UART chunks are consumed once, byte ranges are never rescanned, and every
+# chunk boundary is legal: a line, an +IPD header or a payload may be split
+# anywhere. feed() yields (kind, link, data) events:
+#
+#   ECHO       data = the echoed command line
+#   LINE       data = any other complete line (intermediate / unsolicited)
+#   OK, ERROR, SEND_OK, SEND_FAIL
+#              data = the status line
+#   IPD        link = link id (None in single-link mode), data = memoryview slice
+#              of the fed buffer holding the next part of that frame's payload;
+#              it is only valid until the next event, copy it to keep it
+#   CLOSED     link = link id or None, data = the line
+#   PROMPT     the ">" data prompt of AT+CIPSEND (it is not newline-terminated)
+#   IPD_NOTICE passive receive mode (AT+CIPRECVMODE=1): "+IPD,[<id>,]<len>"
+#              without payload, data is waiting in the ESP; link = link id or
+#              None, data = the line
+#   RECV_DATA  the "+CIPRECVDATA:<len>,<data>" reply of AT+CIPRECVDATA; data is
+#              a memoryview slice like IPD (link is None, the command names it)
+#
+# Line data is a fresh bytes object without the trailing CR/LF; blank lines
+# (including the space the ESP sends after ">") are dropped. Lines longer than
+# max_line are truncated to max_line bytes.
+#
+# ATReply indexes a reply that is already complete in one buffer (a capture,
+# a read-until-status buffer) instead: parse() records the status and the
+# (start, end) offsets of lines and +IPD payload spans in preallocated tables,
+# and nothing is copied or decoded until line(), text() or payload() is asked.
+#
+# RxRing is the receive side the ESP-AT clients share: a fixed bytearray the
+# UART is read into with readinto(), handed to ATStream.feed() window by window,
+# so polling does not allocate a fresh bytes object per chunk. The asyncio
+# client awaits its stream's readinto() on window() and commit()s the count.
+
+ECHO = "echo"
+LINE = "line"
+OK = "OK"
+ERROR = "ERROR"
+SEND_OK = "SEND OK"
+SEND_FAIL = "SEND FAIL"
+IPD = "+IPD"
+CLOSED = "CLOSED"
+PROMPT = ">"
+IPD_NOTICE = "+IPD notice"
+RECV_DATA = "+CIPRECVDATA"
+
+# Events that end an AT command exchange.
+FINAL = (OK, ERROR, SEND_OK, SEND_FAIL)
+
+# AT+CIPSTATUS? codes with an IP address: 2 got IP, 3 links open, 4 links
+# closed (the station stays up).
+_STATUS_UP = (2, 3, 4)
+
+_STATUS_LINES = {b"OK": OK, b"ERROR": ERROR, b"SEND OK": SEND_OK, b"SEND FAIL": SEND_FAIL}
+_STATUS_PAIRS = ((b"OK", OK), (b"ERROR", ERROR), (b"SEND OK", SEND_OK), (b"SEND FAIL", SEND_FAIL))
+_IPD_HEAD = b"+IPD,"
+_RECV_HEAD = b"+CIPRECVDATA"
+_PROMPT_BYTE = 0x3E
+_CR = 0x0D
+_LF = 0x0A
+_COLON = 0x3A
+_COMMA = 0x2C
+
+
+def _index(buf, byte, i, end):
+    """Offset of the first `byte` in buf[i:end], or -1.
+
+    MicroPython's bytearray has no find() or startswith(), and the parsers
+    are handed bytearrays (RxRing's ring, the client's reply buffer), so they
+    scan by index.
+    """
+    while i < end:
+        if buf[i] == byte:
+            return i
+        i += 1
+    return -1
+
+
+def _starts(buf, prefix, i, end):
+    """True if buf[i:end] starts with prefix (bytes), compared in place."""
+    n = len(prefix)
+    if end - i < n:
+        return False
+    k = 0
+    while k < n:
+        if buf[i + k] != prefix[k]:
+            return False
+        k += 1
+    return True
+
+
+class ATStream:
+    """Byte-level state machine over an ESP-AT UART stream."""
+
+    def __init__(self, max_line=256):
+        self._line = bytearray(max_line)
+        self._len = 0
+        self._remaining = 0
+        self._kind = IPD
+        self._link = None
+        self._echo = None
+        self._await_len = False
+
+    @property
+    def in_payload(self):
+        """True while the remaining bytes of an +IPD or +CIPRECVDATA frame are still expected."""
+        return self._remaining > 0
+
+    def expect_echo(self, command):
+        """Report the next line equal to `command` as ECHO rather than LINE."""
+        if command is None:
+            self._echo = None
+        else:
+            if isinstance(command, str):
+                command = command.encode()
+            self._echo = command.strip()
+
+    def reset(self):
+        """Drop any partial line or payload, e.g. after flushing the UART."""
+        self._len = 0
+        self._remaining = 0
+        self._link = None
+        self._await_len = False
+
+    def feed(self, data, start=0, end=None):
+        """Parse data[start:end] (bytes or bytearray) and yield its events."""
+        if end is None:
+            end = len(data)
+        mv = None
+        i = start
+        while i < end:
+            if self._remaining:
+                if mv is None:
+                    mv = memoryview(data)
+                take = min(self._remaining, end - i)
+                self._remaining -= take
+                yield self._kind, self._link, mv[i:i + take]
+                i += take
+                continue
+
+            if self._await_len:
+                # "+CIPRECVDATA:" seen; the length runs up to a comma.
+                comma = _index(data, _COMMA, i, end)
+                if comma < 0:
+                    self._append(data, i, end)
+                    break
+                digits = bytes(self._line[:self._len]) + data[i:comma]
+                self._len = 0
+                self._await_len = False
+                i = comma + 1
+                if digits.isdigit():
+                    self._kind = RECV_DATA
+                    self._link = None
+                    self._remaining = int(digits)
+                continue
+
+            if not self._len and data[i] == _PROMPT_BYTE:
+                i += 1
+                yield PROMPT, None, None
+                continue
+
+            nl = _index(data, _LF, i, end)
+            stop = end if nl < 0 else nl
+
+            # An +IPD header ends at its colon, not at a newline.
+            colon = _index(data, _COLON, i, stop)
+            if colon >= 0:
+                header = bytes(self._line[:self._len]) + data[i:colon]
+                if header.startswith(_IPD_HEAD) and self._start_payload(header):
+                    self._len = 0
+                    i = colon + 1
+                    continue
+                if header == _RECV_HEAD:
+                    self._len = 0
+                    self._await_len = True
+                    i = colon + 1
+                    continue
+
+            self._append(data, i, stop)
+            if nl < 0:
+                break
+            i = nl + 1
+            event = self._take_line()
+            if event is not None:
+                yield event
+
+    def flush(self):
+        """Yield the event of a pending unterminated line, if any."""
+        event = self._take_line()
+        if event is not None:
+            yield event
+
+    def _append(self, data, i, stop):
+        n = min(stop - i, len(self._line) - self._len)
+        if n > 0:
+            self._line[self._len:self._len + n] = data[i:i + n]
+            self._len += n
+
+    @staticmethod
+    def _ipd_fields(header):
+        """(link, length) of "+IPD,[<id>,]<len>", or None."""
+        fields = header[len(_IPD_HEAD):].split(b",")
+        try:
+            if len(fields) == 1:
+                return None, int(fields[0])
+            return int(fields[0]), int(fields[1])
+        except ValueError:
+            return None
+
+    def _start_payload(self, header):
+        fields = self._ipd_fields(header)
+        if fields is None:
+            return False
+        self._kind = IPD
+        self._link, self._remaining = fields
+        return True
+
+    def _take_line(self):
+        n = self._len
+        self._len = 0
+        if n and self._line[n - 1] == _CR:
+            n -= 1
+        line = bytes(self._line[:n])
+        if not line.strip():
+            return None
+        kind = _STATUS_LINES.get(line)
+        if kind is not None:
+            return kind, None, line
+        if self._echo is not None and line.strip() == self._echo:
+            self._echo = None
+            return ECHO, None, line
+        if line.startswith(_IPD_HEAD):
+            fields = self._ipd_fields(line)
+            if fields is not None:
+                return IPD_NOTICE, fields[0], line
+        if line.endswith(b"CLOSED"):
+            if line == b"CLOSED":
+                return CLOSED, None, line
+            head = line[:-7]
+            if line[-7:-6] == b"," and head.isdigit():
+                return CLOSED, int(head), line
+        return LINE, None, line
+
+
+def status_up(code):
+    """True if an AT+CIPSTATUS? STATUS: code means WiFi is up (has an IP address)."""
+    return code in _STATUS_UP
+
+
+def _digits(buf, i, j):
+    """Value of the decimal digits buf[i:j], or -1; no slice is made."""
+    if i >= j:
+        return -1
+    n = 0
+    while i < j:
+        c = buf[i]
+        if c < 0x30 or c > 0x39:
+            return -1
+        n = n * 10 + c - 0x30
+        i += 1
+    return n
+
+
+class ATReply:
+    """Offsets of one complete ESP-AT reply inside the caller's buffer.
+
+    Reuse one instance: parse() overwrites its preallocated tables (up to
+    max_lines lines and max_spans +IPD payload spans; later ones are counted
+    in `dropped`) and copies nothing. `status` is the last OK/ERROR (None if
+    there is none), `status_index` its position among the lines (-1 if it did
+    not fit); `sent` is the last SEND OK/SEND FAIL. Lines include every
+    non-blank line but the echo.
+    """
+
+    def __init__(self, max_lines=16, max_spans=8):
+        self.buf = None
+        self.status = None
+        self.status_index = -1
+        self.sent = None
+        self.echo = False
+        self.prompt = False
+        self.line_count = 0
+        self.span_count = 0
+        self.payload_length = 0
+        self.dropped = 0
+        self._lines = [0] * (2 * max_lines)
+        self._spans = [0] * (2 * max_spans)
+
+    def parse(self, buf, start=0, end=None, command=None):
+        """Index buf[start:end] (bytes or bytearray); returns self.
+
+        command (bytes) marks its echo line, which is not listed.
+        """
+        if end is None:
+            end = len(buf)
+        self.buf = buf
+        self.status = None
+        self.status_index = -1
+        self.sent = None
+        self.echo = False
+        self.prompt = False
+        self.line_count = 0
+        self.span_count = 0
+        self.payload_length = 0
+        self.dropped = 0
+        i = start
+        while i < end:
+            c = buf[i]
+            if c == _PROMPT_BYTE:
+                self.prompt = True
+                i += 1
+                continue
+            if _starts(buf, _IPD_HEAD, i, end):
+                skip = self._span(buf, i, end)
+                if skip:
+                    i = skip
+                    continue
+            nl = _index(buf, _LF, i, end)
+            stop = end if nl < 0 else nl
+            i = self._line(buf, i, stop, command)
+            if nl < 0:
+                break
+        return self
+
+    def _span(self, buf, i, end):
+        """Record the +IPD frame at i; returns the offset after it, or 0 if it is a notice line."""
+        nl = _index(buf, _LF, i, end)
+        colon = _index(buf, _COLON, i, end if nl < 0 else nl)
+        if colon < 0:
+            return 0
+        comma = _index(buf, _COMMA, i + len(_IPD_HEAD), colon)
+        n = _digits(buf, (comma + 1) if comma >= 0 else i + len(_IPD_HEAD), colon)
+        if n < 0:
+            return 0
+        stop = min(colon + 1 + n, end)
+        k = self.span_count
+        if 2 * k < len(self._spans):
+            self._spans[2 * k] = colon + 1
+            self._spans[2 * k + 1] = stop
+            self.span_count = k + 1
+            self.payload_length += stop - colon - 1
+        else:
+            self.dropped += 1
+        return stop
+
+    def _line(self, buf, i, stop, command):
+        """Classify buf[i:stop] (CR and surrounding spaces trimmed); returns stop + 1."""
+        j = stop
+        while j > i and buf[j - 1] in (0x0D, 0x20):
+            j -= 1
+        while i < j and buf[i] == 0x20:
+            i += 1
+        n = j - i
+        if not n:
+            return stop + 1
+        if command is not None and not self.echo and n == len(command) and _starts(buf, command, i, j):
+            self.echo = True
+            return stop + 1
+        kind = None
+        for text, status in _STATUS_PAIRS:
+            if n == len(text) and _starts(buf, text, i, j):
+                kind = status
+                break
+        k = self.line_count
+        if 2 * k < len(self._lines):
+            self._lines[2 * k] = i
+            self._lines[2 * k + 1] = j
+            self.line_count = k + 1
+        else:
+            # The status still counts when its line does not fit.
+            self.dropped += 1
+            k = -1
+        if kind == OK or kind == ERROR:
+            self.status = kind
+            self.status_index = k
+        elif kind is not None:
+            self.sent = kind
+        return stop + 1
+
+    def line(self, index):
+        """Line index as a memoryview of the buffer."""
+        return memoryview(self.buf)[self._lines[2 * index]:self._lines[2 * index + 1]]
+
+    def text(self, index):
+        """Line index decoded to str."""
+        return bytes(self.line(index)).decode("utf-8", "ignore")
+
+    def value(self, prefix):
+        """Decimal value after prefix (bytes) on the first line starting with it, or -1."""
+        buf = self.buf
+        lines = self._lines
+        n = len(prefix)
+        for k in range(self.line_count):
+            i = lines[2 * k]
+            j = lines[2 * k + 1]
+            if _starts(buf, prefix, i, j):
+                return _digits(buf, i + n, j)
+        return -1
+
+    def span(self, index):
+        """Payload of +IPD frame index as a memoryview of the buffer."""
+        return memoryview(self.buf)[self._spans[2 * index]:self._spans[2 * index + 1]]
+
+    def payload(self):
+        """All +IPD payload joined into one bytes object."""
+        return b"".join(self.span(k) for k in range(self.span_count))
+
+
+def _waiting(uart):
+    """Bytes the UART holds: any() on machine.UART, in_waiting on busio.UART."""
+    if hasattr(uart, "any"):
+        return uart.any()
+    return uart.in_waiting
+
+
+class RxRing:
+    """Fixed-size UART receive ring, filled with readinto() and parsed in place.
+
+    fill() reads at most what the UART holds and the ring has room for;
+    feed() passes each buffered window (at most two when the data wraps) to
+    ATStream.feed() as (buf, start, end) and releases it. A window is released
+    before it is parsed, so abandoning the events part way drops the rest of
+    it, as abandoning the events of a read() chunk did.
+
+    A reader that cannot poll (an asyncio stream) reads into window() itself
+    and passes the count to commit().
+
+    `high_water` is the most bytes ever buffered at once; `overflows` counts
+    fills that found the ring full while the UART still held data (the excess
+    stays in the UART driver's own buffer, which loses bytes if it fills too).
+    """
+
+    def __init__(self, size=1024):
+        self.buf = bytearray(size)
+        self._mv = memoryview(self.buf)
+        self.size = size
+        self._start = 0
+        self._count = 0
+        self.received = 0
+        self.high_water = 0
+        self.overflows = 0
+
+    def __len__(self):
+        return self._count
+
+    def window(self, limit=None):
+        """Free space after the buffered bytes as a memoryview (at most limit bytes, empty when full)."""
+        end = self._start + self._count
+        if end >= self.size:
+            end -= self.size
+            room = self._start - end
+        else:
+            room = self.size - end
+        if limit is not None and limit < room:
+            room = limit
+        return self._mv[end:end + room]
+
+    def commit(self, n):
+        """Count n bytes written into window() as buffered."""
+        self._count += n
+        self.received += n
+        if self._count > self.high_water:
+            self.high_water = self._count
+
+    def fill(self, uart):
+        """Read what uart holds into the ring; returns the number of bytes read."""
+        total = 0
+        waiting = _waiting(uart)
+        while waiting and self._count < self.size:
+            # readinto() blocks for the UART timeout if asked for more than it holds.
+            n = uart.readinto(self.window(waiting))
+            if not n:
+                break
+            self.commit(n)
+            total += n
+            waiting = _waiting(uart)
+        if waiting and self._count == self.size:
+            self.overflows += 1
+        return total
+
+    def feed(self, stream):
+        """Parse every buffered byte with stream (an ATStream) and yield its events."""
+        while self._count:
+            start = self._start
+            end = min(start + self._count, self.size)
+            self._count -= end - start
+            self._start = 0 if end == self.size else end
+            for event in stream.feed(self.buf, start, end):
+                yield event
+
+    def clear(self):
+        """Drop the buffered bytes; the counters are kept."""
+        self._start = 0
+        self._count = 0
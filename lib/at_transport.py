@@ -0,0 +1,113 @@
+# Blocking ESP-AT command exchange for the MicroPython stage scripts and boot path
+# Each call returns as soon as the ESP's final reply arrives (OK, ERROR,
+# SEND OK, SEND FAIL, or the ">" prompt of AT+CIPSEND) instead of sleeping a
+# fixed time; the timeout only bounds a silent or stuck module. Parsing is
+# lib/at_stream.py's, HTTP framing lib/http_stream.py's.
+#
+# The UART needs write() and readinto() plus any() (machine.UART) or in_waiting
+# (busio.UART, host/esp_at.py). Received bytes go through one preallocated
+# at_stream.RxRing (`rx`, with its high-water and overflow counters). Tick
+# functions default to MicroPython's time.ticks_ms/ticks_diff/sleep_ms and can
+# be injected to run on the host (tests/test_at_transport.py).
+import time
+
+from at_stream import ATStream, CLOSED, ECHO, ERROR, IPD, OK, PROMPT, RxRing, SEND_FAIL, SEND_OK
+from http_stream import HTTPResponse
+
+
+class Reply:
+    """Final status of one exchange (None on timeout), its other lines, and latency in ms."""
+
+    def __init__(self, status, lines, ms):
+        self.status = status
+        self.lines = lines
+        self.ms = ms
+
+    @property
+    def ok(self):
+        return self.status in (OK, SEND_OK, PROMPT)
+
+    @property
+    def text(self):
+        return "\r\n".join(self.lines)
+
+    def __repr__(self):
+        return "Reply({!r}, {}ms)".format(self.status, self.ms)
+
+
+class ATTransport:
+    """Send AT commands over a polled UART and wait only as long as the ESP takes."""
+
+    def __init__(self, uart, ticks_ms=None, ticks_diff=None, sleep_ms=None, poll_ms=1, rx_size=1024):
+        self.uart = uart
+        self.rx = RxRing(rx_size)
+        self._ticks_ms = ticks_ms or time.ticks_ms
+        self._ticks_diff = ticks_diff or time.ticks_diff
+        self._sleep_ms = sleep_ms or time.sleep_ms
+        self._poll_ms = poll_ms
+        self._stream = ATStream()
+        self._response = None
+        self.link_closed = False
+
+    def _events(self):
+        """Parser events for whatever the UART holds now (possibly none)."""
+        if not self.rx.fill(self.uart):
+            return ()
+        return self.rx.feed(self._stream)
+
+    def _wait(self, finals, timeout_ms, done=None):
+        """Collect lines until an event kind in finals arrives or done() is true; returns a Reply."""
+        start = self._ticks_ms()
+        lines = []
+        while True:
+            for kind, _link, data in self._events():
+                if kind == IPD:
+                    if self._response is not None and not self._response.complete:
+                        self._response.feed(data)
+                elif kind == CLOSED:
+                    self.link_closed = True
+                elif kind in finals:
+                    return Reply(kind, lines, self._ticks_diff(self._ticks_ms(), start))
+                elif kind != ECHO and kind != PROMPT:
+                    lines.append(data.decode("utf-8", "ignore"))
+            elapsed = self._ticks_diff(self._ticks_ms(), start)
+            if elapsed >= timeout_ms or (done is not None and done()):
+                return Reply(None, lines, elapsed)
+            self._sleep_ms(self._poll_ms)
+
+    def command(self, cmd, timeout_ms=2000, prompt=False):
+        """Send cmd and wait for OK or ERROR; with prompt=True (AT+CIPSEND) for ">" or ERROR."""
+        # Stale output (boot banner, late URCs) must not answer this command.
+        while self.rx.fill(self.uart):
+            for _event in self.rx.feed(self._stream):
+                pass
+        self._stream.reset()
+        self._stream.expect_echo(cmd)
+        self.uart.write((cmd + "\r\n").encode())
+        return self._wait((PROMPT, ERROR) if prompt else (OK, ERROR), timeout_ms)
+
+    def send_http(self, data, timeout_ms=10000):
+        """After AT+CIPSEND's prompt: send a request and wait for its HTTP response.
+
+        Returns (reply, response): the SEND OK / SEND FAIL reply, and the
+        HTTPResponse, complete once its framing says so or the server closed
+        the link (check response.complete; status is 0 if nothing arrived).
+        """
+        start = self._ticks_ms()
+        response = HTTPResponse()
+        self._response = response
+        self.link_closed = False
+        try:
+            self.uart.write(data)
+            reply = self._wait((SEND_OK, SEND_FAIL), timeout_ms)
+            if reply.status == SEND_OK:
+                remaining = timeout_ms - self._ticks_diff(self._ticks_ms(), start)
+                self._wait((), remaining, lambda: response.complete or self.link_closed)
+        except ValueError:
+            # Not HTTP: leave the response incomplete.
+            return Reply(None, [], self._ticks_diff(self._ticks_ms(), start)), response
+        finally:
+            self._response = None
+        if self.link_closed:
+            response.finish()
+        return reply, response
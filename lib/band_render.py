@@ -0,0 +1,207 @@
+# Band (strip) rendering for the ST77916 drivers
+# Shared by lib/st77916.py and firmware/drivers/display.py. Pure Python: the band
+# FrameBuffer and the panel writer are injected, so it runs on the host.
+#
+# Instead of a full-screen framebuffer, drawing calls are recorded into a display
+# list. render() replays the list once per horizontal band into a small reusable
+# FrameBuffer, shifted up by the band's top row so framebuf clips everything
+# outside it, and pushes each band through its own window.
+#
+# The list stays bounded without fill(): an opaque fill_rect drops the earlier
+# commands it fully covers (a heartbeat square repainted every few hundred ms
+# keeps one entry), and past max_commands the renderer asks the app to redraw
+# the whole screen instead of growing further.
+
+from damage import blit_size
+
+# Positional arguments that hold a y coordinate, per framebuf drawing method.
+Y_ARGS = {
+    "pixel": (1,),
+    "hline": (1,),
+    "vline": (1,),
+    "line": (1, 3),
+    "rect": (1,),
+    "fill_rect": (1,),
+    "ellipse": (1,),
+    "poly": (1,),
+    "text": (2,),
+    "blit": (2,),
+}
+DRAW_METHODS = ("fill",) + tuple(Y_ARGS)
+# Everything a driver forwards to its BandRenderer in band mode.
+SURFACE_METHODS = DRAW_METHODS + ("scroll", "invalidate")
+
+# Default display list cap; each entry costs a tuple plus its arguments.
+MAX_COMMANDS = 128
+
+
+class BandRenderer:
+    """framebuf-compatible display list rendered band by band.
+
+    band is a FrameBuffer of width x band_rows; write_band(y, rows) sends its
+    first `rows` rows to panel rows y..y+rows-1. Only bands touched by drawing
+    calls since the last render() are redrawn, but each one replays the whole
+    retained list, so start every screen with fill() (which also drops the
+    previous list). Arguments are kept by reference: do not reuse a poly()
+    coords array or blit() source for something else before render().
+
+    When a call would grow the list past max_commands, the list is dropped and
+    the next render() calls redraw(), which must draw the whole screen again
+    (without show()). Without a redraw hook the overflowing call raises
+    RuntimeError.
+    """
+
+    def __init__(self, band, width, height, band_rows, write_band, background=0, max_commands=MAX_COMMANDS,
+                 redraw=None):
+        self._band = band
+        self.width = width
+        self.height = height
+        self.band_rows = band_rows
+        self._write_band = write_band
+        self.background = background
+        self.max_commands = max_commands
+        self._redraw = redraw
+        self._redraw_pending = False
+        self.overflows = 0
+        self._commands = []
+        self._dirty = bytearray((height + band_rows - 1) // band_rows)
+
+    def __len__(self):
+        return len(self._commands)
+
+    @property
+    def dirty(self):
+        return any(self._dirty)
+
+    def reset(self):
+        """Drop the display list; the panel keeps its content until the next render()."""
+        self._commands = []
+
+    def _mark(self, y0, y1):
+        y0 = max(0, y0)
+        y1 = min(self.height, y1)
+        if y0 >= y1:
+            return False
+        for band in range(y0 // self.band_rows, (y1 - 1) // self.band_rows + 1):
+            self._dirty[band] = 1
+        return True
+
+    def _record(self, name, args, x0, y0, x1, y1):
+        if self._redraw_pending or not self._mark(y0, y1):
+            return
+        commands = self._commands
+        if name == "fill_rect":
+            # Opaque: earlier commands entirely inside it can never show again.
+            keep = 0
+            for cmd in commands:
+                if not (x0 <= cmd[2] and cmd[4] <= x1 and y0 <= cmd[3] and cmd[5] <= y1):
+                    commands[keep] = cmd
+                    keep += 1
+            del commands[keep:]
+        if len(commands) >= self.max_commands:
+            self._overflow()
+            return
+        commands.append((name, args, x0, y0, x1, y1))
+
+    def _overflow(self):
+        if self._redraw is None:
+            raise RuntimeError("display list full ({} commands); start each screen with fill()".format(
+                self.max_commands))
+        self._commands = []
+        self._redraw_pending = True
+        self.overflows += 1
+        self._mark(0, self.height)
+
+    def invalidate(self, x=0, y=0, w=None, h=None):
+        self._mark(y, self.height if h is None else y + h)
+
+    # Drawing calls: same signatures as framebuf.FrameBuffer.
+
+    def fill(self, c):
+        self._commands = [("fill", (c,), 0, 0, self.width, self.height)]
+        self._redraw_pending = False
+        self._mark(0, self.height)
+
+    def pixel(self, x, y, *c):
+        if not c:
+            raise ValueError("band mode cannot read pixels back")
+        self._record("pixel", (x, y) + c, x, y, x + 1, y + 1)
+
+    def hline(self, x, y, w, c):
+        self._record("hline", (x, y, w, c), x, y, x + w, y + 1)
+
+    def vline(self, x, y, h, c):
+        self._record("vline", (x, y, h, c), x, y, x + 1, y + h)
+
+    def line(self, x1, y1, x2, y2, c):
+        self._record("line", (x1, y1, x2, y2, c), min(x1, x2), min(y1, y2), max(x1, x2) + 1, max(y1, y2) + 1)
+
+    def rect(self, x, y, w, h, c, *f):
+        self._record("rect", (x, y, w, h, c) + f, x, y, x + w, y + h)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._record("fill_rect", (x, y, w, h, c), x, y, x + w, y + h)
+
+    def ellipse(self, x, y, xr, yr, c, *args):
+        self._record("ellipse", (x, y, xr, yr, c) + args, x - xr, y - yr, x + xr + 1, y + yr + 1)
+
+    def poly(self, x, y, coords, c, *f):
+        if len(coords) < 2:
+            return
+        x0 = x1 = coords[0]
+        y0 = y1 = coords[1]
+        for i in range(2, len(coords) - 1, 2):
+            x0 = min(x0, coords[i])
+            x1 = max(x1, coords[i])
+            y0 = min(y0, coords[i + 1])
+            y1 = max(y1, coords[i + 1])
+        self._record("poly", (x, y, coords, c) + f, x + x0, y + y0, x + x1 + 1, y + y1 + 1)
+
+    def text(self, s, x, y, *c):
+        self._record("text", (s, x, y) + c, x, y, x + 8 * len(s), y + 8)
+
+    def blit(self, fbuf, x, y, *args, w=None, h=None):
+        size = blit_size(fbuf, w, h)
+        if size is None:
+            self._record("blit", (fbuf, x, y) + args, 0, 0, self.width, self.height)
+        else:
+            self._record("blit", (fbuf, x, y) + args, x, y, x + size[0], y + size[1])
+
+    def scroll(self, xstep, ystep):
+        raise ValueError("band mode cannot scroll; redraw instead")
+
+    def render(self):
+        """Redraw and push every dirty band; returns the number of bands sent."""
+        if self._redraw_pending:
+            self._redraw_pending = False
+            # A screen that overflows again inside redraw() raises instead of looping.
+            redraw, self._redraw = self._redraw, None
+            try:
+                redraw()
+            finally:
+                self._redraw = redraw
+        band = self._band
+        rows_per_band = self.band_rows
+        commands = self._commands
+        cleared = bool(commands) and commands[0][0] == "fill"
+        sent = 0
+        for index in range(len(self._dirty)):
+            if not self._dirty[index]:
+                continue
+            top = index * rows_per_band
+            rows = min(rows_per_band, self.height - top)
+            bottom = top + rows
+            if not cleared:
+                band.fill(self.background)
+            for name, args, _x0, y0, _x1, y1 in commands:
+                if y1 <= top or y0 >= bottom:
+                    continue
+                if top:
+                    args = list(args)
+                    for i in Y_ARGS.get(name, ()):
+                        args[i] -= top
+                getattr(band, name)(*args)
+            self._write_band(top, rows)
+            self._dirty[index] = 0
+            sent += 1
+        return sent
@@ -0,0 +1,63 @@
+# Boot-time profiler for display bring-up (reset, init stream, first frame)
+# Pure Python apart from the tick source, so it runs on the host with a fake clock.
+import time
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = self._profiler._ticks_us()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = self._profiler._ticks_diff(self._profiler._ticks_us(), self._start)
+        self._profiler.record(self._name, elapsed / 1000)
+        return False
+
+
+class BootProfiler:
+    """Times named boot phases and compares them with per-phase and total budgets (ms)."""
+
+    def __init__(self, budgets_ms=None, total_budget_ms=None, ticks_us=None, ticks_diff=None):
+        self.budgets_ms = budgets_ms or {}
+        self.total_budget_ms = total_budget_ms
+        self._ticks_us = ticks_us or time.ticks_us
+        self._ticks_diff = ticks_diff or time.ticks_diff
+        self.phases = []
+
+    def phase(self, name):
+        """Context manager timing one phase: `with profiler.phase("reset"): ...`"""
+        return _Phase(self, name)
+
+    def record(self, name, elapsed_ms):
+        self.phases.append((name, elapsed_ms))
+
+    @property
+    def total_ms(self):
+        return sum(ms for _name, ms in self.phases)
+
+    def over_budget(self):
+        """Names of phases (and "total") that exceeded their budget."""
+        over = [name for name, ms in self.phases if name in self.budgets_ms and ms > self.budgets_ms[name]]
+        if self.total_budget_ms is not None and self.total_ms > self.total_budget_ms:
+            over.append("total")
+        return over
+
+    def report(self):
+        lines = []
+        for name, ms in self.phases:
+            budget = self.budgets_ms.get(name)
+            if budget is None:
+                lines.append("[boot] {}: {:.1f}ms".format(name, ms))
+            else:
+                flag = " OVER" if ms > budget else ""
+                lines.append("[boot] {}: {:.1f}ms / {}ms{}".format(name, ms, budget, flag))
+        total = "[boot] total: {:.1f}ms".format(self.total_ms)
+        if self.total_budget_ms is not None:
+            total += " / {}ms{}".format(self.total_budget_ms, " OVER" if self.total_ms > self.total_budget_ms else "")
+        lines.append(total)
+        return "\n".join(lines)
@@ -0,0 +1,199 @@
+# Damage (dirty-rectangle) tracking for frame-buffered displays
+# Shared by lib/st77916.py and firmware/drivers/display.py: DamageTracker holds
+# the rectangles, DamageMixin records them from the framebuf drawing calls.
+# Pure Python: no machine/rp2 imports so it also runs on the host.
+
+
+class DamageTracker:
+    """Accumulate damaged screen regions as a short list of merged rectangles.
+
+    Rectangles are stored as [x0, y0, x1, y1] with exclusive ends and handed
+    out by take() as (x, y, w, h) tuples, ready for set_window + RAMWR.
+    """
+
+    def __init__(self, width, height, max_rects=8, merge_slack=256):
+        self.width = width
+        self.height = height
+        self.max_rects = max_rects
+        # Extra pixels we accept pushing to save one window (command) round-trip.
+        self.merge_slack = merge_slack
+        self._rects = []
+
+    @property
+    def dirty(self):
+        return bool(self._rects)
+
+    def clear(self):
+        self._rects = []
+
+    def add_full(self):
+        self._rects = [[0, 0, self.width, self.height]]
+
+    def add(self, x, y, w, h):
+        """Mark (x, y, w, h) damaged; the region is clipped to the screen."""
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        rects = self._rects
+        new = [x0, y0, x1, y1]
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(rects)):
+                if self._waste(rects[i], new) <= self.merge_slack:
+                    new = self._union(rects.pop(i), new)
+                    merged = True
+                    break
+        rects.append(new)
+
+        while len(rects) > self.max_rects:
+            self._merge_cheapest_pair()
+
+    def bbox(self, x0, y0, x1, y1):
+        """Mark the inclusive bounding box of two corner points damaged."""
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y0 > y1:
+            y0, y1 = y1, y0
+        self.add(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+
+    def rects(self):
+        return [(r[0], r[1], r[2] - r[0], r[3] - r[1]) for r in self._rects]
+
+    def take(self):
+        """Return the damaged rectangles and reset the tracker."""
+        out = self.rects()
+        self._rects = []
+        return out
+
+    def area(self):
+        return sum((r[2] - r[0]) * (r[3] - r[1]) for r in self._rects)
+
+    @staticmethod
+    def _union(a, b):
+        return [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+
+    @staticmethod
+    def _waste(a, b):
+        """Pixels pushed needlessly if a and b are sent as their union."""
+        ux = max(a[2], b[2]) - min(a[0], b[0])
+        uy = max(a[3], b[3]) - min(a[1], b[1])
+        area_a = (a[2] - a[0]) * (a[3] - a[1])
+        area_b = (b[2] - b[0]) * (b[3] - b[1])
+        ix = min(a[2], b[2]) - max(a[0], b[0])
+        iy = min(a[3], b[3]) - max(a[1], b[1])
+        inter = ix * iy if ix > 0 and iy > 0 else 0
+        return ux * uy - (area_a + area_b - inter)
+
+    def _merge_cheapest_pair(self):
+        rects = self._rects
+        best = None
+        best_i = best_j = 0
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                waste = self._waste(rects[i], rects[j])
+                if best is None or waste < best:
+                    best = waste
+                    best_i, best_j = i, j
+        b = rects.pop(best_j)
+        a = rects.pop(best_i)
+        rects.append(self._union(a, b))
+
+
+def blit_size(fbuf, w=None, h=None):
+    """(w, h) of a blit() source, or None if it cannot be known.
+
+    Explicit w/h win; a (buffer, width, height, format[, stride]) tuple carries
+    its size. A MicroPython FrameBuffer has no width/height attributes, so a
+    plain FrameBuffer source is only sized if it is a subclass that sets them.
+    """
+    if w is None or h is None:
+        if isinstance(fbuf, (tuple, list)):
+            w, h = fbuf[1], fbuf[2]
+        else:
+            w = getattr(fbuf, "width", None) if w is None else w
+            h = getattr(fbuf, "height", None) if h is None else h
+    if w is None or h is None:
+        return None
+    return w, h
+
+
+class DamageMixin:
+    """framebuf drawing calls that record their bounding box in self._damage.
+
+    Put it before framebuf.FrameBuffer in the bases; the driver sets
+    self._damage (a DamageTracker), self.width and self.height.
+    """
+
+    def fill(self, c):
+        self._damage.add_full()
+        super().fill(c)
+
+    def pixel(self, x, y, *c):
+        if c:
+            self._damage.add(x, y, 1, 1)
+        return super().pixel(x, y, *c)
+
+    def hline(self, x, y, w, c):
+        self._damage.add(x, y, w, 1)
+        super().hline(x, y, w, c)
+
+    def vline(self, x, y, h, c):
+        self._damage.add(x, y, 1, h)
+        super().vline(x, y, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        self._damage.bbox(x1, y1, x2, y2)
+        super().line(x1, y1, x2, y2, c)
+
+    def rect(self, x, y, w, h, c, *f):
+        self._damage.add(x, y, w, h)
+        super().rect(x, y, w, h, c, *f)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._damage.add(x, y, w, h)
+        super().fill_rect(x, y, w, h, c)
+
+    def ellipse(self, x, y, xr, yr, c, *args):
+        self._damage.bbox(x - xr, y - yr, x + xr, y + yr)
+        super().ellipse(x, y, xr, yr, c, *args)
+
+    def poly(self, x, y, coords, c, *f):
+        if len(coords) >= 2:
+            x0 = x1 = coords[0]
+            y0 = y1 = coords[1]
+            for i in range(2, len(coords) - 1, 2):
+                x0 = min(x0, coords[i])
+                x1 = max(x1, coords[i])
+                y0 = min(y0, coords[i + 1])
+                y1 = max(y1, coords[i + 1])
+            self._damage.bbox(x + x0, y + y0, x + x1, y + y1)
+        super().poly(x, y, coords, c, *f)
+
+    def text(self, s, x, y, *c):
+        self._damage.add(x, y, 8 * len(s), 8)
+        super().text(s, x, y, *c)
+
+    def blit(self, fbuf, x, y, *args, w=None, h=None):
+        """framebuf blit(); pass w/h (or a (buffer, w, h, format) tuple) to damage only the sprite.
+
+        A source of unknown size damages the whole screen.
+        """
+        size = blit_size(fbuf, w, h)
+        if size is None:
+            self._damage.add_full()
+        else:
+            self._damage.add(x, y, size[0], size[1])
+        super().blit(fbuf, x, y, *args)
+
+    def scroll(self, xstep, ystep):
+        self._damage.add_full()
+        super().scroll(xstep, ystep)
+
+    def invalidate(self, x=0, y=0, w=None, h=None):
+        """Mark a region damaged after writing the raw buffer directly (default: whole screen)."""
+        self._damage.add(x, y, self.width if w is None else w, self.height if h is None else h)
@@ -0,0 +1,114 @@
+# Tear-effect (TE) synchronized frame pacing for the ST77916 panel
+# Shared driver helper; pure Python so it runs on the host with a fake clock.
+#
+# The panel pulses LCD_TE once per refresh when TE output is enabled (0x35).
+# Frames requested during a refresh period are coalesced and presented after the
+# next TE edge, so the transfer starts while the panel is in vertical blanking.
+# The TE IRQ only timestamps the edge; the frame itself is started by poll()
+# from the app loop, never from IRQ context in the middle of drawing.
+import time
+
+
+class FramePacer:
+    """Coalesces frame requests and starts at most one present per TE pulse.
+
+    present() starts a frame (non-blocking with DMA); busy() reports whether
+    the previous frame is still in flight. Wire on_te() to the TE pin's
+    rising-edge IRQ and call poll() from the app loop: it presents a pending
+    frame once an edge has been seen since the last poll(), or after
+    te_timeout_us if TE never fires, so the display never stalls. Poll at
+    least once per refresh to start frames inside the blanking interval.
+    """
+
+    def __init__(self, present, busy, te_timeout_us=50_000, ticks_us=None, ticks_diff=None):
+        self._present = present
+        self._busy = busy
+        self._te_timeout_us = te_timeout_us
+        self._ticks_us = ticks_us or time.ticks_us
+        self._ticks_diff = ticks_diff or time.ticks_diff
+
+        self._pending = False
+        self._requested_at = 0
+        self._last_te = None
+        self._te_edge = False
+        self._last_frame = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.frames = 0
+        self.vsyncs = 0
+        self.missed_vsyncs = 0
+        self.te_timeouts = 0
+        self._te_period_sum = 0
+        self._te_periods = 0
+        self._frame_time_sum = 0
+        self._frame_time_max = 0
+        self._frame_time_min = None
+        self._frame_times = 0
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def request(self):
+        """Ask for a frame at the next TE edge; repeated calls before it coalesce."""
+        self.requests += 1
+        if not self._pending:
+            self._pending = True
+            self._requested_at = self._ticks_us()
+
+    def on_te(self, _pin=None):
+        """TE pin IRQ handler: record the edge only."""
+        now = self._ticks_us()
+        if self._last_te is not None:
+            self._te_period_sum += self._ticks_diff(now, self._last_te)
+            self._te_periods += 1
+        self._last_te = now
+        self.vsyncs += 1
+        self._te_edge = True
+
+    def poll(self):
+        """Start the pending frame after a TE edge (or the TE timeout); call from the app loop."""
+        edge = self._te_edge
+        self._te_edge = False
+        if not self._pending:
+            return
+        if self._busy():
+            if edge:
+                # Previous frame still streaming: this refresh shows a stale frame.
+                self.missed_vsyncs += 1
+            return
+        now = self._ticks_us()
+        if edge:
+            self._fire(now)
+        elif self._ticks_diff(now, self._requested_at) >= self._te_timeout_us:
+            self.te_timeouts += 1
+            self._fire(now)
+
+    def _fire(self, now):
+        self._pending = False
+        if self._last_frame is not None:
+            dt = self._ticks_diff(now, self._last_frame)
+            self._frame_time_sum += dt
+            self._frame_times += 1
+            self._frame_time_max = max(self._frame_time_max, dt)
+            self._frame_time_min = dt if self._frame_time_min is None else min(self._frame_time_min, dt)
+        self._last_frame = now
+        self.frames += 1
+        self._present()
+
+    def stats(self):
+        """Counters plus average TE period and frame time in microseconds."""
+        return {
+            "requests": self.requests,
+            "frames": self.frames,
+            "coalesced": self.requests - self.frames - (1 if self._pending else 0),
+            "vsyncs": self.vsyncs,
+            "missed_vsyncs": self.missed_vsyncs,
+            "te_timeouts": self.te_timeouts,
+            "te_period_us": self._te_period_sum // self._te_periods if self._te_periods else 0,
+            "frame_time_avg_us": self._frame_time_sum // self._frame_times if self._frame_times else 0,
+            "frame_time_min_us": self._frame_time_min or 0,
+            "frame_time_max_us": self._frame_time_max,
+        }
@@ -0,0 +1,319 @@
+# HTTP/1.x requests and incremental response framing for the ESP-AT clients
+# Shared by lib/wifi_at.py and lib/wifi_at_async.py; pure Python, runs on the
+# host (tests/test_http_stream.py).
+#
+# split_url() and build_request() produce the request head; body_buffers()
+# walks a request body (bytes, a file or an iterable of pieces) without
+# copying or loading all of it, and request_sends() groups head and body into
+# the AT+CIPSEND pieces both clients send.
+#
+# Response bytes are fed as they arrive (+IPD payload slices included). The
+# status line and headers are parsed line by line, then the body is framed by
+# Content-Length, Transfer-Encoding: chunked, or the connection closing, so a
+# caller knows exactly when the response is complete and whether the link can
+# carry the next request.
+#
+# With a sink (a callable, or an object with write() such as a file) body
+# bytes are handed over as they arrive instead of being kept, so memory use
+# does not grow with the body. The pieces may be memoryview slices of the
+# caller's buffer; they are only valid during the call.
+
+_HEAD = 0
+_LENGTH = 1
+_CHUNK_SIZE = 2
+_CHUNK_DATA = 3
+_CHUNK_END = 4
+_TRAILER = 5
+_UNTIL_CLOSE = 6
+_DONE = 7
+
+# Bytes scanned per step while looking for the end of a line.
+_SCAN = 256
+
+# ESP-AT accepts at most this many bytes per AT+CIPSEND.
+SEND_MAX = 8192
+
+# Room kept per send for chunked framing: "<size hex>\r\n" ... "\r\n".
+_CHUNK_FRAME = 8
+
+
+def split_url(url):
+    """Return (host, port, path) of an http:// URL."""
+    if url.startswith("http://"):
+        url = url[7:]
+    elif url.startswith("https://"):
+        url = url[8:]
+
+    if "/" in url:
+        host, path = url.split("/", 1)
+        path = "/" + path
+    else:
+        host = url
+        path = "/"
+
+    port = 80
+    if ":" in host:
+        host, port_text = host.rsplit(":", 1)
+        port = int(port_text)
+    return host, port, path
+
+
+def build_request(method, host, path, keep_alive=False, headers=None, extra=""):
+    """Request line and headers (ending in the blank line) as a str."""
+    request = method + " " + path + " HTTP/1.1\r\n"
+    request += "Host: " + host + "\r\n"
+    request += extra
+    request += "Connection: keep-alive\r\n" if keep_alive else "Connection: close\r\n"
+    if headers:
+        for k, v in headers.items():
+            request += "{}: {}\r\n".format(k, v)
+    request += "\r\n"
+    return request
+
+
+def post_headers(content_type, length):
+    """Content-Type and Content-Length lines of a POST; Transfer-Encoding: chunked if length is None."""
+    extra = "Content-Type: {}\r\n".format(content_type)
+    if length is None:
+        return extra + "Transfer-Encoding: chunked\r\n"
+    return extra + "Content-Length: {}\r\n".format(length)
+
+
+def body_length(data):
+    """Length of a bytes-like request body; None for a file or an iterable of pieces."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    return None
+
+
+def body_buffers(data, size=4096):
+    """Yield a request body as buffers.
+
+    A bytes-like body is yielded once as a memoryview. A file is read size
+    bytes at a time, with readinto() into one reused buffer when it has it,
+    so each buffer is only valid until the next one is requested. Any other
+    iterable is taken to yield bytes-like pieces.
+    """
+    if body_length(data) is not None:
+        yield memoryview(data)
+    elif hasattr(data, "readinto"):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        while True:
+            n = data.readinto(buf)
+            if not n:
+                return
+            yield view[:n]
+    elif hasattr(data, "read"):
+        while True:
+            piece = data.read(size)
+            if not piece:
+                return
+            yield piece
+    else:
+        for piece in data:
+            yield piece
+
+
+def request_sends(head, body, chunked=False, size=SEND_MAX):
+    """Yield the request as buffer lists of at most size bytes, one per send.
+
+    A bytes-like body is sliced, not copied, and shares the first send with
+    the head. A file or iterable body is read one buffer at a time and each
+    buffer is sent before the next is read, so memory use does not grow with
+    the body; its head goes alone, so a refused first send has consumed none
+    of it. With chunked each piece is framed as an HTTP chunk.
+    """
+    parts = [head]
+    total = len(head)
+    if body is None:
+        yield parts
+        return
+    replayable = body_length(body) is not None
+    if not replayable:
+        yield parts
+        parts = []
+        total = 0
+    frame = _CHUNK_FRAME if chunked else 0
+    for buf in body_buffers(body, size - frame):
+        view = memoryview(buf)
+        while len(view):
+            room = size - total - frame
+            if room <= 0:
+                yield parts
+                parts = []
+                total = 0
+                continue
+            piece = view[:room]
+            view = view[room:]
+            if chunked:
+                chunk_head = "{:x}\r\n".format(len(piece)).encode()
+                parts += [chunk_head, piece, b"\r\n"]
+                total += len(chunk_head) + len(piece) + 2
+            else:
+                parts.append(piece)
+                total += len(piece)
+        if parts and not replayable:
+            yield parts
+            parts = []
+            total = 0
+    if chunked:
+        if total + 5 > size:
+            yield parts
+            parts = []
+        parts.append(b"0\r\n\r\n")
+    if parts:
+        yield parts
+
+
+class HTTPResponse:
+    """One HTTP response, assembled from feed() calls."""
+
+    def __init__(self, head_request=False, max_line=1024, sink=None):
+        self.version = None
+        self.status = 0
+        self.reason = ""
+        self.headers = {}
+        self.keep_alive = False
+        self.body_bytes = 0
+        self._head_request = head_request
+        self._max_line = max_line
+        self._line = bytearray()
+        self._state = _HEAD
+        self._remaining = 0
+        self._body = []
+        if sink is not None and hasattr(sink, "write"):
+            sink = sink.write
+        self._sink = sink
+
+    @property
+    def complete(self):
+        return self._state == _DONE
+
+    @property
+    def headers_done(self):
+        return self._state != _HEAD
+
+    @property
+    def body(self):
+        """The body received so far (empty when a sink takes it)."""
+        return b"".join(self._body)
+
+    def feed(self, data):
+        """Consume response bytes; returns how many belong to this response.
+
+        Raises ValueError on a malformed status line, header or chunk size.
+        """
+        n = len(data)
+        i = 0
+        while i < n and self._state != _DONE:
+            state = self._state
+            if state == _LENGTH or state == _CHUNK_DATA:
+                take = min(self._remaining, n - i)
+                self._deliver(data[i:i + take])
+                i += take
+                self._remaining -= take
+                if not self._remaining:
+                    if state == _LENGTH:
+                        self._state = _DONE
+                    else:
+                        self._state = _CHUNK_END
+                        self._remaining = 2
+            elif state == _CHUNK_END:
+                # CRLF after the chunk data.
+                take = min(self._remaining, n - i)
+                i += take
+                self._remaining -= take
+                if not self._remaining:
+                    self._state = _CHUNK_SIZE
+            elif state == _UNTIL_CLOSE:
+                self._deliver(data[i:n])
+                i = n
+            else:
+                i = self._feed_line(data, i, n)
+        return i
+
+    def finish(self):
+        """Mark the connection closed; returns True if the response is complete."""
+        if self._state == _UNTIL_CLOSE:
+            self._state = _DONE
+        return self._state == _DONE
+
+    def _deliver(self, piece):
+        self.body_bytes += len(piece)
+        if self._sink is not None:
+            self._sink(piece)
+        else:
+            self._body.append(bytes(piece))
+
+    def _feed_line(self, data, i, n):
+        segment = bytes(data[i:min(n, i + _SCAN)])
+        nl = segment.find(b"\n")
+        if nl < 0:
+            self._line.extend(segment)
+            if len(self._line) > self._max_line:
+                raise ValueError("HTTP line too long")
+            return i + len(segment)
+        self._line.extend(segment[:nl])
+        line = bytes(self._line).rstrip(b"\r")
+        self._line = bytearray()
+        self._on_line(line)
+        return i + nl + 1
+
+    def _on_line(self, line):
+        state = self._state
+        if state == _CHUNK_SIZE:
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise ValueError("bad chunk size")
+            if size:
+                self._state = _CHUNK_DATA
+                self._remaining = size
+            else:
+                self._state = _TRAILER
+        elif state == _TRAILER:
+            if not line:
+                self._state = _DONE
+        elif self.version is None:
+            parts = line.split(None, 2)
+            if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+                raise ValueError("bad status line")
+            self.version = parts[0].decode()
+            self.status = int(parts[1])
+            self.reason = parts[2].decode() if len(parts) > 2 else ""
+        elif line:
+            name, sep, value = line.partition(b":")
+            if not sep:
+                raise ValueError("bad header line")
+            name = name.strip().lower().decode()
+            value = value.strip().decode()
+            if name in self.headers:
+                value = self.headers[name] + ", " + value
+            self.headers[name] = value
+        else:
+            self._end_head()
+
+    def _end_head(self):
+        headers = self.headers
+        if 100 <= self.status < 200:
+            # Interim response (100 Continue): the real one follows.
+            self.version = None
+            self.status = 0
+            self.headers = {}
+            return
+        connection = headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            self.keep_alive = "keep-alive" in connection
+        else:
+            self.keep_alive = "close" not in connection
+        if self._head_request or self.status in (204, 304):
+            self._state = _DONE
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            self._state = _CHUNK_SIZE
+        elif "content-length" in headers:
+            self._remaining = int(headers["content-length"])
+            self._state = _LENGTH if self._remaining else _DONE
+        else:
+            self._state = _UNTIL_CLOSE
+            self.keep_alive = False
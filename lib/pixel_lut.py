@@ -0,0 +1,133 @@
+# Indexed / low-bit-depth framebuffer expansion for the ST77916 QSPI path
+# Shared by lib/st77916.py and firmware/drivers/display.py.
+#
+# GS8 and GS4 framebuffers hold palette indices (a gray ramp by default). While
+# streaming, each index is looked up in a table of already nibble-packed
+# RGB565 words, so expansion and packing are a single lookup per pixel and the
+# panel receives exactly the words an RGB565 framebuffer of those colours
+# would produce (see lib/qspi_pack.py).
+#
+# 360x360 framebuffer sizes: rgb565 259,200 B, gs8 129,600 B, gs4 64,800 B.
+import sys
+from array import array
+
+from qspi_pack import SWAP, pack_nibbles
+
+if sys.implementation.name == "micropython":
+    import micropython
+
+# Bits per pixel of each supported colour mode.
+MODES = {"rgb565": 16, "gs8": 8, "gs4": 4}
+
+
+def packed_word(color):
+    """FIFO word for one RGB565 colour as stored in an RGB565 framebuffer."""
+    return SWAP[color & 0xFF] | (SWAP[(color >> 8) & 0xFF] << 8)
+
+
+def rgb565(r, g, b):
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+
+def gray_ramp(levels):
+    """RGB565 colours of an even black-to-white ramp with `levels` steps."""
+    top = levels - 1
+    return [rgb565(v, v, v) for v in (i * 255 // top for i in range(levels))]
+
+
+def expand_gs8_py(src, dst, lut):
+    """Expand GS8 indices in src into packed words in dst; return the word count."""
+    n = len(src)
+    for i in range(n):
+        dst[i] = lut[src[i]]
+    return n
+
+
+def expand_gs4_py(src, dst, lut):
+    """Expand GS4_HMSB bytes (first pixel in the high nibble) into packed words."""
+    j = 0
+    for b in src:
+        dst[j] = lut[b >> 4]
+        dst[j + 1] = lut[b & 0x0F]
+        j += 2
+    return j
+
+
+expand_gs8 = expand_gs8_py
+expand_gs4 = expand_gs4_py
+
+if sys.implementation.name == "micropython":
+    @micropython.viper
+    def _expand_gs8_viper(src: ptr8, dst: ptr16, lut: ptr16, n: int) -> int:
+        i = 0
+        while i < n:
+            dst[i] = lut[src[i]]
+            i += 1
+        return n
+
+    @micropython.viper
+    def _expand_gs4_viper(src: ptr8, dst: ptr16, lut: ptr16, n: int) -> int:
+        i = 0
+        j = 0
+        while i < n:
+            b = src[i]
+            dst[j] = lut[b >> 4]
+            dst[j + 1] = lut[b & 0x0F]
+            i += 1
+            j += 2
+        return j
+
+    def expand_gs8(src, dst, lut):
+        return _expand_gs8_viper(src, dst, lut, len(src))
+
+    def expand_gs4(src, dst, lut):
+        return _expand_gs4_viper(src, dst, lut, len(src))
+
+
+class PixelFormat:
+    """Framebuffer colour mode plus the pack function that turns it into FIFO words.
+
+    pack(src, dst) has the pack_nibbles signature, so the PIO stream and DMA
+    presenter treat every mode alike. For gs8/gs4, set_palette() replaces the
+    default gray ramp with arbitrary RGB565 colours (256 / 16 entries).
+    """
+
+    def __init__(self, mode="rgb565", palette=None):
+        if mode not in MODES:
+            raise ValueError("mode must be one of " + ", ".join(sorted(MODES)))
+        self.mode = mode
+        self.bits_per_pixel = MODES[mode]
+        self.lut = None
+        if mode == "rgb565":
+            if palette is not None:
+                raise ValueError("rgb565 mode has no palette")
+            self.pack = pack_nibbles
+            return
+        self.lut = array("H", [0] * (1 << self.bits_per_pixel))
+        self.set_palette(palette or gray_ramp(len(self.lut)))
+        expand = expand_gs8 if mode == "gs8" else expand_gs4
+        lut = self.lut
+        self.pack = lambda src, dst: expand(src, dst, lut)
+
+    def set_palette(self, colors, start=0):
+        """Load RGB565 colours into the lookup table from index `start`."""
+        if self.lut is None:
+            raise ValueError("rgb565 mode has no palette")
+        if start < 0 or start + len(colors) > len(self.lut):
+            raise ValueError("palette has at most {} entries".format(len(self.lut)))
+        for i, color in enumerate(colors):
+            self.lut[start + i] = packed_word(color)
+
+    def buffer_size(self, width, height):
+        return self.row_bytes(width) * height
+
+    def row_bytes(self, width):
+        return (width * self.bits_per_pixel + 7) // 8
+
+    def align(self, x, y, w, h, width):
+        """Widen window (x, y, w, h) to whole bytes per row (gs4: even columns)."""
+        if self.bits_per_pixel != 4:
+            return x, y, w, h
+        x1 = min(width, (x + w + 1) & ~1)
+        x &= ~1
+        return x, y, x1 - x, h
@@ -0,0 +1,230 @@
+# DMA-fed, non-blocking pixel presentation for the ST77916 QSPI PIO path
+# Shared driver helper; the state machine, DMA channel and window callbacks are
+# injected so the sequencing runs on the host against fakes (tests/test_qspi_dma.py).
+#
+# Pixels are packed (lib/qspi_pack.py) into one of two ping-pong word buffers
+# while DMA streams the other one into the PIO TX FIFO. Halfword DMA writes are
+# replicated across the 32-bit FIFO entry and the PIO only consumes the low 16
+# bits, so the packed array('H') words go out unchanged.
+from array import array
+
+from qspi_pack import CHUNK_WORDS, pack_nibbles
+
+# RP2040/RP2350 PIO TX FIFO addresses and DREQs, indexed by PIO block.
+PIO_BASES = (0x5020_0000, 0x5030_0000, 0x5040_0000)
+PIO_TXF0_OFFSET = 0x010
+PIO_DREQ_TX0 = (0, 8, 16)
+DMA_SIZE_HALFWORD = 1
+
+
+def pio_tx_fifo(sm_id):
+    """Return (TX FIFO address, DREQ number) for global state machine id sm_id."""
+    block, index = divmod(sm_id, 4)
+    return PIO_BASES[block] + PIO_TXF0_OFFSET + 4 * index, PIO_DREQ_TX0[block] + index
+
+
+class PresentHandle:
+    """Completion handle for one presented frame."""
+
+    def __init__(self):
+        self.done = False
+        self._callbacks = []
+
+    def then(self, callback):
+        """Call callback(handle) once the frame is on the panel."""
+        if self.done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+        return self
+
+    def _complete(self):
+        self.done = True
+        callbacks = self._callbacks
+        self._callbacks = []
+        for callback in callbacks:
+            callback(self)
+
+
+class DmaPresenter:
+    """Streams framebuffer windows to the QSPI state machine through DMA.
+
+    prepare() is called when a frame actually starts and returns
+    (source_buffer, windows); windows are (x, y, w, h) rectangles of a buffer
+    with the given row stride in bytes. Each pixel becomes one FIFO word and a
+    full row must fit in one word buffer. Indexed framebuffers pass the pack
+    function and bits_per_pixel of a lib/pixel_lut.py PixelFormat.
+    begin_window(x, y, w, h) must open the panel window and leave CS asserted;
+    end_window() releases it.
+
+    Requests made while a frame is in flight coalesce into a single next frame.
+
+    The DMA IRQ only chains the in-flight frame's remaining chunks and windows.
+    Finishing a frame (callbacks) and starting the next one (prepare(), which
+    takes the damage and may copy the framebuffer) happen in poll(), request()
+    or wait(), so they never interleave with drawing code in the app loop.
+    """
+
+    def __init__(self, sm, dma, fifo_addr, dreq, stride, prepare, begin_window, end_window,
+                 chunk_words=CHUNK_WORDS, pack=None, bits_per_pixel=16):
+        self._sm = sm
+        self._dma = dma
+        self._fifo = fifo_addr
+        self._chunk_words = chunk_words
+        self.set_format(stride, pack or pack_nibbles, bits_per_pixel)
+        self._prepare = prepare
+        self._begin_window = begin_window
+        self._end_window = end_window
+        self._ctrl = dma.pack_ctrl(size=DMA_SIZE_HALFWORD, inc_write=False, treq_sel=dreq, irq_quiet=False)
+
+        self._bufs = (array("H", [0] * chunk_words), array("H", [0] * chunk_words))
+        self._bufs_mv = (memoryview(self._bufs[0]), memoryview(self._bufs[1]))
+        self._free = 0
+
+        self._job = None
+        self._queued = None
+        self._src = None
+        self._chunks = None
+        self._staged = None
+        self._window_open = False
+        self._polling = False
+
+        # Keep the in-flight frame streaming between app-loop polls.
+        dma.irq(handler=self._on_dma_irq, hard=False)
+
+    def set_format(self, stride, pack, bits_per_pixel):
+        """Switch the source layout; only call while not busy."""
+        if self._chunk_words * bits_per_pixel < stride * 8:
+            raise ValueError("chunk_words must hold one full row")
+        self._stride = stride
+        self._pack = pack
+        self._bits_per_pixel = bits_per_pixel
+
+    @property
+    def busy(self):
+        return self._job is not None or self._queued is not None
+
+    def request(self, callback=None):
+        """Queue a frame and return its PresentHandle; never blocks on the transfer."""
+        if self._queued is None:
+            self._queued = PresentHandle()
+        handle = self._queued
+        if callback is not None:
+            handle.then(callback)
+        self.poll()
+        return handle
+
+    def wait(self, handle):
+        while not handle.done:
+            self.poll()
+
+    def close(self):
+        self._dma.irq(handler=None)
+        self._dma.close()
+
+    def _on_dma_irq(self, _dma):
+        # Soft IRQ context: runs between any two bytecodes of the app loop.
+        self._advance(False)
+
+    def poll(self):
+        """Advance the transfer; returns True while a frame is in flight or queued."""
+        return self._advance(True)
+
+    def _advance(self, from_loop):
+        if self._polling:
+            return self.busy
+        self._polling = True
+        try:
+            while not self._dma.active():
+                if self._staged is not None:
+                    self._start_staged()
+                    self._stage_next()
+                    continue
+                if not from_loop:
+                    break
+                if self._job is not None:
+                    self._finish_job()
+                if self._queued is None:
+                    break
+                self._start_job()
+        finally:
+            self._polling = False
+        return self.busy
+
+    def _start_job(self):
+        self._job = self._queued
+        self._queued = None
+        src, windows = self._prepare()
+        self._src = memoryview(src)
+        self._chunks = self._iter_chunks(windows)
+        self._stage_next()
+
+    def _finish_job(self):
+        self._drain()
+        if self._window_open:
+            self._end_window()
+            self._window_open = False
+        job = self._job
+        self._job = None
+        self._src = None
+        self._chunks = None
+        job._complete()
+
+    def _drain(self):
+        # DMA completion only means the FIFO has the last words; wait for the PIO to take them.
+        while self._sm.tx_fifo():
+            pass
+
+    def _start_staged(self):
+        index, count, window = self._staged
+        self._staged = None
+        if window is not None:
+            self._drain()
+            if self._window_open:
+                self._end_window()
+            self._begin_window(*window)
+            self._window_open = True
+        self._dma.config(read=self._bufs[index], write=self._fifo, count=count, ctrl=self._ctrl, trigger=True)
+        self._free = 1 - index
+
+    def _stage_next(self):
+        """Pack the next chunk into the buffer the DMA is not reading."""
+        if self._chunks is None:
+            return
+        try:
+            window, offset, row_bytes, rows = next(self._chunks)
+        except StopIteration:
+            self._chunks = None
+            return
+        index = self._free
+        dst = self._bufs_mv[index]
+        stride = self._stride
+        src = self._src
+        pack = self._pack
+        words = 0
+        for _ in range(rows):
+            words += pack(src[offset:offset + row_bytes], dst[words:])
+            offset += stride
+        self._staged = (index, words, window)
+
+    def _iter_chunks(self, windows):
+        """Yield (window or None, offset, span_bytes, rows) per word buffer.
+
+        The window is only given for the first chunk of each rectangle.
+        """
+        stride = self._stride
+        bpp = self._bits_per_pixel
+        for x, y, w, h in windows:
+            row_bytes = w * bpp // 8
+            per_chunk = self._chunk_words // w
+            offset = y * stride + x * bpp // 8
+            window = (x, y, w, h)
+            for r in range(0, h, per_chunk):
+                rows = min(per_chunk, h - r)
+                if row_bytes == stride:
+                    # Full-width rows are contiguous: pack them as one span.
+                    yield window, offset, rows * row_bytes, 1
+                else:
+                    yield window, offset, row_bytes, rows
+                offset += rows * stride
+                window = None
@@ -0,0 +1,84 @@
+# Nibble packing for the ST77916 QSPI PIO path
+# Shared by lib/st77916.py and firmware/drivers/display.py.
+#
+# The PIO program shifts each FIFO word out LSB-first, 4 bits per clock, so the
+# high nibble of every byte has to sit below its low nibble. Two payload bytes
+# become one 16-bit word:
+#   word = hi(b1) | lo(b1) << 4 | hi(b2) << 8 | lo(b2) << 12
+# A trailing odd byte becomes hi(b) | lo(b) << 4.
+import sys
+from array import array
+
+if sys.implementation.name == "micropython":
+    import micropython
+
+# Byte with its two nibbles swapped, indexed by byte value.
+SWAP = bytes(((b >> 4) | ((b & 0x0F) << 4)) for b in range(256))
+
+CHUNK_WORDS = 1024
+
+
+def pack_nibbles_py(src, dst):
+    """Pack src bytes into dst (array of >= 16-bit words); return the word count."""
+    swap = SWAP
+    n = len(src)
+    j = 0
+    for i in range(0, n - 1, 2):
+        dst[j] = swap[src[i]] | (swap[src[i + 1]] << 8)
+        j += 1
+    if n & 1:
+        dst[j] = swap[src[n - 1]]
+        j += 1
+    return j
+
+
+pack_nibbles = pack_nibbles_py
+
+if sys.implementation.name == "micropython":
+    @micropython.viper
+    def _pack_nibbles_viper(src: ptr8, dst: ptr16, n: int) -> int:
+        i = 0
+        j = 0
+        while i + 1 < n:
+            b1 = src[i]
+            b2 = src[i + 1]
+            dst[j] = ((b1 >> 4) | ((b1 & 0x0F) << 4)) | (((b2 >> 4) | ((b2 & 0x0F) << 4)) << 8)
+            i += 2
+            j += 1
+        if i < n:
+            b1 = src[i]
+            dst[j] = (b1 >> 4) | ((b1 & 0x0F) << 4)
+            j += 1
+        return j
+
+    def pack_nibbles(src, dst):
+        """Viper kernel with the same output as pack_nibbles_py; dst must be an array('H')."""
+        return _pack_nibbles_viper(src, dst, len(src))
+
+
+class NibbleStream:
+    """Packs byte payloads into a reusable word buffer and puts it to a PIO state machine in bulk.
+
+    Every pixel becomes one FIFO word. For indexed framebuffers pass the
+    pack function and bits_per_pixel of a lib/pixel_lut.py PixelFormat.
+    """
+
+    def __init__(self, sm, chunk_words=CHUNK_WORDS, pack=None, bits_per_pixel=16):
+        self._sm = sm
+        self._words = array("H", [0] * chunk_words)
+        self._words_mv = memoryview(self._words)
+        self._chunk_words = chunk_words
+        self.set_format(pack or pack_nibbles, bits_per_pixel)
+
+    def set_format(self, pack, bits_per_pixel):
+        self._pack = pack
+        self._chunk_bytes = self._chunk_words * bits_per_pixel // 8
+
+    def write(self, payload):
+        src = memoryview(payload)
+        words_mv = self._words_mv
+        pack = self._pack
+        step = self._chunk_bytes
+        for start in range(0, len(src), step):
+            n = pack(src[start:start + step], self._words)
+            self._sm.put(words_mv[:n])
@@ -0,0 +1,89 @@
+# Visible-area mask for the round 360x360 ST77916 panel
+# Shared by lib/st77916.py and firmware/drivers/display.py.
+# Pure Python: no machine/rp2 imports so it also runs on the host.
+import math
+from array import array
+
+
+def visible_spans(width, height):
+    """Per-row [x0, x1) spans of pixels touched by the inscribed circle.
+
+    Returned as a flat array('H') of x0, x1 pairs, one pair per row. Spans are
+    conservative: any pixel the circle edge crosses counts as visible.
+    """
+    cx = width / 2
+    cy = height / 2
+    r = min(width, height) / 2
+    spans = array("H", [0] * (2 * height))
+    for y in range(height):
+        # Distance from the centre to the nearest edge of this pixel row.
+        if y + 1 <= cy:
+            dy = cy - (y + 1)
+        elif y >= cy:
+            dy = y - cy
+        else:
+            dy = 0
+        if dy >= r:
+            continue
+        half = math.sqrt(r * r - dy * dy)
+        spans[2 * y] = max(0, int(math.floor(cx - half)))
+        spans[2 * y + 1] = min(width, int(math.ceil(cx + half)))
+    return spans
+
+
+class RoundMask:
+    """Clips transfer windows to the visible part of a round panel.
+
+    Rows are grouped into bands of band_rows; each band is sent as one window
+    spanning the widest row in it, trading a few hidden pixels for fewer
+    set_window round-trips. band_rows=1 sends exact per-row spans.
+    """
+
+    def __init__(self, width, height, band_rows=8):
+        self.width = width
+        self.height = height
+        self.band_rows = max(1, band_rows)
+        spans = visible_spans(width, height)
+        bands = []
+        for y0 in range(0, height, self.band_rows):
+            y1 = min(y0 + self.band_rows, height)
+            x0 = width
+            x1 = 0
+            for y in range(y0, y1):
+                if spans[2 * y + 1] > spans[2 * y]:
+                    x0 = min(x0, spans[2 * y])
+                    x1 = max(x1, spans[2 * y + 1])
+            if x1 > x0:
+                bands.append((y0, y1, x0, x1))
+        self.bands = bands
+
+    def visible_pixels(self):
+        return sum((y1 - y0) * (x1 - x0) for y0, y1, x0, x1 in self.bands)
+
+    def clip(self, x, y, w, h):
+        """Split rect (x, y, w, h) into windows covering only its visible part.
+
+        Vertically adjacent bands that clip to the same columns are coalesced
+        into a single window.
+        """
+        rx1 = x + w
+        ry1 = y + h
+        out = []
+        for by0, by1, bx0, bx1 in self.bands:
+            if by1 <= y:
+                continue
+            if by0 >= ry1:
+                break
+            wx0 = max(x, bx0)
+            wx1 = min(rx1, bx1)
+            if wx0 >= wx1:
+                continue
+            wy0 = max(y, by0)
+            wy1 = min(ry1, by1)
+            if out:
+                px, py, pw, ph = out[-1]
+                if px == wx0 and pw == wx1 - wx0 and py + ph == wy0:
+                    out[-1] = (px, py, pw, ph + wy1 - wy0)
+                    continue
+            out.append((wx0, wy0, wx1 - wx0, wy1 - wy0))
+        return out
@@ -5,8 +5,16 @@
 import machine
 import time
 import framebuf
+import gc
 from rp2 import PIO, StateMachine, asm_pio
 
+from band_render import SURFACE_METHODS, BandRenderer
+from damage import DamageMixin, DamageTracker
+from pixel_lut import PixelFormat
+from qspi_pack import NibbleStream
+from round_mask import RoundMask
+from st77916_init import init_stream, run_init
+
 # Pin configuration from Waveshare demo
 LCD_SCLK = 10
 LCD_D0   = 11
@@ -18,18 +26,32 @@ LCD_RST  = 16
 LCD_TE   = 17
 LCD_BL   = 24
 
-# QSPI PIO program - outputs 4 bits at a time
+# QSPI PIO program - outputs 4 bits at a time, two packed bytes per FIFO word (lib/qspi_pack.py)
 @asm_pio(sideset_init=PIO.OUT_LOW, out_init=(PIO.OUT_LOW, PIO.OUT_LOW, PIO.OUT_LOW, PIO.OUT_LOW),
-         out_shiftdir=PIO.SHIFT_RIGHT, autopull=True, pull_thresh=8)
+         out_shiftdir=PIO.SHIFT_RIGHT, autopull=True, pull_thresh=16)
 def qspi_prog():
     # Toggle SCLK using sideset while shifting 4-bit nibbles on D0..D3.
     out(pins, 4).side(0)  [1]  # Clock low, output nibble
     nop().side(1)         [1]  # Clock high
 
-class ST77916(framebuf.FrameBuffer):
+# Command phase PIO program - 1 bit per clock on D0, MSB first (bytes put shifted left by 24)
+@asm_pio(sideset_init=PIO.OUT_LOW, out_init=PIO.OUT_LOW,
+         out_shiftdir=PIO.SHIFT_LEFT, autopull=True, pull_thresh=8)
+def qspi_cmd_prog():
+    out(pins, 1).side(0)  [1]  # Clock low, output bit
+    nop().side(1)         [1]  # Clock high
+
+FB_FORMATS = {"rgb565": framebuf.RGB565, "gs8": framebuf.GS8, "gs4": framebuf.GS4_HMSB}
+
+# One RGB565 pixel, held by the FrameBuffer base while set_color_mode() swaps buffers
+_PLACEHOLDER = bytearray(2)
+
+
+class ST77916(DamageMixin, framebuf.FrameBuffer):
     """ST77916 360x360 round display with QSPI interface"""
 
-    def __init__(self):
+    def __init__(self, mask_band_rows=0, command_mode="pio", profiler=None, color_mode="rgb565", palette=None,
+                 band_rows=0, band_redraw=None):
         self.width = 360
         self.height = 360
 
@@ -52,10 +74,44 @@ class ST77916(framebuf.FrameBuffer):
                               sideset_base=machine.Pin(LCD_SCLK),
                               out_base=machine.Pin(LCD_D0))
         self.sm.active(1)
+        self._pixels = NibbleStream(self.sm)
 
-        # Framebuffer (RGB565)
-        self.buffer = bytearray(self.width * self.height * 2)
-        super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
+        # Command phase on a second state machine sharing SCLK/D0 ("bitbang" = legacy GPIO path)
+        self.cmd_sm = None
+        if command_mode == "pio":
+            self.cmd_sm = StateMachine(1, qspi_cmd_prog,
+                                       freq=80_000_000,
+                                       sideset_base=machine.Pin(LCD_SCLK),
+                                       out_base=machine.Pin(LCD_D0))
+            self.cmd_sm.active(1)
+        elif command_mode != "bitbang":
+            raise ValueError("command_mode must be 'pio' or 'bitbang'")
+        self._cmd_header = bytearray([0x02, 0x00, 0x00, 0x00])
+
+        # Framebuffer: RGB565, or gs8/gs4 palette indices expanded while streaming (lib/pixel_lut.py)
+        # band_rows > 0: only one band of that many rows is allocated (lib/band_render.py);
+        # band_redraw() redraws the whole screen if the display list outgrows its cap
+        self._format = PixelFormat(color_mode, palette)
+        buffer_rows = band_rows or self.height
+        self.buffer = bytearray(self._format.buffer_size(self.width, buffer_rows))
+        super().__init__(self.buffer, self.width, buffer_rows, FB_FORMATS[color_mode])
+        self._pixels.set_format(self._format.pack, self._format.bits_per_pixel)
+
+        # Damaged regions since the last show(); panel RAM is undefined after reset
+        self._damage = DamageTracker(self.width, self.height)
+        self._damage.add_full()
+
+        # Round-panel mask: only stream pixels inside the circle (0 = full square)
+        self._mask = RoundMask(self.width, self.height, mask_band_rows) if mask_band_rows > 0 else None
+
+        # Band mode: drawing calls are recorded and replayed into the band buffer on show()
+        self._bands = None
+        if band_rows:
+            band = framebuf.FrameBuffer(self.buffer, self.width, band_rows, FB_FORMATS[color_mode])
+            self._bands = BandRenderer(band, self.width, self.height, band_rows, self._write_band,
+                                       redraw=band_redraw)
+            for name in SURFACE_METHODS:
+                setattr(self, name, getattr(self._bands, name))
 
         # Colors
         self.RED = 0xF800
@@ -68,24 +124,39 @@ class ST77916(framebuf.FrameBuffer):
         self.YELLOW = 0xFFE0
 
         # Initialize display
-        self._init_display()
+        self._init_display(profiler)
         self.bl(1)  # Turn on backlight
 
+    def _wait_idle(self, sm):
+        """Wait until sm has shifted out everything queued (FIFO empty + last OSR word)"""
+        while sm.tx_fifo():
+            pass
+        time.sleep_us(1)
+
     def _write_cmd(self, cmd, data=None, delay=0, keep_cs=False):
         """Write command and optional data"""
         self.cs(0)
 
         # Command phase (1-bit mode): 0x02, 0x00, cmd, 0x00
-        cmd_bytes = bytes([0x02, 0x00, cmd, 0x00])
+        cmd_bytes = self._cmd_header
+        cmd_bytes[2] = cmd
 
-        # Use regular GPIO for command phase
-        for b in cmd_bytes:
-            self._write_byte_1bit(b)
-
-        # Data phase if needed
-        if data:
-            for b in data:
+        if self.cmd_sm is not None:
+            self.cmd_sm.put(cmd_bytes, 24)
+            if data:
+                self.cmd_sm.put(data, 24)
+            self._wait_idle(self.cmd_sm)
+        else:
+            # SCLK/D0 are muxed to PIO0 for the pixel stream: bit-bang them as GPIOs, then hand them back
+            self.sclk.init(machine.Pin.OUT)
+            self.d0.init(machine.Pin.OUT)
+            for b in cmd_bytes:
                 self._write_byte_1bit(b)
+            if data:
+                for b in data:
+                    self._write_byte_1bit(b)
+            self.sclk.init(machine.Pin.ALT, alt=machine.Pin.ALT_PIO0)
+            self.d0.init(machine.Pin.ALT, alt=machine.Pin.ALT_PIO0)
 
         if not keep_cs:
             self.cs(1)
@@ -103,85 +174,26 @@ class ST77916(framebuf.FrameBuffer):
             self.sclk(1)
 
     def _write_bytes_4bit(self, data):
-        """Write bytes using QSPI 4-bit mode"""
-        # Pack nibbles for 4-bit transfer
-        for i in range(0, len(data), 2):
-            if i + 1 < len(data):
-                # Two bytes become 4 nibbles
-                byte1 = data[i]
-                byte2 = data[i+1]
-                # Pack: high nibble of byte1, low nibble of byte1, etc.
-                word = ((byte1 >> 4) & 0xF) | ((byte1 & 0xF) << 4) | ((byte2 >> 4) & 0xF) << 8 | ((byte2 & 0xF) << 12)
-                self.sm.put(word)
-            else:
-                # Last byte
-                byte1 = data[i]
-                word = ((byte1 >> 4) & 0xF) | ((byte1 & 0xF) << 4)
-                self.sm.put(word)
-
-    def _init_display(self):
-        """Initialize ST77916 display"""
-        # Reset
+        """Write bytes using QSPI 4-bit mode (bulk-packed, see lib/qspi_pack.py)"""
+        self._pixels.write(data)
+
+    def _init_display(self, profiler=None):
+        """Initialize ST77916 display (Waveshare BSP sequence from lib/st77916_init.py)"""
+        if profiler is None:
+            self._reset()
+            run_init(init_stream(), self._write_cmd, time.sleep_ms)
+            return
+        with profiler.phase("reset"):
+            self._reset()
+        with profiler.phase("init stream"):
+            run_init(init_stream(), self._write_cmd, time.sleep_ms)
+
+    def _reset(self):
         self.rst(0)
         time.sleep_ms(100)
         self.rst(1)
         time.sleep_ms(100)
 
-        # Init sequence from Waveshare demo
-        init_cmds = [
-            (0xF0, [0x28], 0),
-            (0xF2, [0x28], 0),
-            (0x73, [0xF0], 0),
-            (0x7C, [0xD1], 0),
-            (0x83, [0xE0], 0),
-            (0x84, [0x61], 0),
-            (0xF2, [0x82], 0),
-            (0xF0, [0x00], 0),
-            (0xF0, [0x01], 0),
-            (0xF1, [0x01], 0),
-            (0xB0, [0x56], 0),
-            (0xB1, [0x4D], 0),
-            (0xB2, [0x24], 0),
-            (0xB4, [0x87], 0),
-            (0xB5, [0x44], 0),
-            (0xB6, [0x8B], 0),
-            (0xB7, [0x40], 0),
-            (0xB8, [0x86], 0),
-            (0xBA, [0x00], 0),
-            (0xBB, [0x08], 0),
-            (0xBC, [0x08], 0),
-            (0xBD, [0x00], 0),
-            (0xC0, [0x80], 0),
-            (0xC1, [0x10], 0),
-            (0xC2, [0x37], 0),
-            (0xC3, [0x80], 0),
-            (0xC4, [0x10], 0),
-            (0xC5, [0x37], 0),
-            (0xC6, [0xA9], 0),
-            (0xC7, [0x41], 0),
-            (0xC8, [0x01], 0),
-            (0xC9, [0xA9], 0),
-            (0xCA, [0x41], 0),
-            (0xCB, [0x01], 0),
-            (0xD0, [0x91], 0),
-            (0xD1, [0x08], 0),
-            (0xD2, [0x88], 0),
-            (0xD3, [0x88], 0),
-            (0xD4, [0x88], 0),
-            (0xD5, [0x88], 0),
-            (0xE0, [0x00, 0x03, 0x07, 0x0E, 0x13, 0x17, 0x1B, 0x1E, 0x1F, 0x1D, 0x1A, 0x15, 0x0F, 0x0A, 0x05, 0x01], 0),
-            (0xE1, [0x1F, 0x1C, 0x18, 0x11, 0x0C, 0x08, 0x04, 0x01, 0x00, 0x02, 0x05, 0x0A, 0x10, 0x15, 0x1A, 0x1E], 0),
-            (0x35, [0x00], 0),
-            (0x36, [0x00], 0),  # Rotation
-            (0x3A, [0x55], 0),  # 16-bit color
-            (0x21, [], 0),      # Inversion on
-            (0x11, [], 120),    # Sleep out
-            (0x29, [], 20),     # Display on
-        ]
-
-        for cmd, data, delay in init_cmds:
-            self._write_cmd(cmd, bytes(data) if data else None, delay)
-
     def _set_window(self, x1, y1, x2, y2):
         """Set drawing window"""
         self._write_cmd(0x2A, bytes([
@@ -193,14 +205,71 @@ class ST77916(framebuf.FrameBuffer):
             (y2 >> 8) & 0xFF, y2 & 0xFF
         ]))
 
-    def show(self):
-        """Display the framebuffer"""
-        self._set_window(0, 0, self.width - 1, self.height - 1)
+    def set_color_mode(self, mode, palette=None):
+        """Switch to "rgb565", "gs8" or "gs4" for the next screen (clears the framebuffer)"""
+        if self._bands is not None:
+            raise RuntimeError("set_color_mode is not supported with band_rows")
+        fmt = PixelFormat(mode, palette)
+        self._format = fmt
+        # The FrameBuffer base still holds the old buffer: re-point it at a 1x1
+        # placeholder so gc.collect() frees the old buffer before the new one exists
+        super().__init__(_PLACEHOLDER, 1, 1, framebuf.RGB565)
+        self.buffer = None
+        gc.collect()
+        self.buffer = bytearray(fmt.buffer_size(self.width, self.height))
+        super().__init__(self.buffer, self.width, self.height, FB_FORMATS[mode])
+        self._pixels.set_format(fmt.pack, fmt.bits_per_pixel)
+        self._damage.add_full()
+
+    def set_palette(self, colors, start=0):
+        """Load RGB565 colors for palette indices start.. (gs8/gs4 only)"""
+        self._format.set_palette(colors, start)
+        self._damage.add_full()
 
-        # Start memory write (0x2C), but keep CS asserted while streaming pixels.
+    def _write_region(self, x, y, w, h, top=0):
+        """Push one rectangle of the framebuffer through its own window (top: first buffer row in band mode)"""
+        self._set_window(x, y, x + w - 1, y + h - 1)
         self._write_cmd(0x2C, keep_cs=True)
+        bpp = self._format.bits_per_pixel
+        stride = self._format.row_bytes(self.width)
+        buf = memoryview(self.buffer)
+        row = y - top
+        if w == self.width:
+            self._write_bytes_4bit(buf[row * stride:(row + h) * stride])
+        else:
+            start = row * stride + x * bpp // 8
+            row_bytes = w * bpp // 8
+            for _ in range(h):
+                self._write_bytes_4bit(buf[start:start + row_bytes])
+                start += stride
+        self._wait_idle(self.sm)
+        self.cs(1)
 
-        # Send pixel data over 4-bit bus.
-        self._write_bytes_4bit(self.buffer)
+    def _write_band(self, top, rows):
+        windows = [(0, top, self.width, rows)] if self._mask is None else self._mask.clip(0, top, self.width, rows)
+        for x, y, w, h in windows:
+            x, y, w, h = self._format.align(x, y, w, h, self.width)
+            self._write_region(x, y, w, h, top)
 
-        self.cs(1)
+    def _take_windows(self):
+        """Damaged rectangles since the last show(), clipped to the round mask if enabled.
+
+        In gs4 mode windows are widened to even columns so rows start on whole bytes.
+        """
+        rects = self._damage.take()
+        if self._mask is not None:
+            windows = []
+            for x, y, w, h in rects:
+                windows.extend(self._mask.clip(x, y, w, h))
+            rects = windows
+        if self._format.bits_per_pixel == 4:
+            rects = [self._format.align(x, y, w, h, self.width) for x, y, w, h in rects]
+        return rects
+
+    def show(self):
+        """Display the regions damaged since the previous show()"""
+        if self._bands is not None:
+            self._bands.render()
+            return
+        for x, y, w, h in self._take_windows():
+            self._write_region(x, y, w, h)
@@ -0,0 +1,123 @@
+# ST77916 panel init stream, shared by lib/st77916.py and firmware/drivers/display.py
+# Waveshare BSP init sequence, precompiled into one compact command stream.
+#
+# Stream format, one entry per command:
+#   cmd, flags, params[flags & 0x7F], [delay_ms if flags & 0x80]
+# The entries below are written 4 single-parameter commands per line.
+# tests/test_st77916_init.py checks the stream against the readable BSP table.
+
+DELAY_FLAG = 0x80
+MADCTL = 0x36
+DISPON = 0x29
+
+INIT_STREAM = (
+    b"\xF0\x01\x28\xF2\x01\x28\x73\x01\xF0\x7C\x01\xD1"
+    b"\x83\x01\xE0\x84\x01\x61\xF2\x01\x82\xF0\x01\x00"
+    b"\xF0\x01\x01\xF1\x01\x01\xB0\x01\x56\xB1\x01\x4D"
+    b"\xB2\x01\x24\xB4\x01\x87\xB5\x01\x44\xB6\x01\x8B"
+    b"\xB7\x01\x40\xB8\x01\x86\xBA\x01\x00\xBB\x01\x08"
+    b"\xBC\x01\x08\xBD\x01\x00\xC0\x01\x80\xC1\x01\x10"
+    b"\xC2\x01\x37\xC3\x01\x80\xC4\x01\x10\xC5\x01\x37"
+    b"\xC6\x01\xA9\xC7\x01\x41\xC8\x01\x01\xC9\x01\xA9"
+    b"\xCA\x01\x41\xCB\x01\x01\xD0\x01\x91\xD1\x01\x68"
+    b"\xD2\x01\x68\xF5\x02\x00\xA5\xDD\x01\x4F\xDE\x01\x4F"
+    b"\xF1\x01\x10\xF0\x01\x00\xF0\x01\x02"
+    b"\xE0\x0E\xF0\x0A\x10\x09\x09\x36\x35\x33\x4A\x29\x15\x15\x2E\x34"
+    b"\xE1\x0E\xF0\x0A\x0F\x08\x08\x05\x34\x33\x4A\x39\x15\x15\x2D\x33"
+    b"\xF0\x01\x10\xF3\x01\x10\xE0\x01\x07\xE1\x01\x00"
+    b"\xE2\x01\x00\xE3\x01\x00\xE4\x01\xE0\xE5\x01\x06"
+    b"\xE6\x01\x21\xE7\x01\x01\xE8\x01\x05\xE9\x01\x02"
+    b"\xEA\x01\xDA\xEB\x01\x00\xEC\x01\x00\xED\x01\x0F"
+    b"\xEE\x01\x00\xEF\x01\x00\xF8\x01\x00\xF9\x01\x00"
+    b"\xFA\x01\x00\xFB\x01\x00\xFC\x01\x00\xFD\x01\x00"
+    b"\xFE\x01\x00\xFF\x01\x00\x60\x01\x40\x61\x01\x04"
+    b"\x62\x01\x00\x63\x01\x42\x64\x01\xD9\x65\x01\x00"
+    b"\x66\x01\x00\x67\x01\x00\x68\x01\x00\x69\x01\x00"
+    b"\x6A\x01\x00\x6B\x01\x00\x70\x01\x40\x71\x01\x03"
+    b"\x72\x01\x00\x73\x01\x42\x74\x01\xD8\x75\x01\x00"
+    b"\x76\x01\x00\x77\x01\x00\x78\x01\x00\x79\x01\x00"
+    b"\x7A\x01\x00\x7B\x01\x00\x80\x01\x48\x81\x01\x00"
+    b"\x82\x01\x06\x83\x01\x02\x84\x01\xD6\x85\x01\x04"
+    b"\x86\x01\x00\x87\x01\x00\x88\x01\x48\x89\x01\x00"
+    b"\x8A\x01\x08\x8B\x01\x02\x8C\x01\xD8\x8D\x01\x04"
+    b"\x8E\x01\x00\x8F\x01\x00\x90\x01\x48\x91\x01\x00"
+    b"\x92\x01\x0A\x93\x01\x02\x94\x01\xDA\x95\x01\x04"
+    b"\x96\x01\x00\x97\x01\x00\x98\x01\x48\x99\x01\x00"
+    b"\x9A\x01\x0C\x9B\x01\x02\x9C\x01\xDC\x9D\x01\x04"
+    b"\x9E\x01\x00\x9F\x01\x00\xA0\x01\x48\xA1\x01\x00"
+    b"\xA2\x01\x0E\xA3\x01\x02\xA4\x01\xDE\xA5\x01\x04"
+    b"\xA6\x01\x00\xA7\x01\x00\xA8\x01\x48\xA9\x01\x00"
+    b"\xAA\x01\x10\xAB\x01\x02\xAC\x01\xE0\xAD\x01\x04"
+    b"\xAE\x01\x00\xAF\x01\x00\xB0\x01\x48\xB1\x01\x00"
+    b"\xB2\x01\x12\xB3\x01\x02\xB4\x01\xE2\xB5\x01\x04"
+    b"\xB6\x01\x00\xB7\x01\x00\xB8\x01\x48\xB9\x01\x00"
+    b"\xBA\x01\x14\xBB\x01\x02\xBC\x01\xE4\xBD\x01\x04"
+    b"\xBE\x01\x00\xBF\x01\x00\xC0\x01\x48\xC1\x01\x00"
+    b"\xC2\x01\x16\xC3\x01\x02\xC4\x01\xE6\xC5\x01\x04"
+    b"\xC6\x01\x00\xC7\x01\x00\xC8\x01\x48\xC9\x01\x00"
+    b"\xCA\x01\x18\xCB\x01\x02\xCC\x01\xE8\xCD\x01\x04"
+    b"\xCE\x01\x00\xCF\x01\x00\xD0\x01\x48\xD1\x01\x00"
+    b"\xD2\x01\x1A\xD3\x01\x02\xD4\x01\xEA\xD5\x01\x04"
+    b"\xD6\x01\x00\xD7\x01\x00\xD8\x01\x48\xD9\x01\x00"
+    b"\xDA\x01\x1C\xDB\x01\x02\xDC\x01\xEC\xDD\x01\x04"
+    b"\xDE\x01\x00\xDF\x01\x00\x35\x01\x00\x36\x01\x00"
+    b"\x3A\x01\x55\x21\x00\x11\x80\x78\x29\x80\x14"
+)
+
+
+def compile_init(entries):
+    """Compile (cmd, params, delay_ms) entries into the stream format."""
+    out = bytearray()
+    for cmd, params, delay in entries:
+        if len(params) > 0x7F or delay > 0xFF:
+            raise ValueError("init entry 0x%02X out of range" % cmd)
+        out.append(cmd)
+        out.append(len(params) | (DELAY_FLAG if delay else 0))
+        out.extend(bytes(params))
+        if delay:
+            out.append(delay)
+    return bytes(out)
+
+
+def _offsets(stream, cmd):
+    """Offsets of (first param, delay byte or -1) of the first entry for cmd."""
+    i = 0
+    n = len(stream)
+    while i < n:
+        flags = stream[i + 1]
+        count = flags & 0x7F
+        params = i + 2
+        delay = params + count if flags & DELAY_FLAG else -1
+        if stream[i] == cmd:
+            return params, delay
+        i = params + count + (1 if flags & DELAY_FLAG else 0)
+    raise ValueError("command 0x%02X not in init stream" % cmd)
+
+
+_MADCTL_PARAM = _offsets(INIT_STREAM, MADCTL)[0]
+_DISPON_DELAY = _offsets(INIT_STREAM, DISPON)[1]
+
+
+def init_stream(rotation=0, post_init_ms=20):
+    """INIT_STREAM patched with the board rotation and display-on settle time."""
+    stream = bytearray(INIT_STREAM)
+    stream[_MADCTL_PARAM] = rotation & 0x03
+    stream[_DISPON_DELAY] = min(post_init_ms, 0xFF)
+    return stream
+
+
+def run_init(stream, write_cmd, sleep_ms):
+    """Send every entry of stream with write_cmd(cmd, params) and honor its delay."""
+    mv = memoryview(stream)
+    i = 0
+    n = len(stream)
+    while i < n:
+        cmd = stream[i]
+        flags = stream[i + 1]
+        i += 2
+        count = flags & 0x7F
+        write_cmd(cmd, mv[i:i + count] if count else None)
+        i += count
+        if flags & DELAY_FLAG:
+            sleep_ms(stream[i])
+            i += 1
@@ -3,13 +3,186 @@
 import busio
 import time
 
+from at_stream import (ATReply, ATStream, CLOSED, ERROR, IPD, IPD_NOTICE, LINE, OK, PROMPT, RECV_DATA, RxRing,
+                       SEND_FAIL, SEND_OK, status_up)
+from http_stream import HTTPResponse, body_length, build_request, post_headers, request_sends, split_url
+
+# ESP-AT supports link ids 0..4 in multiplexed mode (AT+CIPMUX=1).
+MAX_LINKS = 5
+
+# UART rates tried by negotiate_baudrate(), fastest first.
+FAST_BAUDRATES = (921600, 460800, 230400)
+
+# Stream events handled by _route() rather than by the command waiting for its status.
+_ROUTED = (IPD, CLOSED, PROMPT, IPD_NOTICE, RECV_DATA, SEND_OK, SEND_FAIL)
+
+# Idle wait between UART polls, in seconds.
+_POLL_S = 0.002
+
+# Reply lines kept by _send_cmd(capture=True); AT+CIPSTATUS? with all links open fits.
+_REPLY_BUF_SIZE = 384
+
+# Cached WiFi state, kept current by unsolicited result codes (URCs).
+WIFI_UNKNOWN = "unknown"
+WIFI_DOWN = "down"
+WIFI_ASSOCIATED = "associated"      # joined the AP, no IP address yet
+WIFI_UP = "up"
+
+# URCs passed to subscribers as (event, link_id); link_id is None unless the
+# URC names a multiplexed link.
+URC_WIFI_CONNECTED = "WIFI CONNECTED"
+URC_WIFI_GOT_IP = "WIFI GOT IP"
+URC_WIFI_DISCONNECT = "WIFI DISCONNECT"
+URC_READY = "ready"                 # the module (re)booted
+URC_CONNECT = "CONNECT"
+URC_CLOSED = "CLOSED"
+
+_URC_STATES = {
+    URC_WIFI_CONNECTED: WIFI_ASSOCIATED,
+    URC_WIFI_GOT_IP: WIFI_UP,
+    URC_WIFI_DISCONNECT: WIFI_DOWN,
+    URC_READY: WIFI_UNKNOWN,
+}
+
+
+class Link:
+    """One multiplexed ESP-AT link and the HTTP request it carries."""
+
+    def __init__(self, link_id: int, host: str, port: int):
+        self.id = link_id
+        self.host = host
+        self.port = port
+        self.open = True
+        self.busy = False
+        self.closing = False
+        self.response = None
+        self.error = None
+        self.deadline = 0.0
+
+    @property
+    def done(self) -> bool:
+        return not self.busy
+
+    def begin(self, response, deadline: float):
+        self.response = response
+        self.error = None
+        self.busy = True
+        self.deadline = deadline
+
+    def fail(self, error: str):
+        self.error = error
+        self.busy = False
+        self.closing = True
+
+    def result(self) -> tuple[int, str]:
+        """(status_code, body) once done; (0, reason) on failure."""
+        if self.error is not None or self.response is None:
+            return 0, self.error or "No request"
+        return self.response.status, self.response.body.decode("utf-8", "ignore")
+
+
+class DNSCache:
+    """Host name -> IP address, kept for ttl seconds, at most size names.
+
+    The least recently used name goes first when it is full. hits and misses
+    count get() calls (an expired entry is a miss).
+    """
+
+    def __init__(self, size: int = 8, ttl: float = 300.0, clock=time.monotonic):
+        self.size = size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = {}      # name -> [ip, expires, last use]
+        self._uses = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and self._clock() < entry[1]
+
+    def get(self, name: str):
+        """The cached IP of name, or None."""
+        entry = self._entries.get(name)
+        if entry is not None and self._clock() >= entry[1]:
+            del self._entries[name]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._uses += 1
+        entry[2] = self._uses
+        return entry[0]
+
+    def put(self, name: str, ip: str):
+        if not self.size:
+            return
+        if name not in self._entries and len(self._entries) >= self.size:
+            oldest = min(self._entries, key=lambda key: self._entries[key][2])
+            del self._entries[oldest]
+        self._uses += 1
+        self._entries[name] = [ip, self._clock() + self.ttl, self._uses]
+
+    def invalidate(self, name: str):
+        self._entries.pop(name, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
 class ESPATWiFi:
     """Wrapper for ESP32 running ESP-AT firmware over UART."""
     
-    def __init__(self, uart_tx, uart_rx, baudrate=115200, debug="errors"):
-        self.uart = busio.UART(uart_tx, uart_rx, baudrate=baudrate, timeout=1)
+    def __init__(self, uart_tx, uart_rx, baudrate=115200, debug="errors", keep_alive=False,
+                 multiplex=False, max_links=MAX_LINKS, per_host=2, passive=False, recv_chunk=1024,
+                 rts=None, cts=None, rx_size=1024, dns_size=8, dns_ttl=300.0):
+        # RTS/CTS hardware flow control only when both lines are wired.
+        self.flow_control = rts is not None and cts is not None
+        if self.flow_control:
+            self.uart = busio.UART(uart_tx, uart_rx, baudrate=baudrate, timeout=1, rts=rts, cts=cts)
+        else:
+            self.uart = busio.UART(uart_tx, uart_rx, baudrate=baudrate, timeout=1)
         self.debug = self._normalize_debug_level(debug)
         self._connected = False
+        # Keep-alive mode reuses one open link per host:port across requests.
+        self.keep_alive = keep_alive
+        self._link = None
+        # Multiplexed mode (AT+CIPMUX=1): up to max_links requests in flight,
+        # at most per_host of them to the same host:port.
+        self.multiplex = multiplex
+        self.max_links = min(max_links, MAX_LINKS)
+        self.per_host = per_host
+        self._links = {}
+        # Passive receive mode (AT+CIPRECVMODE=1): the ESP holds TCP data and
+        # it is pulled recv_chunk bytes at a time, so neither the UART nor the
+        # heap sees more than that at once.
+        self.passive = passive
+        self.recv_chunk = recv_chunk
+        self._pending = set()       # link ids (None in single-link mode) with held data
+        self._pull_into = None
+        self._pull_count = 0
+        self._pull_error = False
+        self._link_closed = False
+        self._unclosed = False      # a finished close-mode link may still be open
+        self._stream = ATStream()
+        # Every UART read goes into this ring (readinto, no bytes per chunk).
+        self.rx = RxRing(rx_size)
+        self._prompted = False
+        self._sent = None           # SEND OK (True) / SEND FAIL (False) of the last send
+        self._uploading = None      # single-link response taking +IPD data during a send
+        self.wifi_state = WIFI_UNKNOWN
+        # Host names are resolved once with AT+CIPDOMAIN and links opened by
+        # IP; dns_size=0 leaves resolution to AT+CIPSTART on every connect.
+        self.dns = DNSCache(dns_size, dns_ttl)
+        self._subscribers = []
+        # _send_cmd(capture=True) copies the reply lines here for one reused ATReply.
+        self._reply_buf = bytearray(_REPLY_BUF_SIZE)
+        self._reply_len = 0
+        self._reply = ATReply(max_lines=8, max_spans=1)
 
     @staticmethod
     def _normalize_debug_level(debug) -> str:
@@ -26,7 +199,15 @@ class ESPATWiFi:
 
     @staticmethod
     def parse_response(response_text: str, command: str = None) -> dict:
-        """Parse a raw AT response into echo/intermediate/status/payload sections."""
+        """Parse a raw AT response into echo/intermediate/status/payload sections.
+
+        Kept as the original str parser for callers of the dict API rather
+        than wrapped around at_stream.ATReply: the caller already holds a
+        decoded str, so a wrapper has to encode it back, parse, and decode
+        every line again to build the same dict, which cost more heap per
+        call than this (bench/bench_parse_response.py). The client itself
+        reads replies with ATReply on its reply buffer (see is_connected).
+        """
         lines = [line for line in response_text.replace("\r\n", "\n").split("\n") if line]
         echo = None
         status = None
@@ -95,39 +276,76 @@ class ESPATWiFi:
             return response_text.split("\r\n\r\n", 1)[1]
         return ""
 
+    @staticmethod
+    def _is_ip(host: str) -> bool:
+        parts = host.split(".")
+        return len(parts) == 4 and all(part.isdigit() for part in parts)
+
+    @staticmethod
+    def _domain_ip(response_text: str):
+        """The address of an AT+CIPDOMAIN reply (+CIPDOMAIN:"<ip>" or +CIPDOMAIN:<ip>), or None."""
+        for line in response_text.split("\r\n"):
+            if line.startswith("+CIPDOMAIN:"):
+                ip = line[11:].strip().strip('"')
+                return ip if ESPATWiFi._is_ip(ip) else None
+        return None
+
     @staticmethod
     def _is_retryable(cmd: str) -> bool:
         retryable = ("AT", "AT+CWMODE", "AT+CWJAP", "AT+CIPSTART", "AT+CIPSEND")
         return any(cmd.startswith(prefix) for prefix in retryable)
         
-    def _send_cmd(self, cmd: str, timeout: float = 2.0, max_attempts: int = None) -> tuple[bool, str]:
-        """Send AT command and wait for response."""
+    def _send_cmd(self, cmd: str, timeout: float = 2.0, max_attempts: int = None,
+                  capture: bool = False) -> tuple[bool, str]:
+        """Send AT command and wait for response.
+
+        With capture the reply lines are copied as bytes into _reply_buf[:_reply_len]
+        instead of being decoded, and the returned text is empty on success.
+        """
         attempts = max_attempts
         if attempts is None:
             attempts = 3 if self._is_retryable(cmd) else 1
 
         final_text = ""
+        stream = self._stream
         for attempt in range(1, attempts + 1):
-            self.uart.reset_input_buffer()
+            # Handle stale output (URCs, late link traffic) before the reply.
+            self._drain()
+            if not (self.multiplex or self.passive):
+                stream.reset()
+            stream.expect_echo(cmd)
+            self._prompted = False
+            self._reply_len = 0
             self.uart.write((cmd + "\r\n").encode())
 
+            lines = []
+            status = None
             deadline = time.monotonic() + timeout
-            response = b""
 
-            while time.monotonic() < deadline:
-                if self.uart.in_waiting:
-                    response += self.uart.read(self.uart.in_waiting)
-                    if b"\r\nOK\r\n" in response or b"\r\nERROR\r\n" in response:
-                        break
-                time.sleep(0.01)
+            while status is None and time.monotonic() < deadline:
+                if self.rx.fill(self.uart):
+                    # Consume everything read: in multiplexed mode it may
+                    # also carry +IPD data for other links.
+                    for kind, link, data in self.rx.feed(stream):
+                        if self._route(kind, link, data):
+                            continue
+                        if status is None:
+                            if capture:
+                                self._capture(data)
+                            else:
+                                lines.append(data.decode("utf-8", "ignore"))
+                            if kind == OK or kind == ERROR:
+                                status = kind
+                    continue
+                time.sleep(_POLL_S)
 
-            final_text = response.decode("utf-8", errors="ignore")
-            parsed = self.parse_response(final_text, command=cmd)
-            success = parsed["status"] == "OK"
-            if success:
+            final_text = "\r\n".join(lines)
+            if status == OK:
                 self._log("verbose", f"[AT] {cmd} -> OK")
                 return True, final_text
 
+            if capture:
+                final_text = bytes(self._reply_buf[:self._reply_len]).decode("utf-8", "ignore")
             self._log("errors", f"[AT] {cmd} attempt {attempt}/{attempts} failed")
             self._log("verbose", f"  Response: {final_text}")
             if attempt < attempts:
@@ -136,6 +354,190 @@ class ESPATWiFi:
 
         return False, final_text
 
+    def _capture(self, data):
+        """Append one reply line to _reply_buf; lines past its end are dropped."""
+        start = self._reply_len
+        end = start + len(data) + 1
+        if end <= len(self._reply_buf):
+            self._reply_buf[start:end - 1] = data
+            self._reply_buf[end - 1] = 0x0A
+            self._reply_len = end
+
+    def _route(self, kind, link_id, data) -> bool:
+        """Handle link traffic and URCs arriving outside (or in the middle of) a command.
+
+        Returns False for events that belong to the command's own reply.
+        """
+        if kind == LINE:
+            return self._line_urc(data)
+        if kind not in _ROUTED:
+            return False
+        if kind == PROMPT:
+            self._prompted = True
+        elif kind == SEND_OK or kind == SEND_FAIL:
+            self._sent = kind == SEND_OK
+        elif kind == RECV_DATA:
+            self._pull_count += len(data)
+            if self._pull_into is not None and not self._pull_error:
+                try:
+                    self._pull_into.feed(data)
+                except ValueError:
+                    self._pull_error = True
+        elif kind == IPD_NOTICE:
+            self._pending.add(link_id)
+        elif kind == CLOSED:
+            self._pending.discard(link_id)
+            if not self.multiplex:
+                self._link = None
+                self._link_closed = True
+            else:
+                link = self._links.pop(link_id, None)
+                if link is not None:
+                    link.open = False
+                    if link.busy:
+                        if link.response.finish():
+                            link.busy = False
+                        else:
+                            link.fail("Connection closed")
+            self._notify(URC_CLOSED, link_id)
+        elif not self.multiplex:
+            if self._uploading is not None:
+                # The server answered before the upload finished.
+                try:
+                    self._uploading.feed(data)
+                except ValueError:
+                    pass
+        else:
+            link = self._links.get(link_id)
+            if link is not None and link.busy:
+                try:
+                    link.response.feed(data)
+                except ValueError:
+                    link.fail("Bad HTTP response")
+                else:
+                    self._settle(link)
+        return True
+
+    def _line_urc(self, line) -> bool:
+        """Apply a URC line (WIFI ..., ready, [<id>,]CONNECT); False if it is not one."""
+        if line == b"CONNECT" or (line.endswith(b",CONNECT") and line[:-8].isdigit()):
+            self._notify(URC_CONNECT, int(line[:-8]) if line != b"CONNECT" else None)
+            return True
+        event = line.decode("utf-8", "ignore")
+        state = _URC_STATES.get(event)
+        if state is None:
+            return False
+        self.wifi_state = state
+        if state == WIFI_DOWN or state == WIFI_UNKNOWN:
+            # Every link went down with the AP (or the module reset).
+            self._link = None
+            self._unclosed = False
+            for link in self._links.values():
+                link.open = False
+                if link.busy:
+                    link.fail("WiFi disconnected")
+            self._links.clear()
+            self._pending.clear()
+        if state == WIFI_UNKNOWN:
+            # A reboot also forgot CIPMUX/CIPRECVMODE: connect() again.
+            self._connected = False
+        self._notify(event, None)
+        return True
+
+    def _notify(self, event, link_id):
+        for callback in self._subscribers:
+            callback(event, link_id)
+
+    def subscribe(self, callback):
+        """Call callback(event, link_id) for every URC (see the URC_* names)."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _drain(self):
+        """Handle whatever the UART already holds (URCs, link traffic) without waiting."""
+        while self.rx.fill(self.uart):
+            for kind, link_id, data in self.rx.feed(self._stream):
+                self._route(kind, link_id, data)
+
+    def _settle(self, link):
+        if link.response.complete:
+            link.busy = False
+            link.closing = not (self.keep_alive and link.response.keep_alive)
+
+    def _wait_for(self, done, timeout: float):
+        """Route UART traffic until done() is true or timeout seconds pass."""
+        deadline = time.monotonic() + timeout
+        while not done() and time.monotonic() < deadline:
+            if self.rx.fill(self.uart):
+                for kind, link_id, data in self.rx.feed(self._stream):
+                    self._route(kind, link_id, data)
+                continue
+            time.sleep(_POLL_S)
+
+    def _wait_prompt(self, timeout: float = 2.0) -> bool:
+        """Wait for the ">" AT+CIPSEND prints once it is ready for the data."""
+        self._wait_for(lambda: self._prompted, timeout)
+        return self._prompted
+
+    def _wait_sent(self, timeout: float = 5.0) -> bool:
+        """Wait for SEND OK after AT+CIPSEND data; False on SEND FAIL or timeout."""
+        self._wait_for(lambda: self._sent is not None, timeout)
+        return self._sent is True
+
+    def _send_request(self, link_id, sends, attempts: int = None) -> str:
+        """AT+CIPSEND each buffer list from sends in turn.
+
+        Waits for SEND OK before each send after the first (the ESP refuses
+        a send while the last one is in flight); the response is read after
+        the last. Returns "sent", "refused" (the first AT+CIPSEND failed, so
+        nothing was sent) or "failed".
+        """
+        first = True
+        for parts in sends:
+            if not first and not self._wait_sent():
+                return "failed"
+            size = sum(len(part) for part in parts)
+            if link_id is None:
+                cmd = f"AT+CIPSEND={size}"
+            else:
+                cmd = f"AT+CIPSEND={link_id},{size}"
+            ok, _ = self._send_cmd(cmd, max_attempts=attempts if first else None)
+            if not ok:
+                return "refused" if first else "failed"
+            if not self._wait_prompt():
+                return "failed"
+            self._sent = None
+            for part in parts:
+                self.uart.write(part)
+            first = False
+        return "sent"
+
+    def _pull(self, link_id, response) -> int:
+        """Passive mode: move up to recv_chunk bytes the ESP holds for a link into response.
+
+        Returns the byte count, or -1 if the response turned out malformed.
+        With response None the data is read and dropped.
+        """
+        if link_id is None:
+            cmd = f"AT+CIPRECVDATA={self.recv_chunk}"
+        else:
+            cmd = f"AT+CIPRECVDATA={link_id},{self.recv_chunk}"
+        # A notice arriving during the pull marks the link pending again.
+        self._pending.discard(link_id)
+        self._pull_into = response
+        self._pull_count = 0
+        self._pull_error = False
+        ok, _ = self._send_cmd(cmd, timeout=2.0, max_attempts=1)
+        self._pull_into = None
+        if ok and self._pull_count >= self.recv_chunk:
+            # A full chunk: the ESP may hold more.
+            self._pending.add(link_id)
+        return -1 if self._pull_error else self._pull_count
+
     def _close_socket(self):
         ok, _ = self._send_cmd("AT+CIPCLOSE", timeout=2.0, max_attempts=1)
         if not ok:
@@ -152,178 +554,442 @@ class ESPATWiFi:
         ok, _ = self._send_cmd("AT+CWMODE=1")
         if not ok:
             return False
+
+        # Multiplexed links (only accepted while no link is open)
+        self._links.clear()
+        ok, _ = self._send_cmd("AT+CIPMUX=1" if self.multiplex else "AT+CIPMUX=0")
+        if not ok and self.multiplex:
+            return False
+
+        # Passive receive mode
+        self._pending.clear()
+        ok, _ = self._send_cmd("AT+CIPRECVMODE=1" if self.passive else "AT+CIPRECVMODE=0")
+        if not ok and self.passive:
+            return False
         
-        # Connect to AP
+        # Connect to AP (drops any open link)
+        self._link = None
         ok, resp = self._send_cmd(f'AT+CWJAP="{ssid}","{password}"', timeout=15)
         self._connected = ok
+        self.wifi_state = WIFI_UP if ok else WIFI_DOWN
         return ok
     
-    def is_connected(self) -> bool:
-        """Check if WiFi is connected."""
-        ok, resp = self._send_cmd("AT+CIPSTATUS?")
-        if not ok:
+    # UART rate
+
+    def negotiate_baudrate(self, rates=FAST_BAUDRATES, probes: int = 4) -> list:
+        """Opt-in: move the ESP-AT UART to the fastest of rates that passes a probe.
+
+        Uses AT+UART_CUR (not stored in flash, so a module reset returns to
+        the default rate), with RTS/CTS if both pins were given. A rate is
+        kept only if `probes` AT+GMR replies arrive identical to the one read
+        at the starting rate; otherwise the previous rate is restored and the
+        next one tried. Returns [(baudrate, round_trip_ms or None), ...] for
+        the starting rate and every rate tried, fastest last when it held;
+        round_trip_ms is the mean AT+GMR command-to-OK time of the probe,
+        a latency figure rather than a bulk throughput.
+        """
+        start = self.uart.baudrate
+        reference, round_trip = self._probe_uart(probes)
+        report = [(start, round_trip)]
+        if reference is None:
+            self._log("errors", f"[AT] UART probe failed at {start} baud; keeping it")
+            return report
+        for rate in rates:
+            if rate <= start:
+                continue
+            current = self.uart.baudrate
+            ok = self._switch_baudrate(rate)
+            round_trip = None
+            if ok:
+                reply, round_trip = self._probe_uart(probes)
+                if reply != reference:
+                    round_trip = None
+                    ok = False
+                    self._switch_baudrate(current, confirm=False)
+            report.append((rate, round_trip))
+            self._log("verbose", f"[AT] {rate} baud: " + (f"{round_trip:.1f} ms per AT+GMR" if ok else "failed"))
+            if ok:
+                break
+        return report
+
+    def _probe_uart(self, probes: int):
+        """(AT+GMR reply, mean round trip in ms) if all probes give the same reply, else (None, None)."""
+        reply = None
+        started = time.monotonic()
+        for _ in range(probes):
+            ok, text = self._send_cmd("AT+GMR", timeout=1.0, max_attempts=1)
+            if not ok or (reply is not None and text != reply):
+                return None, None
+            reply = text
+        return reply, (time.monotonic() - started) * 1000 / probes
+
+    def _switch_baudrate(self, rate: int, confirm: bool = True) -> bool:
+        """Move both ends to rate; on failure leave both at the current rate.
+
+        confirm=False skips waiting for the ESP's OK, for when replies at the
+        current rate are already unreliable.
+        """
+        old = self.uart.baudrate
+        # Both rates use the same flow-control field: RTS/CTS only when wired.
+        flow = 3 if self.flow_control else 0
+        ok, _ = self._send_cmd(f"AT+UART_CUR={rate},8,1,0,{flow}", timeout=1.0, max_attempts=1)
+        if not (ok or not confirm):
             return False
-        parsed = self.parse_response(resp, command="AT+CIPSTATUS?")
-        for line in parsed["intermediate"]:
-            if line.startswith("STATUS:"):
-                try:
-                    code = int(line.split(":", 1)[1])
-                    return code in (2, 3)
-                except (ValueError, IndexError):
-                    continue
+        # The ESP switches once its OK is out.
+        time.sleep(0.02)
+        self.uart.baudrate = rate
+        if self._send_cmd("AT", timeout=0.5, max_attempts=3)[0]:
+            return True
+        # Recover: the ESP either stayed at old or is at rate but unusable.
+        self.uart.baudrate = old
+        if self._send_cmd("AT", timeout=0.5, max_attempts=2)[0]:
+            return False
+        self.uart.baudrate = rate
+        self._send_cmd(f"AT+UART_CUR={old},8,1,0,{flow}", timeout=0.5, max_attempts=1)
+        time.sleep(0.02)
+        self.uart.baudrate = old
+        if not self._send_cmd("AT", timeout=0.5, max_attempts=3)[0]:
+            self._log("errors", f"[AT] lost the ESP after trying {rate} baud")
         return False
+
+    def is_connected(self, refresh: bool = False) -> bool:
+        """Check if WiFi is connected (has an IP address).
+
+        Answers from the state cached from URCs; AT+CIPSTATUS? is only sent
+        while the state is unknown (e.g. before connect() or after a module
+        reset) or when refresh is set.
+        """
+        self._drain()
+        if refresh or self.wifi_state == WIFI_UNKNOWN:
+            if not self._send_cmd("AT+CIPSTATUS?", capture=True)[0]:
+                return False
+            code = self._reply.parse(self._reply_buf, 0, self._reply_len).value(b"STATUS:")
+            if code >= 0:
+                self.wifi_state = WIFI_UP if status_up(code) else WIFI_DOWN
+        return self.wifi_state == WIFI_UP
     
-    def http_get(self, url: str, headers: dict = None) -> tuple[int, str]:
-        """Perform HTTP GET request. Returns (status_code, body)."""
-        # Parse URL
-        if url.startswith("http://"):
-            url = url[7:]
-        elif url.startswith("https://"):
-            url = url[8:]
-        
-        if "/" in url:
-            host, path = url.split("/", 1)
-            path = "/" + path
-        else:
-            host = url
-            path = "/"
-        
-        port = 80
-        
-        # Start TCP connection
-        ok, _ = self._send_cmd(f'AT+CIPSTART="TCP","{host}",{port}', timeout=5)
-        if not ok:
-            return 0, "Connection failed"
-        
-        # Build request
-        request = f"GET {path} HTTP/1.1\r\n"
-        request += f"Host: {host}\r\n"
-        request += "Connection: close\r\n"
-        if headers:
-            for k, v in headers.items():
-                request += f"{k}: {v}\r\n"
-        request += "\r\n"
-        
-        # Send request
-        req_len = len(request)
-        ok, _ = self._send_cmd(f"AT+CIPSEND={req_len}")
-        if not ok:
-            self._close_socket()
-            return 0, "Send failed"
-        
-        time.sleep(0.1)
-        self.uart.write(request.encode())
-        
-        # Read response
-        deadline = time.monotonic() + 10
-        response = b""
-        
-        while time.monotonic() < deadline:
-            if self.uart.in_waiting:
-                response += self.uart.read(self.uart.in_waiting)
-                if b"+IPD," in response and b"CLOSED" in response:
-                    break
-            time.sleep(0.05)
+    _split_url = staticmethod(split_url)
 
-        if not response:
+    def _build_request(self, method: str, host: str, path: str, headers: dict = None, extra: str = "") -> str:
+        return build_request(method, host, path, self.keep_alive, headers, extra)
+
+    def _post_request(self, url: str, data, content_type: str, headers: dict, length: int):
+        """(host, port, head, chunked) of a POST; chunked when the body length is unknown."""
+        host, port, path = self._split_url(url)
+        if length is None:
+            length = body_length(data)
+        request = self._build_request("POST", host, path, headers, post_headers(content_type, length))
+        return host, port, request.encode(), length is None
+
+    def _request(self, host: str, port: int, request: bytes, timeout: float, sink=None,
+                 body=None, chunked: bool = False) -> tuple[int, str]:
+        if self.multiplex:
+            deadline = time.monotonic() + timeout
+            link = self._start(host, port, request, timeout, sink, body, chunked)
+            while link is None and time.monotonic() < deadline:
+                # Pool or per-host limit exhausted: wait for a link to free up.
+                self.poll()
+                time.sleep(_POLL_S)
+                link = self._start(host, port, request, timeout, sink, body, chunked)
+            if link is None:
+                return 0, "No free link"
+            self.wait(link)
+            return link.result()
+        return self._framed_request(host, port, request, timeout, sink, body, chunked)
+
+    def _resolve(self, host: str) -> str:
+        """The address to open a link to host by: its cached or freshly looked up IP.
+
+        Falls back to the name itself (AT+CIPSTART resolves it) when the
+        lookup fails or the cache is off.
+        """
+        if not self.dns.size or self._is_ip(host):
+            return host
+        ip = self.dns.get(host)
+        if ip is not None:
+            return ip
+        ok, resp = self._send_cmd(f'AT+CIPDOMAIN="{host}"', timeout=10, max_attempts=1)
+        ip = self._domain_ip(resp) if ok else None
+        if ip is None:
+            self._log("verbose", f"[AT] no address for {host}, connecting by name")
+            return host
+        self.dns.put(host, ip)
+        return ip
+
+    def _open_link(self, host: str, port: int) -> bool:
+        """Make (host, port) the open keep-alive link, reusing it when it already is."""
+        if self._link == (host, port):
+            return True
+        if self._link is not None:
+            self._close_link()
+        self._close_unclosed()
+        for _ in range(2):
+            address = self._resolve(host)
+            ok, resp = self._send_cmd(f'AT+CIPSTART="TCP","{address}",{port}', timeout=5)
+            if ok:
+                self._link = (host, port)
+                return True
+            if "ALREADY CONNECTED" not in resp:
+                # The host may have moved: look it up again next time.
+                self.dns.invalidate(host)
+                return False
+            # The ESP still holds a link we lost track of.
             self._close_socket()
-            return 0, "HTTP timeout"
-        
-        # Parse response
-        text = response.decode("utf-8", errors="ignore")
-        
-        # Find body (after \r\n\r\n)
-        if "\r\n\r\n" in text:
-            header, body = text.split("\r\n\r\n", 1)
-            # Extract status code
-            if "HTTP/1.1" in header:
-                status_line = header.split("\r\n")[0]
-                parts = status_line.split()
-                if len(parts) >= 2:
-                    try:
-                        status = int(parts[1])
-                        return status, body
-                    except:
-                        pass
+        return False
 
+    def _close_link(self):
+        self._link = None
         self._close_socket()
-        return 0, text
-    
-    def http_post(self, url: str, data: bytes, content_type: str = "application/octet-stream", headers: dict = None) -> tuple[int, str]:
-        """Perform HTTP POST request. Returns (status_code, body)."""
-        # Parse URL
-        if url.startswith("http://"):
-            url = url[7:]
-        elif url.startswith("https://"):
-            url = url[8:]
-        
-        if "/" in url:
-            host, path = url.split("/", 1)
-            path = "/" + path
-        else:
-            host = url
-            path = "/"
-        
-        port = 80
-        data_len = len(data)
-        
-        # Start TCP connection
-        ok, _ = self._send_cmd(f'AT+CIPSTART="TCP","{host}",{port}', timeout=5)
-        if not ok:
-            return 0, "Connection failed"
-        
-        # Build request
-        request = f"POST {path} HTTP/1.1\r\n"
-        request += f"Host: {host}\r\n"
-        request += f"Content-Type: {content_type}\r\n"
-        request += f"Content-Length: {data_len}\r\n"
-        request += "Connection: close\r\n"
-        if headers:
-            for k, v in headers.items():
-                request += f"{k}: {v}\r\n"
-        request += "\r\n"
-        
-        # Send headers first
-        req_bytes = request.encode() + data
-        req_len = len(req_bytes)
-        
-        ok, _ = self._send_cmd(f"AT+CIPSEND={req_len}")
-        if not ok:
+
+    def _close_unclosed(self):
+        """Close the last close-mode link unless its CLOSED has arrived by now."""
+        if not self._unclosed:
+            return
+        self._unclosed = False
+        self._link_closed = False
+        self._drain()
+        if not self._link_closed:
+            # The server kept the link open after a complete response.
             self._close_socket()
-            return 0, "Send failed"
-        
-        time.sleep(0.1)
-        self.uart.write(req_bytes)
-        
-        # Read response
-        deadline = time.monotonic() + 15
-        response = b""
-        
+
+    def close(self):
+        """Close the keep-alive link (or every multiplexed link), if open."""
+        if self._link is not None:
+            self._close_link()
+        self._close_unclosed()
+        for link in self._links.values():
+            link.closing = True
+        self._reap()
+
+    def _framed_request(self, host: str, port: int, request: bytes, timeout: float, sink=None,
+                        body=None, chunked: bool = False) -> tuple[int, str]:
+        """Send request (the head, then body if given) on the single link and
+        read exactly one framed response.
+
+        The response is complete once its Content-Length or final chunk has
+        arrived, without waiting for the server to close the link. The link
+        stays open for the next request when keep_alive is set and the server
+        agrees.
+        """
+        # A file or iterator body can only be sent once.
+        replayable = body is None or body_length(body) is not None
+        for _attempt in range(2):
+            reused = self._link == (host, port)
+            if not self._open_link(host, port):
+                return 0, "Connection failed"
+
+            response = HTTPResponse(sink=sink)
+            self._link_closed = False
+            self._uploading = response
+            sent = self._send_request(None, request_sends(request, body, chunked), 1 if reused else None)
+            self._uploading = None
+            if sent == "refused" and reused:
+                # The server dropped the idle link: reconnect and resend.
+                self._link = None
+                self._log("verbose", f"[AT] link to {host}:{port} dropped, reconnecting")
+                continue
+            if sent != "sent" and not response.complete:
+                self._close_link()
+                return 0, "Send failed"
+
+            outcome = self._read_framed_response(response, timeout)
+            if outcome == "dropped" and reused and replayable:
+                self._link = None
+                self._log("verbose", f"[AT] link to {host}:{port} dropped, reconnecting")
+                continue
+            if outcome == "malformed":
+                self.close()
+                return 0, "Bad HTTP response"
+            if not response.complete:
+                self.close()
+                return 0, "HTTP timeout"
+            if self._link_closed:
+                self._link = None
+            elif not (self.keep_alive and response.keep_alive):
+                # The server should close the link now; _open_link() checks
+                # that it did before starting the next one.
+                self._link = None
+                self._unclosed = True
+            return response.status, response.body.decode("utf-8", "ignore")
+        return 0, "Connection failed"
+
+    def _read_framed_response(self, response, timeout: float) -> str:
+        """Feed +IPD payload into response until it is complete.
+
+        Returns "complete", "closed" (link closed by the server), "dropped"
+        (closed before any response byte), "malformed" or "timeout".
+        """
+        deadline = time.monotonic() + timeout
+        received = 0
+        if response.complete:
+            # It arrived while the request was still being sent.
+            return "complete"
+
         while time.monotonic() < deadline:
-            if self.uart.in_waiting:
-                response += self.uart.read(self.uart.in_waiting)
-                if b"+IPD," in response and b"CLOSED" in response:
-                    break
-            time.sleep(0.05)
+            if None in self._pending:
+                # Passive mode: the ESP holds data for us.
+                got = self._pull(None, response)
+                if got < 0:
+                    return "malformed"
+                received += got
+                if response.complete:
+                    return "complete"
+                continue
+            if self._link_closed:
+                if not received and not response.headers_done:
+                    return "dropped"
+                response.finish()
+                return "closed"
+            if self.rx.fill(self.uart):
+                outcome = None
+                for kind, link_id, data in self.rx.feed(self._stream):
+                    if kind == IPD and outcome is None:
+                        received += len(data)
+                        try:
+                            response.feed(data)
+                        except ValueError:
+                            outcome = "malformed"
+                        if response.complete:
+                            outcome = "complete"
+                    else:
+                        self._route(kind, link_id, data)
+                if outcome is not None:
+                    return outcome
+                continue
+            time.sleep(_POLL_S)
+        return "timeout"
 
-        if not response:
-            self._close_socket()
-            return 0, "HTTP timeout"
-        
-        # Parse response
-        text = response.decode("utf-8", errors="ignore")
-        
-        if "\r\n\r\n" in text:
-            header, body = text.split("\r\n\r\n", 1)
-            if "HTTP/1.1" in header:
-                status_line = header.split("\r\n")[0]
-                parts = status_line.split()
-                if len(parts) >= 2:
-                    try:
-                        status = int(parts[1])
-                        return status, body
-                    except:
-                        pass
+    # Multiplexed mode
 
-        self._close_socket()
-        return 0, text
+    def _acquire(self, host: str, port: int):
+        """Return an idle open link to host:port, a free link id, or None."""
+        same = 0
+        for link in self._links.values():
+            if (link.host, link.port) == (host, port):
+                if link.open and not link.busy and not link.closing:
+                    return link
+                same += 1
+        if same >= self.per_host:
+            return None
+        for link_id in range(self.max_links):
+            if link_id not in self._links:
+                return link_id
+        return None
+
+    def _reap(self):
+        """Close links whose response ended the exchange or that failed."""
+        for link in list(self._links.values()):
+            if link.closing and not link.busy:
+                del self._links[link.id]
+                if link.open:
+                    link.open = False
+                    self._send_cmd(f"AT+CIPCLOSE={link.id}", timeout=2.0, max_attempts=1)
+
+    def _start(self, host: str, port: int, request: bytes, timeout: float, sink=None,
+               body=None, chunked: bool = False):
+        self._reap()
+        for _attempt in range(2):
+            link = self._acquire(host, port)
+            if link is None:
+                return None
+            reused = isinstance(link, Link)
+            if not reused:
+                link_id = link
+                link = Link(link_id, host, port)
+                address = self._resolve(host)
+                ok, _ = self._send_cmd(f'AT+CIPSTART={link_id},"TCP","{address}",{port}', timeout=5)
+                if not ok:
+                    self.dns.invalidate(host)
+                    link.open = False
+                    link.fail("Connection failed")
+                    return link
+                self._links[link_id] = link
+
+            # Early response data is routed to the link while the body goes out.
+            link.begin(HTTPResponse(sink=sink), time.monotonic() + timeout)
+            sent = self._send_request(link.id, request_sends(request, body, chunked), 1 if reused else None)
+            if sent != "sent" and not link.response.complete:
+                link.fail("Send failed")
+                self._reap()
+                if sent == "refused" and reused:
+                    # The server dropped the idle link: open a new one.
+                    continue
+            return link
+        return None
+
+    def poll(self) -> int:
+        """Handle pending UART traffic without waiting: URCs, and +IPD/CLOSED of
+        multiplexed links. Returns how many multiplexed links are busy."""
+        self._drain()
+        for link_id in list(self._pending):
+            # Passive mode: pull held data (stale data of idle links is dropped).
+            link = self._links.get(link_id)
+            if link_id is None:
+                # Single link: the next response read pulls it.
+                continue
+            if link is None:
+                self._pending.discard(link_id)
+            elif not link.busy:
+                self._pull(link_id, None)
+            elif self._pull(link_id, link.response) < 0:
+                link.fail("Bad HTTP response")
+            else:
+                self._settle(link)
+        now = time.monotonic()
+        busy = 0
+        for link in self._links.values():
+            if link.busy and now > link.deadline:
+                link.fail("HTTP timeout")
+            busy += link.busy
+        self._reap()
+        return busy
+
+    def wait(self, *links):
+        """Poll until every given link has finished its request."""
+        while True:
+            self.poll()
+            if not any(link.busy for link in links):
+                return
+            time.sleep(_POLL_S)
+
+    def start_get(self, url: str, headers: dict = None, timeout: float = 10, sink=None):
+        """Multiplexed mode: send a GET without waiting for the response.
+
+        Returns the Link carrying it (check link.done / link.result() after
+        poll() or wait()), or None when the pool or the per-host limit is full.
+        """
+        host, port, path = self._split_url(url)
+        request = self._build_request("GET", host, path, headers)
+        return self._start(host, port, request.encode(), timeout, sink)
+
+    def start_post(self, url: str, data, content_type: str = "application/octet-stream",
+                   headers: dict = None, timeout: float = 15, sink=None, length: int = None):
+        """Multiplexed mode: send a POST without waiting for the response.
+
+        See start_get() and http_post(); the body has been sent when it returns.
+        """
+        host, port, request, chunked = self._post_request(url, data, content_type, headers, length)
+        return self._start(host, port, request, timeout, sink, data, chunked)
+
+    def http_get(self, url: str, headers: dict = None, sink=None) -> tuple[int, str]:
+        """Perform HTTP GET request. Returns (status_code, body).
+
+        With a sink (a callable or an object with write()) the body is passed
+        to it piece by piece as it arrives and the returned body is empty.
+        """
+        host, port, path = self._split_url(url)
+        request = self._build_request("GET", host, path, headers)
+        return self._request(host, port, request.encode(), timeout=10, sink=sink)
+
+    def http_post(self, url: str, data, content_type: str = "application/octet-stream", headers: dict = None,
+                  sink=None, length: int = None) -> tuple[int, str]:
+        """Perform HTTP POST request. Returns (status_code, body); see http_get() for sink.
+
+        data is bytes-like, a file (read in pieces, e.g. a WAV recording) or
+        an iterable of bytes-like pieces. It goes out in AT+CIPSEND pieces of
+        at most 8192 bytes without being joined to the head or loaded whole.
+        A file or iterable is sent with Transfer-Encoding: chunked unless its
+        length is given.
+        """
+        host, port, request, chunked = self._post_request(url, data, content_type, headers, length)
+        return self._request(host, port, request, timeout=15, sink=sink, body=data, chunked=chunked)
@@ -0,0 +1,384 @@
+# EXPERIMENTAL (NON-TARGET RUNTIME): asyncio ESP-AT driver kept for reference only.
+# Awaitable ESP-AT WiFi driver for RP2350 + ESP32-WROOM
+#
+# Same AT and HTTP behaviour as wifi_at.ESPATWiFi in single-link mode (framed
+# responses, optional keep-alive, body sinks), but every wait is an await:
+# the display heartbeat and touch polling keep running during connect() and
+# HTTP calls. The UART is any stream with `async readinto(buf)`, `write(buf)`
+# and `async drain()`: asyncio.StreamReader(machine.UART) on MicroPython, or
+# UARTStream(busio.UART) on CircuitPython, whose UART has no readiness events.
+# Reads land in the same preallocated RxRing the sync client polls into.
+# Calls from several tasks are serialized by a lock.
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+from at_stream import ATStream, CLOSED, ERROR, IPD, OK, PROMPT, RxRing, SEND_FAIL, SEND_OK, status_up
+from http_stream import HTTPResponse, body_length, build_request, post_headers, request_sends, split_url
+
+# Commands worth repeating after an ERROR or a timeout.
+_RETRYABLE = ("AT", "AT+CWMODE", "AT+CWJAP", "AT+CIPSTART", "AT+CIPSEND")
+
+# Stream events handled by _route() rather than by the command waiting for its status.
+_ROUTED = (PROMPT, CLOSED, SEND_OK, SEND_FAIL)
+
+
+class UARTStream:
+    """asyncio stream over a polled UART (in_waiting/read/write)."""
+
+    def __init__(self, uart, poll_s=0.005):
+        self.uart = uart
+        self.poll_s = poll_s
+
+    async def readinto(self, buf):
+        while True:
+            waiting = self.uart.in_waiting
+            if waiting:
+                # readinto() blocks for the UART timeout if asked for more than it holds.
+                n = self.uart.readinto(buf[:waiting] if waiting < len(buf) else buf)
+                if n:
+                    return n
+            await asyncio.sleep(self.poll_s)
+
+    def write(self, buf):
+        self.uart.write(buf)
+
+    async def drain(self):
+        pass
+
+
+class AsyncESPATWiFi:
+    """ESP-AT firmware over an asyncio UART stream."""
+
+    def __init__(self, stream, debug="errors", keep_alive=False, read_size=512, rx_size=1024):
+        self.stream = stream
+        self.debug = self._normalize_debug_level(debug)
+        self.keep_alive = keep_alive
+        self.read_size = read_size
+        self._parser = ATStream()
+        # Every UART read goes into this ring (readinto, no bytes per chunk).
+        self.rx = RxRing(rx_size)
+        self._lock = asyncio.Lock()
+        self._connected = False
+        self._link = None
+        self._link_closed = False
+        self._unclosed = False      # a finished close-mode link may still be open
+        self._prompted = False
+        self._sent = None           # SEND OK (True) / SEND FAIL (False) of the last send
+        self._uploading = None      # response taking +IPD data during a send
+
+    @staticmethod
+    def _normalize_debug_level(debug):
+        if isinstance(debug, bool):
+            return "verbose" if debug else "silent"
+        if debug in ("silent", "errors", "verbose"):
+            return debug
+        return "errors"
+
+    def _log(self, level, message):
+        thresholds = {"silent": 0, "errors": 1, "verbose": 2}
+        if thresholds.get(self.debug, 1) >= thresholds[level]:
+            print(message)
+
+    async def _events(self):
+        """Wait for the next UART chunk, read into the ring, and return its parser events."""
+        rx = self.rx
+        view = rx.window(self.read_size)
+        # Full only if the events of a full ring were left unread: parse those first.
+        if len(view):
+            n = await self.stream.readinto(view)
+            if n:
+                rx.commit(n)
+        return rx.feed(self._parser)
+
+    def _route(self, kind):
+        if kind == PROMPT:
+            self._prompted = True
+        elif kind == SEND_OK or kind == SEND_FAIL:
+            self._sent = kind == SEND_OK
+        elif kind == CLOSED:
+            self._link = None
+            self._link_closed = True
+
+    # AT commands
+
+    async def send_cmd(self, cmd, timeout=2.0, max_attempts=None):
+        """Send an AT command and await its status. Returns (ok, response_text)."""
+        async with self._lock:
+            return await self._send_cmd(cmd, timeout, max_attempts)
+
+    async def _send_cmd(self, cmd, timeout=2.0, max_attempts=None):
+        attempts = max_attempts
+        if attempts is None:
+            attempts = 3 if cmd.split("=", 1)[0].rstrip("?") in _RETRYABLE else 1
+
+        text = ""
+        for attempt in range(1, attempts + 1):
+            self._parser.reset()
+            self._parser.expect_echo(cmd)
+            self._prompted = False
+            self.stream.write((cmd + "\r\n").encode())
+            await self.stream.drain()
+
+            lines = []
+            try:
+                status = await asyncio.wait_for(self._collect(lines), timeout)
+            except asyncio.TimeoutError:
+                status = None
+            text = "\r\n".join(lines)
+            if status == OK:
+                self._log("verbose", "[AT] {} -> OK".format(cmd))
+                return True, text
+
+            self._log("errors", "[AT] {} attempt {}/{} failed".format(cmd, attempt, attempts))
+            self._log("verbose", "  Response: {}".format(text))
+            if attempt < attempts:
+                await asyncio.sleep(min(0.8, 0.15 * (2 ** (attempt - 1))))
+        return False, text
+
+    async def _collect(self, lines):
+        status = None
+        while status is None:
+            # Consume the whole chunk: a ">" prompt may follow the status.
+            for kind, _link, data in await self._events():
+                if kind in _ROUTED:
+                    self._route(kind)
+                elif kind == IPD:
+                    if self._uploading is not None:
+                        # The server answered before the upload finished.
+                        try:
+                            self._uploading.feed(data)
+                        except ValueError:
+                            pass
+                elif status is None:
+                    lines.append(data.decode("utf-8", "ignore"))
+                    if kind == OK or kind == ERROR:
+                        status = kind
+        return status
+
+    async def _wait_prompt(self):
+        while not self._prompted:
+            for kind, _link, _data in await self._events():
+                if kind in _ROUTED:
+                    self._route(kind)
+
+    async def _wait_sent(self):
+        while self._sent is None:
+            for kind, _link, data in await self._events():
+                if kind in _ROUTED:
+                    self._route(kind)
+                elif kind == IPD and self._uploading is not None:
+                    try:
+                        self._uploading.feed(data)
+                    except ValueError:
+                        pass
+
+    async def _send_request(self, sends, attempts=None):
+        """AT+CIPSEND each buffer list from sends in turn; see ESPATWiFi._send_request().
+
+        Returns "sent", "refused" (the first AT+CIPSEND failed, so nothing
+        was sent) or "failed".
+        """
+        first = True
+        for parts in sends:
+            if not first:
+                try:
+                    await asyncio.wait_for(self._wait_sent(), 5.0)
+                except asyncio.TimeoutError:
+                    return "failed"
+                if not self._sent:
+                    return "failed"
+            size = sum(len(part) for part in parts)
+            ok, _ = await self._send_cmd("AT+CIPSEND={}".format(size), max_attempts=attempts if first else None)
+            if not ok:
+                return "refused" if first else "failed"
+            try:
+                await asyncio.wait_for(self._wait_prompt(), 2.0)
+            except asyncio.TimeoutError:
+                return "failed"
+            self._sent = None
+            for part in parts:
+                self.stream.write(part)
+            await self.stream.drain()
+            first = False
+        return "sent"
+
+    async def connect(self, ssid, password):
+        """Connect to WiFi network."""
+        async with self._lock:
+            ok, _ = await self._send_cmd("AT")
+            if not ok:
+                return False
+            ok, _ = await self._send_cmd("AT+CWMODE=1")
+            if not ok:
+                return False
+            await self._send_cmd("AT+CIPMUX=0")
+
+            # Connect to AP (drops any open link)
+            self._link = None
+            self._unclosed = False
+            ok, _ = await self._send_cmd('AT+CWJAP="{}","{}"'.format(ssid, password), timeout=15)
+            self._connected = ok
+            return ok
+
+    async def is_connected(self):
+        """Check if WiFi is connected."""
+        async with self._lock:
+            ok, resp = await self._send_cmd("AT+CIPSTATUS?")
+        if not ok:
+            return False
+        for line in resp.split("\r\n"):
+            if line.startswith("STATUS:"):
+                try:
+                    return status_up(int(line.split(":", 1)[1]))
+                except ValueError:
+                    continue
+        return False
+
+    # Single TCP link
+
+    async def _close_socket(self):
+        ok, _ = await self._send_cmd("AT+CIPCLOSE", timeout=2.0, max_attempts=1)
+        if not ok:
+            self._log("errors", "[AT] AT+CIPCLOSE failed during cleanup")
+
+    async def _close_link(self):
+        self._link = None
+        await self._close_socket()
+
+    async def _close_unclosed(self):
+        """Close the last close-mode link unless its CLOSED arrives shortly."""
+        if not self._unclosed:
+            return
+        self._unclosed = False
+        try:
+            await asyncio.wait_for(self._until_closed(), 0.05)
+        except asyncio.TimeoutError:
+            # The server kept the link open after a complete response.
+            await self._close_socket()
+
+    async def _until_closed(self):
+        while not self._link_closed:
+            for kind, _link, _data in await self._events():
+                if kind in _ROUTED:
+                    self._route(kind)
+
+    async def _open_link(self, host, port):
+        if self._link == (host, port):
+            return True
+        if self._link is not None:
+            await self._close_link()
+        await self._close_unclosed()
+        for _ in range(2):
+            ok, resp = await self._send_cmd('AT+CIPSTART="TCP","{}",{}'.format(host, port), timeout=5)
+            if ok:
+                self._link = (host, port)
+                return True
+            if "ALREADY CONNECTED" not in resp:
+                return False
+            # The ESP still holds a link we lost track of.
+            await self._close_socket()
+        return False
+
+    async def close(self):
+        """Close the keep-alive link, if one is open."""
+        async with self._lock:
+            if self._link is not None:
+                await self._close_link()
+            await self._close_unclosed()
+
+    async def _read_response(self, response):
+        """Feed +IPD payload into response; "complete", "closed", "dropped" or "malformed"."""
+        received = 0
+        while True:
+            outcome = None
+            for kind, _link, data in await self._events():
+                if kind == IPD and outcome is None:
+                    received += len(data)
+                    try:
+                        response.feed(data)
+                    except ValueError:
+                        outcome = "malformed"
+                    if response.complete:
+                        outcome = "complete"
+                elif kind in _ROUTED:
+                    self._route(kind)
+            if outcome is not None:
+                return outcome
+            if self._link_closed:
+                if not received:
+                    return "dropped"
+                response.finish()
+                return "closed"
+
+    async def _request(self, host, port, request, timeout, sink=None, body=None, chunked=False):
+        # A file or iterator body can only be sent once.
+        replayable = body is None or body_length(body) is not None
+        for _attempt in range(2):
+            reused = self._link == (host, port)
+            if not await self._open_link(host, port):
+                return 0, "Connection failed"
+
+            response = HTTPResponse(sink=sink)
+            self._link_closed = False
+            self._uploading = response
+            sent = await self._send_request(request_sends(request, body, chunked), 1 if reused else None)
+            self._uploading = None
+            if sent == "refused" and reused:
+                # The server dropped the idle link: reconnect and resend.
+                self._link = None
+                self._log("verbose", "[AT] link to {}:{} dropped, reconnecting".format(host, port))
+                continue
+            if sent != "sent" and not response.complete:
+                await self._close_link()
+                return 0, "Send failed"
+
+            if response.complete:
+                outcome = "complete"
+            else:
+                try:
+                    outcome = await asyncio.wait_for(self._read_response(response), timeout)
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+            if outcome == "dropped" and reused and replayable:
+                self._link = None
+                self._log("verbose", "[AT] link to {}:{} dropped, reconnecting".format(host, port))
+                continue
+            if outcome == "malformed":
+                await self._close_link()
+                return 0, "Bad HTTP response"
+            if not response.complete:
+                await self._close_link()
+                return 0, "HTTP timeout"
+            if self._link_closed:
+                self._link = None
+            elif not (self.keep_alive and response.keep_alive):
+                # The server should close the link now; checked before the next one.
+                self._link = None
+                self._unclosed = True
+            return response.status, response.body.decode("utf-8", "ignore")
+        return 0, "Connection failed"
+
+    async def http_get(self, url, headers=None, sink=None, timeout=10):
+        """Perform HTTP GET request. Returns (status_code, body); see ESPATWiFi.http_get()."""
+        host, port, path = split_url(url)
+        request = build_request("GET", host, path, self.keep_alive, headers)
+        async with self._lock:
+            return await self._request(host, port, request.encode(), timeout, sink)
+
+    async def http_post(self, url, data, content_type="application/octet-stream", headers=None,
+                        sink=None, timeout=15, length=None):
+        """Perform HTTP POST request. Returns (status_code, body); see ESPATWiFi.http_post().
+
+        data (bytes-like, a file or an iterable of pieces) goes out after the
+        head in AT+CIPSEND pieces of at most 8192 bytes, each sent once the
+        last one's SEND OK is in, without being joined to the head or loaded
+        whole.
+        """
+        host, port, path = split_url(url)
+        if length is None:
+            length = body_length(data)
+        request = build_request("POST", host, path, self.keep_alive, headers, post_headers(content_type, length))
+        async with self._lock:
+            return await self._request(host, port, request.encode(), timeout, sink, data, length is None)
@@ -7,7 +7,6 @@ This file intentionally does only three things for stabilization:
 """
 from machine import Pin, UART
 import sys
-import time
 
 # Target runtime: MicroPython
 
@@ -19,41 +18,51 @@ ESP_RX = 27  # GP27 <- ESP32 TX
 def init_display():
     """Initialize ST77916 display and draw startup status."""
     sys.path.append('/lib')
+    from boot_profile import BootProfiler
     from st77916 import ST77916
 
-    display = ST77916()
+    profiler = BootProfiler()
+    display = ST77916(profiler=profiler)
 
-    display.fill(display.BLACK)
-    display.text('Magic Orb', 130, 150, display.CYAN)
-    display.text('Runtime: MicroPython', 70, 180, display.WHITE)
-    display.text('Display: ST77916', 95, 210, display.WHITE)
-    display.text('ESP-AT UART: init...', 70, 240, display.WHITE)
-    display.show()
+    with profiler.phase('first frame'):
+        display.fill(display.BLACK)
+        display.text('Magic Orb', 130, 150, display.CYAN)
+        display.text('Runtime: MicroPython', 70, 180, display.WHITE)
+        display.text('Display: ST77916', 95, 210, display.WHITE)
+        display.text('ESP-AT UART: init...', 70, 240, display.WHITE)
+        display.show()
+    print(profiler.report())
     return display
 
 
 def init_esp_at_uart():
-    """Initialize UART for ESP32 ESP-AT module."""
+    """Initialize UART for ESP32 ESP-AT module; returns (transport, probe reply)."""
+    from at_transport import ATTransport
+
     uart = UART(0, baudrate=115200, tx=Pin(ESP_TX), rx=Pin(ESP_RX))
-    # Probe once so boot logs show basic health signal
-    uart.write(b'AT\r\n')
-    time.sleep_ms(200)
-    return uart
+    at = ATTransport(uart)
+    # Probe once so boot logs show basic health signal; returns on the reply.
+    reply = at.command('AT', 500)
+    print('[boot] ESP-AT probe: {} in {}ms'.format(reply.status or 'no response', reply.ms))
+    return at, reply
 
 
-def show_ready(display):
+def show_ready(display, esp_ok=True):
     """Update display with stabilized boot status."""
     display.fill(display.BLACK)
     display.text('Magic Orb', 130, 150, display.CYAN)
     display.text('Display: ST77916 OK', 85, 185, display.GREEN)
-    display.text('ESP-AT UART: OK', 95, 210, display.GREEN)
+    if esp_ok:
+        display.text('ESP-AT UART: OK', 95, 210, display.GREEN)
+    else:
+        display.text('ESP-AT UART: no reply', 70, 210, display.RED)
     display.show()
 
 
 def main():
     display = init_display()
-    _uart = init_esp_at_uart()
-    show_ready(display)
+    _at, probe = init_esp_at_uart()
+    show_ready(display, probe.ok)
     print('Magic Orb Phase 0 boot complete (MicroPython, ST77916).')
 
 
@@ -11,6 +11,7 @@ from hardware_profile import (
 )
 
 sys.path.append('/lib')
+from at_transport import ATTransport
 from st77916 import ST77916
 
 # ============================================================
@@ -43,39 +44,36 @@ display.text("Stage C running", 110, 170, display.WHITE)
 display.show()
 
 uart = UART(ESP_UART_ID, baudrate=ESP_UART_BAUDRATE, tx=Pin(ESP_TX), rx=Pin(ESP_RX))
+at = ATTransport(uart)
 
 
-def at_cmd(cmd, timeout_ms=2000):
-    while uart.any():
-        uart.read()
-    uart.write((cmd + "\r\n").encode())
-    time.sleep_ms(timeout_ms)
-    response = b""
-    while uart.any():
-        response += uart.read()
-    return response.decode("utf-8", errors="ignore")
+def at_cmd(cmd, timeout_ms=2000, prompt=False):
+    """Send cmd, wait for its final reply (timeout_ms at most) and log the latency."""
+    reply = at.command(cmd, timeout_ms, prompt)
+    print(f"  {cmd.split('=', 1)[0]}: {reply.status or 'timeout'} in {reply.ms}ms")
+    return reply
 
 
 print("\n[Stage C] Probing AT channel...")
 resp = at_cmd("AT", 600)
-if "OK" not in resp:
-    raise RuntimeError(f"no AT response: {resp[:120] if resp else 'empty'}")
+if not resp.ok:
+    raise RuntimeError(f"no AT response: {resp.text[:120] or 'empty'}")
 print("✓ ESP-AT responded")
 
 print("\n[Stage C] Connecting WiFi...")
-if "OK" not in at_cmd("AT+CWMODE=1", 1000):
+if not at_cmd("AT+CWMODE=1", 1000).ok:
     raise RuntimeError("no AT response while setting station mode")
 resp = at_cmd(f'AT+CWJAP="{WIFI_SSID}","{WIFI_PASS}"', 15000)
-if "OK" not in resp and "WIFI GOT IP" not in resp:
-    raise RuntimeError(f"wifi join fail: {resp[:160] if resp else 'empty'}")
+if not resp.ok and "WIFI GOT IP" not in resp.lines:
+    raise RuntimeError(f"wifi join fail: {resp.text[:160] or 'empty'}")
 print("✓ WiFi joined")
 
 print("\n[Stage C] Running HTTP GET over TCP...")
-if "OK" not in at_cmd("AT+CIPMUX=0", 800):
+if not at_cmd("AT+CIPMUX=0", 800).ok:
     raise RuntimeError("tcp setup fail: CIPMUX")
 resp = at_cmd(f'AT+CIPSTART="TCP","{HTTP_HOST}",80', 7000)
-if "OK" not in resp and "CONNECT" not in resp:
-    raise RuntimeError(f"tcp connect fail: {resp[:160] if resp else 'empty'}")
+if not resp.ok and "CONNECT" not in resp.lines:
+    raise RuntimeError(f"tcp connect fail: {resp.text[:160] or 'empty'}")
 
 request = (
     f"GET {HTTP_PATH} HTTP/1.1\r\n"
@@ -83,34 +81,25 @@ request = (
     "Connection: close\r\n"
     "\r\n"
 )
-resp = at_cmd(f"AT+CIPSEND={len(request)}", 2000)
-if ">" not in resp and "OK" not in resp:
-    raise RuntimeError(f"send prompt fail: {resp[:160] if resp else 'empty'}")
-
-uart.write(request.encode())
-time.sleep_ms(3500)
-raw = b""
-while uart.any():
-    raw += uart.read()
-http_blob = raw.decode("utf-8", errors="ignore")
-
-status_code = None
-for line in http_blob.split("\r\n"):
-    if line.startswith("HTTP/1.1") or line.startswith("HTTP/1.0"):
-        parts = line.split(" ")
-        if len(parts) >= 2 and parts[1].isdigit():
-            status_code = int(parts[1])
-        break
-
-if status_code is None:
-    raise RuntimeError(f"HTTP status parse fail: {http_blob[:200] if http_blob else 'empty'}")
+resp = at_cmd(f"AT+CIPSEND={len(request)}", 2000, prompt=True)
+if not resp.ok:
+    raise RuntimeError(f"send prompt fail: {resp.text[:160] or 'empty'}")
+
+http_start_ms = time.ticks_ms()
+resp, response = at.send_http(request.encode(), 10000)
+http_ms = time.ticks_diff(time.ticks_ms(), http_start_ms)
+print(f"  HTTP response: {'complete' if response.complete else 'incomplete'} in {http_ms}ms")
+status_code = response.status
+if not status_code:
+    raise RuntimeError(f"HTTP status parse fail: {resp.status or 'no SEND OK'}, {response.body[:200] or 'empty'}")
 
 print(f"✓ HTTP status parsed: {status_code}")
-at_cmd("AT+CIPCLOSE", 800)
+if not at.link_closed:
+    at_cmd("AT+CIPCLOSE", 800)
 
 display.fill(display.BLACK)
 display.text("Stage C PASS", 120, 160, display.GREEN)
 display.text(f"HTTP {status_code}", 130, 190, display.WHITE)
 display.show()
 
-print("\n✓ Stage C PASS")
+print(f"\n✓ Stage C PASS in {time.ticks_diff(time.ticks_ms(), start_ms)}ms")
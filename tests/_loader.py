@@ -0,0 +1,34 @@
+"""Module loading shared by the host tests.
+
+lib/ modules are loaded from their files, as the board imports them from
+/lib, with lib/ on sys.path for their own imports (damage, at_stream, ...).
+host/ holds the CPython stand-ins (framebuf, machine, rp2) and simulators.
+"""
+import importlib.util
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+LIB = ROOT / "lib"
+HOST = ROOT / "host"
+
+
+def add_paths(*paths):
+    """Put each directory on sys.path once."""
+    for path in paths:
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_lib_module(name):
+    """A fresh copy of lib/<name>.py."""
+    add_paths(LIB)
+    return load_module(name, LIB / (name + ".py"))
@@ -0,0 +1,233 @@
+import unittest
+
+from _loader import load_lib_module
+
+at_stream = load_lib_module("at_stream")
+
+HTTP = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello"
+CAPTURE = (
+    b"AT+CIPSEND=18\r\n\r\nOK\r\n> "
+    b"\r\nRecv 18 bytes\r\n\r\nSEND OK\r\n\r\n"
+    b"+IPD," + str(len(HTTP)).encode() + b":" + HTTP + b"\r\n"
+    b"+IPD,2,4:ab\r\n\r\nCLOSED\r\n2,CLOSED\r\n"
+)
+PASSIVE = (
+    b"\r\n+IPD,1,40\r\nAT+CIPRECVDATA=1,17\r\n"
+    b"+CIPRECVDATA:17,HTTP/1.1 200 OK\r\n\r\nOK\r\n"
+    b"+CIPRECVDATA:0,\r\nOK\r\n+IPD,7\r\n"
+)
+
+
+class BoardBytearray(bytearray):
+    """bytearray as MicroPython has it: no str-like search methods."""
+
+    def __getattribute__(self, name):
+        if name in ("find", "rfind", "index", "startswith", "endswith", "split", "strip"):
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
+def events(chunks, command=None):
+    stream = at_stream.ATStream()
+    stream.expect_echo(command)
+    out = []
+    for chunk in chunks:
+        for kind, link, data in stream.feed(chunk):
+            out.append((kind, link, None if data is None else bytes(data)))
+    for kind, link, data in stream.flush():
+        out.append((kind, link, bytes(data)))
+    return out
+
+
+def merged(evts):
+    """Join consecutive payload slices of the same link into one event."""
+    out = []
+    for kind, link, data in evts:
+        if kind in (at_stream.IPD, at_stream.RECV_DATA) and out and out[-1][:2] == (kind, link):
+            out[-1] = (kind, link, out[-1][2] + data)
+        else:
+            out.append((kind, link, data))
+    return out
+
+
+class ATStreamTests(unittest.TestCase):
+    def test_emits_typed_events(self):
+        self.assertEqual(merged(events([CAPTURE], "AT+CIPSEND=18")), [
+            (at_stream.ECHO, None, b"AT+CIPSEND=18"),
+            (at_stream.OK, None, b"OK"),
+            (at_stream.PROMPT, None, None),
+            (at_stream.LINE, None, b"Recv 18 bytes"),
+            (at_stream.SEND_OK, None, b"SEND OK"),
+            (at_stream.IPD, None, HTTP),
+            (at_stream.IPD, 2, b"ab\r\n"),
+            (at_stream.CLOSED, None, b"CLOSED"),
+            (at_stream.CLOSED, 2, b"2,CLOSED"),
+        ])
+
+    def test_any_chunking_gives_the_same_events(self):
+        whole = merged(events([CAPTURE], "AT+CIPSEND=18"))
+        for size in (1, 2, 3, 7, 64):
+            chunks = [CAPTURE[i:i + size] for i in range(0, len(CAPTURE), size)]
+            with self.subTest(size=size):
+                self.assertEqual(merged(events(chunks, "AT+CIPSEND=18")), whole)
+
+    def test_passive_mode_notices_and_recv_data(self):
+        expected = [
+            (at_stream.IPD_NOTICE, 1, b"+IPD,1,40"),
+            (at_stream.ECHO, None, b"AT+CIPRECVDATA=1,17"),
+            (at_stream.RECV_DATA, None, b"HTTP/1.1 200 OK\r\n"),
+            (at_stream.OK, None, b"OK"),
+            (at_stream.OK, None, b"OK"),
+            (at_stream.IPD_NOTICE, None, b"+IPD,7"),
+        ]
+        for size in (1, 2, 5, len(PASSIVE)):
+            chunks = [PASSIVE[i:i + size] for i in range(0, len(PASSIVE), size)]
+            with self.subTest(size=size):
+                self.assertEqual(merged(events(chunks, "AT+CIPRECVDATA=1,17")), expected)
+
+    def test_payload_slices_are_views_of_the_fed_buffer(self):
+        data = bytearray(b"+IPD,3:xyzOK\r\n")
+        stream = at_stream.ATStream()
+        kind, link, view = next(stream.feed(data))
+        self.assertEqual(kind, at_stream.IPD)
+        self.assertIsInstance(view, memoryview)
+        data[7] = ord("X")
+        self.assertEqual(bytes(view), b"Xyz")
+
+    def test_feeds_a_sub_range(self):
+        data = b"junkERROR\r\njunk"
+        self.assertEqual(list(at_stream.ATStream().feed(data, 4, 11)), [(at_stream.ERROR, None, b"ERROR")])
+
+    def test_ipd_with_bad_length_is_a_line(self):
+        self.assertEqual(events([b"+IPD,x:abc\r\n"]), [(at_stream.LINE, None, b"+IPD,x:abc")])
+
+    def test_parses_a_bytearray_without_search_methods(self):
+        whole = merged(events([CAPTURE], "AT+CIPSEND=18"))
+        for size in (5, len(CAPTURE)):
+            chunks = [BoardBytearray(CAPTURE[i:i + size]) for i in range(0, len(CAPTURE), size)]
+            with self.subTest(size=size):
+                self.assertEqual(merged(events(chunks, "AT+CIPSEND=18")), whole)
+        self.assertEqual(merged(events([BoardBytearray(PASSIVE)], "AT+CIPRECVDATA=1,17"))[2],
+                         (at_stream.RECV_DATA, None, b"HTTP/1.1 200 OK\r\n"))
+
+    def test_long_lines_are_truncated(self):
+        stream = at_stream.ATStream(max_line=8)
+        self.assertEqual(list(stream.feed(b"0123456789abcdef\r\nOK\r\n")), [
+            (at_stream.LINE, None, b"01234567"),
+            (at_stream.OK, None, b"OK"),
+        ])
+
+
+class ATReplyTests(unittest.TestCase):
+    def test_indexes_the_same_lines_and_payload_as_the_stream(self):
+        reply = at_stream.ATReply().parse(CAPTURE, command=b"AT+CIPSEND=18")
+        lines = [data for kind, _link, data in events([CAPTURE], "AT+CIPSEND=18")
+                 if kind not in (at_stream.ECHO, at_stream.IPD, at_stream.PROMPT)]
+        self.assertEqual([bytes(reply.line(k)) for k in range(reply.line_count)], lines)
+        self.assertEqual((reply.status, reply.status_index, reply.sent), (at_stream.OK, 0, at_stream.SEND_OK))
+        self.assertTrue(reply.echo and reply.prompt)
+        self.assertEqual(reply.payload(), HTTP + b"ab\r\n")
+        self.assertEqual((reply.span_count, reply.payload_length), (2, len(HTTP) + 4))
+        self.assertEqual(reply.text(1), "Recv 18 bytes")
+
+    def test_views_the_callers_buffer_and_is_reusable(self):
+        buf = bytearray(b"xxAT\r\nSTATUS:2\r\n\r\nOK\r\n")
+        reply = at_stream.ATReply(max_lines=1)
+        reply.parse(buf, start=2, command=b"AT")
+        line = reply.line(0)
+        buf[13] = ord("3")
+        self.assertEqual(bytes(line), b"STATUS:3")
+        # The status line did not fit the one-line table, but still counts.
+        self.assertEqual((reply.status, reply.status_index, reply.dropped), (at_stream.OK, -1, 1))
+        reply.parse(b"+IPD,1,40\r\nERROR")
+        self.assertEqual((reply.line_count, reply.text(0), reply.status, reply.span_count, reply.dropped),
+                         (1, "+IPD,1,40", at_stream.ERROR, 0, 1))
+
+    def test_value_reads_the_number_after_a_prefix(self):
+        reply = at_stream.ATReply().parse(b"STATUS:3\n+CIPSTATUS:0,\"TCP\"\nSTATUS\nOK\n")
+        self.assertEqual(reply.value(b"STATUS:"), 3)
+        self.assertEqual(reply.value(b"+CIPSTATUS:"), -1)
+        self.assertEqual(reply.value(b"+CWMODE:"), -1)
+        self.assertEqual([at_stream.status_up(code) for code in range(6)], [False, False, True, True, True, False])
+
+    def test_parses_a_bytearray_without_search_methods(self):
+        reply = at_stream.ATReply().parse(BoardBytearray(CAPTURE), command=b"AT+CIPSEND=18")
+        expected = at_stream.ATReply().parse(CAPTURE, command=b"AT+CIPSEND=18")
+        self.assertEqual([bytes(reply.line(k)) for k in range(reply.line_count)],
+                         [bytes(expected.line(k)) for k in range(expected.line_count)])
+        self.assertEqual((reply.status, reply.sent, reply.echo, reply.payload()),
+                         (at_stream.OK, at_stream.SEND_OK, True, HTTP + b"ab\r\n"))
+        status = at_stream.ATReply().parse(BoardBytearray(b"STATUS:3\r\n\r\nOK\r\n"))
+        self.assertEqual(status.value(b"STATUS:"), 3)
+
+
+class HeldUART:
+    """machine.UART-like port holding whatever was put() into it."""
+
+    def __init__(self):
+        self.held = bytearray()
+
+    def put(self, data):
+        self.held += data
+
+    def any(self):
+        return len(self.held)
+
+    def readinto(self, buf):
+        n = min(len(buf), len(self.held))
+        buf[:n] = self.held[:n]
+        del self.held[:n]
+        return n or None
+
+
+class RxRingTests(unittest.TestCase):
+    def test_wrapping_windows_parse_like_whole_chunks(self):
+        ring = at_stream.RxRing(64)
+        uart = HeldUART()
+        stream = at_stream.ATStream()
+        stream.expect_echo("AT+CIPSEND=18")
+        out = []
+        for i in range(0, len(CAPTURE), 23):
+            uart.put(CAPTURE[i:i + 23])
+            while ring.fill(uart):
+                out.extend((kind, link, None if data is None else bytes(data))
+                           for kind, link, data in ring.feed(stream))
+        self.assertEqual(merged(out), merged(events([CAPTURE], "AT+CIPSEND=18")))
+        self.assertEqual((ring.received, len(ring), ring.high_water, ring.overflows), (len(CAPTURE), 0, 23, 0))
+
+    def test_ring_buffer_needs_no_search_methods(self):
+        ring = at_stream.RxRing(64)
+        ring.buf = BoardBytearray(64)
+        ring._mv = memoryview(ring.buf)
+        uart = HeldUART()
+        uart.put(CAPTURE)
+        stream = at_stream.ATStream()
+        stream.expect_echo("AT+CIPSEND=18")
+        out = []
+        while ring.fill(uart):
+            out.extend((kind, link, None if data is None else bytes(data)) for kind, link, data in ring.feed(stream))
+        self.assertEqual(merged(out), merged(events([CAPTURE], "AT+CIPSEND=18")))
+
+    def test_counts_overflow_and_keeps_the_excess_in_the_uart(self):
+        ring = at_stream.RxRing(16)
+        uart = HeldUART()
+        uart.put(b"+IPD,30:" + bytes(range(30)) + b"\r\nOK\r\n")
+        self.assertEqual(ring.fill(uart), 16)
+        self.assertEqual((len(ring), ring.high_water, ring.overflows, len(uart.held)), (16, 16, 1, 28))
+        stream = at_stream.ATStream()
+        payload = b""
+        kinds = []
+        while True:
+            for kind, _link, data in ring.feed(stream):
+                kinds.append(kind)
+                if kind == at_stream.IPD:
+                    payload += data
+            if not ring.fill(uart):
+                break
+        self.assertEqual(payload, bytes(range(30)))
+        self.assertEqual(kinds[-1], at_stream.OK)
+        self.assertEqual((ring.received, ring.overflows), (44, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
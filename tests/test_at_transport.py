@@ -0,0 +1,108 @@
+import time
+import unittest
+
+from _loader import HOST, LIB, add_paths, load_lib_module
+
+add_paths(LIB, HOST)
+
+import machine  # noqa: E402
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+
+at_transport = load_lib_module("at_transport")
+
+
+def wall_ticks():
+    return {
+        "ticks_ms": lambda: int(time.monotonic() * 1000),
+        "ticks_diff": lambda a, b: a - b,
+        "sleep_ms": lambda ms: time.sleep(ms / 1000),
+    }
+
+
+class SilentUART:
+    """A machine.UART-like port nobody answers on."""
+
+    def __init__(self):
+        self.written = []
+
+    def any(self):
+        return 0
+
+    def read(self):
+        return None
+
+    def write(self, buf):
+        self.written.append(bytes(buf))
+
+
+class ATTransportTests(unittest.TestCase):
+    def setUp(self):
+        self.sim = ESPATSimulator(baudrate=115200, connect_ms=150)
+        self.addCleanup(self.sim.close)
+        self.at = at_transport.ATTransport(self.sim.uart, **wall_ticks())
+
+    def test_returns_on_the_final_status(self):
+        reply = self.at.command("AT+GMR", 1000)
+        self.assertTrue(reply.ok)
+        self.assertIn("SDK version:v4.2 (host)", reply.lines)
+        self.assertLess(reply.ms, 100)
+        reply = self.at.command("AT+NOPE", 1000)
+        self.assertEqual(reply.status, at_transport.ERROR)
+        self.assertLess(reply.ms, 100)
+
+    def test_stale_output_does_not_answer_the_command(self):
+        self.sim.lose_ap()
+        time.sleep(0.01)
+        reply = self.at.command("AT", 600)
+        self.assertTrue(reply.ok)
+        self.assertEqual(reply.lines, [])
+
+    def test_http_exchange(self):
+        with LocalHTTPServer() as server:
+            self.assertTrue(self.at.command("AT+CIPMUX=0", 800).ok)
+            start = time.monotonic()
+            reply = self.at.command('AT+CIPSTART="TCP","{}",{}'.format(server.host, server.port), 7000)
+            self.assertTrue(reply.ok)
+            self.assertLess(reply.ms, 400)
+            request = "GET /hold HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n".encode()
+            self.assertEqual(self.at.command("AT+CIPSEND={}".format(len(request)), 2000, prompt=True).status,
+                             at_transport.PROMPT)
+            reply, response = self.at.send_http(request, 10000)
+            self.assertEqual(reply.status, at_transport.SEND_OK)
+            self.assertEqual((response.complete, response.status, response.body), (True, 200, b"held"))
+            # /hold keeps the link open for 1 s; the framed response ends the wait.
+            self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_machine_uart_plug_in_and_join_timing(self):
+        sim = ESPATSimulator(baudrate=115200, join_ms=300, ap=("ssid", "password"))
+        self.addCleanup(sim.close)
+        machine.reset()
+        machine.attach_uart(0, sim.uart)
+        self.addCleanup(machine.reset)
+        at = at_transport.ATTransport(machine.UART(0, baudrate=115200), **wall_ticks())
+        reply = at.command('AT+CWJAP="ssid","wrong"', 15000)
+        self.assertEqual((reply.status, reply.lines), (at_transport.ERROR, ["+CWJAP:2"]))
+        reply = at.command('AT+CWJAP="ssid","password"', 15000)
+        self.assertTrue(reply.ok)
+        self.assertEqual(reply.lines, ["WIFI CONNECTED", "WIFI GOT IP"])
+        self.assertGreaterEqual(reply.ms, 300)
+        self.assertLess(reply.ms, 500)
+        self.assertIn("STATUS:2", at.command("AT+CIPSTATUS", 1000).lines)
+
+    def test_timeout_on_a_silent_uart(self):
+        now = [0]
+
+        def sleep_ms(ms):
+            now[0] += ms
+
+        uart = SilentUART()
+        at = at_transport.ATTransport(uart, ticks_ms=lambda: now[0], ticks_diff=lambda a, b: a - b,
+                                      sleep_ms=sleep_ms)
+        reply = at.command("AT", 600)
+        self.assertEqual((reply.status, reply.ok, reply.ms), (None, False, 600))
+        self.assertEqual(uart.written, [b"AT\r\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
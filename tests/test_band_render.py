@@ -0,0 +1,185 @@
+import unittest
+
+from _loader import load_lib_module
+
+band_render = load_lib_module("band_render")
+
+
+class GridFrameBuffer:
+    """Clipping subset of framebuf.FrameBuffer over a list-of-rows canvas."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rows = [[0] * width for _ in range(height)]
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(0, y), min(self.height, y + h)):
+            for xx in range(max(0, x), min(self.width, x + w)):
+                self.rows[yy][xx] = c
+
+    def pixel(self, x, y, c):
+        self.fill_rect(x, y, 1, 1, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=1):
+        # One 6x8 box per glyph is enough to check band translation.
+        for i in range(len(s)):
+            self.fill_rect(x + 8 * i + 1, y, 6, 8, c)
+
+
+class PanelRecorder:
+    def __init__(self, band, width, height):
+        self.band = band
+        self.image = [[None] * width for _ in range(height)]
+        self.bands = []
+
+    def write_band(self, top, rows):
+        self.bands.append((top, rows))
+        for r in range(rows):
+            self.image[top + r] = list(self.band.rows[r])
+
+
+def draw_scene(surface):
+    surface.fill(3)
+    surface.fill_rect(5, 2, 20, 17, 7)
+    surface.rect(1, 9, 30, 12, 9)
+    surface.hline(0, 23, 32, 4)
+    surface.vline(30, 0, 24, 5)
+    surface.pixel(2, 15, 1)
+    surface.text("ab", 4, 13, 8)
+
+
+class BandRendererTests(unittest.TestCase):
+    WIDTH = 32
+    HEIGHT = 24
+    ROWS = 5
+
+    def setUp(self):
+        self.band = GridFrameBuffer(self.WIDTH, self.ROWS)
+        self.panel = PanelRecorder(self.band, self.WIDTH, self.HEIGHT)
+        self.renderer = band_render.BandRenderer(self.band, self.WIDTH, self.HEIGHT, self.ROWS, self.panel.write_band)
+
+    def test_banded_output_matches_a_full_framebuffer(self):
+        full = GridFrameBuffer(self.WIDTH, self.HEIGHT)
+        draw_scene(full)
+        draw_scene(self.renderer)
+
+        self.assertEqual(self.renderer.render(), 5)
+        self.assertEqual(self.panel.image, full.rows)
+        self.assertEqual(self.panel.bands, [(0, 5), (5, 5), (10, 5), (15, 5), (20, 4)])
+
+    def test_only_bands_touched_since_last_render_are_sent(self):
+        draw_scene(self.renderer)
+        self.renderer.render()
+        self.panel.bands = []
+
+        self.renderer.fill_rect(0, 6, 4, 5, 2)
+        self.assertTrue(self.renderer.dirty)
+        self.assertEqual(self.renderer.render(), 2)
+        self.assertEqual(self.panel.bands, [(5, 5), (10, 5)])
+        self.assertEqual(self.panel.image[6][0], 2)
+        # The rest of band 1 is replayed from the retained list.
+        self.assertEqual(self.panel.image[6][10], 7)
+        self.assertFalse(self.renderer.dirty)
+
+    def test_fill_starts_a_new_display_list(self):
+        draw_scene(self.renderer)
+        self.renderer.fill(0)
+
+        self.assertEqual(len(self.renderer), 1)
+
+    def test_offscreen_calls_are_not_recorded(self):
+        self.renderer.fill_rect(0, 30, 5, 5, 1)
+        self.renderer.hline(0, -1, 5, 1)
+
+        self.assertEqual(len(self.renderer), 0)
+        self.assertFalse(self.renderer.dirty)
+
+    def test_poly_and_line_mark_their_row_span(self):
+        self.renderer.poly(0, 10, [0, 0, 5, 4, 2, 1], 1)
+        self.renderer.line(0, 22, 3, 20, 1)
+
+        self.assertEqual(list(self.renderer._dirty), [0, 0, 1, 0, 1])
+
+    def test_heartbeat_frames_keep_the_display_list_bounded(self):
+        draw_scene(self.renderer)
+        self.renderer.render()
+        start = len(self.renderer)
+
+        for frame in range(500):
+            self.renderer.fill_rect(12, 18, 4, 4, frame & 1)
+            self.renderer.render()
+
+        self.assertEqual(len(self.renderer), start + 1)
+        self.assertEqual(self.renderer.overflows, 0)
+
+    def test_covered_commands_are_dropped_without_changing_the_image(self):
+        full = GridFrameBuffer(self.WIDTH, self.HEIGHT)
+        for surface in (full, self.renderer):
+            draw_scene(surface)
+            surface.text("x", 8, 4, 2)
+            surface.pixel(10, 6, 2)
+            surface.fill_rect(6, 3, 12, 10, 6)
+        self.renderer.render()
+
+        self.assertEqual(len(self.renderer), 8)
+        self.assertEqual(self.panel.image, full.rows)
+
+    def test_overflow_redraws_the_whole_screen_on_render(self):
+        redraws = []
+
+        def redraw():
+            redraws.append(1)
+            draw_scene(self.renderer)
+
+        renderer = band_render.BandRenderer(self.band, self.WIDTH, self.HEIGHT, self.ROWS, self.panel.write_band,
+                                            max_commands=16, redraw=redraw)
+        self.renderer = renderer
+        draw_scene(renderer)
+        renderer.render()
+        for i in range(20):
+            renderer.pixel(i, 0, 1)
+
+        self.assertEqual(renderer.overflows, 1)
+        self.assertEqual(len(renderer), 0)
+        self.assertEqual(renderer.render(), 5)
+        full = GridFrameBuffer(self.WIDTH, self.HEIGHT)
+        draw_scene(full)
+        self.assertEqual((redraws, self.panel.image), ([1], full.rows))
+
+    def test_overflow_without_a_redraw_hook_raises(self):
+        renderer = band_render.BandRenderer(self.band, self.WIDTH, self.HEIGHT, self.ROWS, self.panel.write_band,
+                                            max_commands=4)
+        renderer.fill(0)
+        for i in range(3):
+            renderer.pixel(i, 0, 1)
+        with self.assertRaises(RuntimeError):
+            renderer.pixel(5, 0, 1)
+
+    def test_pixel_reads_and_scroll_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.renderer.pixel(0, 0)
+        with self.assertRaises(ValueError):
+            self.renderer.scroll(0, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
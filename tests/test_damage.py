@@ -0,0 +1,90 @@
+import unittest
+
+from _loader import HOST, add_paths, load_lib_module
+
+add_paths(HOST)
+
+import framebuf  # noqa: E402
+
+damage = load_lib_module("damage")
+DamageTracker = damage.DamageTracker
+
+
+class Surface(damage.DamageMixin, framebuf.FrameBuffer):
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._damage = DamageTracker(width, height)
+        super().__init__(bytearray(width * height * 2), width, height, framebuf.RGB565)
+
+
+class DamageTrackerTests(unittest.TestCase):
+    def test_clips_to_screen_and_drops_empty_regions(self):
+        t = DamageTracker(360, 360)
+        t.add(-10, 350, 40, 40)
+        t.add(400, 10, 5, 5)
+
+        self.assertEqual(t.take(), [(0, 350, 30, 10)])
+        self.assertFalse(t.dirty)
+
+    def test_merges_overlapping_and_adjacent_rects(self):
+        t = DamageTracker(360, 360)
+        t.add(80, 260, 200, 24)
+        t.add(118, 266, 120, 8)  # text inside the cleared strip
+        t.add(80, 284, 200, 4)  # directly below
+
+        self.assertEqual(t.rects(), [(80, 260, 200, 28)])
+
+    def test_keeps_distant_rects_separate(self):
+        t = DamageTracker(360, 360)
+        t.add(164, 300, 32, 32)
+        t.add(80, 20, 16, 8)
+
+        self.assertEqual(sorted(t.rects()), [(80, 20, 16, 8), (164, 300, 32, 32)])
+        self.assertEqual(t.area(), 32 * 32 + 16 * 8)
+
+    def test_caps_rect_count_by_merging_cheapest_pair(self):
+        t = DamageTracker(360, 360, max_rects=2, merge_slack=0)
+        t.add(0, 0, 8, 8)
+        t.add(20, 0, 8, 8)
+        t.add(300, 300, 8, 8)
+
+        self.assertEqual(sorted(t.rects()), [(0, 0, 28, 8), (300, 300, 8, 8)])
+
+    def test_full_damage_absorbs_later_regions(self):
+        t = DamageTracker(360, 360)
+        t.add_full()
+        t.add(10, 10, 5, 5)
+
+        self.assertEqual(t.take(), [(0, 0, 360, 360)])
+
+    def test_bbox_accepts_unordered_corners(self):
+        t = DamageTracker(360, 360)
+        t.bbox(20, 30, 10, 5)
+
+        self.assertEqual(t.rects(), [(10, 5, 11, 26)])
+
+
+
+class DamageMixinTests(unittest.TestCase):
+    def test_drawing_calls_damage_their_bounding_boxes(self):
+        surface = Surface(100, 100)
+        surface.text("hi", 10, 20, 0xFFFF)
+        surface.line(60, 70, 50, 60, 0xFFFF)
+        self.assertEqual(sorted(surface._damage.take()), [(10, 20, 16, 8), (50, 60, 11, 11)])
+
+    def test_blit_damages_the_sprite_when_its_size_is_known(self):
+        surface = Surface(100, 100)
+        sprite_buf = bytearray(8 * 4 * 2)
+        sprite = framebuf.FrameBuffer(sprite_buf, 8, 4, framebuf.RGB565)
+        surface.blit(sprite, 30, 40, w=8, h=4)
+        self.assertEqual(surface._damage.take(), [(30, 40, 8, 4)])
+        surface.blit((sprite_buf, 8, 4, framebuf.RGB565), 5, 6)
+        self.assertEqual(surface._damage.take(), [(5, 6, 8, 4)])
+        # A FrameBuffer does not know its size: the whole screen is redrawn.
+        surface.blit(sprite, 30, 40)
+        self.assertEqual(surface._damage.take(), [(0, 0, 100, 100)])
+
+
+if __name__ == "__main__":
+    unittest.main()
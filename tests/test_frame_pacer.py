@@ -0,0 +1,107 @@
+import unittest
+
+from _loader import load_lib_module
+
+FramePacer = load_lib_module("frame_pacer").FramePacer
+
+TE_PERIOD_US = 16_667
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def ticks_us(self):
+        return self.now
+
+    @staticmethod
+    def ticks_diff(a, b):
+        return a - b
+
+
+class FramePacerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.presents = []
+        self.in_flight = False
+        self.pacer = FramePacer(
+            present=lambda: self.presents.append(self.clock.now),
+            busy=lambda: self.in_flight,
+            ticks_us=self.clock.ticks_us,
+            ticks_diff=self.clock.ticks_diff,
+        )
+
+    def vsync(self):
+        self.clock.now += TE_PERIOD_US
+        self.pacer.on_te()
+        self.pacer.poll()
+
+    def test_presents_only_on_te_edge(self):
+        self.pacer.request()
+        self.pacer.poll()
+        self.assertEqual(self.presents, [])
+
+        self.vsync()
+        self.assertEqual(self.presents, [TE_PERIOD_US])
+
+    def test_te_irq_only_records_the_edge(self):
+        self.pacer.request()
+        self.clock.now += TE_PERIOD_US
+        self.pacer.on_te()
+        self.assertEqual(self.presents, [])
+        self.assertEqual(self.pacer.stats()["vsyncs"], 1)
+
+        self.clock.now += 500
+        self.pacer.poll()
+        self.assertEqual(self.presents, [TE_PERIOD_US + 500])
+        self.pacer.request()
+        self.pacer.poll()
+        self.assertEqual(len(self.presents), 1)
+
+    def test_coalesces_requests_within_one_refresh(self):
+        for _ in range(5):
+            self.pacer.request()
+        self.vsync()
+        self.vsync()
+
+        self.assertEqual(len(self.presents), 1)
+        self.assertEqual(self.pacer.stats()["coalesced"], 4)
+
+    def test_counts_missed_vsyncs_while_previous_frame_streams(self):
+        self.pacer.request()
+        self.vsync()
+        self.pacer.request()
+        self.in_flight = True
+        self.vsync()
+        self.vsync()
+        self.in_flight = False
+        self.vsync()
+
+        stats = self.pacer.stats()
+        self.assertEqual(stats["frames"], 2)
+        self.assertEqual(stats["missed_vsyncs"], 2)
+        self.assertEqual(stats["frame_time_avg_us"], 3 * TE_PERIOD_US)
+        self.assertEqual(stats["te_period_us"], TE_PERIOD_US)
+
+    def test_steady_animation_has_steady_frame_time(self):
+        for _ in range(10):
+            self.pacer.request()
+            self.vsync()
+
+        stats = self.pacer.stats()
+        self.assertEqual(stats["frames"], 10)
+        self.assertEqual(stats["frame_time_min_us"], TE_PERIOD_US)
+        self.assertEqual(stats["frame_time_max_us"], TE_PERIOD_US)
+        self.assertEqual(stats["missed_vsyncs"], 0)
+
+    def test_falls_back_to_timeout_without_te(self):
+        self.pacer.request()
+        self.clock.now += 60_000
+        self.pacer.poll()
+
+        self.assertEqual(len(self.presents), 1)
+        self.assertEqual(self.pacer.stats()["te_timeouts"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
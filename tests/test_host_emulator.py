@@ -0,0 +1,215 @@
+import pathlib
+import tracemalloc
+import unittest
+
+from _loader import HOST, load_module
+
+emulator = load_module("emulator", HOST / "emulator.py")
+
+
+def init_commands():
+    from st77916_init import init_stream
+
+    stream = init_stream()
+    commands = []
+    i = 0
+    while i < len(stream):
+        cmd, flags = stream[i], stream[i + 1]
+        count = flags & 0x7F
+        commands.append((cmd, bytes(stream[i + 2:i + 2 + count])))
+        i += 2 + count + (1 if flags & 0x80 else 0)
+    return commands
+
+
+def switch_peak(display, first, second):
+    """Heap peak while display switches first -> second (only buffers made after first are traced)."""
+    tracemalloc.start()
+    try:
+        display.set_color_mode(first)
+        tracemalloc.reset_peak()
+        display.set_color_mode(second)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def draw(display, bg, fg):
+    display.fill(bg)
+    display.rect(40, 150, 280, 140, fg)
+    display.text("Touch the screen", 120, 208, fg)
+    display.fill_rect(170, 20, 20, 60, fg)
+
+
+class FirmwareDriverTests(unittest.TestCase):
+    def setUp(self):
+        self.emu = emulator.Emulator()
+        self.panel = self.emu.panel
+
+    def test_boot_replays_the_init_stream(self):
+        self.emu.firmware_driver()
+
+        self.assertEqual(self.panel.errors, [])
+        self.assertEqual(self.panel.log, init_commands())
+        self.assertTrue(self.panel.te_enabled and self.panel.display_on)
+
+    def test_bitbang_and_pio_commands_decode_identically(self):
+        results = []
+        for mode in ("bitbang", "pio"):
+            emu = emulator.Emulator()
+            display = emu.firmware_driver(command_mode=mode)
+            display.fill(display.COLOR_BLUE)
+            display.show()
+            display.set_window(164, 300, 195, 331)
+            display.fill_rect(100, 120, 30, 20, display.COLOR_YELLOW)
+            display.show()
+            stats = emu.panel.take_stats()
+
+            self.assertEqual(emu.panel.errors, [])
+            self.assertEqual(stats["bitbang_bytes"] > 0, mode == "bitbang")
+            results.append((emu.panel.log, bytes(emu.panel.image), stats["pixel_bytes"]))
+        self.assertEqual(results[0], results[1])
+
+    def test_full_frame_reaches_panel_ram_bit_exact(self):
+        display = self.emu.firmware_driver()
+        self.panel.take_stats()
+        draw(display, display.COLOR_BLUE, display.COLOR_YELLOW)
+        display.show()
+        stats = self.panel.take_stats()
+
+        self.assertEqual(self.panel.errors, [])
+        self.assertEqual(self.panel.image, display._buffer)
+        self.assertEqual(stats["pixel_bytes"], 360 * 360 * 2)
+        self.assertEqual(stats["windows"], 1)
+        self.assertAlmostEqual(stats["bus_us"], (stats["cmd_bytes"] * 8 + stats["pixel_bytes"] * 2) * 4 / 80)
+
+    def test_dma_present_matches_blocking_show(self):
+        display = self.emu.firmware_driver()
+        draw(display, 0x1234, 0xFFFF)
+        display.show()
+        expected = bytes(self.panel.image)
+
+        other = emulator.Emulator()
+        display = other.firmware_driver(use_dma=True, double_buffer=True)
+        draw(display, 0x1234, 0xFFFF)
+        handle = display.present_async()
+        while display.poll():
+            pass
+
+        self.assertTrue(handle.done)
+        self.assertEqual(other.panel.errors, [])
+        self.assertEqual(bytes(other.panel.image), expected)
+
+    def test_damage_and_round_mask_shrink_the_frame(self):
+        display = self.emu.firmware_driver(mask_band_rows=16)
+        display.fill(0)
+        display.show()
+        full = self.panel.take_stats()
+        display.fill_rect(170, 170, 20, 20, 0xFFFF)
+        display.show()
+        partial = self.panel.take_stats()
+
+        self.assertLess(full["pixel_bytes"], 360 * 360 * 2)
+        self.assertEqual(partial["pixel_bytes"], 20 * 20 * 2)
+        self.assertEqual(self.panel.pixel(175, 175), 0xFFFF)
+
+    def test_indexed_mode_expands_to_the_palette_colour(self):
+        display = self.emu.firmware_driver(color_mode="gs4", palette=[0x0000, 0xF800])
+        display.fill(1)
+        display.show()
+
+        self.assertEqual(self.panel.errors, [])
+        # Wire order of a little-endian RGB565 framebuffer holding 0xF800.
+        self.assertEqual(self.panel.pixel(0, 0), 0x00F8)
+
+    def test_set_color_mode_frees_both_buffers_before_allocating(self):
+        display = self.emu.firmware_driver(use_dma=True, double_buffer=True)
+        peak = switch_peak(display, "gs8", "rgb565")
+
+        # The new rgb565 pair, not that plus the old gs8 buffer held by the FrameBuffer base.
+        self.assertLess(peak, 2 * 360 * 360 * 2 + 360 * 360 // 2)
+        display.fill(0x07E0)
+        display.show()
+        self.assertEqual(self.panel.errors, [])
+
+    def test_te_pacing_presents_on_vsync(self):
+        display = self.emu.firmware_driver(use_dma=True, te_pacing=True)
+        self.panel.take_stats()
+        display.fill(0xFFFF)
+        display.request_frame()
+        self.assertEqual(self.panel.take_stats()["pixel_bytes"], 0)
+
+        self.panel.vsync()
+        while display.poll():
+            pass
+        self.assertEqual(self.panel.take_stats()["pixel_bytes"], 360 * 360 * 2)
+        self.assertEqual(display.frame_stats()["frames"], 1)
+
+
+class DriverParityTests(unittest.TestCase):
+    def test_unaligned_gs4_windows_send_the_same_traffic(self):
+        results = []
+        for make in ("firmware_driver", "lib_driver"):
+            for mask_band_rows in (0, 16):
+                emu = emulator.Emulator()
+                display = getattr(emu, make)(color_mode="gs4", palette=[0x0000, 0xF800], mask_band_rows=mask_band_rows)
+                display.fill(0)
+                display.show()
+                start = len(emu.panel.log)
+                display.fill_rect(101, 120, 30, 21, 1)
+                display.pixel(250, 301, 1)
+                display.show()
+
+                self.assertEqual(emu.panel.errors, [])
+                results.append((mask_band_rows, emu.panel.log[start:], bytes(emu.panel.image)))
+        self.assertEqual(results[:2], results[2:])
+        # Odd x and odd right edges are widened to even columns on both.
+        self.assertIn((0x2A, bytes([0, 100, 0, 131])), results[0][1])
+
+
+class LibDriverTests(unittest.TestCase):
+    def test_bitbang_and_pio_commands_decode_identically(self):
+        logs = []
+        for mode in ("bitbang", "pio"):
+            emu = emulator.Emulator()
+            display = emu.lib_driver(command_mode=mode)
+            display.fill(display.RED)
+            display.show()
+            self.assertEqual(emu.panel.errors, [])
+            logs.append((emu.panel.log, bytes(emu.panel.image)))
+        self.assertEqual(logs[0], logs[1])
+
+    def test_set_color_mode_frees_the_old_buffer_before_allocating(self):
+        emu = emulator.Emulator()
+        display = emu.lib_driver()
+        peak = switch_peak(display, "gs4", "rgb565")
+
+        self.assertLess(peak, 360 * 360 * 2 + 360 * 360 // 4)
+
+    def test_band_mode_renders_the_same_image(self):
+        images = []
+        for band_rows in (0, 24):
+            emu = emulator.Emulator()
+            display = emu.lib_driver(band_rows=band_rows)
+            draw(display, display.BLUE, display.WHITE)
+            display.show()
+            self.assertEqual(emu.panel.errors, [])
+            images.append(bytes(emu.panel.image))
+        self.assertEqual(images[0], images[1])
+
+    def test_save_png_writes_an_rgb_image(self):
+        import tempfile
+
+        emu = emulator.Emulator(width=360, height=360)
+        display = emu.lib_driver()
+        display.fill(display.GREEN)
+        display.show()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "frame.png"
+            emu.panel.save_png(path)
+            data = path.read_bytes()
+        self.assertEqual(data[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(data[16:24], (360).to_bytes(4, "big") * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
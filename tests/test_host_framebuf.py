@@ -0,0 +1,133 @@
+import random
+import unittest
+
+from _loader import HOST, add_paths
+
+add_paths(HOST)
+
+import framebuf_py  # noqa: E402
+
+try:
+    import framebuf_np
+except ImportError:
+    framebuf_np = None
+
+FORMATS = {
+    "RGB565": framebuf_py.RGB565,
+    "GS8": framebuf_py.GS8,
+    "GS4_HMSB": framebuf_py.GS4_HMSB,
+    "GS2_HMSB": framebuf_py.GS2_HMSB,
+    "MONO_HLSB": framebuf_py.MONO_HLSB,
+    "MONO_HMSB": framebuf_py.MONO_HMSB,
+    "MONO_VLSB": framebuf_py.MONO_VLSB,
+}
+BITS = {"RGB565": 16, "GS8": 8, "GS4_HMSB": 4, "GS2_HMSB": 2}
+
+
+def new_buffer(module, fmt, width, height):
+    # Room for any format, padded stride included; the spare tail must stay untouched too.
+    buf = bytearray(((width + 7) & ~7) * height * 2)
+    return buf, module.FrameBuffer(buf, width, height, fmt)
+
+
+def draw_script(fb, fmt, seed):
+    """Random mix of every drawing call, including clipped and overlapping ones."""
+    rnd = random.Random(seed)
+    mask = (1 << next(BITS.get(k, 1) for k, v in FORMATS.items() if v == fmt)) - 1
+
+    def color():
+        return rnd.randrange(0x10000) & mask if rnd.random() < 0.9 else rnd.randrange(0x10000)
+
+    def pos():
+        return rnd.randrange(-20, 60)
+
+    sprite_buf = bytearray(range(256)) * 2
+    sprite = framebuf_py.FrameBuffer(sprite_buf, 9, 7, fmt)
+    palette_buf = bytearray(64)
+    palette = framebuf_py.FrameBuffer(palette_buf, 16, 1, framebuf_py.RGB565)
+    for i in range(16):
+        palette.pixel(i, 0, (i * 0x1111) & mask)
+    sprite4_buf = bytes(range(0, 256, 7))
+    fb.fill(color())
+    for _ in range(40):
+        op = rnd.randrange(11)
+        if op == 0:
+            fb.fill_rect(pos(), pos(), rnd.randrange(-2, 40), rnd.randrange(-2, 40), color())
+        elif op == 1:
+            fb.hline(pos(), pos(), rnd.randrange(60), color())
+            fb.vline(pos(), pos(), rnd.randrange(60), color())
+        elif op == 2:
+            fb.rect(pos(), pos(), rnd.randrange(1, 40), rnd.randrange(1, 40), color(), rnd.random() < 0.5)
+        elif op == 3:
+            fb.line(pos(), pos(), pos(), pos(), color())
+        elif op == 4:
+            fb.ellipse(pos(), pos(), rnd.randrange(12), rnd.randrange(12), color(), rnd.random() < 0.5,
+                       rnd.randrange(16))
+        elif op == 5:
+            fb.poly(pos(), pos(), [rnd.randrange(-5, 30) for _ in range(8)], color(), rnd.random() < 0.5)
+        elif op == 6:
+            fb.text("Hi\x01\xe9 ~{}".format(rnd.randrange(100)), pos(), pos(), color())
+        elif op == 7:
+            fb.blit(sprite, pos(), pos(), rnd.choice((-1, 0, 1, 3, 0x1234)))
+        elif op == 8:
+            fb.blit((sprite4_buf, 8, 9, framebuf_py.GS4_HMSB), pos(), pos(), rnd.choice((-1, 2)), palette)
+        elif op == 9:
+            fb.scroll(rnd.randrange(-12, 12), rnd.randrange(-12, 12))
+        else:
+            fb.pixel(pos(), pos(), color())
+
+
+class PureLayoutTests(unittest.TestCase):
+    def test_rgb565_is_little_endian(self):
+        buf, fb = new_buffer(framebuf_py, framebuf_py.RGB565, 4, 2)
+        fb.pixel(1, 1, 0xF800)
+        self.assertEqual(buf[10:12], b"\x00\xf8")
+        self.assertEqual(fb.pixel(1, 1), 0xF800)
+
+    def test_gs4_puts_even_pixel_in_high_nibble(self):
+        buf, fb = new_buffer(framebuf_py, framebuf_py.GS4_HMSB, 4, 1)
+        fb.pixel(0, 0, 0xA)
+        fb.pixel(3, 0, 0x5)
+        self.assertEqual(bytes(buf[:2]), b"\xa0\x05")
+
+    def test_mono_hlsb_puts_first_pixel_in_msb(self):
+        buf, fb = new_buffer(framebuf_py, framebuf_py.MONO_HLSB, 8, 1)
+        fb.pixel(0, 0, 1)
+        self.assertEqual(buf[0], 0x80)
+
+    def test_text_draws_font_columns(self):
+        buf, fb = new_buffer(framebuf_py, framebuf_py.MONO_VLSB, 8, 8)
+        fb.text("A", 0, 0, 1)
+        self.assertEqual(bytes(buf[:8]), framebuf_py.FONT_8X8[(ord("A") - 32) * 8:(ord("A") - 31) * 8])
+
+
+@unittest.skipIf(framebuf_np is None, "NumPy not installed")
+class NumpyBackendTests(unittest.TestCase):
+    def test_matches_pure_python_byte_for_byte(self):
+        for name, fmt in FORMATS.items():
+            for seed in range(4):
+                with self.subTest(format=name, seed=seed):
+                    expected, fb = new_buffer(framebuf_py, fmt, 45, 37)
+                    draw_script(fb, fmt, seed)
+                    actual, fb = new_buffer(framebuf_np, fmt, 45, 37)
+                    draw_script(fb, fmt, seed)
+                    self.assertEqual(bytes(actual), bytes(expected))
+
+    def test_honours_stride(self):
+        for name, fmt in FORMATS.items():
+            if fmt == framebuf_py.MONO_VLSB:
+                continue
+            with self.subTest(format=name):
+                buffers = []
+                for module in (framebuf_py, framebuf_np):
+                    buf = bytearray(64 * 10 * BITS.get(name, 1) // 8)
+                    fb = module.FrameBuffer(buf, 20, 10, fmt, 64)
+                    fb.fill_rect(-3, 2, 30, 5, 0xFFFF)
+                    fb.text("ok", 3, 1, 0)
+                    fb.scroll(5, -1)
+                    buffers.append(bytes(buf))
+                self.assertEqual(buffers[0], buffers[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
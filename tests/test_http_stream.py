@@ -0,0 +1,119 @@
+import io
+import unittest
+
+from _loader import load_lib_module
+
+http_stream = load_lib_module("http_stream")
+HTTPResponse = http_stream.HTTPResponse
+
+LENGTH = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nX-A: 1\r\nX-A: 2\r\n\r\nhello"
+CHUNKED = (
+    b"HTTP/1.1 201 Created\r\nTransfer-Encoding: chunked\r\n\r\n"
+    b"4\r\nWiki\r\n6;ext=1\r\npedia \r\nE\r\nin \r\n\r\nchunks.\r\n0\r\nX-T: 1\r\n\r\n"
+)
+
+
+def feed_in(raw, size, **kwargs):
+    response = HTTPResponse(**kwargs)
+    used = 0
+    for i in range(0, len(raw), size):
+        used += response.feed(memoryview(raw)[i:i + size])
+    return response, used
+
+
+class HTTPResponseTests(unittest.TestCase):
+    def test_content_length_completes_without_close(self):
+        for size in (1, 3, len(LENGTH)):
+            with self.subTest(size=size):
+                response, used = feed_in(LENGTH + b"next", size)
+                self.assertTrue(response.complete)
+                self.assertEqual(used, len(LENGTH))
+                self.assertEqual(response.status, 200)
+                self.assertEqual(response.headers["x-a"], "1, 2")
+                self.assertEqual(response.body, b"hello")
+                self.assertTrue(response.keep_alive)
+
+    def test_chunked_body(self):
+        for size in (1, 5, len(CHUNKED)):
+            with self.subTest(size=size):
+                response, used = feed_in(CHUNKED, size)
+                self.assertTrue(response.complete)
+                self.assertEqual(used, len(CHUNKED))
+                self.assertEqual(response.status, 201)
+                self.assertEqual(response.body, b"Wikipedia in \r\n\r\nchunks.")
+
+    def test_body_until_close(self):
+        response, _ = feed_in(b"HTTP/1.0 200 OK\r\n\r\nstream", 4)
+        self.assertFalse(response.complete)
+        self.assertFalse(response.keep_alive)
+        self.assertTrue(response.finish())
+        self.assertEqual(response.body, b"stream")
+
+    def test_connection_header(self):
+        response, _ = feed_in(b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 0\r\n\r\n", 7)
+        self.assertTrue(response.complete)
+        self.assertFalse(response.keep_alive)
+        response, _ = feed_in(b"HTTP/1.0 200 OK\r\nConnection: keep-alive\r\nContent-Length: 0\r\n\r\n", 7)
+        self.assertTrue(response.keep_alive)
+
+    def test_no_body_statuses_and_head(self):
+        response, _ = feed_in(b"HTTP/1.1 204 No Content\r\n\r\n", 64)
+        self.assertTrue(response.complete)
+        response, _ = feed_in(b"HTTP/1.1 200 OK\r\nContent-Length: 99\r\n\r\n", 64, head_request=True)
+        self.assertTrue(response.complete)
+
+    def test_skips_interim_response(self):
+        response, _ = feed_in(b"HTTP/1.1 100 Continue\r\n\r\n" + LENGTH, 9)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, b"hello")
+
+    def test_sink_receives_the_body_as_it_arrives(self):
+        pieces = []
+        response, _ = feed_in(CHUNKED, 6, sink=lambda piece: pieces.append(bytes(piece)))
+        self.assertTrue(response.complete)
+        self.assertEqual(b"".join(pieces), b"Wikipedia in \r\n\r\nchunks.")
+        self.assertEqual(response.body, b"")
+        self.assertEqual(response.body_bytes, 24)
+        out = io.BytesIO()
+        feed_in(LENGTH, 3, sink=out)
+        self.assertEqual(out.getvalue(), b"hello")
+
+    def test_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            HTTPResponse().feed(b"SMTP ready\r\n")
+        with self.assertRaises(ValueError):
+            HTTPResponse().feed(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n")
+
+
+class RequestBodyTests(unittest.TestCase):
+    def test_bytes_body_is_not_copied(self):
+        data = bytearray(b"abcdef")
+        (view,) = list(http_stream.body_buffers(data))
+        data[0] = ord("x")
+        self.assertEqual(bytes(view), b"xbcdef")
+        self.assertEqual(http_stream.body_length(data), 6)
+
+    def test_files_and_iterables(self):
+        data = bytes(range(256)) * 10
+        pieces = [bytes(piece) for piece in http_stream.body_buffers(io.BytesIO(data), size=1000)]
+        self.assertEqual([len(piece) for piece in pieces], [1000, 1000, 560])
+        self.assertEqual(b"".join(pieces), data)
+        self.assertIsNone(http_stream.body_length(io.BytesIO(data)))
+        self.assertEqual(list(http_stream.body_buffers(iter([b"a", b"bc"]))), [b"a", b"bc"])
+
+    def test_request_sends_split_head_and_body_into_pieces(self):
+        data = bytes(range(250))
+        sends = [b"".join(bytes(part) for part in parts)
+                 for parts in http_stream.request_sends(b"HEAD", data, size=100)]
+        self.assertEqual([len(send) for send in sends], [100, 100, 54])
+        self.assertEqual(b"".join(sends), b"HEAD" + data)
+
+        sends = [b"".join(bytes(part) for part in parts)
+                 for parts in http_stream.request_sends(b"HEAD", iter([b"abc", b"de"]), chunked=True, size=100)]
+        self.assertEqual(sends, [b"HEAD", b"3\r\nabc\r\n", b"2\r\nde\r\n", b"0\r\n\r\n"])
+        self.assertEqual(http_stream.post_headers("text/plain", None),
+                         "Content-Type: text/plain\r\nTransfer-Encoding: chunked\r\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import unittest
+from array import array
+
+from _loader import load_lib_module
+
+pixel_lut = load_lib_module("pixel_lut")
+qspi_pack = load_lib_module("qspi_pack")
+
+
+def rgb565_words(colors):
+    """Words the RGB565 path sends for colours stored little-endian in a framebuffer."""
+    raw = bytearray()
+    for color in colors:
+        raw += bytes((color & 0xFF, color >> 8))
+    dst = [0] * len(colors)
+    qspi_pack.pack_nibbles_py(raw, dst)
+    return dst
+
+
+class PixelFormatTests(unittest.TestCase):
+    def test_buffer_sizes_for_the_360_panel(self):
+        sizes = {mode: pixel_lut.PixelFormat(mode).buffer_size(360, 360) for mode in pixel_lut.MODES}
+        self.assertEqual(sizes, {"rgb565": 259_200, "gs8": 129_600, "gs4": 64_800})
+
+    def test_gs8_palette_matches_the_rgb565_wire_words(self):
+        rng = random.Random(1)
+        palette = [rng.getrandbits(16) for _ in range(256)]
+        fmt = pixel_lut.PixelFormat("gs8", palette)
+        indices = bytes(rng.getrandbits(8) for _ in range(97))
+        dst = array("H", [0] * len(indices))
+
+        self.assertEqual(fmt.pack(indices, dst), len(indices))
+        self.assertEqual(list(dst), rgb565_words([palette[i] for i in indices]))
+
+    def test_gs4_expands_high_nibble_first(self):
+        fmt = pixel_lut.PixelFormat("gs4")
+        ramp = pixel_lut.gray_ramp(16)
+        dst = array("H", [0] * 4)
+
+        self.assertEqual(fmt.pack(bytes((0x0F, 0xA3)), dst), 4)
+        self.assertEqual(list(dst), rgb565_words([ramp[0x0], ramp[0xF], ramp[0xA], ramp[0x3]]))
+        self.assertEqual((ramp[0], ramp[15]), (0x0000, 0xFFFF))
+
+    def test_set_palette_updates_entries_in_place(self):
+        fmt = pixel_lut.PixelFormat("gs4")
+        fmt.set_palette([0xF800, 0x07E0], start=14)
+        dst = array("H", [0] * 2)
+        fmt.pack(bytes((0xEF,)), dst)
+
+        self.assertEqual(list(dst), rgb565_words([0xF800, 0x07E0]))
+        with self.assertRaises(ValueError):
+            fmt.set_palette([0] * 3, start=14)
+
+    def test_rejects_unknown_modes_and_rgb565_palettes(self):
+        with self.assertRaises(ValueError):
+            pixel_lut.PixelFormat("mono")
+        with self.assertRaises(ValueError):
+            pixel_lut.PixelFormat("rgb565", [0])
+
+    def test_gs4_windows_are_widened_to_even_columns(self):
+        fmt = pixel_lut.PixelFormat("gs4")
+        self.assertEqual(fmt.align(3, 1, 4, 2, 360), (2, 1, 6, 2))
+        self.assertEqual(fmt.align(357, 0, 3, 1, 360), (356, 0, 4, 1))
+        self.assertEqual(pixel_lut.PixelFormat("gs8").align(3, 1, 4, 2, 360), (3, 1, 4, 2))
+
+
+class IndexedNibbleStreamTests(unittest.TestCase):
+    def test_chunks_count_pixels_not_bytes(self):
+        class SM:
+            def __init__(self):
+                self.puts = []
+
+            def put(self, words, shift=0):
+                self.puts.append(list(words))
+
+        fmt = pixel_lut.PixelFormat("gs4")
+        sm = SM()
+        stream = qspi_pack.NibbleStream(sm, chunk_words=8, pack=fmt.pack, bits_per_pixel=4)
+        payload = bytes(range(10))
+        stream.write(payload)
+
+        self.assertEqual([len(p) for p in sm.puts], [8, 8, 4])
+        expected = array("H", [0] * 20)
+        fmt.pack(payload, expected)
+        self.assertEqual(sum(sm.puts, []), list(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import unittest
+
+from _loader import load_lib_module
+
+qspi_dma = load_lib_module("qspi_dma")
+qspi_pack = load_lib_module("qspi_pack")
+
+
+class FakeStateMachine:
+    """TX FIFO that takes a few tx_fifo() polls to drain after each DMA burst."""
+
+    def __init__(self, log):
+        self.log = log
+        self.words = []
+        self.fifo_level = 0
+
+    def tx_fifo(self):
+        if self.fifo_level:
+            self.fifo_level -= 1
+        return self.fifo_level
+
+
+class FakeDMA:
+    """DMA channel that stays active for `latency` active() polls after each trigger."""
+
+    def __init__(self, sm, log, latency=2):
+        self.sm = sm
+        self.log = log
+        self.latency = latency
+        self.remaining = 0
+        self.pending = None
+        self.handler = None
+        self.transfers = 0
+
+    def pack_ctrl(self, **kwargs):
+        return kwargs
+
+    def irq(self, handler=None, hard=False):
+        self.handler = handler
+
+    def config(self, read, write, count, ctrl, trigger):
+        assert self.remaining == 0, "DMA reconfigured while busy"
+        assert ctrl["size"] == 1 and ctrl["inc_write"] is False
+        self.pending = list(read[:count])
+        self.remaining = self.latency
+        self.transfers += 1
+        self.log.append(("dma", count))
+
+    def active(self):
+        if self.remaining:
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.sm.words.extend(self.pending)
+                self.sm.fifo_level = 3
+                self.pending = None
+        return self.remaining > 0
+
+
+def expected_words(buffer, stride, windows):
+    words = []
+    for x, y, w, h in windows:
+        for row in range(y, y + h):
+            start = row * stride + 2 * x
+            span = buffer[start:start + 2 * w]
+            dst = [0] * w
+            qspi_pack.pack_nibbles_py(span, dst)
+            words.extend(dst)
+    return words
+
+
+class DmaPresenterTests(unittest.TestCase):
+    WIDTH = 16
+    HEIGHT = 8
+
+    def setUp(self):
+        self.log = []
+        self.sm = FakeStateMachine(self.log)
+        self.dma = FakeDMA(self.sm, self.log)
+        self.buffer = bytearray(i & 0xFF for i in range(self.WIDTH * self.HEIGHT * 2))
+        self.windows = []
+        self.prepared = 0
+        self.presenter = qspi_dma.DmaPresenter(
+            self.sm,
+            self.dma,
+            fifo_addr=0x50200010,
+            dreq=0,
+            stride=self.WIDTH * 2,
+            prepare=self._prepare,
+            begin_window=self._begin,
+            end_window=self._end,
+            chunk_words=self.WIDTH * 2,
+        )
+
+    def _prepare(self):
+        self.prepared += 1
+        windows, self.windows = self.windows, []
+        return self.buffer, windows
+
+    def _begin(self, x, y, w, h):
+        self.assertEqual(self.dma.remaining, 0, "window opened during a transfer")
+        self.assertEqual(self.sm.fifo_level, 0, "window opened before the FIFO drained")
+        self.log.append(("begin", (x, y, w, h)))
+
+    def _end(self):
+        self.assertEqual(self.dma.remaining, 0, "CS released during a transfer")
+        self.assertEqual(self.sm.fifo_level, 0, "CS released before the FIFO drained")
+        self.log.append(("end",))
+
+    def run_to_completion(self, handle):
+        for _ in range(1000):
+            if handle.done:
+                return
+            self.presenter.poll()
+        self.fail("present never completed")
+
+    def test_request_returns_before_the_transfer_finishes(self):
+        self.windows = [(0, 0, self.WIDTH, self.HEIGHT)]
+        handle = self.presenter.request()
+
+        self.assertFalse(handle.done)
+        self.assertTrue(self.presenter.busy)
+        self.run_to_completion(handle)
+        self.assertFalse(self.presenter.busy)
+
+    def test_streams_bit_identical_words_with_window_commands_in_order(self):
+        self.windows = [(0, 0, self.WIDTH, 3), (4, 5, 6, 3)]
+        expected = expected_words(self.buffer, self.WIDTH * 2, self.windows)
+        self.run_to_completion(self.presenter.request())
+
+        self.assertEqual(self.sm.words, expected)
+        kinds = [event[0] for event in self.log]
+        self.assertEqual(kinds[0], "begin")
+        self.assertEqual(kinds[-1], "end")
+        self.assertEqual(
+            [event for event in self.log if event[0] != "dma"],
+            [("begin", (0, 0, 16, 3)), ("end",), ("begin", (4, 5, 6, 3)), ("end",)],
+        )
+
+    def test_packs_next_chunk_while_dma_is_busy(self):
+        self.windows = [(0, 0, self.WIDTH, self.HEIGHT)]
+        self.presenter.request()
+
+        self.assertTrue(self.dma.remaining > 0)
+        self.assertIsNotNone(self.presenter._staged)
+
+    def test_requests_during_a_transfer_coalesce_into_one_frame(self):
+        done = []
+        self.windows = [(0, 0, self.WIDTH, self.HEIGHT)]
+        first = self.presenter.request(done.append)
+        self.windows = [(2, 2, 4, 4)]
+        second = self.presenter.request(done.append)
+        third = self.presenter.request(done.append)
+
+        self.assertIs(second, third)
+        self.run_to_completion(third)
+        self.assertEqual(self.prepared, 2)
+        self.assertEqual(done, [first, second, second])
+
+    def test_empty_frame_completes_without_touching_the_bus(self):
+        handle = self.presenter.request()
+
+        self.assertTrue(handle.done)
+        self.assertEqual(self.log, [])
+
+    def test_dma_irq_streams_the_frame_but_leaves_the_next_to_poll(self):
+        self.windows = [(0, 0, self.WIDTH, self.HEIGHT)]
+        handle = self.presenter.request()
+        self.windows = [(0, 0, 4, 4)]
+        queued = self.presenter.request()
+        for _ in range(1000):
+            self.dma.handler(self.dma)
+        # Every chunk went out from the IRQ, but only poll() completes the
+        # frame and takes the next one's damage.
+        self.assertEqual(self.sm.words, expected_words(self.buffer, self.WIDTH * 2, [(0, 0, self.WIDTH, self.HEIGHT)]))
+        self.assertFalse(handle.done)
+        self.assertEqual(self.prepared, 1)
+        self.run_to_completion(queued)
+        self.assertTrue(handle.done)
+        self.assertEqual(self.prepared, 2)
+
+    def test_indexed_format_expands_byte_offsets_per_pixel(self):
+        pixel_lut = load_lib_module("pixel_lut")
+        fmt = pixel_lut.PixelFormat("gs4")
+        stride = fmt.row_bytes(self.WIDTH)
+        self.presenter.set_format(stride, fmt.pack, fmt.bits_per_pixel)
+        self.windows = [(0, 0, self.WIDTH, 2), (4, 3, 6, 2)]
+        expected = []
+        for x, y, w, h in self.windows:
+            for row in range(y, y + h):
+                dst = [0] * w
+                fmt.pack(self.buffer[row * stride + x // 2:row * stride + (x + w) // 2], dst)
+                expected.extend(dst)
+        self.run_to_completion(self.presenter.request())
+
+        self.assertEqual(self.sm.words, expected)
+
+
+class PioTxFifoTests(unittest.TestCase):
+    def test_maps_state_machine_ids_to_fifo_and_dreq(self):
+        self.assertEqual(qspi_dma.pio_tx_fifo(0), (0x50200010, 0))
+        self.assertEqual(qspi_dma.pio_tx_fifo(5), (0x50300014, 9))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import random
+import unittest
+from array import array
+
+from _loader import load_lib_module
+
+qspi_pack = load_lib_module("qspi_pack")
+
+
+def legacy_words(data):
+    """Word sequence of the original per-word _write_bytes_4bit loop."""
+    words = []
+    for i in range(0, len(data), 2):
+        b1 = data[i]
+        if i + 1 < len(data):
+            b2 = data[i + 1]
+            words.append(
+                ((b1 >> 4) & 0x0F)
+                | ((b1 & 0x0F) << 4)
+                | (((b2 >> 4) & 0x0F) << 8)
+                | ((b2 & 0x0F) << 12)
+            )
+        else:
+            words.append(((b1 >> 4) & 0x0F) | ((b1 & 0x0F) << 4))
+    return words
+
+
+class _RecordingSM:
+    def __init__(self):
+        self.puts = []
+
+    def put(self, value, shift=0):
+        self.puts.append(list(value))
+
+
+class PackNibblesTests(unittest.TestCase):
+    def test_matches_legacy_packer_for_every_byte_pair_position(self):
+        data = bytes(range(256)) + bytes(reversed(range(256)))
+        dst = array("H", [0] * len(data))
+        n = qspi_pack.pack_nibbles_py(data, dst)
+        self.assertEqual(list(dst[:n]), legacy_words(data))
+
+    def test_matches_legacy_packer_for_odd_length(self):
+        data = bytes((0x12, 0x34, 0xAB))
+        dst = array("H", [0] * 2)
+        n = qspi_pack.pack_nibbles_py(data, dst)
+        self.assertEqual(list(dst[:n]), legacy_words(data))
+        self.assertEqual(list(dst[:n]), [0x4321, 0xBA])
+
+    def test_accepts_memoryview_slices_of_framebuffer(self):
+        rng = random.Random(1)
+        frame = bytearray(rng.getrandbits(8) for _ in range(360 * 2 * 4))
+        row = memoryview(frame)[720:1440]
+        dst = array("H", [0] * 360)
+        n = qspi_pack.pack_nibbles(row, dst)
+        self.assertEqual(list(dst[:n]), legacy_words(bytes(row)))
+
+
+class NibbleStreamTests(unittest.TestCase):
+    def test_bulk_puts_are_bit_identical_across_chunk_boundaries(self):
+        rng = random.Random(2)
+        payload = bytearray(rng.getrandbits(8) for _ in range(2 * 37 + 1))
+        sm = _RecordingSM()
+        qspi_pack.NibbleStream(sm, chunk_words=8).write(payload)
+
+        self.assertEqual(len(sm.puts), 5)
+        self.assertEqual([w for put in sm.puts for w in put], legacy_words(payload))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,9 @@
-import importlib.util
-import pathlib
 import sys
 import types
 import unittest
 
+from _loader import load_lib_module
+
 
 class _DummyUART:
     def __init__(self, *args, **kwargs):
@@ -12,12 +12,7 @@ class _DummyUART:
 
 def _load_wifi_module():
     sys.modules.setdefault("busio", types.SimpleNamespace(UART=_DummyUART))
-    module_path = pathlib.Path(__file__).resolve().parents[1] / "lib" / "wifi_at.py"
-    spec = importlib.util.spec_from_file_location("wifi_at", module_path)
-    module = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    spec.loader.exec_module(module)
-    return module
+    return load_lib_module("wifi_at")
 
 
 wifi_at = _load_wifi_module()
@@ -0,0 +1,51 @@
+import math
+import unittest
+
+from _loader import load_lib_module
+
+round_mask = load_lib_module("round_mask")
+RoundMask = round_mask.RoundMask
+
+
+class VisibleSpanTests(unittest.TestCase):
+    def test_spans_cover_every_pixel_centre_inside_circle(self):
+        spans = round_mask.visible_spans(360, 360)
+        for y in range(360):
+            x0, x1 = spans[2 * y], spans[2 * y + 1]
+            for x in range(360):
+                inside = math.hypot(x + 0.5 - 180, y + 0.5 - 180) < 180
+                if inside:
+                    self.assertTrue(x0 <= x < x1, (x, y))
+
+    def test_spans_are_symmetric_and_widest_at_centre(self):
+        spans = round_mask.visible_spans(360, 360)
+        self.assertEqual((spans[2 * 179], spans[2 * 179 + 1]), (0, 360))
+        for y in range(180):
+            mirror = 359 - y
+            self.assertEqual(spans[2 * y], spans[2 * mirror])
+            self.assertEqual(spans[2 * y + 1], 360 - spans[2 * y])
+
+
+class RoundMaskClipTests(unittest.TestCase):
+    def test_per_row_mask_skips_about_a_fifth_of_the_square(self):
+        mask = RoundMask(360, 360, band_rows=1)
+        hidden = 1 - mask.visible_pixels() / (360 * 360)
+        self.assertGreater(hidden, 0.20)
+
+    def test_full_screen_clip_matches_bands(self):
+        mask = RoundMask(360, 360, band_rows=8)
+        windows = mask.clip(0, 0, 360, 360)
+        self.assertEqual(sum(w * h for _x, _y, w, h in windows), mask.visible_pixels())
+        self.assertEqual(windows[0], (126, 0, 108, 8))
+
+    def test_rect_inside_circle_is_untouched(self):
+        mask = RoundMask(360, 360, band_rows=8)
+        self.assertEqual(mask.clip(164, 300, 32, 32), [(164, 300, 32, 32)])
+
+    def test_rect_in_hidden_corner_produces_no_windows(self):
+        mask = RoundMask(360, 360, band_rows=8)
+        self.assertEqual(mask.clip(0, 0, 20, 20), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+
+from _loader import load_lib_module
+
+st77916_init = load_lib_module("st77916_init")
+boot_profile = load_lib_module("boot_profile")
+
+ROTATION = 0
+POST_INIT_MS = 20
+
+# Readable Waveshare BSP table the precompiled stream was generated from.
+BSP_INIT_TABLE = (
+    (0xF0, (0x28,), 0), (0xF2, (0x28,), 0), (0x73, (0xF0,), 0), (0x7C, (0xD1,), 0),
+    (0x83, (0xE0,), 0), (0x84, (0x61,), 0), (0xF2, (0x82,), 0), (0xF0, (0x00,), 0),
+    (0xF0, (0x01,), 0), (0xF1, (0x01,), 0), (0xB0, (0x56,), 0), (0xB1, (0x4D,), 0),
+    (0xB2, (0x24,), 0), (0xB4, (0x87,), 0), (0xB5, (0x44,), 0), (0xB6, (0x8B,), 0),
+    (0xB7, (0x40,), 0), (0xB8, (0x86,), 0), (0xBA, (0x00,), 0), (0xBB, (0x08,), 0),
+    (0xBC, (0x08,), 0), (0xBD, (0x00,), 0), (0xC0, (0x80,), 0), (0xC1, (0x10,), 0),
+    (0xC2, (0x37,), 0), (0xC3, (0x80,), 0), (0xC4, (0x10,), 0), (0xC5, (0x37,), 0),
+    (0xC6, (0xA9,), 0), (0xC7, (0x41,), 0), (0xC8, (0x01,), 0), (0xC9, (0xA9,), 0),
+    (0xCA, (0x41,), 0), (0xCB, (0x01,), 0), (0xD0, (0x91,), 0), (0xD1, (0x68,), 0),
+    (0xD2, (0x68,), 0), (0xF5, (0x00, 0xA5), 0), (0xDD, (0x4F,), 0), (0xDE, (0x4F,), 0),
+    (0xF1, (0x10,), 0), (0xF0, (0x00,), 0), (0xF0, (0x02,), 0),
+    (0xE0, (0xF0, 0x0A, 0x10, 0x09, 0x09, 0x36, 0x35, 0x33, 0x4A, 0x29, 0x15, 0x15, 0x2E, 0x34), 0),
+    (0xE1, (0xF0, 0x0A, 0x0F, 0x08, 0x08, 0x05, 0x34, 0x33, 0x4A, 0x39, 0x15, 0x15, 0x2D, 0x33), 0),
+    (0xF0, (0x10,), 0), (0xF3, (0x10,), 0), (0xE0, (0x07,), 0), (0xE1, (0x00,), 0),
+    (0xE2, (0x00,), 0), (0xE3, (0x00,), 0), (0xE4, (0xE0,), 0), (0xE5, (0x06,), 0),
+    (0xE6, (0x21,), 0), (0xE7, (0x01,), 0), (0xE8, (0x05,), 0), (0xE9, (0x02,), 0),
+    (0xEA, (0xDA,), 0), (0xEB, (0x00,), 0), (0xEC, (0x00,), 0), (0xED, (0x0F,), 0),
+    (0xEE, (0x00,), 0), (0xEF, (0x00,), 0), (0xF8, (0x00,), 0), (0xF9, (0x00,), 0),
+    (0xFA, (0x00,), 0), (0xFB, (0x00,), 0), (0xFC, (0x00,), 0), (0xFD, (0x00,), 0),
+    (0xFE, (0x00,), 0), (0xFF, (0x00,), 0),
+    (0x60, (0x40,), 0), (0x61, (0x04,), 0), (0x62, (0x00,), 0), (0x63, (0x42,), 0),
+    (0x64, (0xD9,), 0), (0x65, (0x00,), 0), (0x66, (0x00,), 0), (0x67, (0x00,), 0),
+    (0x68, (0x00,), 0), (0x69, (0x00,), 0), (0x6A, (0x00,), 0), (0x6B, (0x00,), 0),
+    (0x70, (0x40,), 0), (0x71, (0x03,), 0), (0x72, (0x00,), 0), (0x73, (0x42,), 0),
+    (0x74, (0xD8,), 0), (0x75, (0x00,), 0), (0x76, (0x00,), 0), (0x77, (0x00,), 0),
+    (0x78, (0x00,), 0), (0x79, (0x00,), 0), (0x7A, (0x00,), 0), (0x7B, (0x00,), 0),
+    (0x80, (0x48,), 0), (0x81, (0x00,), 0), (0x82, (0x06,), 0), (0x83, (0x02,), 0),
+    (0x84, (0xD6,), 0), (0x85, (0x04,), 0), (0x86, (0x00,), 0), (0x87, (0x00,), 0),
+    (0x88, (0x48,), 0), (0x89, (0x00,), 0), (0x8A, (0x08,), 0), (0x8B, (0x02,), 0),
+    (0x8C, (0xD8,), 0), (0x8D, (0x04,), 0), (0x8E, (0x00,), 0), (0x8F, (0x00,), 0),
+    (0x90, (0x48,), 0), (0x91, (0x00,), 0), (0x92, (0x0A,), 0), (0x93, (0x02,), 0),
+    (0x94, (0xDA,), 0), (0x95, (0x04,), 0), (0x96, (0x00,), 0), (0x97, (0x00,), 0),
+    (0x98, (0x48,), 0), (0x99, (0x00,), 0), (0x9A, (0x0C,), 0), (0x9B, (0x02,), 0),
+    (0x9C, (0xDC,), 0), (0x9D, (0x04,), 0), (0x9E, (0x00,), 0), (0x9F, (0x00,), 0),
+    (0xA0, (0x48,), 0), (0xA1, (0x00,), 0), (0xA2, (0x0E,), 0), (0xA3, (0x02,), 0),
+    (0xA4, (0xDE,), 0), (0xA5, (0x04,), 0), (0xA6, (0x00,), 0), (0xA7, (0x00,), 0),
+    (0xA8, (0x48,), 0), (0xA9, (0x00,), 0), (0xAA, (0x10,), 0), (0xAB, (0x02,), 0),
+    (0xAC, (0xE0,), 0), (0xAD, (0x04,), 0), (0xAE, (0x00,), 0), (0xAF, (0x00,), 0),
+    (0xB0, (0x48,), 0), (0xB1, (0x00,), 0), (0xB2, (0x12,), 0), (0xB3, (0x02,), 0),
+    (0xB4, (0xE2,), 0), (0xB5, (0x04,), 0), (0xB6, (0x00,), 0), (0xB7, (0x00,), 0),
+    (0xB8, (0x48,), 0), (0xB9, (0x00,), 0), (0xBA, (0x14,), 0), (0xBB, (0x02,), 0),
+    (0xBC, (0xE4,), 0), (0xBD, (0x04,), 0), (0xBE, (0x00,), 0), (0xBF, (0x00,), 0),
+    (0xC0, (0x48,), 0), (0xC1, (0x00,), 0), (0xC2, (0x16,), 0), (0xC3, (0x02,), 0),
+    (0xC4, (0xE6,), 0), (0xC5, (0x04,), 0), (0xC6, (0x00,), 0), (0xC7, (0x00,), 0),
+    (0xC8, (0x48,), 0), (0xC9, (0x00,), 0), (0xCA, (0x18,), 0), (0xCB, (0x02,), 0),
+    (0xCC, (0xE8,), 0), (0xCD, (0x04,), 0), (0xCE, (0x00,), 0), (0xCF, (0x00,), 0),
+    (0xD0, (0x48,), 0), (0xD1, (0x00,), 0), (0xD2, (0x1A,), 0), (0xD3, (0x02,), 0),
+    (0xD4, (0xEA,), 0), (0xD5, (0x04,), 0), (0xD6, (0x00,), 0), (0xD7, (0x00,), 0),
+    (0xD8, (0x48,), 0), (0xD9, (0x00,), 0), (0xDA, (0x1C,), 0), (0xDB, (0x02,), 0),
+    (0xDC, (0xEC,), 0), (0xDD, (0x04,), 0), (0xDE, (0x00,), 0), (0xDF, (0x00,), 0),
+    (0x35, (0x00,), 0),  # TE on
+    (0x36, (ROTATION,), 0),
+    (0x3A, (0x55,), 0),
+    (0x21, (), 0),
+    (0x11, (), 120),
+    (0x29, (), POST_INIT_MS),
+)
+
+
+class InitStreamTests(unittest.TestCase):
+    def test_stream_matches_bsp_table(self):
+        self.assertEqual(st77916_init.INIT_STREAM, st77916_init.compile_init(BSP_INIT_TABLE))
+
+    def test_run_init_replays_every_command_and_delay(self):
+        sent = []
+        delays = []
+        st77916_init.run_init(
+            st77916_init.init_stream(rotation=2, post_init_ms=50),
+            lambda cmd, data: sent.append((cmd, bytes(data) if data is not None else b"")),
+            delays.append,
+        )
+
+        expected = [(cmd, bytes(params)) for cmd, params, _delay in BSP_INIT_TABLE]
+        expected[-5] = (0x36, bytes((2,)))
+        self.assertEqual(sent, expected)
+        self.assertEqual(delays, [120, 50])
+
+    def test_init_stream_copy_leaves_template_untouched(self):
+        stream = st77916_init.init_stream(rotation=3)
+        self.assertNotEqual(bytes(stream), st77916_init.INIT_STREAM)
+        self.assertEqual(bytes(st77916_init.init_stream()), st77916_init.INIT_STREAM)
+
+    def test_compile_rejects_oversized_entries(self):
+        with self.assertRaises(ValueError):
+            st77916_init.compile_init([(0x11, (), 300)])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def ticks_us(self):
+        return self.now
+
+    @staticmethod
+    def ticks_diff(a, b):
+        return a - b
+
+
+class BootProfilerTests(unittest.TestCase):
+    def test_reports_phases_against_budget(self):
+        clock = FakeClock()
+        profiler = boot_profile.BootProfiler(
+            budgets_ms={"reset": 250, "init stream": 100},
+            total_budget_ms=300,
+            ticks_us=clock.ticks_us,
+            ticks_diff=clock.ticks_diff,
+        )
+        with profiler.phase("reset"):
+            clock.now += 200_000
+        with profiler.phase("init stream"):
+            clock.now += 150_000
+
+        self.assertEqual(profiler.phases, [("reset", 200.0), ("init stream", 150.0)])
+        self.assertEqual(profiler.over_budget(), ["init stream", "total"])
+        report = profiler.report()
+        self.assertIn("[boot] init stream: 150.0ms / 100ms OVER", report)
+        self.assertIn("[boot] total: 350.0ms / 300ms OVER", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
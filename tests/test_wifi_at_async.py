@@ -0,0 +1,169 @@
+import asyncio
+import io
+import unittest
+
+from _loader import HOST, LIB, add_paths, load_lib_module
+
+add_paths(LIB, HOST)
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+
+wifi_at_async = load_lib_module("wifi_at_async")
+
+
+class FakeAsyncUART:
+    """asyncio stream over the ESP-AT simulator; readinto() yields to other tasks until data arrives."""
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    async def readinto(self, buf):
+        while True:
+            n = self.sim.uart.readinto(buf)
+            if n:
+                return n
+            await asyncio.sleep(0.001)
+
+    def write(self, buf):
+        self.sim.uart.write(buf)
+
+    async def drain(self):
+        pass
+
+
+class SilentUART:
+    """An async UART nobody answers on."""
+
+    def __init__(self):
+        self.written = []
+
+    async def readinto(self, buf):
+        await asyncio.sleep(3600)
+
+    def write(self, buf):
+        self.written.append(bytes(buf))
+
+    async def drain(self):
+        pass
+
+
+async def ticking(coro, period=0.005):
+    """Run coro while a heartbeat task counts ticks; returns (result, ticks)."""
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(period)
+            ticks += 1
+
+    task = asyncio.create_task(heartbeat())
+    try:
+        result = await coro
+    finally:
+        task.cancel()
+    return result, ticks
+
+
+class AsyncClientTests(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+
+    def make_client(self, connect_ms=0, **kwargs):
+        sim = ESPATSimulator(baudrate=None, connect_ms=connect_ms)
+        self.addCleanup(sim.close)
+        return wifi_at_async.AsyncESPATWiFi(FakeAsyncUART(sim), debug="silent", **kwargs), sim
+
+    def test_heartbeat_runs_during_connect_and_http(self):
+        wifi, sim = self.make_client(connect_ms=200)
+
+        async def session():
+            self.assertTrue(await wifi.connect("ssid", "password"))
+            return await wifi.http_get(self.server.url("/ping"))
+
+        result, ticks = asyncio.run(ticking(session()))
+        self.assertEqual(result, (200, "pong"))
+        # CIPSTART alone keeps the simulated ESP busy for 0.2 s.
+        self.assertGreaterEqual(ticks, 10)
+
+    def test_keep_alive_and_close_mode(self):
+        async def gets(wifi):
+            results = [await wifi.http_get(self.server.url(path)) for path in ("/ping", "/chunked", "/hold")]
+            results.append(await wifi.http_post(self.server.url("/echo"), b"abc"))
+            await wifi.close()
+            return results
+
+        expected = [(200, "pong"), (200, "chunked body done"), (200, "held"), (200, "abc")]
+        for keep_alive, starts in ((False, 4), (True, 1)):
+            with self.subTest(keep_alive=keep_alive):
+                wifi, sim = self.make_client(keep_alive=keep_alive)
+                self.assertEqual(asyncio.run(gets(wifi)), expected)
+                self.assertEqual(sim.counts["AT+CIPSTART"], starts)
+
+    def test_upload_goes_out_in_8192_byte_sends(self):
+        data = bytes(i * 7 % 256 for i in range(50000))
+        expected = (200, "{} {}".format(len(data), sum(data) % 65536))
+
+        async def posts(wifi):
+            url = self.server.url("/length")
+            return [await wifi.http_post(url, memoryview(data)), await wifi.http_post(url, io.BytesIO(data))]
+
+        wifi, sim = self.make_client(keep_alive=True)
+        self.assertEqual(asyncio.run(posts(wifi)), [expected, expected])
+        # The simulator refuses more than 8192 bytes per send: 7 for the bytes
+        # body (head included); head, 7 chunks and the last chunk for the file.
+        self.assertEqual(sim.counts["AT+CIPSEND"], 7 + 9)
+
+    def test_closed_link_status_counts_as_connected(self):
+        wifi, sim = self.make_client()
+
+        async def session():
+            before = await wifi.is_connected()
+            await wifi.connect("ssid", "password")
+            joined = await wifi.is_connected()
+            await wifi.http_get(self.server.url("/ping"))
+            await wifi.close()
+            return before, joined, await wifi.is_connected()
+
+        # STATUS:5 before the join, 2 after it, 4 once the HTTP link has closed.
+        self.assertEqual(asyncio.run(session()), (False, True, True))
+
+    def test_concurrent_calls_are_serialized(self):
+        wifi, sim = self.make_client(keep_alive=True)
+
+        async def both():
+            return await asyncio.gather(
+                wifi.http_get(self.server.url("/bytes/3000")),
+                wifi.http_get(self.server.url("/ping")),
+            )
+
+        big, small = asyncio.run(both())
+        self.assertEqual((big[0], len(big[1])), (200, 3000))
+        self.assertEqual(small, (200, "pong"))
+
+    def test_reads_go_through_the_receive_ring(self):
+        wifi, sim = self.make_client(read_size=256, rx_size=512)
+        status, body = asyncio.run(wifi.http_get(self.server.url("/bytes/3000")))
+        self.assertEqual((status, len(body)), (200, 3000))
+        self.assertGreater(wifi.rx.received, 3000)
+        self.assertEqual((len(wifi.rx), wifi.rx.high_water, wifi.rx.overflows), (0, 256, 0))
+
+    def test_command_timeout_does_not_block_the_loop(self):
+        uart = SilentUART()
+        wifi = wifi_at_async.AsyncESPATWiFi(uart, debug="silent")
+        result, ticks = asyncio.run(ticking(wifi.send_cmd("AT+GMR", timeout=0.1)))
+        self.assertEqual(result, (False, ""))
+        self.assertEqual(uart.written, [b"AT+GMR\r\n"])
+        self.assertGreaterEqual(ticks, 5)
+
+    def test_uart_stream_wraps_a_polled_uart(self):
+        sim = ESPATSimulator(baudrate=None)
+        self.addCleanup(sim.close)
+        wifi = wifi_at_async.AsyncESPATWiFi(wifi_at_async.UARTStream(sim.uart, poll_s=0.001), debug="silent")
+        self.assertEqual(asyncio.run(wifi.http_get(self.server.url("/ping"))), (200, "pong"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+import io
+import sys
+import time
+import types
+import unittest
+
+from _loader import HOST, LIB, add_paths, load_lib_module
+
+add_paths(LIB, HOST)
+
+from esp_at import ESPATSimulator  # noqa: E402
+from local_http import LocalHTTPServer  # noqa: E402
+
+
+class _DummyUART:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def _load_wifi_module():
+    sys.modules.setdefault("busio", types.SimpleNamespace(UART=_DummyUART))
+    return load_lib_module("wifi_at")
+
+
+wifi_at = _load_wifi_module()
+
+
+def make_client(**kwargs):
+    sim = ESPATSimulator(baudrate=None)
+    wifi = wifi_at.ESPATWiFi(None, None, debug="silent", **kwargs)
+    wifi.uart = sim.uart
+    return wifi, sim
+
+
+class HTTPClientTests(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+
+    def test_close_mode_opens_a_link_per_request(self):
+        wifi, sim = make_client()
+        self.addCleanup(sim.close)
+        for _ in range(2):
+            self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(sim.counts["AT+CIPSTART"], 2)
+
+    def test_close_mode_returns_before_the_server_closes(self):
+        wifi, sim = make_client()
+        self.addCleanup(sim.close)
+        start = time.monotonic()
+        self.assertEqual(wifi.http_get(self.server.url("/hold")), (200, "held"))
+        self.assertLess(time.monotonic() - start, 0.5)
+        # The held link is closed before the next one is opened.
+        self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(sim.counts["AT+CIPCLOSE"], 1)
+        self.assertEqual(sim.counts["AT+CIPSTART"], 2)
+
+    def test_failed_connects_are_retried(self):
+        sim = ESPATSimulator(baudrate=None, connect_fail_rate=0.3, seed=1)
+        self.addCleanup(sim.close)
+        wifi = wifi_at.ESPATWiFi(None, None, debug="silent")
+        wifi.uart = sim.uart
+        for _ in range(10):
+            self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertGreater(sim.counts["AT+CIPSTART"], 10)
+        self.assertEqual(self.server.connections, 10)
+
+    def test_small_receive_ring_carries_a_large_body(self):
+        wifi, sim = make_client(rx_size=64)
+        self.addCleanup(sim.close)
+        status, body = wifi.http_get(self.server.url("/bytes/5000"))
+        self.assertEqual((status, body), (200, bytes(48 + i % 64 for i in range(5000)).decode()))
+        self.assertEqual(len(wifi.rx.buf), 64)
+        self.assertEqual(wifi.rx.high_water, 64)
+        self.assertGreater(wifi.rx.overflows, 0)
+        self.assertGreater(wifi.rx.received, 5000)
+
+    def test_keep_alive_reuses_the_link(self):
+        wifi, sim = make_client(keep_alive=True)
+        self.addCleanup(sim.close)
+        self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(wifi.http_get(self.server.url("/chunked")), (200, "chunked body done"))
+        self.assertEqual(wifi.http_post(self.server.url("/echo"), b"\x00abc"), (200, "\x00abc"))
+        self.assertEqual(sim.counts["AT+CIPSTART"], 1)
+        self.assertEqual(self.server.connections, 1)
+        self.assertNotIn("AT+CIPCLOSE", sim.counts)
+
+    def test_keep_alive_reconnects_after_the_server_drops_the_link(self):
+        wifi, sim = make_client(keep_alive=True)
+        self.addCleanup(sim.close)
+        self.assertEqual(wifi.http_get(self.server.url("/drop")), (200, "bye"))
+        self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(sim.counts["AT+CIPSTART"], 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_keep_alive_switches_hosts(self):
+        wifi, sim = make_client(keep_alive=True)
+        self.addCleanup(sim.close)
+        with LocalHTTPServer() as other:
+            self.assertEqual(wifi.http_get(self.server.url("/ping"))[0], 200)
+            self.assertEqual(wifi.http_get(other.url("/ping"))[0], 200)
+            self.assertEqual(wifi.http_get(other.url("/ping"))[0], 200)
+        self.assertEqual(sim.counts["AT+CIPSTART"], 2)
+        self.assertEqual(sim.counts["AT+CIPCLOSE"], 1)
+
+
+class MultiplexTests(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+        self.wifi, self.sim = make_client(multiplex=True, keep_alive=True, per_host=2)
+        self.addCleanup(self.sim.close)
+        self.assertTrue(self.wifi.connect("ssid", "password"))
+        self.assertTrue(self.sim.mux)
+
+    def test_requests_overlap_on_separate_links(self):
+        start = time.monotonic()
+        slow = [self.wifi.start_get(self.server.url("/slow")) for _ in range(2)]
+        self.assertTrue(slow[0].busy)
+        self.wifi.wait(*slow)
+        elapsed = time.monotonic() - start
+        self.assertEqual([link.result() for link in slow], [(200, "slow")] * 2)
+        self.assertEqual(sorted(link.id for link in slow), [0, 1])
+        # One after the other takes 2 x (0.1 s send pause + 0.2 s server time).
+        self.assertLess(elapsed, 0.4 + 0.15)
+
+    def test_routes_ipd_frames_by_link_id(self):
+        with LocalHTTPServer() as other:
+            big = self.wifi.start_get(self.server.url("/bytes/5000"))
+            small = self.wifi.start_get(other.url("/ping"))
+            post = self.wifi.start_post(other.url("/echo"), b"abc")
+            self.wifi.wait(big, small, post)
+        self.assertEqual(len(big.result()[1]), 5000)
+        self.assertEqual(small.result(), (200, "pong"))
+        self.assertEqual(post.result(), (200, "abc"))
+
+    def test_per_host_limit_and_link_reuse(self):
+        links = [self.wifi.start_get(self.server.url("/slow")) for _ in range(2)]
+        self.assertIsNone(self.wifi.start_get(self.server.url("/ping")))
+        self.wifi.wait(*links)
+        # Blocking calls reuse the idle keep-alive links.
+        self.assertEqual(self.wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(self.sim.counts["AT+CIPSTART"], 2)
+        self.wifi.close()
+        self.assertEqual(self.sim.counts["AT+CIPCLOSE"], 2)
+        self.assertEqual(self.wifi.poll(), 0)
+
+
+class PassiveReceiveTests(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+
+    def connected_client(self, **kwargs):
+        wifi, sim = make_client(passive=True, recv_chunk=512, **kwargs)
+        self.addCleanup(sim.close)
+        self.assertTrue(wifi.connect("ssid", "password"))
+        self.assertTrue(sim.passive)
+        return wifi, sim
+
+    def test_body_streams_to_a_sink_in_bounded_pieces(self):
+        for keep_alive in (False, True):
+            with self.subTest(keep_alive=keep_alive):
+                wifi, sim = self.connected_client(keep_alive=keep_alive)
+                sizes = []
+                received = bytearray()
+
+                def sink(piece):
+                    sizes.append(len(piece))
+                    received.extend(piece)
+
+                self.assertEqual(wifi.http_get(self.server.url("/bytes/20000"), sink=sink), (200, ""))
+                self.assertEqual(bytes(received), bytes(48 + i % 64 for i in range(20000)))
+                self.assertLessEqual(max(sizes), 512)
+                self.assertGreater(sim.counts["AT+CIPRECVDATA"], 20000 // 512)
+                self.assertEqual(wifi.http_get(self.server.url("/chunked")), (200, "chunked body done"))
+
+    def test_multiplexed_links_pull_their_own_data(self):
+        wifi, sim = self.connected_client(multiplex=True, keep_alive=True)
+        out = io.BytesIO()
+        big = wifi.start_get(self.server.url("/bytes/6000"), sink=out)
+        small = wifi.start_post(self.server.url("/echo"), b"passive")
+        wifi.wait(big, small)
+        self.assertEqual(big.result(), (200, ""))
+        self.assertEqual(len(out.getvalue()), 6000)
+        self.assertEqual(small.result(), (200, "passive"))
+
+
+class URCTests(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+        self.wifi, self.sim = make_client(keep_alive=True)
+        self.addCleanup(self.sim.close)
+        self.events = []
+        self.wifi.subscribe(lambda event, link_id: self.events.append((event, link_id)))
+
+    def test_state_is_cached_after_connect(self):
+        self.assertTrue(self.wifi.connect("ssid", "password"))
+        self.assertEqual(self.events, [(wifi_at.URC_WIFI_CONNECTED, None), (wifi_at.URC_WIFI_GOT_IP, None)])
+        for _ in range(3):
+            self.assertTrue(self.wifi.is_connected())
+        self.assertNotIn("AT+CIPSTATUS", self.sim.counts)
+
+    def test_unknown_state_is_queried_once(self):
+        self.sim.wifi_connected = True
+        self.assertTrue(self.wifi.is_connected())
+        self.assertTrue(self.wifi.is_connected())
+        self.assertEqual(self.sim.counts["AT+CIPSTATUS"], 1)
+        self.assertTrue(self.wifi.is_connected(refresh=True))
+        self.assertEqual(self.sim.counts["AT+CIPSTATUS"], 2)
+
+    def test_disconnect_drops_the_link_and_rejoin_restores_state(self):
+        self.assertTrue(self.wifi.connect("ssid", "password"))
+        self.assertEqual(self.wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        del self.events[:]
+        self.sim.lose_ap()
+        self.wifi.poll()
+        self.assertEqual(self.events, [(wifi_at.URC_WIFI_DISCONNECT, None), (wifi_at.URC_CLOSED, None)])
+        self.assertFalse(self.wifi.is_connected())
+        self.assertEqual(self.wifi.wifi_state, wifi_at.WIFI_DOWN)
+        self.sim.rejoin_ap()
+        self.assertTrue(self.wifi.is_connected())
+        self.assertNotIn("AT+CIPSTATUS", self.sim.counts)
+        # The dropped keep-alive link is reopened without a failed CIPSEND.
+        self.assertEqual(self.wifi.http_get(self.server.url("/ping")), (200, "pong"))
+        self.assertEqual(self.sim.counts["AT+CIPSTART"], 2)
+        self.assertEqual(self.sim.counts["AT+CIPSEND"], 2)
+
+
+class UploadTests(unittest.TestCase):
+    DATA = bytes(i * 7 % 256 for i in range(50000))
+
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+        self.expected = (200, "{} {}".format(len(self.DATA), sum(self.DATA) % 65536))
+
+    def make_client(self, **kwargs):
+        wifi, sim = make_client(**kwargs)
+        self.addCleanup(sim.close)
+        return wifi, sim
+
+    def test_bytes_body_goes_out_in_8192_byte_sends(self):
+        wifi, sim = self.make_client()
+        self.assertEqual(wifi.http_post(self.server.url("/length"), memoryview(self.DATA)), self.expected)
+        # Head and body share the sends; the simulator refuses more than 8192 bytes per send.
+        self.assertEqual(sim.counts["AT+CIPSEND"], 7)
+
+    def test_file_and_iterable_bodies_are_sent_chunked(self):
+        wifi, sim = self.make_client(keep_alive=True)
+        url = self.server.url("/length")
+        self.assertEqual(wifi.http_post(url, io.BytesIO(self.DATA)), self.expected)
+        pieces = (self.DATA[i:i + 3000] for i in range(0, len(self.DATA), 3000))
+        self.assertEqual(wifi.http_post(url, pieces), self.expected)
+        self.assertEqual(wifi.http_post(url, io.BytesIO(self.DATA), length=len(self.DATA)), self.expected)
+        self.assertEqual(wifi.http_post(self.server.url("/echo"), iter([b"a", b"", b"bc"])), (200, "abc"))
+        self.assertEqual(sim.counts["AT+CIPSTART"], 1)
+
+    def test_dropped_link_is_reopened_before_a_file_is_read(self):
+        wifi, sim = self.make_client(keep_alive=True)
+        self.assertEqual(wifi.http_get(self.server.url("/drop")), (200, "bye"))
+        # The refused first send carries only the head.
+        time.sleep(0.05)
+        self.assertEqual(wifi.http_post(self.server.url("/length"), io.BytesIO(self.DATA)), self.expected)
+        self.assertEqual(sim.counts["AT+CIPSTART"], 2)
+
+    def test_multiplexed_upload(self):
+        wifi, sim = self.make_client(multiplex=True, keep_alive=True)
+        self.assertTrue(wifi.connect("ssid", "password"))
+        post = wifi.start_post(self.server.url("/length"), io.BytesIO(self.DATA))
+        ping = wifi.start_get(self.server.url("/ping"))
+        wifi.wait(post, ping)
+        self.assertEqual((post.result(), ping.result()), (self.expected, (200, "pong")))
+
+
+class DNSCacheTests(unittest.TestCase):
+    def test_entries_expire_and_the_least_recently_used_goes_first(self):
+        now = [0.0]
+        cache = wifi_at.DNSCache(size=2, ttl=60, clock=lambda: now[0])
+        cache.put("ha.local", "10.0.0.2")
+        cache.put("claw.local", "10.0.0.3")
+        self.assertEqual(cache.get("ha.local"), "10.0.0.2")
+        cache.put("other.local", "10.0.0.4")
+        self.assertEqual((cache.get("claw.local"), cache.get("ha.local")), (None, "10.0.0.2"))
+        now[0] = 61
+        self.assertIsNone(cache.get("ha.local"))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 2, 1))
+
+
+class DNSResolveTests(unittest.TestCase):
+    DNS_MS = 150
+
+    def setUp(self):
+        self.server = LocalHTTPServer().start()
+        self.addCleanup(self.server.stop)
+        self.sim = ESPATSimulator(baudrate=None, dns_ms=self.DNS_MS, hosts={"ha.local": self.server.host})
+        self.addCleanup(self.sim.close)
+        self.url = "http://ha.local:{}/ping".format(self.server.port)
+
+    def client(self, **kwargs):
+        wifi = wifi_at.ESPATWiFi(None, None, debug="silent", **kwargs)
+        wifi.uart = self.sim.uart
+        return wifi
+
+    def timed_gets(self, wifi, count):
+        times = []
+        for _ in range(count):
+            start = time.monotonic()
+            self.assertEqual(wifi.http_get(self.url), (200, "pong"))
+            times.append(time.monotonic() - start)
+        return times
+
+    def test_host_is_resolved_once_and_connected_by_ip(self):
+        wifi = self.client()
+        times = self.timed_gets(wifi, 3)
+        self.assertEqual((self.sim.counts["AT+CIPDOMAIN"], self.sim.dns_lookups), (1, 1))
+        self.assertEqual((wifi.dns.hits, wifi.dns.misses), (2, 1))
+        self.assertGreater(times[0], self.DNS_MS / 1000)
+        self.assertLess(max(times[1:]), times[0] - self.DNS_MS / 2000)
+
+    def test_without_the_cache_every_connect_resolves(self):
+        wifi = self.client(dns_size=0)
+        self.timed_gets(wifi, 3)
+        self.assertNotIn("AT+CIPDOMAIN", self.sim.counts)
+        self.assertEqual(self.sim.dns_lookups, 3)
+
+    def test_failed_connect_drops_the_cached_address(self):
+        wifi = self.client()
+        self.sim.hosts["ha.local"] = "127.0.0.2"
+        self.assertEqual(wifi.http_get(self.url), (0, "Connection failed"))
+        self.assertNotIn("ha.local", wifi.dns)
+        self.sim.hosts["ha.local"] = self.server.host
+        self.assertEqual(wifi.http_get(self.url), (200, "pong"))
+        self.assertEqual(self.sim.counts["AT+CIPDOMAIN"], 2)
+
+    def test_unknown_host_falls_back_to_connecting_by_name(self):
+        wifi = self.client()
+        self.assertEqual(wifi.http_get("http://nowhere.invalid/ping"), (0, "Connection failed"))
+        self.assertEqual(len(wifi.dns), 0)
+        self.assertEqual(self.sim.counts["AT+CIPDOMAIN"], 1)
+
+
+class BaudRateTests(unittest.TestCase):
+    def make_client(self, max_baudrate=None, flow_control=False):
+        sim = ESPATSimulator(baudrate=115200, max_baudrate=max_baudrate)
+        self.addCleanup(sim.close)
+        wifi = wifi_at.ESPATWiFi(None, None, debug="silent")
+        wifi.uart = sim.uart
+        wifi.flow_control = flow_control
+        return wifi, sim
+
+    def test_moves_to_the_fastest_rate(self):
+        wifi, sim = self.make_client()
+        report = wifi.negotiate_baudrate()
+        self.assertEqual([rate for rate, _ in report], [115200, 921600])
+        self.assertTrue(all(round_trip for _, round_trip in report))
+        self.assertEqual((sim.baudrate, sim.uart.baudrate), (921600, 921600))
+        self.assertFalse(sim.flow_control)
+        self.assertTrue(wifi._send_cmd("AT")[0])
+
+    def test_falls_back_past_rates_that_fail_the_probe(self):
+        wifi, sim = self.make_client(max_baudrate=460800)
+        report = wifi.negotiate_baudrate()
+        self.assertEqual([rate for rate, _ in report], [115200, 921600, 460800])
+        self.assertIsNone(report[1][1])
+        self.assertLess(report[2][1], report[0][1])
+        self.assertEqual((sim.baudrate, sim.uart.baudrate), (460800, 460800))
+        self.assertTrue(wifi._send_cmd("AT+GMR")[0])
+
+    def test_flow_control_is_requested_when_wired(self):
+        wifi, sim = self.make_client(max_baudrate=460800, flow_control=True)
+        self.assertEqual(wifi.negotiate_baudrate()[-1][0], 921600)
+        self.assertTrue(sim.flow_control)
+
+    def test_recovery_keeps_the_flow_control_field(self):
+        wifi, sim = self.make_client(flow_control=True)
+        sent = []
+
+        def send_cmd(cmd, *args, **kwargs):
+            # The ESP takes UART_CUR but never answers AT at either rate.
+            sent.append(cmd)
+            return cmd.startswith("AT+UART_CUR"), ""
+
+        wifi._send_cmd = send_cmd
+        self.assertFalse(wifi._switch_baudrate(921600))
+        self.assertEqual([cmd for cmd in sent if cmd.startswith("AT+UART_CUR")],
+                         ["AT+UART_CUR=921600,8,1,0,3", "AT+UART_CUR=115200,8,1,0,3"])
+        self.assertEqual(sim.uart.baudrate, 115200)
+
+    def test_keeps_the_rate_when_nothing_faster_works(self):
+        wifi, sim = self.make_client(max_baudrate=115200)
+        report = wifi.negotiate_baudrate(rates=(230400,))
+        self.assertEqual([round_trip for _, round_trip in report][1:], [None])
+        self.assertEqual((sim.baudrate, sim.uart.baudrate), (115200, 115200))
+        self.assertTrue(wifi._send_cmd("AT")[0])
+
+
+if __name__ == "__main__":
+    unittest.main()